@@ -1,8 +1,14 @@
 from typing import List, Optional
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Response
 from pydantic import BaseModel
 
+from app.api.routes.recipes import find_recipe, recipe_sync
+from app.core.cursors import CURSOR_HEADER, decode_cursor, encode_cursor, page_after
+from app.db.recipes import RECIPE_STATUSES, recipe_repository
+from app.models.recipe import RecipeFilter
+from app.services.recipe_catalog import recipe_catalog
+
 router = APIRouter()
 
 
@@ -46,6 +52,26 @@ class TagCategory(BaseModel):
     tags: List[str]
 
 
+def _cursor_id(cursor: str, filters: dict) -> str:
+    """Id a listing cursor resumes after"""
+    key = decode_cursor(cursor, filters)
+    if len(key) != 1 or not isinstance(key[0], str):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key[0]
+
+
+def _page(response: Response, items: list, filters: dict, cursor: Optional[str], offset: int, limit: int) -> list:
+    """A page of items by id, after the cursor's id (or from offset); sets X-Next-Cursor"""
+    items = sorted(items, key=lambda item: item.id)
+    if cursor:
+        page, last = page_after(items, lambda item: item.id, _cursor_id(cursor, filters), limit)
+    else:
+        page, last = page_after(items[offset:], lambda item: item.id, None, limit)
+    if last is not None:
+        response.headers[CURSOR_HEADER] = encode_cursor([last], filters)
+    return page
+
+
 @router.get("/stats", response_model=AdminStats, summary="Get platform statistics")
 async def get_admin_stats():
     """Get overall platform statistics"""
@@ -63,11 +89,13 @@ async def get_admin_stats():
 
 @router.get("/users", response_model=List[UserSummary], summary="List all users")
 async def list_users(
+    response: Response,
     status: Optional[str] = Query(None, description="Filter by status: active, inactive"),
     limit: int = Query(default=20, ge=1, le=100),
-    offset: int = Query(default=0, ge=0)
+    offset: int = Query(default=0, ge=0, description="Results to skip (ignored with cursor)"),
+    cursor: Optional[str] = Query(None, description=f"{CURSOR_HEADER} header of the previous page"),
 ):
-    """List all users with optional filtering"""
+    """List all users with optional filtering, by id (X-Next-Cursor pages on)"""
     sample_users = [
         UserSummary(
             id="user_1", name="Emma Wilson", email="emma@example.com",
@@ -99,7 +127,7 @@ async def list_users(
     if status:
         sample_users = [u for u in sample_users if u.status == status]
     
-    return sample_users[offset:offset+limit]
+    return _page(response, sample_users, {"status": status}, cursor, offset, limit)
 
 
 @router.get("/users/{user_id}", summary="Get user details")
@@ -136,48 +164,71 @@ async def update_user_status(user_id: str, status: str = Query(..., description=
 
 @router.get("/recipes", response_model=List[RecipeSummary], summary="List all recipes")
 async def list_recipes(
+    response: Response,
     status: Optional[str] = Query(None, description="Filter by status: published, draft, archived"),
     cuisine: Optional[str] = Query(None),
     limit: int = Query(default=20, ge=1, le=100),
-    offset: int = Query(default=0, ge=0)
+    offset: int = Query(default=0, ge=0, description="Results to skip (ignored with cursor)"),
+    cursor: Optional[str] = Query(None, description=f"{CURSOR_HEADER} header of the previous page"),
 ):
-    """List all recipes with optional filtering"""
-    sample_recipes = [
-        RecipeSummary(
-            id="recipe_1", title="Mediterranean Quinoa Bowl", cuisine="Mediterranean",
-            calories=420, status="published", views=1234, rating=4.8
-        ),
-        RecipeSummary(
-            id="recipe_2", title="Grilled Salmon", cuisine="American",
-            calories=520, status="published", views=987, rating=4.9
-        ),
-        RecipeSummary(
-            id="recipe_3", title="Chicken Tikka Masala", cuisine="Indian",
-            calories=480, status="published", views=2341, rating=4.7
-        ),
-        RecipeSummary(
-            id="recipe_4", title="Thai Green Curry", cuisine="Thai",
-            calories=450, status="draft", views=0, rating=0
-        ),
-        RecipeSummary(
-            id="recipe_5", title="Greek Salad", cuisine="Greek",
-            calories=280, status="published", views=756, rating=4.5
-        ),
-    ]
-    
-    if status:
-        sample_recipes = [r for r in sample_recipes if r.status == status]
-    if cuisine:
-        sample_recipes = [r for r in sample_recipes if r.cuisine.lower() == cuisine.lower()]
-    
-    return sample_recipes[offset:offset+limit]
+    """
+    List recipes by id (X-Next-Cursor pages on): the published catalog,
+    built-in recipes included, and the drafts and archived recipes of the
+    recipe repository.
+    """
+    filters = {"status": status, "cuisine": cuisine}
+    after = _cursor_id(cursor, filters) if cursor else None
+    # Both sources page by id; an offset is only honoured without a cursor
+    wanted = limit + 1 + (0 if cursor else offset)
+    rows = await recipe_repository.list(RecipeFilter(cuisine=cuisine), status=status, after=after, limit=wanted)
+    summaries = {
+        row["id"]: RecipeSummary(
+            id=row["id"],
+            title=row["recipe"]["title"],
+            cuisine=row["recipe"]["cuisine"],
+            calories=int(row["recipe"]["nutrition"]["calories"]),
+            status=row["status"],
+            views=0,
+            rating=row["recipe"].get("rating", 0),
+        )
+        for row in rows
+    }
+    if status in (None, "published"):
+        # Deleted and unpublished recipes have already left the catalog
+        published = sorted(
+            (recipe for recipe in recipe_catalog.query(cuisine=cuisine, limit=len(recipe_catalog))
+             if after is None or recipe.id > after),
+            key=lambda recipe: recipe.id,
+        )
+        for recipe in published[:wanted]:
+            summaries.setdefault(recipe.id, RecipeSummary(
+                id=recipe.id,
+                title=recipe.title,
+                cuisine=recipe.cuisine,
+                calories=int(recipe.nutrition.calories),
+                status="published",
+                views=0,
+                rating=recipe.rating,
+            ))
+    page = sorted(summaries.values(), key=lambda summary: summary.id)[:wanted]
+    if not cursor:
+        page = page[offset:]
+    if len(page) > limit:
+        page = page[:limit]
+        response.headers[CURSOR_HEADER] = encode_cursor([page[-1].id], filters)
+    return page
 
 
 @router.put("/recipes/{recipe_id}/status", summary="Update recipe status")
 async def update_recipe_status(recipe_id: str, status: str = Query(..., description="published, draft, archived")):
-    """Update a recipe's status"""
-    if status not in ["published", "draft", "archived"]:
+    """Update a recipe's status (only published recipes are listed and searched)"""
+    if status not in RECIPE_STATUSES:
         raise HTTPException(status_code=400, detail="Invalid status")
+    recipe = await find_recipe(recipe_id)
+    if not recipe:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    await recipe_repository.save(recipe.model_dump(), status=status)
+    await recipe_sync.catch_up()
     return {"recipe_id": recipe_id, "status": status, "message": "Recipe status updated"}
 
 
@@ -11,16 +11,20 @@ Provides:
 from datetime import datetime
 from typing import Optional
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.security import HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr, Field
 
 from app.core.security import (
-    hash_password,
-    verify_password,
     create_token_pair,
     decode_token,
+    new_token_id,
     TokenPair,
 )
-from app.middleware.auth import get_current_user
+from app.core.tokens import token_registry, seconds_until
+from app.core.config import settings
+from app.core.passwords import password_hasher, PasswordHasherBusy
+from app.db.users import user_repository
+from app.middleware.auth import get_current_user, security
 
 router = APIRouter()
 
@@ -69,39 +73,36 @@ class AuthResponse(BaseModel):
     tokens: TokenPair
 
 
-# In-memory user store (replace with database in production)
-# Initialize with empty dict - demo user created on first access
-_users_db: dict[str, dict] = {}
-_demo_initialized: bool = False
+def _password_pool_busy() -> HTTPException:
+    """503 returned when the password hashing pool is saturated"""
+    return HTTPException(
+        status_code=503,
+        detail="Authentication is temporarily busy. Please retry shortly.",
+        headers={"Retry-After": "1"},
+    )
 
 
-def _ensure_demo_user():
-    """Lazy initialization of demo user to avoid startup issues"""
-    global _demo_initialized
-    if not _demo_initialized:
-        _users_db["demo@example.com"] = {
-            "id": "user_demo",
-            "email": "demo@example.com",
-            "name": "Demo User",
-            "password_hash": hash_password("password123"),
-            "created_at": datetime.now(),
-        }
-        _demo_initialized = True
+async def issue_tokens(user_id: str, family: Optional[str] = None) -> TokenPair:
+    """Create a token pair and register its refresh token as unused"""
+    refresh_jti = new_token_id()
+    family = family or new_token_id()
+    tokens = create_token_pair(user_id, refresh_jti=refresh_jti, family=family)
+    await token_registry.register_refresh_token(
+        refresh_jti,
+        user_id,
+        ttl=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+    )
+    return tokens
 
 
-def get_user_by_email(email: str) -> Optional[dict]:
+async def get_user_by_email(email: str) -> Optional[dict]:
     """Get user by email from database"""
-    _ensure_demo_user()
-    return _users_db.get(email.lower())
+    return await user_repository.get_by_email(email)
 
 
-def get_user_by_id(user_id: str) -> Optional[dict]:
+async def get_user_by_id(user_id: str) -> Optional[dict]:
     """Get user by ID from database"""
-    _ensure_demo_user()
-    for user in _users_db.values():
-        if user["id"] == user_id:
-            return user
-    return None
+    return await user_repository.get_by_id(user_id)
 
 
 @router.post("/register", response_model=AuthResponse, summary="Register new user")
@@ -111,29 +112,31 @@ async def register(data: UserRegister):
     
     Rate limited to 5 requests/min per IP to prevent abuse.
     """
-    _ensure_demo_user()
     email = data.email.lower()
     
     # Check if email already exists
-    if get_user_by_email(email):
+    if await get_user_by_email(email):
         raise HTTPException(
             status_code=400,
             detail="Email already registered"
         )
     
+    try:
+        password_hash = await password_hasher.hash(data.password)
+    except PasswordHasherBusy:
+        raise _password_pool_busy()
+    
     # Create user
     user_id = f"user_{datetime.now().timestamp()}"
-    user = {
-        "id": user_id,
-        "email": email,
-        "name": data.name,
-        "password_hash": hash_password(data.password),
-        "created_at": datetime.now(),
-    }
-    _users_db[email] = user
+    user = await user_repository.create(user_id, email, data.name, password_hash)
+    if not user:
+        raise HTTPException(
+            status_code=400,
+            detail="Email already registered"
+        )
     
     # Generate tokens
-    tokens = create_token_pair(user_id)
+    tokens = await issue_tokens(user_id)
     
     return AuthResponse(
         user=UserResponse(
@@ -153,18 +156,34 @@ async def login(data: UserLogin):
     
     Rate limited to 5 requests/min per IP to prevent brute force.
     """
-    _ensure_demo_user()
     email = data.email.lower()
-    user = get_user_by_email(email)
+    user = await get_user_by_email(email)
     
-    if not user or not verify_password(data.password, user["password_hash"]):
+    if not user:
         raise HTTPException(
             status_code=401,
             detail="Invalid email or password"
         )
     
-    # Generate tokens
-    tokens = create_token_pair(user["id"])
+    try:
+        is_valid, new_hash = await password_hasher.verify_and_update(
+            data.password, user["password_hash"]
+        )
+    except PasswordHasherBusy:
+        raise _password_pool_busy()
+    
+    if not is_valid:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid email or password"
+        )
+    
+    # Cost factor changed since this hash was made - store the rehashed password
+    if new_hash:
+        await user_repository.update_password_hash(user["id"], new_hash)
+    
+    # Generate tokens (new login session = new refresh token family)
+    tokens = await issue_tokens(user["id"])
     
     return AuthResponse(
         user=UserResponse(
@@ -181,36 +200,60 @@ async def login(data: UserLogin):
 async def refresh_token(data: TokenRefresh):
     """
     Get new access token using refresh token.
+    
+    Refresh tokens are single use: each call returns a new refresh token and
+    invalidates the old one. Reusing a refresh token revokes its whole session.
     """
     payload = decode_token(data.refresh_token)
     
-    if not payload or payload.type != "refresh":
+    if not payload or payload.type != "refresh" or not payload.jti or not payload.fam:
         raise HTTPException(
             status_code=401,
             detail="Invalid or expired refresh token"
         )
     
+    if not await token_registry.consume_refresh_token(
+        payload.jti,
+        payload.fam,
+        ttl=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+    ):
+        raise HTTPException(
+            status_code=401,
+            detail="Refresh token has been revoked or already used"
+        )
+    
     # Verify user still exists
-    user = get_user_by_id(payload.sub)
+    user = await get_user_by_id(payload.sub)
     if not user:
         raise HTTPException(
             status_code=401,
             detail="User not found"
         )
     
-    # Generate new token pair
-    return create_token_pair(payload.sub)
+    # Rotate: new token pair in the same session family
+    return await issue_tokens(payload.sub, family=payload.fam)
 
 
 @router.post("/logout", summary="Logout user")
-async def logout(user_id: str = Depends(get_current_user)):
+async def logout(
+    data: Optional[TokenRefresh] = None,
+    user_id: str = Depends(get_current_user),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+):
     """
     Logout user (invalidate tokens).
     
-    In production, you would add the token to a blacklist in Redis.
+    Revokes the current access token and, if a refresh token is provided,
+    every refresh token from the same session.
     """
-    # In production: Add current token to Redis blacklist
-    # await redis.setex(f"blacklist:{token}", ttl, "1")
+    access = decode_token(credentials.credentials)
+    if access and access.jti:
+        await token_registry.revoke_access_token(access.jti, ttl=seconds_until(access.exp))
+    
+    if data:
+        refresh = decode_token(data.refresh_token)
+        if refresh and refresh.type == "refresh" and refresh.sub == user_id and refresh.fam:
+            await token_registry.revoke_family(refresh.fam, ttl=seconds_until(refresh.exp))
     
     return {"message": "Logged out successfully"}
 
@@ -220,7 +263,7 @@ async def get_me(user_id: str = Depends(get_current_user)):
     """
     Get current authenticated user's profile.
     """
-    user = get_user_by_id(user_id)
+    user = await get_user_by_id(user_id)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -1,14 +1,19 @@
 """
 Food Search and Nutrition API Routes
 
-Endpoints for searching foods and retrieving nutrition data using USDA FoodData Central API.
+Endpoints for searching foods and retrieving nutrition data using USDA FoodData Central
+(the live API, or a local import of it when FOOD_DATA_SOURCE=local).
 """
 
 from typing import List, Optional
 from fastapi import APIRouter, Query, HTTPException
 from pydantic import BaseModel
 
-from app.services.usda import usda_service, FoodItem, FoodNutrition
+from app.core.config import settings
+from app.services.barcodes import food_barcodes, normalize_barcode
+from app.services.food_autocomplete import food_autocomplete
+from app.services.local_foods import get_food_service
+from app.services.usda import FoodItem, FoodNutrition, usda_service
 
 router = APIRouter()
 
@@ -21,6 +26,14 @@ class FoodSearchResponse(BaseModel):
     total_pages: int
 
 
+class FoodSuggestion(BaseModel):
+    """Autocomplete suggestion"""
+    fdc_id: int
+    name: str
+    data_type: Optional[str] = None
+    score: float
+
+
 @router.get("/search", response_model=FoodSearchResponse, summary="Search for foods")
 async def search_foods(
     query: str = Query(..., description="Food name or search query", min_length=1),
@@ -33,7 +46,8 @@ async def search_foods(
     brand_owner: Optional[str] = Query(None, description="Filter by brand owner"),
 ):
     """Search for foods using USDA FoodData Central API"""
-    if not usda_service.api_key:
+    food_service = get_food_service()
+    if not food_service.available:
         raise HTTPException(
             status_code=503,
             detail="USDA API key not configured. Food search is not available."
@@ -45,31 +59,84 @@ async def search_foods(
         data_type_list = [dt.strip() for dt in data_type.split(",")]
     
     try:
-        result = await usda_service.search_foods(
+        result = await food_service.search_foods(
             query=query,
             page_size=page_size,
             page_number=page_number,
             data_type=data_type_list,
             brand_owner=brand_owner,
         )
-        return FoodSearchResponse(**result)
+        # Cache hits hold plain dicts, so index the validated response
+        response = FoodSearchResponse(**result)
+        # Make foods seen through search available to autocomplete
+        food_autocomplete.add_many((f.fdc_id, f.name, f.data_type) for f in response.foods)
+        food_barcodes.add_many(response.foods)
+        return response
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to search foods: {str(e)}")
 
 
+# NOTE: This route must come BEFORE /{fdc_id} to avoid being shadowed
+@router.get("/autocomplete", response_model=List[FoodSuggestion], summary="Autocomplete food names")
+async def autocomplete_foods(
+    q: str = Query(..., min_length=1, description="Partial food name (typos tolerated)"),
+    limit: int = Query(default=10, ge=1, le=25),
+):
+    """Suggest foods as the user types, served from an in-process index (no USDA call)"""
+    await food_autocomplete.ensure_loaded()
+    return food_autocomplete.suggest(q, limit)
+
+
+# NOTE: This route must come BEFORE /{fdc_id} to avoid being shadowed
+@router.get("/barcode/{code}", response_model=FoodNutrition, summary="Get food nutrition by barcode")
+async def get_food_by_barcode(code: str):
+    """
+    Get nutrition for a branded food by its GTIN/UPC barcode.
+
+    Indexed barcodes resolve without a USDA call; unknown ones fall back to a
+    USDA search for the code (and are indexed for next time).
+    """
+    if normalize_barcode(code) is None:
+        raise HTTPException(status_code=400, detail="Invalid barcode")
+
+    food_service = get_food_service()
+    await food_barcodes.ensure_loaded()
+
+    try:
+        fdc_id = food_barcodes.lookup(code)
+        if fdc_id is None and usda_service.available:
+            result = await usda_service.search_foods(code, page_size=10, data_type=["Branded"])
+            food_barcodes.add_many(result["foods"])
+            fdc_id = food_barcodes.lookup(code)
+        if fdc_id is None:
+            raise HTTPException(status_code=404, detail=f"No food found for barcode {code}")
+
+        food = await food_service.get_food_by_id(fdc_id)
+        food_autocomplete.record_use(fdc_id)
+        return food
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to look up barcode: {str(e)}")
+
+
 @router.get("/{fdc_id}", response_model=FoodNutrition, summary="Get food nutrition by FDC ID")
 async def get_food_nutrition(fdc_id: int):
     """Get detailed nutrition information for a specific food by FDC ID"""
-    if not usda_service.api_key:
+    food_service = get_food_service()
+    if not food_service.available:
         raise HTTPException(
             status_code=503,
             detail="USDA API key not configured. Food nutrition lookup is not available."
         )
     
     try:
-        return await usda_service.get_food_by_id(fdc_id)
+        food = await food_service.get_food_by_id(fdc_id)
+        food_autocomplete.record_use(fdc_id)
+        food_barcodes.add_many([food])
+        return food
     except HTTPException:
         raise
     except Exception as e:
@@ -79,17 +146,21 @@ async def get_food_nutrition(fdc_id: int):
 @router.post("/batch", response_model=List[FoodNutrition], summary="Get nutrition for multiple foods")
 async def get_foods_batch(fdc_ids: List[int]):
     """Get detailed nutrition information for multiple foods by FDC IDs"""
-    if not usda_service.api_key:
+    food_service = get_food_service()
+    if not food_service.available:
         raise HTTPException(
             status_code=503,
             detail="USDA API key not configured. Food nutrition lookup is not available."
         )
     
-    if len(fdc_ids) > 20:
-        raise HTTPException(status_code=400, detail="Maximum 20 food IDs per request")
+    if len(fdc_ids) > settings.USDA_MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.USDA_MAX_BATCH_IDS} food IDs per request"
+        )
     
     try:
-        return await usda_service.get_foods_by_ids(fdc_ids)
+        return await food_service.get_foods_by_ids(fdc_ids)
     except HTTPException:
         raise
     except Exception as e:
@@ -3,7 +3,7 @@ from datetime import date, datetime
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 
-from app.services.usda import usda_service
+from app.services.local_foods import get_food_service
 
 router = APIRouter()
 
@@ -122,9 +122,10 @@ async def log_meal(meal: MealLogCreate, user_id: str = Query(default="demo-user"
     fat = meal.fat
 
     # If USDA FDC ID is provided, fetch nutrition data automatically
-    if meal.fdc_id and usda_service.api_key:
+    food_service = get_food_service()
+    if meal.fdc_id and food_service.available:
         try:
-            food_nutrition = await usda_service.get_food_by_id(meal.fdc_id)
+            food_nutrition = await food_service.get_food_by_id(meal.fdc_id)
             # Use USDA data if available, otherwise use provided values
             calories = int(food_nutrition.calories) if food_nutrition.calories else calories
             protein = food_nutrition.protein if food_nutrition.protein else protein
@@ -162,18 +163,12 @@ async def log_meals_batch(meals: List[MealLogCreate], user_id: str = Query(defau
     nutrition_map = {}
 
     # Batch fetch nutrition data if needed
-    if fdc_ids and usda_service.api_key:
+    food_service = get_food_service()
+    if fdc_ids and food_service.available:
         try:
-            # Use batch endpoint (max 20 at a time)
-            if len(fdc_ids) <= 20:
-                nutrition_data = await usda_service.get_foods_by_ids(fdc_ids)
-                nutrition_map = {food.fdc_id: food for food in nutrition_data}
-            else:
-                # Split into batches of 20
-                for i in range(0, len(fdc_ids), 20):
-                    batch = fdc_ids[i:i+20]
-                    nutrition_data = await usda_service.get_foods_by_ids(batch)
-                    nutrition_map.update({food.fdc_id: food for food in nutrition_data})
+            # Deduped, cache-aware and chunked by the service
+            nutrition_data = await food_service.get_foods_by_ids(fdc_ids)
+            nutrition_map = {food.fdc_id: food for food in nutrition_data}
         except Exception:
             # If batch lookup fails, continue with provided values
             pass
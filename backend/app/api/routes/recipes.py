@@ -1,8 +1,17 @@
 from typing import List, Optional, Dict
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Response
 from pydantic import BaseModel, Field
 import logging
-
+import os
+import uuid
+
+from app.core.config import settings
+from app.core.cursors import CURSOR_HEADER, decode_cursor, encode_cursor
+from app.core.resilience import UpstreamUnavailableError
+from app.db.recipes import recipe_repository
+from app.services.recipe_catalog import recipe_catalog
+from app.services.recipe_snapshot import RecipeSnapshot
+from app.services.recipe_sync import RecipeCatalogSync
 from app.services.spoonacular import spoonacular_service
 
 logger = logging.getLogger(__name__)
@@ -265,8 +274,46 @@ SAMPLE_RECIPES = [
 ]
 
 
+def load_local_catalog() -> None:
+    """Load the local catalog from RECIPE_SNAPSHOT_PATH, or index the sample recipes"""
+    path = settings.RECIPE_SNAPSHOT_PATH
+    if path and os.path.exists(path):
+        try:
+            recipe_catalog.load_snapshot(RecipeSnapshot(path, RecipeResponse))
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring recipe snapshot {path}: {e}")
+    recipe_catalog.add_many(SAMPLE_RECIPES)
+
+
+# Local catalog, indexed for filtering; recipes written through the API are
+# applied on top from the repository's change feed
+load_local_catalog()
+recipe_sync = RecipeCatalogSync(recipe_repository, recipe_catalog, RecipeResponse)
+
+
+async def find_recipe(recipe_id: str) -> Optional[RecipeResponse]:
+    """A recipe from the catalog, or a stored one that isn't published (draft, archived)"""
+    recipe = recipe_catalog.get(recipe_id)
+    if recipe is None:
+        stored = await recipe_repository.get(recipe_id)
+        if stored is not None and not stored["deleted"]:
+            recipe = RecipeResponse.model_validate(stored["recipe"])
+    return recipe
+
+
+def _catalog_cursor(cursor: str, filters: dict, search: Optional[str]) -> list:
+    """Catalog page key in a cursor: [score, id, doc] when searching, else [id, doc]"""
+    key = decode_cursor(cursor, filters)
+    shape = ((int, float), str, int) if search else (str, int)
+    if len(key) != len(shape) or not all(isinstance(value, kind) for value, kind in zip(key, shape)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
+
+
 @router.get("/", response_model=List[RecipeResponse], summary="List all recipes")
 async def list_recipes(
+    response: Response,
     cuisine: Optional[str] = Query(None, description="Filter by cuisine"),
     meal_type: Optional[str] = Query(None, description="Filter by meal type"),
     max_calories: Optional[int] = Query(None, description="Maximum calories per serving"),
@@ -276,85 +323,85 @@ async def list_recipes(
     tags: Optional[str] = Query(None, description="Comma-separated tags to include"),
     search: Optional[str] = Query(None, description="Search query"),
     limit: int = Query(default=20, ge=1, le=100),
-    offset: int = Query(default=0, ge=0),
+    offset: int = Query(default=0, ge=0, description="Results to skip (ignored with cursor)"),
+    cursor: Optional[str] = Query(None, description=f"{CURSOR_HEADER} header of the previous page"),
 ) -> List[RecipeResponse]:
-    """Get all recipes with optional filtering"""
+    """
+    Get all recipes with optional filtering.
+
+    When more results follow, the response carries an X-Next-Cursor header;
+    pass it back as `cursor` (with the same filters) for the next page.
+    """
+    filters = {
+        "cuisine": cuisine,
+        "meal_type": meal_type,
+        "max_calories": max_calories,
+        "max_prep_time": max_prep_time,
+        "diet_type": diet_type,
+        "exclude_allergens": exclude_allergens,
+        "tags": tags,
+        "search": search,
+    }
     
     # Try to use Spoonacular API if configured
     if spoonacular_service.api_key:
         try:
-            results = await spoonacular_service.search_recipes(
+            # Cursors hold the upstream result position; pages are cut from cached upstream blocks
+            upstream_filters = {**filters, "source": "spoonacular"}
+            position = offset
+            if cursor:
+                key = decode_cursor(cursor, upstream_filters)
+                if len(key) != 1 or not isinstance(key[0], int) or key[0] < 0:
+                    raise HTTPException(status_code=400, detail="Invalid cursor")
+                position = key[0]
+
+            # Filter by meal_type and tags if provided (Spoonacular doesn't support these directly)
+            meal_type_lower = meal_type.lower() if meal_type else None
+            tag_set = set(t.strip().lower() for t in tags.split(",")) if tags else None
+
+            def keep(r: RecipeResponse) -> bool:
+                if meal_type_lower and r.meal_type.lower() != meal_type_lower:
+                    return False
+                return not tag_set or bool(tag_set.intersection(tag.lower() for tag in r.tags))
+
+            results, next_position = await spoonacular_service.search_recipes_from(
+                position,
+                limit,
+                keep=keep if meal_type or tags else None,
                 query=search,
                 cuisine=cuisine,
                 diet=diet_type,
                 exclude_ingredients=exclude_allergens,
                 max_calories=max_calories,
                 max_prep_time=max_prep_time,
-                offset=offset,
-                limit=limit,
             )
-            
-            # Filter by meal_type and tags if provided (Spoonacular doesn't support these directly)
-            # Optimized single-pass filter with pre-computed values
-            if meal_type or tags:
-                meal_type_lower = meal_type.lower() if meal_type else None
-                tag_set = set(t.strip().lower() for t in tags.split(",")) if tags else None
-
-                filtered_results = []
-                for r in results:
-                    # Early exit if meal_type doesn't match
-                    if meal_type_lower and r.meal_type.lower() != meal_type_lower:
-                        continue
-
-                    # Check tags if provided
-                    if tag_set:
-                        recipe_tags_lower = set(tag.lower() for tag in r.tags)
-                        if not tag_set.intersection(recipe_tags_lower):
-                            continue
-
-                    filtered_results.append(r)
-
-                return filtered_results
-
+            if next_position is not None:
+                response.headers[CURSOR_HEADER] = encode_cursor([next_position], upstream_filters)
             return results
+        except UpstreamUnavailableError as e:
+            logger.warning(f"Spoonacular unavailable, falling back to sample data: {e.detail}")
         except HTTPException:
             raise
         except Exception as e:
             logger.warning(f"Spoonacular API call failed, falling back to sample data: {e}")
     
-    # Fallback to sample data - optimized single-pass filter
-    # Pre-compute values outside loop
-    cuisine_lower = cuisine.lower() if cuisine else None
-    meal_type_lower = meal_type.lower() if meal_type else None
-    tag_set = set(t.strip() for t in tags.split(",")) if tags else None
-    search_lower = search.lower() if search else None
-
-    results = []
-    for recipe in SAMPLE_RECIPES:
-        # Early exit checks for better performance
-        if cuisine_lower and recipe.cuisine.lower() != cuisine_lower:
-            continue
-        if meal_type_lower and recipe.meal_type.lower() != meal_type_lower:
-            continue
-        if max_calories and recipe.nutrition.calories > max_calories:
-            continue
-        if max_prep_time and recipe.prep_time > max_prep_time:
-            continue
-
-        # Tag matching
-        if tag_set and not any(t in recipe.tags for t in tag_set):
-            continue
-
-        # Search matching
-        if search_lower:
-            if not (search_lower in recipe.title.lower() or
-                    search_lower in recipe.description.lower() or
-                    search_lower in recipe.cuisine.lower()):
-                continue
-
-        results.append(recipe)
-
-    return results[offset:offset+limit]
+    # Fallback to the local catalog, resuming after the last recipe of the previous page
+    search = search or None
+    results = recipe_catalog.query(
+        cuisine=cuisine,
+        meal_type=meal_type,
+        tags=[t.strip() for t in tags.split(",")] if tags else None,
+        max_calories=max_calories or None,
+        max_prep_time=max_prep_time or None,
+        search=search,
+        after=_catalog_cursor(cursor, filters, search) if cursor else None,
+        offset=0 if cursor else offset,
+        limit=limit + 1,
+    )
+    if len(results) > limit:
+        results = results[:limit]
+        response.headers[CURSOR_HEADER] = encode_cursor(recipe_catalog.page_key(results[-1], search=search), filters)
+    return results
 
 
 @router.get("/featured", response_model=List[RecipeResponse], summary="Get featured recipes")
@@ -363,20 +410,16 @@ async def get_featured_recipes(limit: int = Query(default=6, ge=1, le=20)) -> Li
     # Try Spoonacular API if configured
     if spoonacular_service.api_key:
         try:
-            # Search for popular recipes (sorted by popularity/score)
-            results = await spoonacular_service.search_recipes(
-                limit=limit,
-                offset=0,
-            )
+            # Popular recipes, details served from the per-recipe cache
+            results = await spoonacular_service.get_featured_recipes(limit)
             # Sort by rating and return top recipes
             sorted_results = sorted(results, key=lambda r: r.rating, reverse=True)
             return sorted_results[:limit]
         except Exception as e:
             logger.warning(f"Spoonacular API call failed, falling back to sample data: {e}")
     
-    # Fallback to sample data
-    sorted_recipes = sorted(SAMPLE_RECIPES, key=lambda r: r.rating, reverse=True)
-    return sorted_recipes[:limit]
+    # Fallback to the local catalog
+    return recipe_catalog.query(order_by="rating", descending=True, limit=limit)
 
 
 @router.get("/regional", response_model=List[RecipeResponse], summary="Get regional recipes")
@@ -407,8 +450,8 @@ async def get_regional_recipes(
         except Exception as e:
             logger.warning(f"Spoonacular API call failed, falling back to sample data: {e}")
     
-    # Fallback to sample data
-    return SAMPLE_RECIPES[:limit]
+    # Fallback to the local catalog
+    return recipe_catalog.query(limit=limit)
 
 
 @router.get("/by-health-condition", response_model=List[RecipeResponse], summary="Get recipes for health condition")
@@ -417,8 +460,7 @@ async def get_recipes_for_health_condition(
     limit: int = Query(default=10, ge=1, le=50),
 ) -> List[RecipeResponse]:
     """Get recipes suitable for a specific health condition"""
-    results = [r for r in SAMPLE_RECIPES if condition in r.suitable_for]
-    return results[:limit]
+    return recipe_catalog.query(suitable_for=[condition], limit=limit)
 
 
 # NOTE: This route must come BEFORE /{recipe_id} to avoid being shadowed
@@ -426,6 +468,9 @@ async def get_recipes_for_health_condition(
 async def get_recipe_alternatives(
     recipe_id: str,
     limit: int = Query(default=3, ge=1, le=10),
+    exclude_allergens: Optional[str] = Query(
+        None, description="Comma-separated allergies/conditions the alternatives must be suitable for"
+    ),
 ) -> List[RecipeResponse]:
     """Get alternative recipes with similar nutrition profile"""
     # Try Spoonacular API if configured and recipe_id is numeric
@@ -435,24 +480,25 @@ async def get_recipe_alternatives(
                 recipe_id=int(recipe_id),
                 limit=limit,
             )
+        except UpstreamUnavailableError as e:
+            logger.warning(f"Spoonacular unavailable, falling back to sample data: {e.detail}")
         except HTTPException:
             raise
         except Exception as e:
             logger.warning(f"Spoonacular API call failed, falling back to sample data: {e}")
     
-    # Fallback to sample data
-    recipe = next((r for r in SAMPLE_RECIPES if r.id == recipe_id), None)
+    # Fallback to the local catalog
+    recipe = recipe_catalog.get(recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
     
-    # Find recipes with similar calories (within 100 kcal)
-    alternatives = [
-        r for r in SAMPLE_RECIPES 
-        if r.id != recipe_id and 
-        abs(r.nutrition.calories - recipe.nutrition.calories) <= 100
-    ]
-    
-    return alternatives[:limit]
+    # Nearest recipes by nutrition and cost, for the same meal
+    return recipe_catalog.query(
+        meal_type=recipe.meal_type,
+        exclude_not_suitable_for=[a.strip() for a in exclude_allergens.split(",")] if exclude_allergens else None,
+        similar_to=recipe_id,
+        limit=limit,
+    )
 
 
 @router.get("/{recipe_id}", response_model=RecipeResponse, summary="Get recipe by ID")
@@ -462,13 +508,15 @@ async def get_recipe(recipe_id: str) -> RecipeResponse:
     if spoonacular_service.api_key and recipe_id.isdigit():
         try:
             return await spoonacular_service.get_recipe_by_id(int(recipe_id))
+        except UpstreamUnavailableError as e:
+            logger.warning(f"Spoonacular unavailable, falling back to sample data: {e.detail}")
         except HTTPException:
             raise
         except Exception as e:
             logger.warning(f"Spoonacular API call failed, falling back to sample data: {e}")
     
-    # Fallback to sample data
-    recipe = next((r for r in SAMPLE_RECIPES if r.id == recipe_id), None)
+    # Fallback to the local catalog
+    recipe = recipe_catalog.get(recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
     return recipe
@@ -477,24 +525,36 @@ async def get_recipe(recipe_id: str) -> RecipeResponse:
 @router.post("/", response_model=RecipeResponse, summary="Create a new recipe")
 async def create_recipe(recipe: RecipeCreate) -> RecipeResponse:
     """Create a new recipe (admin only)"""
+    # A random id needs no coordination between workers; create() still
+    # refuses one that is somehow taken
     new_recipe = RecipeResponse(
-        id=f"recipe_{len(SAMPLE_RECIPES) + 1}",
+        id=f"recipe_{uuid.uuid4().hex[:16]}",
         **recipe.model_dump(),
     )
+    if not await recipe_repository.create(new_recipe.model_dump()):
+        raise HTTPException(status_code=409, detail="Recipe id already taken; please retry")
+    await recipe_sync.catch_up()
     return new_recipe
 
 
 @router.put("/{recipe_id}", response_model=RecipeResponse, summary="Update a recipe")
 async def update_recipe(recipe_id: str, recipe: RecipeCreate) -> RecipeResponse:
     """Update an existing recipe (admin only)"""
-    existing = next((r for r in SAMPLE_RECIPES if r.id == recipe_id), None)
+    existing = await find_recipe(recipe_id)
     if not existing:
         raise HTTPException(status_code=404, detail="Recipe not found")
     
-    return RecipeResponse(id=recipe_id, **recipe.model_dump())
+    updated = RecipeResponse(id=recipe_id, **recipe.model_dump())
+    await recipe_repository.save(updated.model_dump())
+    await recipe_sync.catch_up()
+    return updated
 
 
 @router.delete("/{recipe_id}", summary="Delete a recipe")
 async def delete_recipe(recipe_id: str):
     """Delete a recipe (admin only)"""
+    if not await find_recipe(recipe_id):
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    await recipe_repository.delete(recipe_id)
+    await recipe_sync.catch_up()
     return {"message": f"Recipe {recipe_id} deleted successfully"}
@@ -3,14 +3,25 @@ API Response Caching Module
 
 Provides decorator and utility functions for caching external API responses
 using Redis with automatic fallback to in-memory caching.
+
+Values are stored as JSON (pydantic models are dumped first). Functions that
+return a model, or a list of models, pass `model=` to `cached` so cache hits
+come back as the same type a miss returns.
+
+Code running inside a cached function can shorten how long its result is
+kept with cap_cache_ttl() (e.g. a degraded upstream response).
 """
 
 import json
 import hashlib
 import logging
-from typing import Optional, Any, Callable
+from contextvars import ContextVar
+from typing import Optional, Any, Callable, Dict, List, Type
 from functools import wraps
 
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
 from app.core.redis import RedisClient
 
 logger = logging.getLogger(__name__)
@@ -93,6 +104,20 @@ def generate_cache_key(prefix: str, *args, **kwargs) -> str:
     return key_string
 
 
+def _to_cacheable(value: Any) -> Any:
+    """Convert a value (including pydantic models) to JSON-compatible data"""
+    return to_jsonable_python(value)
+
+
+def _rehydrate(value: Any, model: Optional[Type[BaseModel]]) -> Any:
+    """Rebuild model instances from cached JSON data"""
+    if model is None or value is None:
+        return value
+    if isinstance(value, list):
+        return [model.model_validate(item) for item in value]
+    return model.model_validate(value)
+
+
 async def cache_get(key: str) -> Optional[Any]:
     """
     Get value from cache (Redis or in-memory fallback).
@@ -133,7 +158,7 @@ async def cache_set(key: str, value: Any, ttl: int) -> None:
     if redis_client:
         try:
             # Serialize to JSON
-            serialized = json.dumps(value)
+            serialized = json.dumps(_to_cacheable(value))
             await redis_client.setex(key, ttl, serialized)
             return
         except Exception as e:
@@ -141,7 +166,61 @@ async def cache_set(key: str, value: Any, ttl: int) -> None:
             # Fall through to in-memory
 
     # Fallback to in-memory cache
-    in_memory_cache.set(key, value, ttl)
+    in_memory_cache.set(key, _to_cacheable(value), ttl)
+
+
+async def cache_get_many(keys: List[str]) -> List[Optional[Any]]:
+    """
+    Get several values in one round trip (Redis MGET).
+
+    Args:
+        keys: Cache keys
+
+    Returns:
+        Cached values in the same order as keys (None where missing)
+    """
+    if not keys:
+        return []
+
+    redis_client = await RedisClient.get_client()
+
+    if redis_client:
+        try:
+            values = await redis_client.mget(keys)
+            return [json.loads(value) if value else None for value in values]
+        except Exception as e:
+            logger.warning(f"Redis cache mget error: {e}")
+            # Fall through to in-memory
+
+    return [in_memory_cache.get(key) for key in keys]
+
+
+async def cache_set_many(items: Dict[str, Any], ttl: int) -> None:
+    """
+    Set several values with the same TTL in one pipelined round trip.
+
+    Args:
+        items: Mapping of cache key to value
+        ttl: Time to live in seconds
+    """
+    if not items:
+        return
+
+    redis_client = await RedisClient.get_client()
+
+    if redis_client:
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.setex(key, ttl, json.dumps(_to_cacheable(value)))
+            await pipe.execute()
+            return
+        except Exception as e:
+            logger.warning(f"Redis cache pipeline set error: {e}")
+            # Fall through to in-memory
+
+    for key, value in items.items():
+        in_memory_cache.set(key, _to_cacheable(value), ttl)
 
 
 async def cache_delete(key: str) -> None:
@@ -163,13 +242,27 @@ async def cache_delete(key: str) -> None:
     in_memory_cache.delete(key)
 
 
-def cached(ttl: int, prefix: str):
+# TTL of the result of the @cached call in progress (a one-item list, so
+# calls awaited from it can lower it)
+_result_ttl: ContextVar[Optional[List[int]]] = ContextVar("cache_result_ttl", default=None)
+
+
+def cap_cache_ttl(seconds: int) -> None:
+    """Keep the result of the enclosing @cached call for at most this many seconds"""
+    ttl = _result_ttl.get()
+    if ttl is not None:
+        ttl[0] = min(ttl[0], seconds)
+
+
+def cached(ttl: int, prefix: str, model: Optional[Type[BaseModel]] = None):
     """
     Decorator for caching async function results.
 
     Args:
         ttl: Time to live in seconds
         prefix: Cache key prefix
+        model: Pydantic model the function returns (alone or in a list);
+            cache hits are rebuilt into instances of it
 
     Example:
         @cached(ttl=3600, prefix="spoonacular:recipe")
@@ -189,14 +282,23 @@ def cached(ttl: int, prefix: str):
             cached_value = await cache_get(cache_key)
             if cached_value is not None:
                 logger.debug(f"Cache hit: {cache_key}")
-                return cached_value
+                return _rehydrate(cached_value, model)
 
             # Cache miss - call function
             logger.debug(f"Cache miss: {cache_key}")
-            result = await func(*args, **kwargs)
-
-            # Store in cache
-            await cache_set(cache_key, result, ttl)
+            result_ttl = [ttl]
+            token = _result_ttl.set(result_ttl)
+            try:
+                result = await func(*args, **kwargs)
+            finally:
+                _result_ttl.reset(token)
+
+            # Store in cache (a capped result caps any cached caller too)
+            if result_ttl[0] < ttl:
+                logger.debug(f"Cache TTL capped at {result_ttl[0]}s: {cache_key}")
+                cap_cache_ttl(result_ttl[0])
+            if result_ttl[0] > 0:
+                await cache_set(cache_key, result, result_ttl[0])
 
             return result
 
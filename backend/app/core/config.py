@@ -14,6 +14,7 @@ class Settings(BaseSettings):
     # Server
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    WEB_CONCURRENCY: int = 1  # Worker processes (the variable uvicorn and gunicorn read for --workers)
     
     # CORS
     CORS_ORIGINS: list[str] = ["http://localhost:5173", "http://127.0.0.1:5173"]
@@ -23,6 +24,34 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    TOKEN_REVOCATION_FILTER_CAPACITY: int = 100000  # Revoked tokens per Bloom filter generation
+    TOKEN_REVOCATION_FILTER_ERROR_RATE: float = 0.001  # False positives cost one Redis lookup
+    
+    # Password hashing (bcrypt)
+    BCRYPT_ROUNDS: int = 12  # Tune with: python -m app.core.passwords --budget-ms 250
+    PASSWORD_HASH_WORKERS: int = 4  # Threads dedicated to bcrypt per worker process
+    PASSWORD_HASH_MAX_QUEUE: int = 32  # Queued jobs before new requests fail fast with 503
+    
+    # Upstream payload mapping: "off" (inline), "thread" or "process" pool for
+    # payloads of at least PAYLOAD_OFFLOAD_MIN_BYTES (see benchmarks/payload_offload.py)
+    PAYLOAD_OFFLOAD: str = "off"
+    PAYLOAD_OFFLOAD_MIN_BYTES: int = 128 * 1024
+    PAYLOAD_OFFLOAD_WORKERS: int = 2
+    JSON_STREAMING: bool = False  # Map upstream list responses element by element as they stream in (instead of PAYLOAD_OFFLOAD)
+    
+    # Database (SQLite locally; repositories go through app.db.engine)
+    DATABASE_URL: str = "sqlite:///./snacktrack.db"
+    USER_CACHE_SIZE: int = 1024  # Users kept in each worker's read-through cache
+    
+    # Food data: "usda" (live FoodData Central API) or "local" (database built
+    # with python -m app.db.fdc_import, live API as fallback)
+    FOOD_DATA_SOURCE: str = "usda"
+    FOOD_DATABASE_URL: str = "sqlite:///./fdc.db"
+    AUTOCOMPLETE_MAX_EDIT_DISTANCE: int = 2  # Typos tolerated per word (1 for 4-7 letters, 2 for 8+)
+    AUTOCOMPLETE_MEMORY_BUDGET_MB: int = 512  # Warn when the autocomplete index grows past this
+    BARCODE_INDEX_PATH: Optional[str] = None  # Snapshot of the barcode index (rebuilt when the import changes)
+    RECIPE_SNAPSHOT_PATH: Optional[str] = None  # Memory-mapped recipe catalog (python -m app.services.recipe_snapshot)
+    RECIPE_SYNC_INTERVAL_SECONDS: float = 2.0  # How often each worker applies recipe changes made by other workers
     
     # Redis (ElastiCache in production)
     REDIS_HOST: str = "localhost"
@@ -36,11 +65,47 @@ class Settings(BaseSettings):
     RATE_LIMIT_THIRD_PARTY_AUTH_PER_MIN: int = 60  # Third-party API calls (auth)
     RATE_LIMIT_THIRD_PARTY_UNAUTH_PER_MIN: int = 15  # Third-party API calls (unauth)
     RATE_LIMIT_SENSITIVE_PER_MIN: int = 5  # Login, signup, password reset
+    RATE_LIMIT_KEY_LAYOUT: str = "flat"  # "flat" (one key per identity) or "sharded" (hash per shard)
+    RATE_LIMIT_KEY_SHARDS: int = 1024  # Hashes per window when using the sharded layout
     
-    # Third-party APIs
+    # Third-party APIs (base URLs can point at the benchmarks/upstreams stand-ins)
     SPOONACULAR_API_KEY: Optional[str] = None
+    SPOONACULAR_BASE_URL: str = "https://api.spoonacular.com"
     GOOGLE_GEOCODING_API_KEY: Optional[str] = None
     USDA_API_KEY: Optional[str] = None  # USDA FoodData Central API key
+    USDA_BASE_URL: str = "https://api.nal.usda.gov/fdc/v1"
+    
+    # Upstream HTTP connection pools (one long-lived client per upstream)
+    SPOONACULAR_HTTP_MAX_CONNECTIONS: int = 50
+    SPOONACULAR_HTTP_MAX_KEEPALIVE: int = 20
+    SPOONACULAR_HTTP_KEEPALIVE_EXPIRY: float = 30.0  # Seconds an idle connection is kept
+    SPOONACULAR_HTTP_TIMEOUT: float = 30.0
+    SPOONACULAR_HTTP2: bool = False  # Requires the h2 package (pip install httpx[http2])
+    SPOONACULAR_DAILY_POINTS: float = 150.0  # Daily point allowance of the plan (free plan: 150)
+    SPOONACULAR_SHAPED_CACHE_TTL: int = 300  # Seconds a quota-shaped (reduced) response stays cached
+    USDA_HTTP_MAX_CONNECTIONS: int = 50
+    USDA_HTTP_MAX_KEEPALIVE: int = 20
+    USDA_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    USDA_HTTP_TIMEOUT: float = 30.0
+    USDA_HTTP2: bool = False
+    USDA_BATCH_WINDOW_MS: float = 5.0  # Window for merging concurrent food lookups into /foods calls
+    USDA_MAX_BATCH_IDS: int = 500  # FDC IDs accepted by /foods/batch (fetched 20 per upstream call)
+    USDA_BATCH_CONCURRENCY: int = 4  # Concurrent /foods calls per batch lookup
+    DEFAULT_HTTP_MAX_CONNECTIONS: int = 20  # fetch_json and other third-party calls
+    DEFAULT_HTTP_MAX_KEEPALIVE: int = 10
+    DEFAULT_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    DEFAULT_HTTP_TIMEOUT: float = 10.0
+    DEFAULT_HTTP2: bool = False
+    
+    # Upstream resilience
+    REQUEST_DEADLINE_SECONDS: float = 10.0  # Time budget per request, shared by its upstream calls
+    UPSTREAM_RETRY_ATTEMPTS: int = 2  # Extra attempts for idempotent calls
+    UPSTREAM_RETRY_BASE_DELAY: float = 0.1  # Decorrelated jitter bounds (seconds)
+    UPSTREAM_RETRY_MAX_DELAY: float = 2.0
+    UPSTREAM_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive failed calls (retries included) before the circuit opens
+    UPSTREAM_BREAKER_RESET_SECONDS: float = 30.0  # Open time before a trial request is let through
+    UPSTREAM_HEDGING: bool = False  # Send a second idempotent request once p95 latency has passed
+    UPSTREAM_HEDGE_MIN_SAMPLES: int = 50  # Latency samples needed before hedging starts
     
     # AWS (for production)
     AWS_REGION: str = "us-east-1"
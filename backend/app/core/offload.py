@@ -0,0 +1,117 @@
+"""
+Payload Offloading
+
+Decoding and mapping a large upstream response (a 100-recipe complexSearch
+page with nutrition is ~1 MB of JSON) is CPU-bound work that stalls the
+event loop for every other request. PayloadOffloader can move it to a worker
+pool once a payload is larger than PAYLOAD_OFFLOAD_MIN_BYTES:
+
+- "thread": a thread pool. JSON decoding and pydantic hold the GIL, so this
+  doesn't add CPU, but the interpreter switches back to the event loop every
+  few milliseconds instead of after the whole page.
+- "process": a process pool. The loop only pays for sending the raw bytes
+  and validating the compact JSON the worker returns.
+
+Mappers are module-level functions taking the raw response bytes, so they
+can be sent to a process. Process workers return the mapped models
+serialized as compact JSON, which the caller validates back with a
+TypeAdapter (much cheaper than the original payload). Smaller payloads are
+mapped inline.
+
+The default threshold comes from benchmarks/payload_offload.py.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+OFFLOAD_MODES = ("off", "thread", "process")
+
+
+def _map_to_json(mapper: Callable[[bytes], Any], content: bytes) -> bytes:
+    """Worker side: decode and map a payload, return the result as compact JSON"""
+    return to_json(mapper(content))
+
+
+class PayloadOffloader:
+    """Runs payload mappers inline or on a thread/process pool, by payload size"""
+
+    def __init__(self, mode: str, min_bytes: int, max_workers: int):
+        if mode not in OFFLOAD_MODES:
+            logger.warning(f"Unknown PAYLOAD_OFFLOAD mode {mode!r}, mapping payloads inline")
+            mode = "off"
+        self.mode = mode
+        self.min_bytes = min_bytes
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+        self._inline = 0
+        self._offloaded = 0
+
+    def start(self) -> None:
+        """Create the worker pool (also done lazily on first use)"""
+        if self._executor is not None or self.mode == "off":
+            return
+        if self.mode == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="payload")
+        else:
+            # Forking a process that runs an event loop and other threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    def shutdown(self) -> None:
+        """Stop the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def map(self, content: bytes, mapper: Callable[[bytes], T], adapter: TypeAdapter) -> T:
+        """
+        Decode and map an upstream payload.
+
+        Args:
+            content: Raw response body
+            mapper: Module-level function turning the body into models
+            adapter: TypeAdapter for mapper's return type (rebuilds process results)
+        """
+        if self.mode == "off" or len(content) < self.min_bytes:
+            self._inline += 1
+            return mapper(content)
+
+        self.start()
+        self._offloaded += 1
+        loop = asyncio.get_running_loop()
+        if self.mode == "thread":
+            return await loop.run_in_executor(self._executor, mapper, content)
+        packed = await loop.run_in_executor(self._executor, _map_to_json, mapper, content)
+        return adapter.validate_json(packed)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool metrics for the health endpoint"""
+        return {
+            "mode": self.mode,
+            "min_bytes": self.min_bytes,
+            "workers": self.max_workers if self.mode != "off" else 0,
+            "inline": self._inline,
+            "offloaded": self._offloaded,
+        }
+
+
+# Singleton instance
+payload_offloader = PayloadOffloader(
+    mode=settings.PAYLOAD_OFFLOAD,
+    min_bytes=settings.PAYLOAD_OFFLOAD_MIN_BYTES,
+    max_workers=settings.PAYLOAD_OFFLOAD_WORKERS,
+)
@@ -0,0 +1,149 @@
+"""
+Password Hashing Worker Pool
+
+bcrypt is deliberately slow (~250ms at cost 12) and would block the event loop
+if called from async route handlers. PasswordHasher runs hashing and
+verification on a small dedicated thread pool (bcrypt releases the GIL) and
+fails fast once the pool and its queue are full, so a burst of logins cannot
+queue unbounded work behind the rest of the API.
+
+The cost factor is BCRYPT_ROUNDS. To pick one for a latency budget on the
+production instance type, run:
+
+    python -m app.core.passwords --budget-ms 250
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+from app.core.security import hash_password, needs_rehash, verify_password
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password worker pool and its queue are full"""
+
+
+class PasswordHasher:
+    """Bounded thread pool for bcrypt work"""
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def start(self) -> None:
+        """Create the worker threads (also done lazily on first use)"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="bcrypt",
+            )
+
+    def shutdown(self) -> None:
+        """Stop the worker threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run func on the pool, or raise PasswordHasherBusy if saturated"""
+        if self._pending >= self.max_workers + self.max_queue:
+            self._rejected += 1
+            logger.warning(
+                f"Password hashing pool saturated ({self._pending} jobs), rejecting request"
+            )
+            raise PasswordHasherBusy("Password hashing pool is saturated")
+
+        self.start()
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+            self._completed += 1
+
+    async def hash(self, password: str) -> str:
+        """Hash a password with the configured cost"""
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash"""
+        return await self._run(verify_password, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+        """
+        Verify a password and rehash it if its cost differs from BCRYPT_ROUNDS.
+
+        Returns:
+            (is_valid, new_hash) - new_hash is None unless the caller should
+            store a rehashed password
+        """
+        if not await self.verify(password, hashed_password):
+            return False, None
+
+        if needs_rehash(hashed_password):
+            return True, await self.hash(password)
+
+        return True, None
+
+    def stats(self) -> dict[str, int]:
+        """Pool metrics for the health endpoint"""
+        return {
+            "workers": self.max_workers,
+            "in_flight": min(self._pending, self.max_workers),
+            "queue_depth": max(0, self._pending - self.max_workers),
+            "max_queue": self.max_queue,
+            "completed": self._completed,
+            "rejected": self._rejected,
+        }
+
+
+def calibrate_rounds(budget_ms: float, min_rounds: int = 10, max_rounds: int = 16) -> tuple[int, float]:
+    """
+    Find the highest bcrypt cost whose hash time fits in budget_ms.
+
+    Each extra round doubles the work, so one measurement at min_rounds is
+    enough to estimate the others.
+
+    Returns:
+        (rounds, estimated_ms)
+    """
+    samples = []
+    for _ in range(3):
+        start = time.perf_counter()
+        hash_password("calibration-password", rounds=min_rounds)
+        samples.append((time.perf_counter() - start) * 1000)
+    base_ms = min(samples)
+
+    rounds = min_rounds
+    while rounds < max_rounds and base_ms * 2 ** (rounds + 1 - min_rounds) <= budget_ms:
+        rounds += 1
+
+    return rounds, base_ms * 2 ** (rounds - min_rounds)
+
+
+# Singleton instance
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pick BCRYPT_ROUNDS for a latency budget")
+    parser.add_argument("--budget-ms", type=float, required=True, help="Target hash time in milliseconds")
+    args = parser.parse_args()
+
+    rounds, estimated_ms = calibrate_rounds(args.budget_ms)
+    print(f"BCRYPT_ROUNDS={rounds}  (~{estimated_ms:.0f}ms per hash on this machine)")
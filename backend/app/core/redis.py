@@ -1,43 +1,72 @@
 import redis.asyncio as redis
 from typing import Optional
+import asyncio
 import logging
+import time
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait before trying to reconnect after a failed connection, so an
+# unavailable Redis doesn't add a connection timeout to every request
+RECONNECT_INTERVAL_SECONDS = 30
+
 
 class RedisClient:
     """Redis client wrapper for rate limiting and caching"""
     
     _instance: Optional[redis.Redis] = None
     _is_connected: bool = False
+    _retry_at: float = 0.0
+    # Serializes connecting, per event loop (tests run several)
+    _connect_lock: Optional[asyncio.Lock] = None
+    _connect_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    @classmethod
+    def _lock(cls) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if cls._connect_lock is None or cls._connect_lock_loop is not loop:
+            cls._connect_lock = asyncio.Lock()
+            cls._connect_lock_loop = loop
+        return cls._connect_lock
     
     @classmethod
     async def get_client(cls) -> Optional[redis.Redis]:
         """Get or create Redis client"""
-        if cls._instance is None:
-            try:
-                cls._instance = redis.Redis(
-                    host=settings.REDIS_HOST,
-                    port=settings.REDIS_PORT,
-                    password=settings.REDIS_PASSWORD,
-                    db=settings.REDIS_DB,
-                    decode_responses=True,
-                    socket_connect_timeout=5,
-                    socket_timeout=5,
-                )
-                # Test connection
-                await cls._instance.ping()
-                cls._is_connected = True
-                logger.info(f"Connected to Redis at {settings.REDIS_HOST}:{settings.REDIS_PORT}")
-            except Exception as e:
-                logger.warning(f"Redis connection failed: {e}. Rate limiting will use in-memory fallback.")
-                cls._instance = None
-                cls._is_connected = False
+        if cls._instance is None and time.monotonic() >= cls._retry_at:
+            async with cls._lock():
+                # Callers that waited get the client (or the failure) of the first
+                if cls._instance is None and time.monotonic() >= cls._retry_at:
+                    await cls._connect()
         
         return cls._instance
     
+    @classmethod
+    async def _connect(cls) -> None:
+        """Create and ping a client; after a failure, retry in RECONNECT_INTERVAL_SECONDS"""
+        try:
+            client = redis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                password=settings.REDIS_PASSWORD,
+                db=settings.REDIS_DB,
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+            )
+            # Test connection before publishing the client, so callers never
+            # get one that hasn't connected yet
+            await client.ping()
+            cls._instance = client
+            cls._is_connected = True
+            logger.info(f"Connected to Redis at {settings.REDIS_HOST}:{settings.REDIS_PORT}")
+        except Exception as e:
+            logger.warning(f"Redis connection failed: {e}. Rate limiting will use in-memory fallback.")
+            cls._instance = None
+            cls._is_connected = False
+            cls._retry_at = time.monotonic() + RECONNECT_INTERVAL_SECONDS
+    
     @classmethod
     async def close(cls):
         """Close Redis connection"""
@@ -45,6 +74,7 @@ class RedisClient:
             await cls._instance.close()
             cls._instance = None
             cls._is_connected = False
+        cls._retry_at = 0.0
     
     @classmethod
     def is_connected(cls) -> bool:
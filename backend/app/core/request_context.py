@@ -0,0 +1,36 @@
+"""
+Per-request context shared with services.
+
+Values are stored in contextvars set by middleware, so service code deep in
+a call stack can read them without threading the Request object through.
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+# Monotonic time by which the current request should be answered
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def set_request_deadline(budget_seconds: float):
+    """Start the time budget for the current request; returns a reset token"""
+    return request_deadline.set(time.monotonic() + budget_seconds)
+
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left in the current request's budget (None outside a request)"""
+    deadline = request_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+# Authenticated user for the current request (set by RateLimitMiddleware,
+# which already decodes the bearer token)
+request_user_id: ContextVar[Optional[str]] = ContextVar("request_user_id", default=None)
+
+
+def is_authenticated_request() -> bool:
+    """Whether the current request carries a valid access token"""
+    return request_user_id.get() is not None
@@ -0,0 +1,276 @@
+"""
+Upstream Resilience
+
+Wraps calls to third-party APIs (Spoonacular, USDA) with:
+- A circuit breaker per upstream: after repeated failures calls fail fast
+  with UpstreamUnavailableError, which routes treat as "use the fallback"
+- Bounded retries with decorrelated jitter for idempotent calls
+- Optional hedging: a second identical request is sent once the first has
+  been outstanding longer than the upstream's observed p95 latency
+- Deadline budgets: timeouts and retry sleeps are capped by the time left
+  for the incoming request (see app.core.request_context)
+
+Only transport errors, timeouts and 5xx responses count as failures. 4xx
+responses (bad key, quota, not found) are returned to the caller unchanged.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.request_context import remaining_budget
+
+logger = logging.getLogger(__name__)
+
+# Don't start an attempt with less time than this left in the budget
+MIN_ATTEMPT_SECONDS = 0.05
+
+Attempt = Callable[[float], Awaitable[httpx.Response]]
+
+
+class UpstreamUnavailableError(HTTPException):
+    """An upstream is down, timing out or its circuit is open (503)"""
+
+    def __init__(self, upstream: str, reason: str):
+        super().__init__(status_code=503, detail=f"{upstream} API unavailable: {reason}")
+        self.upstream = upstream
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with a single half-open probe.
+    ResilientUpstream records one failure per failed call, however many
+    attempts it made.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a call may be attempted now"""
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.reset_seconds:
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        # Half-open: let one trial call through
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info("Circuit closed after successful trial request")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Free the half-open trial slot when the trial ended without a result"""
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit opened after {self.failures} consecutive failures")
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies"""
+
+    def __init__(self, size: int = 200):
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float, min_samples: int) -> Optional[float]:
+        if len(self._samples) < min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class ResilientUpstream:
+    """Circuit breaker, retries, hedging and deadlines for one upstream"""
+
+    def __init__(self, name: str, timeout: float):
+        self.name = name
+        self.timeout = timeout
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.UPSTREAM_BREAKER_FAILURE_THRESHOLD,
+            reset_seconds=settings.UPSTREAM_BREAKER_RESET_SECONDS,
+        )
+        self.latency = LatencyTracker()
+        self.retries = 0
+        self.hedges = 0
+        self.rejected = 0
+
+    def _attempt_timeout(self) -> Optional[float]:
+        """Timeout for the next attempt, or None if the budget is spent"""
+        budget = remaining_budget()
+        if budget is None:
+            return self.timeout
+        if budget < MIN_ATTEMPT_SECONDS:
+            return None
+        return min(self.timeout, budget)
+
+    async def _timed(self, attempt: Attempt, timeout: float) -> httpx.Response:
+        started = time.perf_counter()
+        response = await attempt(timeout)
+        if response.status_code < 500:
+            self.latency.record(time.perf_counter() - started)
+        return response
+
+    async def _hedged(self, attempt: Attempt, timeout: float) -> httpx.Response:
+        """Run attempt; if it outlives p95 latency, race a second copy"""
+        hedge_after = None
+        if settings.UPSTREAM_HEDGING:
+            hedge_after = self.latency.percentile(0.95, settings.UPSTREAM_HEDGE_MIN_SAMPLES)
+
+        if hedge_after is None or hedge_after >= timeout:
+            return await self._timed(attempt, timeout)
+
+        primary = asyncio.ensure_future(self._timed(attempt, timeout))
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        self.hedges += 1
+        secondary = asyncio.ensure_future(self._timed(attempt, timeout - hedge_after))
+        pending = {primary, secondary}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and task.result().status_code < 500:
+                        return task.result()
+                    error = task.exception() or error
+            if error is not None:
+                raise error
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, attempt: Attempt, idempotent: bool = True) -> httpx.Response:
+        """
+        Call the upstream through the breaker, retrying idempotent calls.
+
+        Args:
+            attempt: Sends one request; receives the timeout to use
+            idempotent: Safe to retry and hedge (reads)
+
+        Raises:
+            UpstreamUnavailableError: circuit open, budget spent, or every
+                attempt failed with a transport error, timeout or 5xx
+        """
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise UpstreamUnavailableError(self.name, "circuit open")
+
+        # A trial call that ends without a recorded result (budget spent,
+        # cancelled, unexpected error) must not hold the half-open slot
+        probing = self.breaker.state == CircuitBreaker.HALF_OPEN
+        try:
+            return await self._attempts(attempt, idempotent)
+        finally:
+            if probing:
+                self.breaker.release_probe()
+
+    async def _attempts(self, attempt: Attempt, idempotent: bool) -> httpx.Response:
+        """Attempts and retries of one call the breaker let through"""
+        max_attempts = 1 + (settings.UPSTREAM_RETRY_ATTEMPTS if idempotent else 0)
+        delay = settings.UPSTREAM_RETRY_BASE_DELAY
+        reason = "deadline exceeded"
+        failed = False
+
+        for attempt_number in range(max_attempts):
+            timeout = self._attempt_timeout()
+            if timeout is None:
+                break
+
+            try:
+                if idempotent:
+                    response = await self._hedged(attempt, timeout)
+                else:
+                    response = await self._timed(attempt, timeout)
+            except httpx.TransportError as e:
+                reason = f"{type(e).__name__}: {e}"
+            else:
+                if response.status_code < 500:
+                    self.breaker.record_success()
+                    return response
+                reason = f"HTTP {response.status_code}"
+
+            failed = True
+            logger.warning(f"{self.name} attempt {attempt_number + 1}/{max_attempts} failed: {reason}")
+
+            if attempt_number + 1 == max_attempts or self.breaker.state == CircuitBreaker.OPEN:
+                break
+
+            # Decorrelated jitter, never sleeping past the request's deadline
+            delay = min(settings.UPSTREAM_RETRY_MAX_DELAY, random.uniform(settings.UPSTREAM_RETRY_BASE_DELAY, delay * 3))
+            budget = remaining_budget()
+            if budget is not None and delay + MIN_ATTEMPT_SECONDS > budget:
+                break
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+        # The call failed, not each attempt: retries don't trip the breaker sooner
+        if failed:
+            self.breaker.record_failure()
+        raise UpstreamUnavailableError(self.name, reason)
+
+    def stats(self) -> Dict[str, Any]:
+        p95 = self.latency.percentile(0.95, 1)
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "rejected": self.rejected,
+        }
+
+
+_upstreams: Dict[str, ResilientUpstream] = {}
+
+
+def get_upstream(name: str, timeout: float) -> ResilientUpstream:
+    """Get the shared resilience wrapper for an upstream"""
+    if name not in _upstreams:
+        _upstreams[name] = ResilientUpstream(name, timeout)
+    return _upstreams[name]
+
+
+def upstream_stats() -> Dict[str, Dict[str, Any]]:
+    """Breaker and retry metrics per upstream for the health endpoint"""
+    return {name: upstream.stats() for name, upstream in _upstreams.items()}
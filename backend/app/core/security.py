@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional
+import uuid
 import bcrypt
 from jose import jwt, JWTError
 from pydantic import BaseModel
@@ -13,6 +14,8 @@ class TokenPayload(BaseModel):
     exp: datetime
     iat: datetime
     type: str  # "access" or "refresh"
+    jti: Optional[str] = None  # unique token id, used for revocation
+    fam: Optional[str] = None  # refresh token family (one per login session)
 
 
 class TokenPair(BaseModel):
@@ -24,21 +27,37 @@ class TokenPair(BaseModel):
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
+    # Truncate to 72 bytes, matching hash_password (bcrypt limit)
     return bcrypt.checkpw(
-        plain_password.encode('utf-8'),
+        plain_password.encode('utf-8')[:72],
         hashed_password.encode('utf-8')
     )
 
 
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    """Hash a password using bcrypt (cost defaults to BCRYPT_ROUNDS)"""
     # Truncate to 72 bytes (bcrypt limit)
     password_bytes = password.encode('utf-8')[:72]
-    salt = bcrypt.gensalt(rounds=12)
+    salt = bcrypt.gensalt(rounds=rounds or settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
 
+def get_hash_rounds(hashed_password: str) -> int:
+    """Read the cost factor from a bcrypt hash ($2b$<rounds>$...)"""
+    return int(hashed_password.split("$")[2])
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Check if a hash was made with a different cost than BCRYPT_ROUNDS"""
+    return get_hash_rounds(hashed_password) != settings.BCRYPT_ROUNDS
+
+
+def new_token_id() -> str:
+    """Generate a unique token id (jti / family id)"""
+    return uuid.uuid4().hex
+
+
 def create_access_token(user_id: str, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     now = datetime.now(timezone.utc)
@@ -52,12 +71,13 @@ def create_access_token(user_id: str, expires_delta: Optional[timedelta] = None)
         "exp": expire,
         "iat": now,
         "type": "access",
+        "jti": new_token_id(),
     }
     
     return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
-def create_refresh_token(user_id: str) -> str:
+def create_refresh_token(user_id: str, jti: Optional[str] = None, family: Optional[str] = None) -> str:
     """Create a JWT refresh token"""
     now = datetime.now(timezone.utc)
     expire = now + timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
@@ -67,16 +87,22 @@ def create_refresh_token(user_id: str) -> str:
         "exp": expire,
         "iat": now,
         "type": "refresh",
+        "jti": jti or new_token_id(),
+        "fam": family or new_token_id(),
     }
     
     return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
-def create_token_pair(user_id: str) -> TokenPair:
+def create_token_pair(
+    user_id: str,
+    refresh_jti: Optional[str] = None,
+    family: Optional[str] = None,
+) -> TokenPair:
     """Create both access and refresh tokens"""
     return TokenPair(
         access_token=create_access_token(user_id),
-        refresh_token=create_refresh_token(user_id),
+        refresh_token=create_refresh_token(user_id, jti=refresh_jti, family=family),
     )
 
 
@@ -0,0 +1,297 @@
+"""
+Token Registry - Refresh Rotation and Revocation
+
+Refresh tokens are single use. Each one carries a jti that is registered in
+Redis (TTL = refresh lifetime) when issued and atomically consumed on
+/refresh. Presenting an already-consumed jti means the token was replayed, so
+the whole family (every refresh token descended from the same login) is
+revoked.
+
+Revoked access tokens are stored in Redis by jti (TTL = remaining lifetime)
+and published on a pub/sub channel. Every worker keeps a Bloom filter of
+revoked jtis fed by that channel, so checking an access token that was never
+revoked (the common case) needs no network call. Only filter hits are
+confirmed against Redis.
+
+Without Redis, exact in-memory sets are used instead (single process only;
+startup warns when WEB_CONCURRENCY says there are several workers).
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.config import settings
+from app.core.redis import RedisClient
+
+logger = logging.getLogger(__name__)
+
+REFRESH_KEY_PREFIX = "auth:refresh:"
+REVOKED_KEY_PREFIX = "auth:revoked:"
+REVOKED_FAMILY_KEY_PREFIX = "auth:revoked-family:"
+REVOCATION_CHANNEL = "auth:revocations"
+
+# Consume a refresh token in one step, so concurrent refreshes can't
+# interleave the family check, the consume and the revocation.
+# Returns 1 (consumed), 0 (family already revoked) or -1 (reused: family revoked now)
+CONSUME_REFRESH_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return 0
+end
+if redis.call('GETDEL', KEYS[1]) then
+    return 1
+end
+redis.call('SET', KEYS[2], '1', 'EX', ARGV[1])
+return -1
+"""
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> list[int]:
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationFilter:
+    """
+    Two-generation Bloom filter of revoked access token ids.
+
+    Bloom filters can't delete, so the filter rotates once per access token
+    lifetime: a revoked token stays in the current or previous generation for
+    at least as long as it could still be presented.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, rotate_seconds: float):
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._rotate_seconds = rotate_seconds
+        self._current = BloomFilter(capacity, error_rate)
+        self._previous = BloomFilter(capacity, error_rate)
+        self._rotate_at = time.monotonic() + rotate_seconds
+
+    def _maybe_rotate(self) -> None:
+        now = time.monotonic()
+        if now >= self._rotate_at:
+            self._previous = self._current
+            self._current = BloomFilter(self._capacity, self._error_rate)
+            self._rotate_at = now + self._rotate_seconds
+
+    def add(self, jti: str) -> None:
+        self._maybe_rotate()
+        self._current.add(jti)
+
+    def __contains__(self, jti: str) -> bool:
+        self._maybe_rotate()
+        return jti in self._current or jti in self._previous
+
+
+def seconds_until(exp: datetime) -> int:
+    """Remaining lifetime of a token (at least 1s, for use as a TTL)"""
+    return max(1, int((exp - datetime.now(timezone.utc)).total_seconds()))
+
+
+class TokenRegistry:
+    """Refresh token rotation and access token revocation"""
+
+    def __init__(self):
+        self._filter = RevocationFilter(
+            capacity=settings.TOKEN_REVOCATION_FILTER_CAPACITY,
+            error_rate=settings.TOKEN_REVOCATION_FILTER_ERROR_RATE,
+            rotate_seconds=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        )
+        self._listener: Optional[asyncio.Task] = None
+        self._consume_refresh = None
+        # In-memory fallback: id -> expiry (monotonic seconds)
+        self._local_refresh: dict[str, float] = {}
+        self._local_revoked: dict[str, float] = {}
+        self._local_revoked_families: dict[str, float] = {}
+
+    @staticmethod
+    def _local_get(store: dict[str, float], key: str) -> bool:
+        expiry = store.get(key)
+        if expiry is None:
+            return False
+        if expiry <= time.monotonic():
+            del store[key]
+            return False
+        return True
+
+    @staticmethod
+    def _local_set(store: dict[str, float], key: str, ttl: int) -> None:
+        now = time.monotonic()
+        store[key] = now + ttl
+        # Opportunistic cleanup so the fallback doesn't grow without bound
+        if len(store) > settings.TOKEN_REVOCATION_FILTER_CAPACITY:
+            for k in [k for k, exp in store.items() if exp <= now]:
+                del store[k]
+
+    async def register_refresh_token(self, jti: str, user_id: str, ttl: int) -> None:
+        """Record a newly issued refresh token as unused"""
+        redis_client = await RedisClient.get_client()
+        if redis_client:
+            try:
+                await redis_client.setex(f"{REFRESH_KEY_PREFIX}{jti}", ttl, user_id)
+                return
+            except Exception as e:
+                logger.error(f"Redis error registering refresh token: {e}")
+
+        self._local_set(self._local_refresh, jti, ttl)
+
+    async def consume_refresh_token(self, jti: str, family: str, ttl: int) -> bool:
+        """
+        Mark a refresh token as used.
+
+        Returns:
+            True if the token was unused and its family is still valid. A
+            token that was already used revokes its family and returns False.
+        """
+        redis_client = await RedisClient.get_client()
+        if redis_client:
+            try:
+                if self._consume_refresh is None:
+                    self._consume_refresh = redis_client.register_script(CONSUME_REFRESH_SCRIPT)
+                result = int(await self._consume_refresh(
+                    keys=[f"{REFRESH_KEY_PREFIX}{jti}", f"{REVOKED_FAMILY_KEY_PREFIX}{family}"],
+                    args=[ttl],
+                    client=redis_client,
+                ))
+                if result < 0:
+                    logger.warning(f"Refresh token reuse detected, revoked token family {family}")
+                return result > 0
+            except Exception as e:
+                logger.error(f"Redis error consuming refresh token: {e}")
+
+        if self._local_get(self._local_revoked_families, family):
+            return False
+        if self._local_refresh.pop(jti, None) is not None:
+            return True
+        self._local_set(self._local_revoked_families, family, ttl)
+        logger.warning(f"Refresh token reuse detected, revoked token family {family}")
+        return False
+
+    async def revoke_family(self, family: str, ttl: int) -> None:
+        """Invalidate every refresh token from one login session"""
+        redis_client = await RedisClient.get_client()
+        if redis_client:
+            try:
+                await redis_client.setex(f"{REVOKED_FAMILY_KEY_PREFIX}{family}", ttl, "1")
+                return
+            except Exception as e:
+                logger.error(f"Redis error revoking token family: {e}")
+
+        self._local_set(self._local_revoked_families, family, ttl)
+
+    async def revoke_access_token(self, jti: str, ttl: int) -> None:
+        """Revoke an access token for the rest of its lifetime"""
+        self._filter.add(jti)
+
+        redis_client = await RedisClient.get_client()
+        if redis_client:
+            try:
+                await redis_client.setex(f"{REVOKED_KEY_PREFIX}{jti}", ttl, "1")
+                await redis_client.publish(REVOCATION_CHANNEL, jti)
+                return
+            except Exception as e:
+                logger.error(f"Redis error revoking access token: {e}")
+
+        self._local_set(self._local_revoked, jti, ttl)
+
+    async def is_revoked(self, jti: Optional[str]) -> bool:
+        """Check if an access token was revoked (no I/O unless the filter matches)"""
+        if jti is None or jti not in self._filter:
+            return False
+
+        # Possible false positive - confirm with the authoritative store
+        redis_client = await RedisClient.get_client()
+        if redis_client:
+            try:
+                return bool(await redis_client.exists(f"{REVOKED_KEY_PREFIX}{jti}"))
+            except Exception as e:
+                logger.error(f"Redis error checking token revocation: {e}")
+                # Filter says it may be revoked and we can't confirm: fail closed
+                return True
+
+        return self._local_get(self._local_revoked, jti)
+
+    async def _load_revoked(self) -> None:
+        """Seed the filter with tokens revoked before this worker subscribed"""
+        redis_client = await RedisClient.get_client()
+        if not redis_client:
+            return
+
+        count = 0
+        async for key in redis_client.scan_iter(match=f"{REVOKED_KEY_PREFIX}*", count=1000):
+            self._filter.add(key[len(REVOKED_KEY_PREFIX):])
+            count += 1
+        logger.info(f"Loaded {count} revoked access tokens into revocation filter")
+
+    async def _listen(self) -> None:
+        """Add revocations published by other workers to the local filter"""
+        while True:
+            redis_client = await RedisClient.get_client()
+            if not redis_client:
+                await asyncio.sleep(5)
+                continue
+
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(REVOCATION_CHANNEL)
+                # Catch up on anything revoked while we weren't subscribed
+                await self._load_revoked()
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message and message["type"] == "message":
+                        self._filter.add(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Token revocation listener error: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.reset()
+
+    async def start(self) -> None:
+        """Start the pub/sub listener (called from the app lifespan)"""
+        if settings.WEB_CONCURRENCY > 1 and not await RedisClient.get_client():
+            logger.warning(
+                f"Redis not available with {settings.WEB_CONCURRENCY} workers: refresh tokens and "
+                "revocations are tracked per worker, so a token can be reused on another worker "
+                "and logout only applies to the worker that handled it"
+            )
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Stop the pub/sub listener"""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+# Singleton instance
+token_registry = TokenRegistry()
@@ -0,0 +1,10 @@
+"""Persistence layer for SnackTrack"""
+
+from app.db.engine import StorageEngine, SQLiteEngine, create_engine, database
+
+__all__ = [
+    "StorageEngine",
+    "SQLiteEngine",
+    "create_engine",
+    "database",
+]
@@ -0,0 +1,149 @@
+"""
+Storage Engines
+
+Repositories talk to a StorageEngine rather than a specific database driver,
+so SQLite (local development, single instance) can be swapped for Postgres in
+production. Queries use qmark (`?`) placeholders; other engines translate them.
+
+SQLiteEngine runs every statement on one dedicated thread, which keeps the
+event loop free and serializes access to the connection.
+"""
+
+import asyncio
+import logging
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Optional, Protocol, Sequence
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StorageEngine(Protocol):
+    """Async database interface used by repositories"""
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """Run a statement and return the number of affected rows"""
+        ...
+
+    async def executemany(self, sql: str, params: Iterable[Sequence[Any]]) -> None:
+        """Run a statement once per parameter set"""
+        ...
+
+    async def executescript(self, script: str) -> None:
+        """Run several statements (schema setup)"""
+        ...
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[dict]:
+        """Fetch a single row as a dict"""
+        ...
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> list[dict]:
+        """Fetch all rows as dicts"""
+        ...
+
+    async def transaction(self, func: Callable[[Any], Any]) -> Any:
+        """Run func(connection) atomically and return its result"""
+        ...
+
+    async def close(self) -> None:
+        """Release the connection"""
+        ...
+
+
+class SQLiteEngine:
+    """SQLite engine running on a single worker thread"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # isolation_level=None: autocommit, transactions are explicit
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.row_factory = sqlite3.Row
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+            logger.info(f"Opened SQLite database at {self.path}")
+        return self._conn
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        def run() -> int:
+            return self._connect().execute(sql, params).rowcount
+        return await self._run(run)
+
+    async def executemany(self, sql: str, params: Iterable[Sequence[Any]]) -> None:
+        def run() -> None:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(sql, params)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        await self._run(run)
+
+    async def executescript(self, script: str) -> None:
+        await self._run(lambda: self._connect().executescript(script))
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[dict]:
+        def run() -> Optional[dict]:
+            row = self._connect().execute(sql, params).fetchone()
+            return dict(row) if row is not None else None
+        return await self._run(run)
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> list[dict]:
+        def run() -> list[dict]:
+            return [dict(row) for row in self._connect().execute(sql, params).fetchall()]
+        return await self._run(run)
+
+    async def transaction(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        def run() -> Any:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(conn)
+                conn.execute("COMMIT")
+                return result
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return await self._run(run)
+
+    async def close(self) -> None:
+        # An in-memory database only exists while its connection is open, and
+        # repositories keep their schema as created: keep it for the engine's life
+        if self.path == ":memory:":
+            return
+
+        def run() -> None:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        await self._run(run)
+
+
+def create_engine(url: str) -> StorageEngine:
+    """
+    Create a storage engine from a database URL.
+
+    Supported: sqlite:///relative/path.db, sqlite:////absolute/path.db,
+    sqlite:///:memory:
+    """
+    if url.startswith("sqlite:///"):
+        return SQLiteEngine(url[len("sqlite:///"):])
+
+    raise ValueError(f"Unsupported DATABASE_URL: {url}")
+
+
+# Application database (connection opened lazily on first query)
+database = create_engine(settings.DATABASE_URL)
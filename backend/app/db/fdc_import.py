@@ -0,0 +1,248 @@
+"""
+FoodData Central Importer
+
+Loads the USDA FoodData Central bulk downloads
+(https://fdc.nal.usda.gov/download-datasets) into the local food database
+used when FOOD_DATA_SOURCE=local. Both published formats are supported:
+
+- CSV: a directory containing food.csv and food_nutrient.csv (branded_food.csv
+  adds brand, barcode and serving size when present)
+- JSON: one or more of the per-dataset files (Foundation, SR Legacy,
+  Branded, FNDDS)
+
+Rows are streamed into temporary staging tables (JSON files are decoded one
+food at a time, see app.utils.json_stream) and flattened into one row per
+food with a single INSERT ... SELECT, so memory use doesn't grow with the
+size of the dump. Re-importing replaces existing foods.
+
+    python -m app.db.fdc_import path/to/FoodData_Central_csv_2024-10-31
+    python -m app.db.fdc_import foundation.json branded.json --database sqlite:///./fdc.db
+"""
+
+import argparse
+import asyncio
+import csv
+import logging
+import os
+import re
+import sqlite3
+from typing import Iterator, List, Optional
+
+from app.core.config import settings
+from app.db.engine import create_engine
+from app.db.foods import FoodRepository
+from app.utils.json_stream import JSONArrayStream
+
+logger = logging.getLogger(__name__)
+
+# food.csv data_type -> dataType as returned by the API (other types, such as
+# lab samples and acquisitions, aren't foods users log)
+DATA_TYPE_NAMES = {
+    "foundation_food": "Foundation",
+    "sr_legacy_food": "SR Legacy",
+    "branded_food": "Branded",
+    "survey_fndds_food": "Survey (FNDDS)",
+}
+
+# FDC nutrient IDs kept from food_nutrient. Foundation foods often report
+# energy only as Atwater factors (2047/2048) rather than 1008.
+ENERGY_KCAL = 1008
+ENERGY_ATWATER_GENERAL = 2047
+ENERGY_ATWATER_SPECIFIC = 2048
+PROTEIN = 1003
+FAT = 1004
+CARBS = 1005
+FIBER = 1079
+SUGARS = 2000
+SUGARS_NLEA = 1063
+SODIUM = 1093
+TRACKED_NUTRIENTS = {
+    ENERGY_KCAL, ENERGY_ATWATER_GENERAL, ENERGY_ATWATER_SPECIFIC,
+    PROTEIN, FAT, CARBS, FIBER, SUGARS, SUGARS_NLEA, SODIUM,
+}
+
+# JSON dataset files are read this many bytes at a time and staged this
+# many foods per executemany
+JSON_READ_BYTES = 1 << 20
+STAGE_BATCH = 1000
+
+# Opening of a JSON dataset file, naming its array member
+_DATASET_KEY_RE = re.compile(rb'\s*\{\s*"([^"]+)"\s*:')
+
+STAGING_SCHEMA = (
+    "CREATE TEMP TABLE fdc_food (fdc_id INTEGER PRIMARY KEY, name TEXT, data_type TEXT)",
+    "CREATE TEMP TABLE fdc_nutrient (fdc_id INTEGER, nutrient_id INTEGER, amount REAL)",
+    "CREATE TEMP TABLE fdc_branded ("
+    "fdc_id INTEGER PRIMARY KEY, brand_owner TEXT, gtin_upc TEXT, serving_size REAL, serving_unit TEXT)",
+)
+
+
+def _nutrient(nutrient_id: int) -> str:
+    return f"MAX(CASE WHEN n.nutrient_id = {nutrient_id} THEN n.amount END)"
+
+
+FLATTEN_SQL = f"""
+INSERT OR REPLACE INTO foods (
+    fdc_id, name, data_type, brand_owner, gtin_upc,
+    calories, protein, carbs, fat, fiber, sugar, sodium,
+    serving_size, serving_unit
+)
+SELECT
+    f.fdc_id, f.name, f.data_type, b.brand_owner, b.gtin_upc,
+    COALESCE({_nutrient(ENERGY_KCAL)}, {_nutrient(ENERGY_ATWATER_GENERAL)}, {_nutrient(ENERGY_ATWATER_SPECIFIC)}),
+    {_nutrient(PROTEIN)},
+    {_nutrient(CARBS)},
+    {_nutrient(FAT)},
+    {_nutrient(FIBER)},
+    COALESCE({_nutrient(SUGARS)}, {_nutrient(SUGARS_NLEA)}),
+    {_nutrient(SODIUM)},
+    b.serving_size, b.serving_unit
+FROM fdc_food f
+LEFT JOIN fdc_nutrient n ON n.fdc_id = f.fdc_id
+LEFT JOIN fdc_branded b ON b.fdc_id = f.fdc_id
+GROUP BY f.fdc_id
+"""
+
+
+def _float(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except ValueError:
+        return None
+
+
+def _read_csv(path: str) -> Iterator[dict]:
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+
+def _stage_csv(conn: sqlite3.Connection, directory: str) -> None:
+    conn.executemany(
+        "INSERT OR REPLACE INTO fdc_food VALUES (?, ?, ?)",
+        (
+            (int(row["fdc_id"]), row["description"], DATA_TYPE_NAMES[row["data_type"]])
+            for row in _read_csv(os.path.join(directory, "food.csv"))
+            if row["data_type"] in DATA_TYPE_NAMES
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO fdc_nutrient VALUES (?, ?, ?)",
+        (
+            (int(row["fdc_id"]), int(row["nutrient_id"]), _float(row["amount"]))
+            for row in _read_csv(os.path.join(directory, "food_nutrient.csv"))
+            if int(row["nutrient_id"]) in TRACKED_NUTRIENTS
+        ),
+    )
+
+    branded_path = os.path.join(directory, "branded_food.csv")
+    if os.path.exists(branded_path):
+        conn.executemany(
+            "INSERT OR REPLACE INTO fdc_branded VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    int(row["fdc_id"]),
+                    row.get("brand_owner") or None,
+                    row.get("gtin_upc") or None,
+                    _float(row.get("serving_size")),
+                    row.get("serving_size_unit") or None,
+                )
+                for row in _read_csv(branded_path)
+            ),
+        )
+
+
+def _read_json_foods(path: str) -> Iterator[dict]:
+    """Foods of a dataset file, decoded one at a time in JSON_READ_BYTES reads"""
+    # Each dataset file is {"<Dataset>Foods": [food, ...]}
+    with open(path, "rb") as f:
+        match = _DATASET_KEY_RE.match(f.read(1024))
+        if match is None:
+            raise ValueError(f"{path} is not a FoodData Central dataset file")
+        stream = JSONArrayStream(match.group(1).decode("utf-8"))
+        f.seek(0)
+        chunk = f.read(JSON_READ_BYTES)
+        while chunk:
+            yield from stream.feed(chunk)
+            chunk = f.read(JSON_READ_BYTES)
+        yield from stream.close()
+
+
+def _stage_json(conn: sqlite3.Connection, path: str) -> None:
+    foods: List[tuple] = []
+    nutrients: List[tuple] = []
+    branded: List[tuple] = []
+
+    def flush() -> None:
+        conn.executemany("INSERT OR REPLACE INTO fdc_food VALUES (?, ?, ?)", foods)
+        conn.executemany("INSERT INTO fdc_nutrient VALUES (?, ?, ?)", nutrients)
+        conn.executemany("INSERT OR REPLACE INTO fdc_branded VALUES (?, ?, ?, ?, ?)", branded)
+        foods.clear()
+        nutrients.clear()
+        branded.clear()
+
+    for food in _read_json_foods(path):
+        fdc_id = food["fdcId"]
+        foods.append((fdc_id, food.get("description", ""), food.get("dataType")))
+        nutrients.extend(
+            (fdc_id, item["nutrient"]["id"], item.get("amount"))
+            for item in food.get("foodNutrients", [])
+            if item.get("nutrient", {}).get("id") in TRACKED_NUTRIENTS
+        )
+        if food.get("brandOwner") or food.get("gtinUpc"):
+            branded.append((
+                fdc_id,
+                food.get("brandOwner"),
+                food.get("gtinUpc"),
+                food.get("servingSize"),
+                food.get("servingSizeUnit"),
+            ))
+        if len(foods) >= STAGE_BATCH:
+            flush()
+    flush()
+
+
+def _import(conn: sqlite3.Connection, paths: List[str]) -> int:
+    for statement in STAGING_SCHEMA:
+        conn.execute(statement)
+    try:
+        for path in paths:
+            logger.info(f"Staging {path}")
+            if os.path.isdir(path):
+                _stage_csv(conn, path)
+            else:
+                _stage_json(conn, path)
+        return conn.execute(FLATTEN_SQL).rowcount
+    finally:
+        for table in ("fdc_food", "fdc_nutrient", "fdc_branded"):
+            conn.execute(f"DROP TABLE IF EXISTS temp.{table}")
+
+
+async def import_fdc(paths: List[str], repository: FoodRepository) -> int:
+    """
+    Import FoodData Central dumps into the food database.
+
+    Args:
+        paths: CSV dump directories and/or JSON dataset files
+        repository: Target repository
+
+    Returns:
+        Number of foods imported
+    """
+    return await repository.bulk_load(lambda conn: _import(conn, paths))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import USDA FoodData Central dumps")
+    parser.add_argument("paths", nargs="+", help="CSV dump directories or JSON dataset files")
+    parser.add_argument("--database", default=settings.FOOD_DATABASE_URL, help="Target database URL")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    engine = create_engine(args.database)
+
+    async def main() -> None:
+        count = await import_fdc(args.paths, FoodRepository(engine))
+        await engine.close()
+        print(f"Imported {count} foods into {args.database}")
+
+    asyncio.run(main())
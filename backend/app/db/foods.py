@@ -0,0 +1,176 @@
+"""
+Food Repository
+
+Local copy of USDA FoodData Central, built from the published bulk dumps by
+app.db.fdc_import. One row per food with the nutrients the API exposes
+already flattened into columns, plus an FTS5 index over name and brand for
+search. Lookups never touch the USDA API or its hourly quota.
+"""
+
+import logging
+import re
+from typing import Any, Callable, List, Optional
+
+from app.core.config import settings
+from app.db.engine import StorageEngine, create_engine
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS foods (
+    fdc_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    data_type TEXT,
+    brand_owner TEXT,
+    gtin_upc TEXT,
+    calories REAL,
+    protein REAL,
+    carbs REAL,
+    fat REAL,
+    fiber REAL,
+    sugar REAL,
+    sodium REAL,
+    serving_size REAL,
+    serving_unit TEXT
+);
+CREATE INDEX IF NOT EXISTS foods_data_type ON foods (data_type);
+CREATE VIRTUAL TABLE IF NOT EXISTS foods_fts USING fts5(
+    name,
+    brand_owner,
+    content='foods',
+    content_rowid='fdc_id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 query: every word must match, the last one
+    as a prefix so partially typed words still find results.
+    """
+    words = re.findall(r"\w+", query.lower())
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words[:-1]] + [f'"{words[-1]}"*']
+    return " ".join(terms)
+
+
+class FoodRepository:
+    """Indexed, read-mostly store of FoodData Central foods"""
+
+    def __init__(self, engine: StorageEngine):
+        self._engine = engine
+        self._ready = False
+        self._count: Optional[int] = None
+
+    async def initialize(self) -> None:
+        """Create the schema (idempotent)"""
+        if self._ready:
+            return
+        await self._engine.executescript(SCHEMA)
+        self._ready = True
+
+    async def count(self) -> int:
+        """Number of foods imported (cached until the next import)"""
+        if self._count is None:
+            await self.initialize()
+            row = await self._engine.fetchone("SELECT COUNT(*) AS n FROM foods")
+            self._count = row["n"]
+        return self._count
+
+    async def bulk_load(self, loader: Callable[[Any], int]) -> int:
+        """
+        Run loader(connection) in one transaction and reindex (used by the
+        importer to stream rows without going through the async API).
+
+        Returns:
+            What loader returns (number of foods written)
+        """
+        await self.initialize()
+        written = await self._engine.transaction(loader)
+        await self.rebuild_index()
+        return written
+
+    async def rebuild_index(self) -> None:
+        """Rebuild the full-text index from the foods table"""
+        await self._engine.execute("INSERT INTO foods_fts(foods_fts) VALUES ('rebuild')")
+        self._count = None
+
+    async def get(self, fdc_id: int) -> Optional[dict]:
+        """Get a food by FDC ID"""
+        await self.initialize()
+        return await self._engine.fetchone("SELECT * FROM foods WHERE fdc_id = ?", (fdc_id,))
+
+    async def get_many(self, fdc_ids: List[int]) -> dict[int, dict]:
+        """Get foods by FDC ID (unknown IDs are omitted)"""
+        if not fdc_ids:
+            return {}
+        await self.initialize()
+        rows = []
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(fdc_ids), 500):
+            chunk = fdc_ids[i:i + 500]
+            rows += await self._engine.fetchall(
+                f"SELECT * FROM foods WHERE fdc_id IN ({', '.join('?' for _ in chunk)})",
+                chunk,
+            )
+        return {row["fdc_id"]: row for row in rows}
+
+    async def all_names(self) -> List[dict]:
+        """fdc_id, name and data_type of every food (for in-memory indexes)"""
+        await self.initialize()
+        return await self._engine.fetchall("SELECT fdc_id, name, data_type FROM foods")
+
+    async def all_barcodes(self) -> List[dict]:
+        """fdc_id and gtin_upc of every food that has a barcode"""
+        await self.initialize()
+        return await self._engine.fetchall(
+            "SELECT fdc_id, gtin_upc FROM foods WHERE gtin_upc IS NOT NULL AND gtin_upc != ''"
+        )
+
+    async def search(
+        self,
+        query: str,
+        limit: int,
+        offset: int = 0,
+        data_types: Optional[List[str]] = None,
+        brand_owner: Optional[str] = None,
+    ) -> tuple[List[dict], int]:
+        """
+        Full-text search ranked by BM25.
+
+        Returns:
+            (rows for the requested page, total matching rows)
+        """
+        match = build_match_query(query)
+        if match is None:
+            return [], 0
+
+        await self.initialize()
+        where = ["foods_fts MATCH ?"]
+        params: list = [match]
+        if data_types:
+            where.append(f"f.data_type IN ({', '.join('?' for _ in data_types)})")
+            params += data_types
+        if brand_owner:
+            where.append("f.brand_owner = ? COLLATE NOCASE")
+            params.append(brand_owner)
+
+        sql_from = (
+            "FROM foods_fts JOIN foods f ON f.fdc_id = foods_fts.rowid "
+            f"WHERE {' AND '.join(where)}"
+        )
+        total = await self._engine.fetchone(f"SELECT COUNT(*) AS n {sql_from}", params)
+        rows = await self._engine.fetchall(
+            f"SELECT f.* {sql_from} ORDER BY bm25(foods_fts) LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        )
+        return rows, total["n"]
+
+
+# FoodData Central database (separate from the application database so it can
+# be rebuilt and shipped on its own)
+food_database = create_engine(settings.FOOD_DATABASE_URL)
+
+# Singleton instance
+food_repository = FoodRepository(food_database)
@@ -0,0 +1,255 @@
+"""
+Recipe Repository
+
+Recipes created, edited, deleted or moderated through the API, on top of the
+built-in catalog (sample recipes or RECIPE_SNAPSHOT_PATH). One row per
+recipe holds the full recipe as JSON plus the fields RecipeFilter filters on
+as indexed columns; list fields (tags, suitable_for, not_suitable_for) go in
+a label table with one row per value. Listings page by recipe id (keyset),
+so a page costs an index seek rather than an OFFSET scan.
+
+Every write stamps the row with the next change sequence number, and a
+delete leaves a tombstone, so `changes(after=seq)` is a change feed: each
+worker reads what changed since the last sequence it applied and updates its
+in-memory catalog (see app.services.recipe_sync) without reloading.
+SQLite serializes writers, so sequence order is commit order; a Postgres
+engine would need the same guarantee (e.g. an advisory lock around writes).
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Any, Iterable, List, Optional
+
+from app.db.engine import StorageEngine, database
+from app.models.recipe import RecipeFilter
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'published',
+    title TEXT,
+    cuisine TEXT COLLATE NOCASE,
+    meal_type TEXT COLLATE NOCASE,
+    calories INTEGER,
+    prep_time INTEGER,
+    cost_per_serving REAL,
+    data TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS recipes_seq ON recipes (seq);
+CREATE INDEX IF NOT EXISTS recipes_cuisine ON recipes (cuisine, id);
+CREATE INDEX IF NOT EXISTS recipes_meal_type ON recipes (meal_type, id);
+CREATE INDEX IF NOT EXISTS recipes_calories ON recipes (calories, id);
+CREATE INDEX IF NOT EXISTS recipes_prep_time ON recipes (prep_time, id);
+CREATE INDEX IF NOT EXISTS recipes_cost ON recipes (cost_per_serving, id);
+CREATE INDEX IF NOT EXISTS recipes_status ON recipes (status, id);
+CREATE TABLE IF NOT EXISTS recipe_labels (
+    field TEXT NOT NULL,
+    value TEXT NOT NULL COLLATE NOCASE,
+    recipe_id TEXT NOT NULL,
+    PRIMARY KEY (field, value, recipe_id)
+);
+CREATE INDEX IF NOT EXISTS recipe_labels_recipe ON recipe_labels (recipe_id);
+"""
+
+RECIPE_STATUSES = ("published", "draft", "archived")
+
+# List fields stored in recipe_labels
+LABEL_FIELDS = ("tags", "suitable_for", "not_suitable_for")
+
+
+def _write(conn: Any, recipe_id: str, recipe: Optional[dict], status: Optional[str], deleted: bool) -> int:
+    """Upsert one row and its labels under the next sequence number (inside a transaction)"""
+    seq = conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM recipes").fetchone()[0]
+    recipe = recipe or {}
+    nutrition = recipe.get("nutrition") or {}
+    conn.execute(
+        "INSERT INTO recipes (id, seq, deleted, status, title, cuisine, meal_type, calories, prep_time, "
+        "cost_per_serving, data, updated_at) VALUES (?, ?, ?, COALESCE(?, 'published'), ?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (id) DO UPDATE SET seq = excluded.seq, deleted = excluded.deleted, "
+        "status = COALESCE(?, recipes.status), title = excluded.title, cuisine = excluded.cuisine, "
+        "meal_type = excluded.meal_type, calories = excluded.calories, prep_time = excluded.prep_time, "
+        "cost_per_serving = excluded.cost_per_serving, data = excluded.data, updated_at = excluded.updated_at",
+        (
+            recipe_id,
+            seq,
+            int(deleted),
+            status,
+            recipe.get("title"),
+            recipe.get("cuisine"),
+            recipe.get("meal_type"),
+            nutrition.get("calories"),
+            recipe.get("prep_time"),
+            recipe.get("cost_per_serving"),
+            json.dumps(recipe) if recipe else None,
+            datetime.now().isoformat(),
+            status,
+        ),
+    )
+    conn.execute("DELETE FROM recipe_labels WHERE recipe_id = ?", (recipe_id,))
+    conn.executemany(
+        "INSERT OR IGNORE INTO recipe_labels (field, value, recipe_id) VALUES (?, ?, ?)",
+        [(field, value, recipe_id) for field in LABEL_FIELDS for value in recipe.get(field) or ()],
+    )
+    return seq
+
+
+def _placeholders(values: Iterable[Any]) -> str:
+    return ", ".join("?" for _ in values)
+
+
+class RecipeRepository:
+    """Async recipe store with indexed filters, keyset listing and a change feed"""
+
+    def __init__(self, engine: StorageEngine):
+        self._engine = engine
+        self._ready = False
+
+    async def initialize(self) -> None:
+        """Create the schema (idempotent)"""
+        if self._ready:
+            return
+        await self._engine.executescript(SCHEMA)
+        self._ready = True
+
+    def _from_row(self, row: Optional[dict]) -> Optional[dict]:
+        if row is None:
+            return None
+        return {
+            "id": row["id"],
+            "seq": row["seq"],
+            "deleted": bool(row["deleted"]),
+            "status": row["status"],
+            "recipe": json.loads(row["data"]) if row["data"] else None,
+            "updated_at": datetime.fromisoformat(row["updated_at"]),
+        }
+
+    async def get(self, recipe_id: str) -> Optional[dict]:
+        """
+        Get a stored recipe.
+
+        Returns:
+            {"id", "seq", "deleted", "status", "recipe" (dict), "updated_at"},
+            a tombstone (deleted=True) for deleted recipes, or None if the
+            recipe was never written through the API
+        """
+        await self.initialize()
+        row = await self._engine.fetchone("SELECT * FROM recipes WHERE id = ?", (recipe_id,))
+        return self._from_row(row)
+
+    async def create(self, recipe: dict, status: str = "published") -> Optional[int]:
+        """
+        Store a new recipe.
+
+        Returns:
+            Its change sequence number, or None if the id is taken (a live
+            or deleted recipe)
+        """
+        await self.initialize()
+
+        def create(conn: Any) -> Optional[int]:
+            if conn.execute("SELECT 1 FROM recipes WHERE id = ?", (recipe["id"],)).fetchone():
+                return None
+            return _write(conn, recipe["id"], recipe, status, deleted=False)
+
+        return await self._engine.transaction(create)
+
+    async def save(self, recipe: dict, status: Optional[str] = None) -> int:
+        """
+        Insert or replace a recipe (undeleting it). status None keeps the
+        stored status ("published" for a new row).
+
+        Returns:
+            The change sequence number
+        """
+        await self.initialize()
+        return await self._engine.transaction(
+            lambda conn: _write(conn, recipe["id"], recipe, status, deleted=False)
+        )
+
+    async def delete(self, recipe_id: str) -> int:
+        """Replace a recipe with a tombstone; returns the change sequence number"""
+        await self.initialize()
+        return await self._engine.transaction(
+            lambda conn: _write(conn, recipe_id, None, None, deleted=True)
+        )
+
+    async def changes(self, after: int, limit: int = 500) -> List[dict]:
+        """Rows written after sequence number `after` (tombstones included), oldest first"""
+        await self.initialize()
+        rows = await self._engine.fetchall(
+            "SELECT * FROM recipes WHERE seq > ? ORDER BY seq LIMIT ?",
+            (after, limit),
+        )
+        return [self._from_row(row) for row in rows]
+
+    async def list(
+        self,
+        filters: Optional[RecipeFilter] = None,
+        status: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[dict]:
+        """
+        Stored (not deleted) recipes matching filters, by id.
+
+        Args:
+            filters: tags and diet_type match any tag, health_condition a
+                suitable_for value, exclude_allergens drops not_suitable_for
+                values, search_query is a substring of the title
+            status: Only recipes with this status
+            after: Recipe id the previous page ended with (keyset)
+            limit: Page size
+        """
+        await self.initialize()
+        filters = filters or RecipeFilter()
+        where = ["r.deleted = 0"]
+        params: list = []
+
+        def label(field: str, values: List[str], negate: bool = False) -> None:
+            where.append(
+                f"{'NOT ' if negate else ''}EXISTS (SELECT 1 FROM recipe_labels l WHERE l.field = ? "
+                f"AND l.value IN ({_placeholders(values)}) AND l.recipe_id = r.id)"
+            )
+            params.extend([field, *values])
+
+        for column, value in (("status", status), ("cuisine", filters.cuisine), ("meal_type", filters.meal_type)):
+            if value is not None:
+                where.append(f"r.{column} = ?")
+                params.append(value)
+        for column, value in (
+            ("calories", filters.max_calories),
+            ("prep_time", filters.max_prep_time),
+            ("cost_per_serving", filters.max_cost),
+        ):
+            if value is not None:
+                where.append(f"r.{column} <= ?")
+                params.append(value)
+        tags = [*(filters.tags or ()), *([filters.diet_type] if filters.diet_type else [])]
+        if tags:
+            label("tags", tags)
+        if filters.health_condition:
+            label("suitable_for", [filters.health_condition])
+        if filters.exclude_allergens:
+            label("not_suitable_for", filters.exclude_allergens, negate=True)
+        if filters.search_query:
+            where.append("r.title LIKE ?")
+            params.append(f"%{filters.search_query}%")
+        if after is not None:
+            where.append("r.id > ?")
+            params.append(after)
+
+        rows = await self._engine.fetchall(
+            f"SELECT r.* FROM recipes r WHERE {' AND '.join(where)} ORDER BY r.id LIMIT ?",
+            params + [limit],
+        )
+        return [self._from_row(row) for row in rows]
+
+
+# Singleton instance
+recipe_repository = RecipeRepository(database)
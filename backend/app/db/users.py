@@ -0,0 +1,159 @@
+"""
+User Repository
+
+Stores auth users behind a StorageEngine with a primary key on id and a unique
+index on the normalized (lowercased) email. A small LRU read-through cache
+serves the hot /refresh and /me lookups without touching the database.
+"""
+
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from app.core.config import settings
+from app.db.engine import StorageEngine, database
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    password_hash TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+"""
+
+# Demo account (demo@example.com / password123). The hash is precomputed so
+# seeding never runs bcrypt on a request path.
+DEMO_USER = {
+    "id": "user_demo",
+    "email": "demo@example.com",
+    "name": "Demo User",
+    "password_hash": "$2b$12$XkLKhUExr9sTa.ZsEadW9eNQyzI6r4D9DphU0OkMvgRChWgikJJ.O",
+}
+
+
+def normalize_email(email: str) -> str:
+    """Normalize an email for storage and lookup"""
+    return email.strip().lower()
+
+
+class UserRepository:
+    """Async user store with indexed lookups and a read-through cache"""
+
+    def __init__(self, engine: StorageEngine, cache_size: int = 1024):
+        self._engine = engine
+        self._cache_size = cache_size
+        self._by_id: OrderedDict[str, dict] = OrderedDict()
+        self._id_by_email: dict[str, str] = {}
+        self._ready = False
+
+    async def initialize(self) -> None:
+        """Create the schema and seed the demo user (idempotent)"""
+        if self._ready:
+            return
+
+        await self._engine.executescript(SCHEMA)
+        await self._engine.execute(
+            "INSERT OR IGNORE INTO users (id, email, name, password_hash, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                DEMO_USER["id"],
+                DEMO_USER["email"],
+                DEMO_USER["name"],
+                DEMO_USER["password_hash"],
+                datetime.now().isoformat(),
+            ),
+        )
+        self._ready = True
+
+    def _cache_put(self, user: dict) -> None:
+        self._by_id[user["id"]] = user
+        self._by_id.move_to_end(user["id"])
+        self._id_by_email[user["email"]] = user["id"]
+
+        while len(self._by_id) > self._cache_size:
+            _, evicted = self._by_id.popitem(last=False)
+            self._id_by_email.pop(evicted["email"], None)
+
+    def _cache_get(self, user_id: str) -> Optional[dict]:
+        user = self._by_id.get(user_id)
+        if user is not None:
+            self._by_id.move_to_end(user_id)
+        return user
+
+    def _from_row(self, row: Optional[dict]) -> Optional[dict]:
+        if row is None:
+            return None
+        row["created_at"] = datetime.fromisoformat(row["created_at"])
+        self._cache_put(row)
+        return row
+
+    async def get_by_id(self, user_id: str) -> Optional[dict]:
+        """Get user by ID"""
+        user = self._cache_get(user_id)
+        if user is not None:
+            return user
+
+        await self.initialize()
+        row = await self._engine.fetchone("SELECT * FROM users WHERE id = ?", (user_id,))
+        return self._from_row(row)
+
+    async def get_by_email(self, email: str) -> Optional[dict]:
+        """Get user by email (case-insensitive)"""
+        email = normalize_email(email)
+        user_id = self._id_by_email.get(email)
+        if user_id is not None:
+            user = self._cache_get(user_id)
+            if user is not None:
+                return user
+
+        await self.initialize()
+        row = await self._engine.fetchone("SELECT * FROM users WHERE email = ?", (email,))
+        return self._from_row(row)
+
+    async def create(self, user_id: str, email: str, name: str, password_hash: str) -> Optional[dict]:
+        """
+        Create a user.
+
+        Returns:
+            The new user, or None if the email is already registered
+        """
+        await self.initialize()
+        user = {
+            "id": user_id,
+            "email": normalize_email(email),
+            "name": name,
+            "password_hash": password_hash,
+            "created_at": datetime.now(),
+        }
+
+        inserted = await self._engine.execute(
+            "INSERT OR IGNORE INTO users (id, email, name, password_hash, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (user["id"], user["email"], user["name"], user["password_hash"], user["created_at"].isoformat()),
+        )
+        if not inserted:
+            return None
+
+        self._cache_put(user)
+        return user
+
+    async def update_password_hash(self, user_id: str, password_hash: str) -> None:
+        """Replace a user's password hash"""
+        await self.initialize()
+        await self._engine.execute(
+            "UPDATE users SET password_hash = ? WHERE id = ?",
+            (password_hash, user_id),
+        )
+
+        user = self._by_id.get(user_id)
+        if user is not None:
+            user["password_hash"] = password_hash
+
+
+# Singleton instance
+user_repository = UserRepository(database, cache_size=settings.USER_CACHE_SIZE)
@@ -4,6 +4,7 @@ SnackTrack API - Main Application Entry Point
 A personalized, affordable, and health-aware diet planning platform.
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -12,7 +13,19 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.core.redis import RedisClient, in_memory_limiter
+from app.core.offload import payload_offloader
+from app.core.passwords import password_hasher
+from app.core.resilience import upstream_stats
+from app.core.tokens import token_registry
+from app.db.engine import database
+from app.db.foods import food_database
+from app.db.users import user_repository
+from app.middleware.deadline import RequestDeadlineMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware
+from app.services.barcodes import food_barcodes
+from app.services.food_autocomplete import food_autocomplete
+from app.services.spoonacular_quota import spoonacular_quota
+from app.utils.client import http_clients
 from app.api.routes import (
     auth,
     profiles,
@@ -46,11 +59,46 @@ async def lifespan(app: FastAPI):
     else:
         logger.warning("Redis not available - using in-memory rate limiting")
     
+    # Dedicated threads for bcrypt so password work never blocks the event loop
+    password_hasher.start()
+    
+    # Worker pool for decoding large upstream payloads (PAYLOAD_OFFLOAD)
+    payload_offloader.start()
+    
+    # Create tables and seed the demo user (precomputed hash, no bcrypt at startup)
+    await user_repository.initialize()
+    
+    # Long-lived pooled clients for Spoonacular, USDA and other upstreams
+    http_clients.open()
+    
+    # Keep this worker's revoked-token filter in sync via Redis pub/sub
+    await token_registry.start()
+    
+    # Apply recipes written through the API to the local catalog and follow new changes
+    await recipes.recipe_sync.start()
+    
+    # Fill a snapshot catalog's text index off the request path (searches
+    # match titles until it is complete)
+    text_indexing = asyncio.create_task(recipes.recipe_catalog.fill_text_index_gradually())
+    
+    # Build the food autocomplete and barcode indexes from the local FDC import
+    if settings.FOOD_DATA_SOURCE == "local":
+        await food_autocomplete.ensure_loaded()
+        await food_barcodes.ensure_loaded()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down...")
+    text_indexing.cancel()
+    await token_registry.stop()
+    await recipes.recipe_sync.stop()
+    await http_clients.aclose()
     await RedisClient.close()
+    password_hasher.shutdown()
+    payload_offloader.shutdown()
+    await database.close()
+    await food_database.close()
     
     # Cleanup in-memory limiter
     in_memory_limiter.cleanup_old_entries()
@@ -82,11 +130,16 @@ def create_application() -> FastAPI:
             "X-RateLimit-Limit",
             "X-RateLimit-Remaining",
             "X-RateLimit-Reset",
+            "X-Next-Cursor",
         ],
     )
     
     # Rate limiting middleware
     application.add_middleware(RateLimitMiddleware)
+
+    # Request deadline (added last so it wraps everything and the budget
+    # includes time spent in the other middleware)
+    application.add_middleware(RequestDeadlineMiddleware)
     
     # Include routers
     application.include_router(
@@ -153,6 +206,14 @@ def create_application() -> FastAPI:
             "status": "ok",
             "redis": redis_status,
             "rate_limiting": "redis" if RedisClient.is_connected() else "in-memory",
+            "password_hashing": password_hasher.stats(),
+            "payload_offload": payload_offloader.stats(),
+            "http_pools": http_clients.stats(),
+            "circuit_breakers": upstream_stats(),
+            "spoonacular_quota": spoonacular_quota.stats(),
+            "food_autocomplete": food_autocomplete.stats(),
+            "food_barcodes": food_barcodes.stats(),
+            "recipe_sync": recipes.recipe_sync.stats(),
         }
 
     return application
@@ -1,10 +1,12 @@
 """Middleware modules for SnackTrack API"""
 
 from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.deadline import RequestDeadlineMiddleware
 from app.middleware.auth import AuthMiddleware, get_current_user, get_current_user_optional
 
 __all__ = [
     "RateLimitMiddleware",
+    "RequestDeadlineMiddleware",
     "AuthMiddleware",
     "get_current_user",
     "get_current_user_optional",
@@ -9,6 +9,7 @@ from fastapi import Request, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.core.security import decode_token, TokenPayload
+from app.core.tokens import token_registry
 
 # HTTP Bearer token security scheme
 security = HTTPBearer(auto_error=False)
@@ -28,7 +29,7 @@ async def get_current_user_optional(
     token = credentials.credentials
     payload = decode_token(token)
     
-    if payload and payload.type == "access":
+    if payload and payload.type == "access" and not await token_registry.is_revoked(payload.jti):
         # Store on request.state for rate limiter
         request.state.user_id = payload.sub
         return payload.sub
@@ -67,6 +68,14 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Bloom filter check - only touches Redis if the token may be revoked
+    if await token_registry.is_revoked(payload.jti):
+        raise HTTPException(
+            status_code=401,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
     # Store on request.state for rate limiter
     request.state.user_id = payload.sub
     return payload.sub
@@ -87,7 +96,7 @@ class AuthMiddleware:
         if auth_header.startswith("Bearer "):
             token = auth_header[7:]
             payload = decode_token(token)
-            if payload and payload.type == "access":
+            if payload and payload.type == "access" and not await token_registry.is_revoked(payload.jti):
                 request.state.user_id = payload.sub
         
         return await call_next(request)
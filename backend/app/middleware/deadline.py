@@ -0,0 +1,38 @@
+"""
+Request deadline middleware.
+
+Gives every request a time budget (REQUEST_DEADLINE_SECONDS, or less if the
+client sends X-Request-Timeout in seconds). Upstream calls made while
+handling the request size their timeouts and retries to what is left, so a
+slow upstream can't hold a request longer than its budget.
+"""
+
+from app.core.config import settings
+from app.core.request_context import request_deadline, set_request_deadline
+
+
+class RequestDeadlineMiddleware:
+    """Pure ASGI middleware so the deadline contextvar reaches route handlers"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        budget = settings.REQUEST_DEADLINE_SECONDS
+        for name, value in scope["headers"]:
+            if name == b"x-request-timeout":
+                try:
+                    budget = min(budget, max(0.0, float(value)))
+                except ValueError:
+                    pass
+                break
+
+        token = set_request_deadline(budget)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_deadline.reset(token)
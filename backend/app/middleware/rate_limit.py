@@ -9,9 +9,16 @@ Enforces:
 
 Uses Redis (ElastiCache) for distributed rate limiting across instances.
 Falls back to in-memory limiting for local development.
+
+Two Redis key layouts are supported (RATE_LIMIT_KEY_LAYOUT):
+- flat: one top-level key per identity and window (rl:user:<id>:<window>)
+- sharded: one hash per shard and window (rl:{<shard>}:<window>), with the
+  identity as the field. Keeps the keyspace to RATE_LIMIT_KEY_SHARDS keys per
+  window and the hash tag spreads shards across Redis Cluster slots.
 """
 
 import time
+import zlib
 import logging
 from typing import Optional
 
@@ -21,6 +28,7 @@ from starlette.responses import JSONResponse
 
 from app.core.config import settings
 from app.core.redis import RedisClient, in_memory_limiter
+from app.core.request_context import request_user_id
 from app.core.security import get_user_id_from_token
 
 logger = logging.getLogger(__name__)
@@ -46,6 +54,19 @@ SENSITIVE_PATHS = (
     "/api/v1/auth/verify",
 )
 
+# Window expiry in seconds (75s > 60s for safety)
+RATE_LIMIT_WINDOW_TTL = 75
+
+# Atomically increment an identity's counter inside a shard hash and set the
+# shard's expiry once, when the hash is first created in the window.
+SHARDED_INCR_SCRIPT = """
+local current = redis.call('HINCRBY', KEYS[1], ARGV[1], 1)
+if current == 1 and redis.call('TTL', KEYS[1]) == -1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return current
+"""
+
 # Paths to exclude from rate limiting
 EXCLUDED_PATHS = (
     "/",
@@ -127,6 +148,21 @@ def get_rate_limit_for_path(path: str, is_authenticated: bool) -> int:
         return settings.RATE_LIMIT_UNAUTH_PER_MIN
 
 
+def build_rate_limit_key(identity: str, window: int) -> tuple[str, Optional[str]]:
+    """
+    Build the Redis key for an identity's counter in a window.
+
+    Returns (key, field). field is None for the flat layout; for the sharded
+    layout the counter lives in field `identity` of hash `key`. Shards use
+    crc32 rather than hash() so every worker maps an identity to the same shard.
+    """
+    if settings.RATE_LIMIT_KEY_LAYOUT == "sharded":
+        shard = zlib.crc32(identity.encode("utf-8")) % settings.RATE_LIMIT_KEY_SHARDS
+        return f"rl:{{{shard}}}:{window}", identity
+
+    return f"rl:{identity}:{window}", None
+
+
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """
     Rate limiting middleware using Redis for distributed counting.
@@ -139,6 +175,10 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     - Graceful fallback to in-memory limiting if Redis unavailable
     """
     
+    def __init__(self, app):
+        super().__init__(app)
+        self._sharded_incr = None
+    
     async def dispatch(self, request: Request, call_next):
         path = request.url.path
         method = request.method
@@ -164,14 +204,13 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         window = now // 60  # 1-minute buckets
         
         if is_authenticated:
-            key = f"rl:user:{user_id}:{window}"
             identity = f"user:{user_id}"
         else:
-            key = f"rl:ip:{client_ip}:{window}"
             identity = f"ip:{client_ip}"
+        key, field = build_rate_limit_key(identity, window)
         
         # Check rate limit
-        is_allowed, current_count = await self._check_rate_limit(key, limit)
+        is_allowed, current_count = await self._check_rate_limit(key, limit, field)
         
         if not is_allowed:
             # Calculate retry-after
@@ -197,8 +236,12 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 },
             )
         
-        # Process request
-        response = await call_next(request)
+        # Process request, exposing the caller's identity to services
+        user_token = request_user_id.set(user_id)
+        try:
+            response = await call_next(request)
+        finally:
+            request_user_id.reset(user_token)
         
         # Add rate limit headers to response
         remaining = max(0, limit - current_count)
@@ -208,7 +251,9 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         
         return response
     
-    async def _check_rate_limit(self, key: str, limit: int) -> tuple[bool, int]:
+    async def _check_rate_limit(
+        self, key: str, limit: int, field: Optional[str] = None
+    ) -> tuple[bool, int]:
         """
         Check and increment rate limit counter.
         Returns (is_allowed, current_count)
@@ -217,12 +262,23 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         
         if redis_client:
             try:
+                if field is not None:
+                    # Sharded layout: HINCRBY + one expiry per shard in a single round trip
+                    if self._sharded_incr is None:
+                        self._sharded_incr = redis_client.register_script(SHARDED_INCR_SCRIPT)
+                    current = await self._sharded_incr(
+                        keys=[key],
+                        args=[field, RATE_LIMIT_WINDOW_TTL],
+                        client=redis_client,
+                    )
+                    return current <= limit, current
+                
                 # Atomic increment
                 current = await redis_client.incr(key)
                 
                 # Set expiry on first request in window
                 if current == 1:
-                    await redis_client.expire(key, 75)  # 75s > 60s for safety
+                    await redis_client.expire(key, RATE_LIMIT_WINDOW_TTL)
                 
                 return current <= limit, current
                 
@@ -231,5 +287,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 # Fall through to in-memory
         
         # Fallback to in-memory limiting
+        if field is not None:
+            key = f"{key}:{field}"
         return in_memory_limiter.check_and_increment(key, limit)
 
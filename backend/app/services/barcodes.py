@@ -0,0 +1,208 @@
+"""
+Food Barcodes
+
+Barcode (GTIN/UPC) -> FDC ID index for branded foods, so logging a scanned
+product doesn't need a USDA search.
+
+Barcodes are normalized to integers (leading zeros dropped, so a 12-digit
+UPC-A and the same product's 13-digit EAN agree) and kept in two parallel
+sorted integer arrays searched with bisect: 16 bytes per code, ~7 MB for
+every branded food in FoodData Central. Codes learned from live USDA results
+go to a small dict that is merged into the arrays in batches.
+
+The index is built from the local FoodData Central import. With
+BARCODE_INDEX_PATH set it is also saved there and loaded on the next start,
+unless the import has changed since.
+"""
+
+import asyncio
+import bisect
+import logging
+import os
+import re
+from array import array
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+from app.db.foods import FoodRepository, food_repository
+
+logger = logging.getLogger(__name__)
+
+# GTIN-8 up to GTIN-14; FDC sometimes drops a leading zero, so allow shorter
+MIN_BARCODE_DIGITS = 6
+MAX_BARCODE_DIGITS = 14
+
+# Live-learned codes held in a dict before being merged into the arrays
+MAX_PENDING_BARCODES = 1024
+
+SNAPSHOT_MAGIC = b"SNKBAR01"
+
+_SEPARATORS_RE = re.compile(r"[\s-]")
+
+
+def normalize_barcode(code: str) -> Optional[int]:
+    """Barcode as an integer, or None if it isn't a plausible GTIN/UPC"""
+    digits = _SEPARATORS_RE.sub("", code or "")
+    if not digits.isdigit() or not MIN_BARCODE_DIGITS <= len(digits) <= MAX_BARCODE_DIGITS:
+        return None
+    value = int(digits)
+    return value or None
+
+
+class BarcodeIndex:
+    """Sorted barcode -> FDC ID arrays"""
+
+    def __init__(self, codes: Optional[array] = None, fdc_ids: Optional[array] = None):
+        self._codes = codes if codes is not None else array("q")
+        self._fdc_ids = fdc_ids if fdc_ids is not None else array("q")
+        self._pending: Dict[int, int] = {}
+
+    @classmethod
+    def build(cls, pairs: Iterable[Tuple[str, int]]) -> "BarcodeIndex":
+        """Index (barcode, fdc_id) pairs; for duplicate codes the newest (highest) FDC ID wins"""
+        normalized = {}
+        for code, fdc_id in pairs:
+            value = normalize_barcode(code)
+            if value is not None and fdc_id > normalized.get(value, 0):
+                normalized[value] = fdc_id
+        codes = sorted(normalized)
+        return cls(array("q", codes), array("q", (normalized[c] for c in codes)))
+
+    def __len__(self) -> int:
+        return len(self._codes) + len(self._pending)
+
+    def lookup(self, code: str) -> Optional[int]:
+        """FDC ID for a barcode, if indexed"""
+        value = normalize_barcode(code)
+        if value is None:
+            return None
+        if value in self._pending:
+            return self._pending[value]
+        position = bisect.bisect_left(self._codes, value)
+        if position < len(self._codes) and self._codes[position] == value:
+            return self._fdc_ids[position]
+        return None
+
+    def add(self, code: str, fdc_id: int) -> None:
+        """Index a barcode seen in a USDA result"""
+        value = normalize_barcode(code)
+        if value is None:
+            return
+        self._pending[value] = max(fdc_id, self._pending.get(value, 0))
+        if len(self._pending) >= MAX_PENDING_BARCODES:
+            self._merge()
+
+    def _merge(self) -> None:
+        merged = dict(zip(self._codes, self._fdc_ids))
+        for value, fdc_id in self._pending.items():
+            merged[value] = max(fdc_id, merged.get(value, 0))
+        codes = sorted(merged)
+        self._codes = array("q", codes)
+        self._fdc_ids = array("q", (merged[c] for c in codes))
+        self._pending.clear()
+
+    def save(self, path: str, source_count: int) -> None:
+        """
+        Write the index to path. source_count (foods in the import it was
+        built from) is stored so a stale snapshot can be detected.
+        """
+        self._merge()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            array("q", (source_count, len(self._codes))).tofile(f)
+            self._codes.tofile(f)
+            self._fdc_ids.tofile(f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple["BarcodeIndex", int]:
+        """Read a snapshot written by save(); returns (index, source_count)"""
+        with open(path, "rb") as f:
+            if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} is not a barcode index snapshot")
+            header = array("q")
+            header.fromfile(f, 2)
+            source_count, size = header
+            codes, fdc_ids = array("q"), array("q")
+            codes.fromfile(f, size)
+            fdc_ids.fromfile(f, size)
+        return cls(codes, fdc_ids), source_count
+
+    def memory_bytes(self) -> int:
+        return (
+            self._codes.buffer_info()[1] * self._codes.itemsize
+            + self._fdc_ids.buffer_info()[1] * self._fdc_ids.itemsize
+        )
+
+
+class FoodBarcodes:
+    """Shared barcode index, loaded from a snapshot or the local food database"""
+
+    def __init__(self, repository: FoodRepository, snapshot_path: Optional[str] = None):
+        self.repository = repository
+        self.snapshot_path = snapshot_path
+        self.index = BarcodeIndex()
+        self._loading: Optional[asyncio.Task] = None
+        self._loaded = False
+
+    async def _load(self) -> None:
+        source_count = await self.repository.count()
+        loop = asyncio.get_running_loop()
+
+        index = None
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            try:
+                snapshot, snapshot_count = await loop.run_in_executor(None, BarcodeIndex.load, self.snapshot_path)
+                if snapshot_count == source_count:
+                    index = snapshot
+            except (OSError, ValueError, EOFError) as e:
+                logger.warning(f"Ignoring barcode index snapshot {self.snapshot_path}: {e}")
+
+        if index is None:
+            rows = await self.repository.all_barcodes()
+            index = await loop.run_in_executor(
+                None, BarcodeIndex.build, ((r["gtin_upc"], r["fdc_id"]) for r in rows)
+            )
+            if self.snapshot_path and source_count:
+                await loop.run_in_executor(None, index.save, self.snapshot_path, source_count)
+
+        # Keep codes learned from live results while loading
+        for value, fdc_id in self.index._pending.items():
+            index._pending.setdefault(value, fdc_id)
+        self.index = index
+        self._loaded = True
+        logger.info(f"Barcode index: {len(index)} barcodes")
+
+    async def ensure_loaded(self) -> None:
+        """Load the index (once)"""
+        if self._loaded:
+            return
+        if self._loading is None or self._loading.get_loop() is not asyncio.get_running_loop():
+            self._loading = asyncio.create_task(self._load())
+        try:
+            await asyncio.shield(self._loading)
+        except Exception:
+            # Let the next request retry the load
+            self._loading = None
+            raise
+
+    def lookup(self, code: str) -> Optional[int]:
+        return self.index.lookup(code)
+
+    def add_many(self, foods: Iterable[Any]) -> None:
+        """Index the barcodes of FoodItem/FoodNutrition results"""
+        for food in foods:
+            if food.gtin_upc:
+                self.index.add(food.gtin_upc, food.fdc_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self._loaded,
+            "barcodes": len(self.index),
+            "memory_bytes": self.index.memory_bytes(),
+        }
+
+
+# Singleton instance
+food_barcodes = FoodBarcodes(food_repository, settings.BARCODE_INDEX_PATH)
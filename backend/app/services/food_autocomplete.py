@@ -0,0 +1,451 @@
+"""
+Food Autocomplete
+
+In-process, typo-tolerant autocomplete over food names, so search-as-you-type
+doesn't cost a USDA round trip per keystroke.
+
+Names are split into words. Each distinct word gets a stable id, a posting
+list of the foods containing it, and a place in a sorted array used for
+prefix lookups (bisect). Misspellings are matched with a symmetric-delete
+index: every word is stored under the strings obtained by deleting up to
+1 (4-7 letters) or 2 (8+ letters) characters, and a query word is looked up
+under its own deletes; candidates are then checked with a bounded edit
+distance. "brocoli" and "chiken" find broccoli and chicken this way.
+
+A query matches foods that contain a match for every query word (the last
+word may be a prefix). Matches are ranked by popularity (generic foods start
+above branded ones; each lookup of a food adds to it), weighted by how
+closely each word matched. Posting lists are kept in rank order, so a query
+stops walking a list as soon as nothing further down can make the top N;
+common words like "raw" cost the same as rare ones.
+
+The index is built from the local FoodData Central database on first use and
+grows with foods returned by live USDA searches.
+"""
+
+import asyncio
+import bisect
+import heapq
+import logging
+import math
+import re
+import sys
+import unicodedata
+from array import array
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.foods import FoodRepository, food_repository
+
+logger = logging.getLogger(__name__)
+
+# Starting popularity by FDC data type; everything else counts as branded
+GENERIC_POPULARITY = 2.0
+BRANDED_POPULARITY = 1.0
+GENERIC_DATA_TYPES = {"Foundation", "SR Legacy", "Survey (FNDDS)"}
+
+# Score multiplier by how a query word matched
+MATCH_WEIGHTS = {"exact": 1.0, "prefix": 0.8, 1: 0.55, 2: 0.3}
+
+# Cap on words a single query word may expand to (short prefixes match many)
+MAX_WORD_CANDIDATES = 256
+
+# Foods whose popularity changed since posting lists were last ordered;
+# past this many the lists are re-sorted
+MAX_BOOSTED_FOODS = 1024
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_words(text: str) -> List[str]:
+    """Lowercase, strip accents and split into words"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return _WORD_RE.findall(text.encode("ascii", "ignore").decode())
+
+
+def max_edit_distance(word: str) -> int:
+    """Typos tolerated in a word of this length"""
+    if len(word) >= 8:
+        return min(2, settings.AUTOCOMPLETE_MAX_EDIT_DISTANCE)
+    if len(word) >= 4:
+        return min(1, settings.AUTOCOMPLETE_MAX_EDIT_DISTANCE)
+    return 0
+
+
+def deletes(word: str, distance: int) -> set[str]:
+    """All strings obtained by deleting up to `distance` characters"""
+    variants = {word}
+    for n in range(1, distance + 1):
+        if len(word) - n < 1:
+            break
+        for positions in combinations(range(len(word)), n):
+            variants.add("".join(c for i, c in enumerate(word) if i not in positions))
+    return variants
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def _deep_size(obj: Any) -> int:
+    """Approximate memory of a container and its elements (one level deep)"""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in obj.items())
+    elif isinstance(obj, list):
+        size += sum(sys.getsizeof(item) for item in obj)
+    return size
+
+
+class AutocompleteIndex:
+    """Prefix + symmetric-delete word index over food names"""
+
+    def __init__(self):
+        # Foods
+        self._fdc_ids = array("q")
+        self._names: List[str] = []
+        self._data_types: List[Optional[str]] = []
+        self._popularity = array("f")
+        self._rank = array("f")
+        self._boosted: set[int] = set()
+        self._doc_by_fdc_id: Dict[int, int] = {}
+        self._doc_words: List[array] = []
+        # Words: stable ids, plus a sorted view for prefix search
+        self._words: List[str] = []
+        self._word_ids: Dict[str, int] = {}
+        self._postings: List[array] = []
+        self._sorted_words: List[str] = []
+        self._sorted_ids = array("I")
+        # Symmetric-delete variant -> word id(s)
+        self._deletes: Dict[str, Any] = {}
+        # Sorted view is rebuilt once at the end of add_many
+        self._bulk_loading = False
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @property
+    def word_count(self) -> int:
+        return len(self._words)
+
+    def foods(self) -> Iterable[Tuple[int, str, Optional[str]]]:
+        """(fdc_id, name, data_type) for every indexed food"""
+        return zip(self._fdc_ids, self._names, self._data_types)
+
+    def _add_word(self, word: str) -> int:
+        word_id = len(self._words)
+        self._words.append(word)
+        self._word_ids[word] = word_id
+        self._postings.append(array("I"))
+
+        if not self._bulk_loading:
+            position = bisect.bisect_left(self._sorted_words, word)
+            self._sorted_words.insert(position, word)
+            self._sorted_ids.insert(position, word_id)
+
+        for variant in deletes(word, max_edit_distance(word)):
+            existing = self._deletes.get(variant)
+            if existing is None:
+                self._deletes[variant] = word_id
+            elif isinstance(existing, int):
+                self._deletes[variant] = array("I", (existing, word_id))
+            else:
+                existing.append(word_id)
+        return word_id
+
+    def add(self, fdc_id: int, name: str, data_type: Optional[str] = None) -> None:
+        """Add a food (ignored if already indexed)"""
+        if fdc_id in self._doc_by_fdc_id:
+            return
+
+        doc = len(self._names)
+        self._doc_by_fdc_id[fdc_id] = doc
+        self._fdc_ids.append(fdc_id)
+        self._names.append(name)
+        self._data_types.append(data_type)
+        popularity = GENERIC_POPULARITY if data_type in GENERIC_DATA_TYPES else BRANDED_POPULARITY
+        self._popularity.append(popularity)
+
+        words = dict.fromkeys(normalize_words(name))
+        self._rank.append(self._static_rank(popularity, len(words)))
+
+        word_ids = array("I")
+        for word in words:
+            word_id = self._word_ids.get(word)
+            if word_id is None:
+                word_id = self._add_word(word)
+            postings = self._postings[word_id]
+            if self._bulk_loading:
+                postings.append(doc)
+            else:
+                postings.insert(self._posting_position(postings, self._rank[doc]), doc)
+            word_ids.append(word_id)
+        self._doc_words.append(word_ids)
+
+    def add_many(self, foods: Iterable[Tuple[int, str, Optional[str]]]) -> None:
+        """Add (fdc_id, name, data_type) tuples"""
+        self._bulk_loading = True
+        try:
+            for fdc_id, name, data_type in foods:
+                self.add(fdc_id, name, data_type)
+        finally:
+            self._bulk_loading = False
+            order = sorted(range(len(self._words)), key=self._words.__getitem__)
+            self._sorted_words = [self._words[i] for i in order]
+            self._sorted_ids = array("I", order)
+            self._sort_postings(range(len(self._words)))
+
+    @staticmethod
+    def _static_rank(popularity: float, word_count: int) -> float:
+        # Shorter names are usually the canonical food ("Bananas, raw")
+        return math.log1p(popularity) / (1 + 0.05 * word_count)
+
+    def _posting_position(self, postings: array, rank: float) -> int:
+        """Insertion point keeping a posting list in descending rank order"""
+        return bisect.bisect_left(postings, -rank, key=lambda doc: -self._rank[doc])
+
+    def _sort_postings(self, word_ids: Iterable[int]) -> None:
+        key = self._rank.__getitem__
+        for word_id in word_ids:
+            postings = self._postings[word_id]
+            self._postings[word_id] = array("I", sorted(postings, key=key, reverse=True))
+
+    def record_use(self, fdc_id: int) -> None:
+        """Count a lookup of a food towards its ranking"""
+        doc = self._doc_by_fdc_id.get(fdc_id)
+        if doc is None:
+            return
+        self._popularity[doc] += 1
+        self._boosted.add(doc)
+        if len(self._boosted) > MAX_BOOSTED_FOODS:
+            self._rerank()
+
+    def _rerank(self) -> None:
+        """Fold boosted popularity into the ranks and re-sort affected postings"""
+        touched = set()
+        for doc in self._boosted:
+            self._rank[doc] = self._static_rank(self._popularity[doc], len(self._doc_words[doc]))
+            touched.update(self._doc_words[doc])
+        self._boosted.clear()
+        self._sort_postings(touched)
+
+    def _score(self, doc: int) -> float:
+        if doc in self._boosted:
+            return self._static_rank(self._popularity[doc], len(self._doc_words[doc]))
+        return self._rank[doc]
+
+    def _prefix_matches(self, prefix: str) -> Dict[int, float]:
+        start = bisect.bisect_left(self._sorted_words, prefix)
+        end = bisect.bisect_right(self._sorted_words, prefix + "\x7f", lo=start)
+        ids = self._sorted_ids[start:end]
+        if len(ids) > MAX_WORD_CANDIDATES:
+            # Keep the words shared by the most foods
+            ids = heapq.nlargest(MAX_WORD_CANDIDATES, ids, key=lambda i: len(self._postings[i]))
+        return {
+            word_id: MATCH_WEIGHTS["exact"] if self._words[word_id] == prefix else MATCH_WEIGHTS["prefix"]
+            for word_id in ids
+        }
+
+    def _fuzzy_matches(self, word: str) -> Dict[int, float]:
+        limit = max_edit_distance(word)
+        exact = self._word_ids.get(word)
+        matches = {exact: MATCH_WEIGHTS["exact"]} if exact is not None else {}
+        if limit == 0:
+            return matches
+
+        for variant in deletes(word, limit):
+            found = self._deletes.get(variant)
+            if found is None:
+                continue
+            for word_id in (found,) if isinstance(found, int) else found:
+                if word_id in matches:
+                    continue
+                candidate = self._words[word_id]
+                allowed = max(limit, max_edit_distance(candidate))
+                distance = edit_distance(word, candidate, allowed)
+                if 0 < distance <= allowed:
+                    matches[word_id] = MATCH_WEIGHTS[distance]
+        return matches
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Best matching foods for a (possibly partial, misspelled) query"""
+        words = normalize_words(query)
+        if not words:
+            return []
+
+        # Candidate words for each query word; the last one may be a prefix
+        per_word: List[Dict[int, float]] = []
+        for i, word in enumerate(words):
+            matches = self._prefix_matches(word) if i == len(words) - 1 else {}
+            if len(matches) < limit:
+                for word_id, weight in self._fuzzy_matches(word).items():
+                    matches.setdefault(word_id, weight)
+            if not matches:
+                return []
+            per_word.append(matches)
+
+        # Walk the most selective query word's postings in rank order and
+        # require the other words; stop once no later food can make the top N
+        def posting_total(matches: Dict[int, float]) -> int:
+            return sum(len(self._postings[w]) for w in matches)
+
+        ordered = sorted(per_word, key=posting_total)
+        seed, rest = ordered[0], ordered[1:]
+
+        # Best weight the other words could add, for the stopping bound
+        ceiling = math.prod(max(matches.values()) for matches in rest)
+        top: List[Tuple[float, int]] = []
+        seen: set[int] = set()
+
+        def consider(doc: int, weight: float) -> None:
+            seen.add(doc)
+            doc_words = self._doc_words[doc]
+            for matches in rest:
+                best = max((matches.get(w, 0.0) for w in doc_words), default=0.0)
+                if best == 0.0:
+                    return
+                weight *= best
+            entry = (weight * self._score(doc), doc)
+            if len(top) < limit:
+                heapq.heappush(top, entry)
+            elif entry > top[0]:
+                heapq.heapreplace(top, entry)
+
+        # Higher-weight words first, so a food is first seen at its best weight
+        for word_id, weight in sorted(seed.items(), key=lambda item: -item[1]):
+            for doc in self._postings[word_id]:
+                if len(top) == limit and weight * ceiling * self._rank[doc] <= top[0][0]:
+                    break
+                if doc not in seen:
+                    consider(doc, weight)
+
+        # Recently used foods may rank above their place in the postings
+        for doc in self._boosted:
+            if doc not in seen:
+                weight = max((seed.get(w, 0.0) for w in self._doc_words[doc]), default=0.0)
+                if weight:
+                    consider(doc, weight)
+
+        return [
+            {
+                "fdc_id": self._fdc_ids[doc],
+                "name": self._names[doc],
+                "data_type": self._data_types[doc],
+                "score": round(score, 4),
+            }
+            for score, doc in sorted(top, reverse=True)
+        ]
+
+    def memory_report(self) -> Dict[str, int]:
+        """Approximate bytes used by each structure"""
+        report = {
+            "foods": (
+                self._fdc_ids.buffer_info()[1] * self._fdc_ids.itemsize
+                + self._popularity.buffer_info()[1] * self._popularity.itemsize
+                + self._rank.buffer_info()[1] * self._rank.itemsize
+                + _deep_size(self._names)
+                + sys.getsizeof(self._data_types)
+                + _deep_size(self._doc_by_fdc_id)
+                + sum(sys.getsizeof(words) for words in self._doc_words)
+            ),
+            "words": (
+                _deep_size(self._words)
+                + _deep_size(self._word_ids)
+                + sys.getsizeof(self._sorted_words)
+                + sys.getsizeof(self._sorted_ids)
+                + sum(sys.getsizeof(p) for p in self._postings)
+            ),
+            "deletes": _deep_size(self._deletes),
+        }
+        report["total"] = sum(report.values())
+        return report
+
+
+class FoodAutocomplete:
+    """Shared autocomplete index, loaded from the local food database"""
+
+    def __init__(self, repository: FoodRepository):
+        self.repository = repository
+        self.index = AutocompleteIndex()
+        self._loading: Optional[asyncio.Task] = None
+        self._loaded = False
+        self._memory: Optional[Dict[str, int]] = None
+
+    async def _load(self) -> None:
+        rows = await self.repository.all_names()
+        loop = asyncio.get_running_loop()
+        index = AutocompleteIndex()
+        await loop.run_in_executor(
+            None, index.add_many, ((r["fdc_id"], r["name"], r["data_type"]) for r in rows)
+        )
+        # Keep foods added from live searches while loading
+        index.add_many(self.index.foods())
+        self.index = index
+        self._memory = index.memory_report()
+        self._loaded = True
+
+        budget = settings.AUTOCOMPLETE_MEMORY_BUDGET_MB * 1024 * 1024
+        logger.info(
+            f"Food autocomplete index: {len(index)} foods, "
+            f"{self._memory['total'] / 1024 / 1024:.1f} MB"
+        )
+        if self._memory["total"] > budget:
+            logger.warning(
+                f"Food autocomplete index exceeds AUTOCOMPLETE_MEMORY_BUDGET_MB "
+                f"({settings.AUTOCOMPLETE_MEMORY_BUDGET_MB} MB)"
+            )
+
+    async def ensure_loaded(self) -> None:
+        """Build the index from the local database (once)"""
+        if self._loaded:
+            return
+        if self._loading is None or self._loading.get_loop() is not asyncio.get_running_loop():
+            self._loading = asyncio.create_task(self._load())
+        try:
+            await asyncio.shield(self._loading)
+        except Exception:
+            # Let the next request retry the load
+            self._loading = None
+            raise
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        return self.index.suggest(query, limit)
+
+    def add_many(self, foods: Iterable[Tuple[int, str, Optional[str]]]) -> None:
+        """Add a few foods (e.g. live search results) without a full re-sort"""
+        for fdc_id, name, data_type in foods:
+            self.index.add(fdc_id, name, data_type)
+
+    def record_use(self, fdc_id: int) -> None:
+        self.index.record_use(fdc_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Index size and memory against the budget, for the health endpoint"""
+        return {
+            "loaded": self._loaded,
+            "foods": len(self.index),
+            "words": self.index.word_count,
+            "memory_bytes": self._memory,
+            "memory_budget_mb": settings.AUTOCOMPLETE_MEMORY_BUDGET_MB,
+        }
+
+
+# Singleton instance
+food_autocomplete = FoodAutocomplete(food_repository)
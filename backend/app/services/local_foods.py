@@ -0,0 +1,145 @@
+"""
+Local Food Service
+
+Serves food search and nutrition lookups from the local FoodData Central
+database (see app.db.fdc_import) with the same interface as USDAFoodService.
+The live USDA API is only used as a fallback: when the local database hasn't
+been imported, or for foods it doesn't contain.
+
+Selected with FOOD_DATA_SOURCE=local; routes get the active service from
+get_food_service().
+"""
+
+import logging
+import math
+from typing import Any, Dict, List, Optional, Union
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.db.foods import FoodRepository, food_repository
+from app.services.usda import FoodItem, FoodNutrition, USDAFoodService, usda_service
+
+logger = logging.getLogger(__name__)
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value else None
+
+
+class LocalFoodService:
+    """Food lookups against the imported FDC database, live API as fallback"""
+
+    def __init__(self, repository: FoodRepository, fallback: USDAFoodService):
+        self.repository = repository
+        self.fallback = fallback
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    @property
+    def _can_fall_back(self) -> bool:
+        return self.fallback.available
+
+    def _to_item(self, row: Dict[str, Any]) -> FoodItem:
+        return FoodItem(
+            fdc_id=row["fdc_id"],
+            name=row["name"],
+            brand_owner=row["brand_owner"],
+            data_type=row["data_type"],
+            description=row["name"],
+            gtin_upc=row["gtin_upc"],
+        )
+
+    def _to_nutrition(self, row: Dict[str, Any]) -> FoodNutrition:
+        return FoodNutrition(
+            fdc_id=row["fdc_id"],
+            name=row["name"],
+            calories=round(row["calories"] or 0.0, 2),
+            protein=round(row["protein"] or 0.0, 2),
+            carbs=round(row["carbs"] or 0.0, 2),
+            fat=round(row["fat"] or 0.0, 2),
+            fiber=_round(row["fiber"]),
+            sugar=_round(row["sugar"]),
+            sodium=_round(row["sodium"]),
+            serving_size=row["serving_size"],
+            serving_unit=row["serving_unit"],
+            brand_owner=row["brand_owner"],
+            data_type=row["data_type"],
+            description=row["name"],
+            gtin_upc=row["gtin_upc"],
+        )
+
+    async def search_foods(
+        self,
+        query: str,
+        page_size: int = 50,
+        page_number: int = 1,
+        data_type: Optional[List[str]] = None,
+        brand_owner: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Search foods in the local database (same result shape as USDAFoodService)"""
+        if not query or not query.strip():
+            raise HTTPException(status_code=400, detail="Search query cannot be empty")
+
+        if not await self.repository.count() and self._can_fall_back:
+            return await self.fallback.search_foods(query, page_size, page_number, data_type, brand_owner)
+
+        page_size = min(page_size, 200)
+        rows, total = await self.repository.search(
+            query,
+            limit=page_size,
+            offset=(page_number - 1) * page_size,
+            data_types=data_type,
+            brand_owner=brand_owner,
+        )
+        return {
+            "foods": [self._to_item(row) for row in rows],
+            "total_hits": total,
+            "current_page": page_number,
+            "total_pages": math.ceil(total / page_size),
+        }
+
+    async def get_food_by_id(self, fdc_id: int) -> FoodNutrition:
+        """Get nutrition for a food, from the live API if it isn't imported"""
+        row = await self.repository.get(fdc_id)
+        if row is not None:
+            return self._to_nutrition(row)
+
+        if self._can_fall_back:
+            return await self.fallback.get_food_by_id(fdc_id)
+
+        raise HTTPException(status_code=404, detail=f"Food with FDC ID {fdc_id} not found")
+
+    async def get_foods_by_ids(self, fdc_ids: List[int]) -> List[FoodNutrition]:
+        """Get nutrition for several foods; ones not imported come from the live API"""
+        fdc_ids = list(dict.fromkeys(fdc_ids))
+        if len(fdc_ids) > settings.USDA_MAX_BATCH_IDS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Maximum {settings.USDA_MAX_BATCH_IDS} food IDs per request"
+            )
+
+        rows = await self.repository.get_many(fdc_ids)
+        foods = {fdc_id: self._to_nutrition(row) for fdc_id, row in rows.items()}
+
+        missing = [fdc_id for fdc_id in fdc_ids if fdc_id not in foods]
+        if missing and self._can_fall_back:
+            try:
+                foods.update({food.fdc_id: food for food in await self.fallback.get_foods_by_ids(missing)})
+            except HTTPException as e:
+                logger.warning(f"Live USDA fallback failed for {len(missing)} foods: {e.detail}")
+
+        return [foods[fdc_id] for fdc_id in fdc_ids if fdc_id in foods]
+
+
+# Singleton instance
+local_food_service = LocalFoodService(food_repository, usda_service)
+
+
+def get_food_service() -> Union[LocalFoodService, USDAFoodService]:
+    """The food service selected by FOOD_DATA_SOURCE"""
+    if settings.FOOD_DATA_SOURCE == "local":
+        return local_food_service
+    return usda_service
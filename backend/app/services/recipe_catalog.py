@@ -0,0 +1,724 @@
+"""
+Recipe Catalog
+
+In-process index over the local recipe catalog (the sample recipes today,
+our own catalog of tens of thousands of recipes later), so fallback listing
+and filtering don't scan every recipe per request.
+
+Each recipe gets a small integer doc id. Lookups by recipe id go through a
+dict. Categorical fields (cuisine, meal_type, tags, suitable_for,
+not_suitable_for) have one bitmap per value: a Python int with bit `doc` set
+for every recipe carrying the value, so combining filters is a handful of
+big-int ANDs/ORs done in C. Numeric fields (calories, prep_time, cost,
+rating) have sorted indexes (values and docs in parallel arrays) used for
+range filters and for ordering.
+
+A query intersects the categorical bitmaps first. A range filter becomes a
+bitmap too when it selects fewer recipes than are left; otherwise it is
+checked per candidate instead. Results are then read in catalog order (or
+by walking a sorted index) and reading stops at offset + limit, so the
+work after the intersection is bounded by the page size, not the catalog.
+A catalog of a few dozen recipes (the sample recipes) is simply scanned.
+
+A free-text search (see recipe_search) yields the matching docs best first;
+results are read in that order, skipping docs not in the filtered bitmap.
+When another order is asked for, the matches become one more bitmap.
+
+Results can also be ordered by nutritional similarity to a recipe (see
+recipe_similarity): the filtered bitmap masks a vectorized nearest-neighbour
+pass, which returns just the nearest page.
+
+Recipes can be added, replaced and removed at any time; the doc ids of
+removed recipes are reused. Pages can be resumed from the last recipe seen
+(page_key / after): a bisect into the sorted index or relevance order, or a
+shift of the bitmap in catalog order, instead of skipping offset results.
+
+The catalog can also be loaded from a memory-mapped snapshot (see
+recipe_snapshot): bitmaps, sorted indexes and vectors are then built from
+its columns, and a recipe object is only materialized when its row is read.
+Its text index is filled in the background, a chunk of rows at a time
+(fill_text_index_gradually); until it is complete, searches match the query
+words against titles instead.
+"""
+
+import asyncio
+import bisect
+import logging
+import re
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.food_autocomplete import normalize_words
+from app.services.recipe_search import RecipeTextIndex, SearchHits, stem
+from app.services.recipe_similarity import FEATURE_FIELDS, FEATURE_WEIGHTS, NutritionVectors, mask_to_bitmap
+
+logger = logging.getLogger(__name__)
+
+# Categorical fields with a bitmap per (lowercased) value
+FACETS = ("cuisine", "meal_type", "tags", "suitable_for", "not_suitable_for")
+
+# Numeric fields with a sorted index; recipes missing a value aren't in it
+SORTED_FIELDS = ("calories", "prep_time", "cost", "rating")
+
+# Snapshot column of each sorted field
+_SORTED_COLUMNS = {
+    "calories": "nutrition.calories",
+    "prep_time": "prep_time",
+    "cost": "cost_per_serving",
+    "rating": "rating",
+}
+
+# Snapshot column of each text field (see recipe_search.recipe_fields)
+_TEXT_COLUMNS = {
+    "title": "title",
+    "tags": "tags",
+    "ingredients": "ingredients.name",
+    "description": "description",
+    "cuisine": "cuisine",
+}
+
+_NONZERO_BYTE = re.compile(rb"[^\x00]")
+
+# Bitmaps up to this many bits are walked bit by bit (cheaper than a bytes scan)
+_SMALL_BITMAP_BITS = 512
+
+# Snapshot rows added to the text index between yields to the event loop
+TEXT_INDEX_CHUNK = 500
+
+# Catalogs up to this size answer filter-only queries (no search, similarity
+# or ordering) by checking each recipe: cheaper than combining bitmaps
+SCAN_MAX_RECIPES = 32
+
+
+def _numeric_values(recipe: Any) -> Dict[str, Optional[float]]:
+    return {
+        "calories": recipe.nutrition.calories,
+        "prep_time": recipe.prep_time,
+        "cost": recipe.cost_per_serving,
+        "rating": recipe.rating,
+    }
+
+
+def _facet_values(recipe: Any) -> Dict[str, set]:
+    return {
+        "cuisine": {recipe.cuisine.lower()},
+        "meal_type": {recipe.meal_type.lower()},
+        "tags": {tag.lower() for tag in recipe.tags},
+        "suitable_for": {value.lower() for value in recipe.suitable_for},
+        "not_suitable_for": {value.lower() for value in recipe.not_suitable_for},
+    }
+
+
+def bitmap_from_docs(docs: Iterable[int]) -> int:
+    """Bitmap with the given doc ids set (built in one pass)"""
+    docs = list(docs)
+    if not docs:
+        return 0
+    buffer = bytearray(max(docs) // 8 + 1)
+    for doc in docs:
+        buffer[doc >> 3] |= 1 << (doc & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def iter_docs(bitmap: int) -> Iterator[int]:
+    """Doc ids set in a bitmap, ascending (zero bytes are skipped in C)"""
+    if bitmap.bit_length() <= _SMALL_BITMAP_BITS:
+        while bitmap:
+            low = bitmap & -bitmap
+            yield low.bit_length() - 1
+            bitmap ^= low
+        return
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    for match in _NONZERO_BYTE.finditer(data):
+        base = match.start() * 8
+        byte = data[match.start()]
+        while byte:
+            low = byte & -byte
+            yield base + low.bit_length() - 1
+            byte ^= low
+
+
+class _SortedIndex:
+    """
+    Docs in value order (equal values in doc order), kept as two parallel
+    arrays rather than (value, doc) tuples: 16 bytes per entry.
+    """
+
+    def __init__(self):
+        self.values = array("d")
+        self.docs = array("q")
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _position(self, value: float, doc: int) -> int:
+        start = bisect.bisect_left(self.values, value)
+        end = bisect.bisect_right(self.values, value, start)
+        return bisect.bisect_left(self.docs, doc, start, end)
+
+    def add(self, value: float, doc: int) -> None:
+        i = self._position(value, doc)
+        self.values.insert(i, value)
+        self.docs.insert(i, doc)
+
+    def remove(self, value: float, doc: int) -> None:
+        i = self._position(value, doc)
+        if i < len(self.docs) and self.docs[i] == doc and self.values[i] == value:
+            del self.values[i]
+            del self.docs[i]
+
+    def load(self, values: np.ndarray, docs: np.ndarray) -> None:
+        """Replace the contents with already sorted values and their docs"""
+        self.values = array("d", np.ascontiguousarray(values, dtype=np.float64).tobytes())
+        self.docs = array("q", np.ascontiguousarray(docs, dtype=np.int64).tobytes())
+
+    def ascending(self, after: Optional[Tuple[float, int]] = None) -> Iterator[int]:
+        """Docs by value, lowest first; after=(value, doc) resumes past that entry"""
+        start = 0
+        if after is not None:
+            value, doc = after
+            low = bisect.bisect_left(self.values, value)
+            high = bisect.bisect_right(self.values, value, low)
+            start = bisect.bisect_right(self.docs, doc, low, high)
+        docs = self.docs
+        return (docs[i] for i in range(start, len(docs)))
+
+    def descending(self, after: Optional[Tuple[float, int]] = None) -> Iterator[int]:
+        """
+        Docs by value, highest first; equal values keep doc order.
+        after=(value, doc) resumes past that entry.
+        """
+        end = len(self.docs)
+        if after is not None:
+            value, doc = after
+            end = bisect.bisect_left(self.values, value)
+            high = bisect.bisect_right(self.values, value, end)
+            yield from self.docs[bisect.bisect_right(self.docs, doc, end, high):high]
+        while end > 0:
+            start = bisect.bisect_left(self.values, self.values[end - 1], 0, end)
+            yield from self.docs[start:end]
+            end = start
+
+    def range(self, low: Optional[float], high: Optional[float]) -> Tuple[int, int]:
+        """Slice bounds of the docs with low <= value <= high"""
+        start = 0 if low is None else bisect.bisect_left(self.values, low)
+        end = len(self.docs) if high is None else bisect.bisect_right(self.values, high)
+        return start, max(start, end)
+
+
+class RecipeCatalog:
+    """Recipes indexed by id, categorical bitmaps and sorted numeric fields"""
+
+    def __init__(self):
+        self._recipes: List[Optional[Any]] = []
+        self._doc_by_id: Dict[str, int] = {}
+        self._free_docs: List[int] = []
+        self._live = 0
+        self._facets: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+        self._sorted = {field: _SortedIndex() for field in SORTED_FIELDS}
+        self._text = RecipeTextIndex()
+        self._vectors = NutritionVectors()
+        # Indexed values per doc, to unindex a recipe that is replaced or removed
+        self._doc_facets: List[Optional[Dict[str, set]]] = []
+        self._doc_numbers: List[Optional[Dict[str, Optional[float]]]] = []
+        # Snapshot the catalog was loaded from; its rows are docs 0..n-1 until replaced
+        self._snapshot: Optional[Any] = None
+        # Snapshot rows not yet in the text index, and their normalized titles
+        # for searching meanwhile
+        self._text_backlog = range(0)
+        self._scan_titles: Optional[List[str]] = None
+        # (doc, recipe, facets, numbers) in catalog order, for scanning small catalogs
+        self._scan_rows: Optional[List[Tuple[int, Any, Dict[str, set], Dict[str, Optional[float]]]]] = None
+        self._scan_recipes: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self._doc_by_id)
+
+    def get(self, recipe_id: str) -> Optional[Any]:
+        doc = self._doc_by_id.get(recipe_id)
+        return None if doc is None else self._recipe(doc)
+
+    def all(self) -> List[Any]:
+        """Every recipe, in catalog order"""
+        return [self._recipe(doc) for doc in iter_docs(self._live)]
+
+    def _recipe(self, doc: int) -> Any:
+        recipe = self._recipes[doc]
+        if recipe is None:
+            # A snapshot row, materialized on first read
+            recipe = self._recipes[doc] = self._snapshot.recipe(doc)
+        return recipe
+
+    def _facets_of(self, doc: int) -> Dict[str, set]:
+        facets = self._doc_facets[doc]
+        if facets is None:
+            facets = {
+                facet: {value.lower() for value in self._snapshot.values(facet, doc)}
+                for facet in FACETS
+            }
+        return facets
+
+    def _numbers_of(self, doc: int) -> Dict[str, Optional[float]]:
+        numbers = self._doc_numbers[doc]
+        if numbers is None:
+            numbers = {field: self._snapshot.number(column, doc) for field, column in _SORTED_COLUMNS.items()}
+        return numbers
+
+    def _allocate(self, recipe: Any) -> int:
+        if self._free_docs:
+            doc = self._free_docs.pop()
+            self._recipes[doc] = recipe
+        else:
+            doc = len(self._recipes)
+            self._recipes.append(recipe)
+            self._doc_facets.append(None)
+            self._doc_numbers.append(None)
+        self._doc_by_id[recipe.id] = doc
+        self._scan_rows = None
+        return doc
+
+    def add(self, recipe: Any) -> None:
+        """Index a recipe, replacing any recipe with the same id"""
+        self.remove(recipe.id)
+        doc = self._allocate(recipe)
+        bit = 1 << doc
+        self._live |= bit
+
+        facets = _facet_values(recipe)
+        for facet, values in facets.items():
+            bitmaps = self._facets[facet]
+            for value in values:
+                bitmaps[value] = bitmaps.get(value, 0) | bit
+        numbers = _numeric_values(recipe)
+        for field, value in numbers.items():
+            if value is not None:
+                self._sorted[field].add(value, doc)
+        self._doc_facets[doc] = facets
+        self._doc_numbers[doc] = numbers
+        self._text.add(doc, recipe)
+        self._vectors.add(doc, recipe)
+
+    def add_many(self, recipes: Iterable[Any]) -> None:
+        """Index many recipes, building each bitmap and sorted index once"""
+        # Within the batch, the last recipe with an id wins
+        recipes = list({recipe.id: recipe for recipe in recipes}.values())
+        if any(recipe.id in self._doc_by_id for recipe in recipes) or self._free_docs:
+            for recipe in recipes:
+                self.add(recipe)
+            return
+
+        docs_by_value: Dict[str, Dict[str, List[int]]] = {facet: {} for facet in FACETS}
+        pairs: Dict[str, List[Tuple[float, int]]] = {
+            field: list(zip(index.values, index.docs)) for field, index in self._sorted.items()
+        }
+        for recipe in recipes:
+            doc = self._allocate(recipe)
+            facets = _facet_values(recipe)
+            for facet, values in facets.items():
+                for value in values:
+                    docs_by_value[facet].setdefault(value, []).append(doc)
+            numbers = _numeric_values(recipe)
+            for field, value in numbers.items():
+                if value is not None:
+                    pairs[field].append((value, doc))
+            self._doc_facets[doc] = facets
+            self._doc_numbers[doc] = numbers
+            self._text.add(doc, recipe)
+            self._vectors.add(doc, recipe)
+
+        for facet, values in docs_by_value.items():
+            bitmaps = self._facets[facet]
+            for value, docs in values.items():
+                bitmaps[value] = bitmaps.get(value, 0) | bitmap_from_docs(docs)
+        for field, index in self._sorted.items():
+            pairs[field].sort()
+            index.load(np.array([value for value, _ in pairs[field]]), np.array([doc for _, doc in pairs[field]]))
+        self._live = bitmap_from_docs(self._doc_by_id.values())
+
+    def remove(self, recipe_id: str) -> bool:
+        """Drop a recipe from the catalog; False if it wasn't there"""
+        doc = self._doc_by_id.pop(recipe_id, None)
+        if doc is None:
+            return False
+        mask = ~(1 << doc)
+        self._live &= mask
+        for facet, values in self._facets_of(doc).items():
+            bitmaps = self._facets[facet]
+            for value in values:
+                remaining = bitmaps[value] & mask
+                if remaining:
+                    bitmaps[value] = remaining
+                else:
+                    del bitmaps[value]
+        for field, value in self._numbers_of(doc).items():
+            if value is not None:
+                self._sorted[field].remove(value, doc)
+        self._text.remove(doc)
+        self._vectors.remove(doc)
+        self._recipes[doc] = None
+        self._doc_facets[doc] = None
+        self._doc_numbers[doc] = None
+        self._free_docs.append(doc)
+        self._scan_rows = None
+        return True
+
+    def load_snapshot(self, snapshot: Any) -> None:
+        """Replace the catalog with the recipes of a RecipeSnapshot"""
+        self.__init__()
+        rows = len(snapshot)
+        self._snapshot = snapshot
+        self._recipes = [None] * rows
+        self._doc_facets = [None] * rows
+        self._doc_numbers = [None] * rows
+        self._doc_by_id = {recipe_id: doc for doc, recipe_id in enumerate(snapshot.strings("id"))}
+        self._live = (1 << rows) - 1
+
+        for facet in FACETS:
+            bitmaps = self._facets[facet]
+            for value, mask in snapshot.value_masks(facet):
+                key = value.lower()
+                bitmaps[key] = bitmaps.get(key, 0) | mask_to_bitmap(mask)
+        for field, column in _SORTED_COLUMNS.items():
+            values = snapshot.column(column).astype(float)
+            docs = np.flatnonzero(~np.isnan(values))
+            docs = docs[np.argsort(values[docs], kind="stable")]
+            self._sorted[field].load(values[docs], docs)
+        self._vectors.load(np.column_stack([
+            snapshot.column(FEATURE_FIELDS[name]).astype(float) for name in FEATURE_WEIGHTS
+        ]) if rows else np.empty((0, len(FEATURE_WEIGHTS))))
+        self._text_backlog = range(rows)
+        logger.info(f"Loaded {rows} recipes from snapshot {snapshot.path}")
+
+    def fill_text_index(self, rows: Optional[int] = None) -> bool:
+        """
+        Add up to rows (default: all) snapshot rows not yet in the text index;
+        True once none are left.
+        """
+        backlog = self._text_backlog
+        if rows is None:
+            rows = len(backlog)
+        self._text_backlog = backlog[rows:]
+        for doc in backlog[:rows]:
+            # Skip rows removed or replaced since the snapshot was loaded
+            if self._live >> doc & 1 and self._doc_numbers[doc] is None:
+                self._text.add_fields(doc, {
+                    field: self._snapshot.values(column, doc) for field, column in _TEXT_COLUMNS.items()
+                })
+        if self._text_backlog:
+            return False
+        self._scan_titles = None
+        return True
+
+    async def fill_text_index_gradually(self) -> None:
+        """Fill the text index TEXT_INDEX_CHUNK rows at a time, yielding to the event loop in between"""
+        if not self._text_backlog:
+            return
+        rows = len(self._text_backlog)
+        while not self.fill_text_index(TEXT_INDEX_CHUNK):
+            await asyncio.sleep(0)
+        logger.info(f"Indexed the text of {rows} snapshot recipes")
+
+    def _scan_hits(self, query: str) -> Optional[SearchHits]:
+        """
+        Search while the text index is being filled: docs whose title
+        contains every (stemmed) query word, all scoring 0 so they come in
+        catalog order.
+        """
+        words = [stem(word) for word in normalize_words(query)]
+        if not words:
+            return None
+        if self._scan_titles is None:
+            self._scan_titles = [" ".join(normalize_words(title or "")) for title in self._snapshot.strings("title")]
+        titles = self._scan_titles
+        scores: Dict[int, float] = {}
+        for doc in iter_docs(self._live):
+            # Rows replaced since the snapshot was loaded have their own title
+            if self._doc_numbers[doc] is None:
+                title = titles[doc]
+            else:
+                title = " ".join(normalize_words(self._recipes[doc].title))
+            if all(word in title for word in words):
+                scores[doc] = 0.0
+        return SearchHits(scores)
+
+    def _search(self, query: str) -> Optional[SearchHits]:
+        if self._text_backlog:
+            return self._scan_hits(query)
+        return self._text.search(query)
+
+    def facet_values(self, facet: str) -> Dict[str, int]:
+        """Recipe count per value of a categorical field"""
+        return {value: bitmap.bit_count() for value, bitmap in self._facets[facet].items()}
+
+    def query(
+        self,
+        cuisine: Optional[str] = None,
+        meal_type: Optional[str] = None,
+        tags: Optional[Iterable[str]] = None,
+        suitable_for: Optional[Iterable[str]] = None,
+        exclude_not_suitable_for: Optional[Iterable[str]] = None,
+        min_calories: Optional[float] = None,
+        max_calories: Optional[float] = None,
+        max_prep_time: Optional[float] = None,
+        max_cost: Optional[float] = None,
+        exclude_ids: Iterable[str] = (),
+        search: Optional[str] = None,
+        similar_to: Optional[str] = None,
+        where: Optional[Callable[[Any], bool]] = None,
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        after: Optional[List[Any]] = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> List[Any]:
+        """
+        Recipes matching every given filter.
+
+        Args:
+            cuisine, meal_type: Exact value (case-insensitive)
+            tags: Recipes with at least one of these tags
+            suitable_for: Recipes suitable for all of these
+            exclude_not_suitable_for: Drop recipes marked not suitable for any of these
+            min_calories, max_calories, max_prep_time, max_cost: Inclusive bounds
+            search: Full-text query (words, "phrases", prefix*); matches are
+                ordered by relevance unless order_by is given
+            similar_to: A recipe id; results (never the recipe itself) are
+                ordered by nutritional similarity to it
+            where: Extra predicate, checked only for recipes passing the rest
+            order_by: A sorted field (calories, prep_time, cost, rating), or
+                None for catalog order (relevance when searching); not
+                combined with similar_to
+            after: page_key() of the last recipe of the previous page; the
+                results resume right after it (same filters and order)
+            offset, limit: Page of the results
+        """
+        if (
+            search is None and similar_to is None and order_by is None
+            and self._snapshot is None and len(self._doc_by_id) <= SCAN_MAX_RECIPES
+        ):
+            return self._scan(
+                cuisine, meal_type, tags, suitable_for, exclude_not_suitable_for,
+                min_calories, max_calories, max_prep_time, max_cost, exclude_ids, where, after, offset, limit,
+            )
+        candidates = self._live
+        for facet, value in (("cuisine", cuisine), ("meal_type", meal_type)):
+            if value is not None:
+                candidates &= self._facets[facet].get(value.lower(), 0)
+        if tags is not None:
+            any_tag = 0
+            for tag in tags:
+                any_tag |= self._facets["tags"].get(tag.lower(), 0)
+            candidates &= any_tag
+        for value in suitable_for or ():
+            candidates &= self._facets["suitable_for"].get(value.lower(), 0)
+        for value in exclude_not_suitable_for or ():
+            candidates &= ~self._facets["not_suitable_for"].get(value.lower(), 0)
+        for recipe_id in exclude_ids:
+            doc = self._doc_by_id.get(recipe_id)
+            if doc is not None:
+                candidates &= ~(1 << doc)
+        target = None
+        if similar_to is not None:
+            if order_by is not None or after is not None:
+                raise ValueError("Cannot order or page recipes by both a field and similarity")
+            target = self._doc_by_id.get(similar_to)
+            if target is None:
+                return []
+            candidates &= ~(1 << target)
+
+        hits = None
+        if search is not None:
+            # A query with nothing searchable in it matches nothing
+            hits = self._search(search) if candidates else None
+            if not hits:
+                return []
+            if order_by is not None or target is not None:
+                candidates &= bitmap_from_docs(hits.scores)
+
+        # Selective ranges narrow the bitmap; the rest are checked per recipe
+        checks: List[Tuple[str, Optional[float], Optional[float]]] = []
+        for field, low, high in (
+            ("calories", min_calories, max_calories),
+            ("prep_time", None, max_prep_time),
+            ("cost", None, max_cost),
+        ):
+            if low is None and high is None:
+                continue
+            if not candidates:
+                return []
+            index = self._sorted[field]
+            start, end = index.range(low, high)
+            if end - start < candidates.bit_count():
+                candidates &= bitmap_from_docs(index.docs[start:end])
+            else:
+                checks.append((field, low, high))
+
+        # Resume point: the recipe id locates the doc (docs differ between workers)
+        resume = None
+        if after is not None:
+            resume = after[0] if len(after) > 2 else None, self._doc_by_id.get(after[-2], after[-1])
+            if hits is None and order_by is None:
+                candidates &= -1 << (resume[1] + 1)
+
+        if not candidates:
+            return []
+        wanted = offset + limit
+        results: List[Any] = []
+        if target is not None:
+            # Checks and where may reject some, so then rank every candidate
+            k = wanted if not checks and where is None else candidates.bit_count()
+            ordered: Iterable[int] = self._vectors.nearest(target, candidates, k)
+        elif hits is not None and order_by is None:
+            ordered = self._members(candidates, hits.order, hits.position_after(*resume) if resume else 0)
+        else:
+            ordered = self._ordered(candidates, order_by, descending, resume if order_by is not None else None)
+        for doc in ordered:
+            if checks and not self._in_ranges(doc, checks):
+                continue
+            recipe = self._recipe(doc)
+            if where is not None and not where(recipe):
+                continue
+            results.append(recipe)
+            if len(results) >= wanted:
+                break
+        return results[offset:]
+
+    def _scan(
+        self,
+        cuisine: Optional[str],
+        meal_type: Optional[str],
+        tags: Optional[Iterable[str]],
+        suitable_for: Optional[Iterable[str]],
+        exclude_not_suitable_for: Optional[Iterable[str]],
+        min_calories: Optional[float],
+        max_calories: Optional[float],
+        max_prep_time: Optional[float],
+        max_cost: Optional[float],
+        exclude_ids: Iterable[str],
+        where: Optional[Callable[[Any], bool]],
+        after: Optional[List[Any]],
+        offset: int,
+        limit: int,
+    ) -> List[Any]:
+        """query() in catalog order by checking every recipe (small catalogs, not from a snapshot)"""
+        rows = self._scan_rows
+        if rows is None:
+            rows = self._scan_rows = [
+                (doc, recipe, self._doc_facets[doc], self._doc_numbers[doc])
+                for doc, recipe in enumerate(self._recipes) if recipe is not None
+            ]
+            self._scan_recipes = [recipe for _, recipe, _, _ in rows]
+        start = self._doc_by_id.get(after[-2], after[-1]) + 1 if after is not None else 0
+        wanted = offset + limit
+        if not (
+            cuisine or meal_type or tags is not None or suitable_for or exclude_not_suitable_for
+            or min_calories is not None or max_calories is not None or max_prep_time is not None
+            or max_cost is not None or exclude_ids or where is not None
+        ):
+            if start:
+                return [recipe for doc, recipe, _, _ in rows if doc >= start][offset:wanted]
+            return self._scan_recipes[offset:wanted]
+
+        cuisine = cuisine.lower() if cuisine is not None else None
+        meal_type = meal_type.lower() if meal_type is not None else None
+        tags = {tag.lower() for tag in tags} if tags is not None else None
+        suitable_for = {value.lower() for value in suitable_for} if suitable_for else None
+        unsuitable = {value.lower() for value in exclude_not_suitable_for} if exclude_not_suitable_for else None
+        excluded = set(exclude_ids) if exclude_ids else None
+        has_facets = cuisine or meal_type or tags is not None or suitable_for or unsuitable
+        has_calories = min_calories is not None or max_calories is not None
+
+        results: List[Any] = []
+        for doc, recipe, facets, numbers in rows:
+            if doc < start:
+                continue
+            if has_facets and (
+                (cuisine is not None and cuisine not in facets["cuisine"])
+                or (meal_type is not None and meal_type not in facets["meal_type"])
+                or (tags is not None and tags.isdisjoint(facets["tags"]))
+                or (suitable_for is not None and not suitable_for <= facets["suitable_for"])
+                or (unsuitable is not None and not unsuitable.isdisjoint(facets["not_suitable_for"]))
+            ):
+                continue
+            if has_calories:
+                calories = numbers["calories"]
+                if calories is None or (min_calories is not None and calories < min_calories) or (
+                        max_calories is not None and calories > max_calories):
+                    continue
+            if max_prep_time is not None and (numbers["prep_time"] is None or numbers["prep_time"] > max_prep_time):
+                continue
+            if max_cost is not None and (numbers["cost"] is None or numbers["cost"] > max_cost):
+                continue
+            if (excluded is not None and recipe.id in excluded) or (where is not None and not where(recipe)):
+                continue
+            results.append(recipe)
+            if len(results) >= wanted:
+                break
+        return results[offset:]
+
+    def _ordered(
+        self,
+        candidates: int,
+        order_by: Optional[str],
+        descending: bool,
+        after: Optional[Tuple[float, int]] = None,
+    ) -> Iterator[int]:
+        if order_by is None:
+            return iter_docs(candidates)
+        if order_by not in self._sorted:
+            raise ValueError(f"Cannot order recipes by {order_by!r}")
+        # One conversion makes each membership test a byte lookup
+        data = candidates.to_bytes((candidates.bit_length() + 7) // 8, "little")
+        size = len(data) * 8
+        index = self._sorted[order_by]
+        ordered = index.descending(after) if descending else index.ascending(after)
+        return (
+            doc for doc in ordered
+            if doc < size and data[doc >> 3] >> (doc & 7) & 1
+        )
+
+    @staticmethod
+    def _members(candidates: int, docs: List[int], start: int = 0) -> Iterator[int]:
+        """The docs (in the given order, from index start) that are set in candidates"""
+        data = candidates.to_bytes((candidates.bit_length() + 7) // 8, "little")
+        size = len(data) * 8
+        return (
+            doc for doc in (docs[i] for i in range(start, len(docs)))
+            if doc < size and data[doc >> 3] >> (doc & 7) & 1
+        )
+
+    def page_key(self, recipe: Any, order_by: Optional[str] = None, search: Optional[str] = None) -> List[Any]:
+        """
+        Where a query(order_by=..., search=...) result sits in its order, to
+        resume after it with query(after=...): [sort value, recipe id, doc],
+        or [recipe id, doc] in catalog order.
+        """
+        doc = self._doc_by_id[recipe.id]
+        if order_by is not None:
+            return [self._numbers_of(doc)[order_by], recipe.id, doc]
+        if search is not None:
+            return [self._search(search).scores[doc], recipe.id, doc]
+        return [recipe.id, doc]
+
+    def _in_ranges(self, doc: int, checks: List[Tuple[str, Optional[float], Optional[float]]]) -> bool:
+        numbers = self._numbers_of(doc)
+        for field, low, high in checks:
+            value = numbers[field]
+            if value is None or (low is not None and value < low) or (high is not None and value > high):
+                return False
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "recipes": len(self),
+            "facet_values": {facet: len(bitmaps) for facet, bitmaps in self._facets.items()},
+            "search": {**self._text.stats(), "backlog": len(self._text_backlog)},
+            "similarity": self._vectors.stats(),
+            "snapshot": self._snapshot.stats() if self._snapshot is not None else None,
+        }
+
+
+# Singleton instance
+recipe_catalog = RecipeCatalog()
@@ -0,0 +1,370 @@
+"""
+Recipe Full-Text Search
+
+BM25-ranked search over the local recipe catalog's title, description,
+ingredients, tags and cuisine, kept in sync by RecipeCatalog as recipes are
+added, edited and removed (no rebuilds).
+
+Text is normalized like food autocomplete (lowercase, accents stripped) and
+reduced with a light suffix stemmer, so "tomatoes" finds "tomato" and
+"roasted" finds "roast". Fields are weighted (a word in the title counts
+three times one in the description) and every occurrence keeps its position
+for phrase queries.
+
+Scores depend on corpus statistics, so they are computed per word on first
+use and cached, along with the word's docs in score order, until the index
+next changes. A one-word search then reads its cached order and stops at the
+page size. Longer queries intersect their clauses' docs first and score only
+those, and are cached whole too.
+
+Query syntax:
+- words: every word must match (BM25 ranks the matches)
+- "olive oil": a phrase, words adjacent and in order within one field
+- chick*: a prefix, matching any indexed word starting with it
+
+A query that finds nothing is retried with its last bare word as a prefix,
+since search-as-you-type input usually ends mid-word ("chick" finds
+chicken).
+"""
+
+import bisect
+import functools
+import math
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.services.food_autocomplete import normalize_words
+
+# BM25 parameters (the usual defaults)
+K1 = 1.2
+B = 0.75
+
+# Term frequency weight of a word by the field it appears in
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "tags": 2.0,
+    "ingredients": 1.5,
+    "description": 1.0,
+    "cuisine": 1.0,
+}
+
+# Position gaps between fields and list items, so phrases can't span them
+FIELD_GAP = 64
+ITEM_GAP = 2
+
+# Cap on indexed words a single prefix may expand to
+MAX_PREFIX_TERMS = 64
+
+# Words and queries whose hits are kept between searches (dropped on any edit)
+MAX_CACHED_HITS = 512
+
+_QUERY_RE = re.compile(r'"([^"]*)"?|(\S+)')
+_VOWELS = set("aeiouy")
+
+
+@functools.lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """
+    Light English suffix stemmer (plurals, -ed, -ing, -ly and a final e).
+
+    Not a full Porter stemmer; it only has to map a word and its common
+    inflections to the same string, which is all recipe text needs.
+    """
+    if len(word) <= 3 or not word.isalpha():
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        word = word[:-3] + "y"
+    elif word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith(("oes", "shes", "ches", "xes", "zes")):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+
+    for suffix in ("ing", "ed"):
+        base = word[:-len(suffix)]
+        if word.endswith(suffix) and len(base) >= 3 and _VOWELS & set(base):
+            if suffix == "ed" and base.endswith("i"):
+                base = base[:-1] + "y"  # fried -> fry
+            elif base[-1] == base[-2] and base[-1] not in "lsz":
+                base = base[:-1]  # chopped -> chop
+            word = base
+            break
+    else:
+        if word.endswith("ly") and len(word) > 5:
+            word = word[:-2]
+
+    if word.endswith("e") and len(word) >= 4:
+        word = word[:-1]  # bake/baking -> bak, slice/sliced -> slic
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Normalized, stemmed words of a text"""
+    return [stem(word) for word in normalize_words(text)]
+
+
+def recipe_fields(recipe: Any) -> Dict[str, List[str]]:
+    """Text of a recipe by field (see FIELD_WEIGHTS)"""
+    return {
+        "title": [recipe.title],
+        "tags": list(recipe.tags),
+        "ingredients": [ingredient.name for ingredient in recipe.ingredients],
+        "description": [recipe.description],
+        "cuisine": [recipe.cuisine],
+    }
+
+
+def parse_query(query: str, prefix_last: bool = False) -> List[Tuple[str, Any]]:
+    """
+    Split a query into clauses: ("term", word), ("prefix", text) or
+    ("phrase", [words]). A word that normalizes to several (sun-dried)
+    becomes a phrase.
+
+    With prefix_last, the query's last word (unless quoted) is read as a
+    prefix, as if it ended in *.
+    """
+    clauses: List[Tuple[str, Any]] = []
+    matches = list(_QUERY_RE.finditer(query))
+    for i, match in enumerate(matches):
+        phrase, word = match.groups()
+        if phrase is not None:
+            words = tokenize(phrase)
+        elif word.endswith("*") or (prefix_last and i == len(matches) - 1):
+            words = normalize_words(word)
+            if words:
+                clauses.extend(("term", stem(w)) for w in words[:-1])
+                clauses.append(("prefix", words[-1]))
+            continue
+        else:
+            words = tokenize(word)
+        if len(words) == 1:
+            clauses.append(("term", words[0]))
+        elif words:
+            clauses.append(("phrase", words))
+    return clauses
+
+
+class _Posting:
+    __slots__ = ("tf", "positions")
+
+    def __init__(self):
+        self.tf = 0.0
+        self.positions: List[int] = []
+
+
+class SearchHits:
+    """Docs matching a search, with their scores"""
+
+    def __init__(self, scores: Dict[int, float]):
+        self.scores = scores
+        self._order: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    @property
+    def order(self) -> List[int]:
+        """Matching docs, best first (ties in indexing order)"""
+        if self._order is None:
+            self._order = sorted(self.scores, key=self.scores.__getitem__, reverse=True)
+        return self._order
+
+    def position_after(self, score: float, doc: int) -> int:
+        """Index in order just past (score, doc); past every doc with that score if doc isn't among them"""
+        order, scores = self.order, self.scores
+        start = bisect.bisect_left(order, -score, key=lambda d: -scores[d])
+        end = bisect.bisect_right(order, -score, start, key=lambda d: -scores[d])
+        try:
+            return order.index(doc, start, end) + 1
+        except ValueError:
+            return end
+
+
+class RecipeTextIndex:
+    """Positional inverted index with BM25 scoring, keyed by catalog doc id"""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, _Posting]] = {}
+        self._vocabulary: List[str] = []  # sorted, for prefix lookups
+        self._doc_terms: Dict[int, List[str]] = {}
+        self._doc_length: Dict[int, float] = {}
+        self._total_length = 0.0
+        # Hits by word, and by query clauses for longer queries
+        self._cache: Dict[Any, SearchHits] = {}
+
+    def __len__(self) -> int:
+        return len(self._doc_length)
+
+    def add(self, doc: int, recipe: Any) -> None:
+        """Index a recipe's text under doc (replacing what doc had)"""
+        self.add_fields(doc, recipe_fields(recipe))
+
+    def add_fields(self, doc: int, fields: Dict[str, List[str]]) -> None:
+        """Index text by field (as from recipe_fields) under doc"""
+        self.remove(doc)
+        self._cache.clear()
+        postings: Dict[str, _Posting] = {}
+        position = 0
+        length = 0.0
+        for field, items in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for item in items:
+                for word in tokenize(item):
+                    posting = postings.get(word)
+                    if posting is None:
+                        posting = postings[word] = _Posting()
+                    posting.tf += weight
+                    posting.positions.append(position)
+                    position += 1
+                    length += weight
+                position += ITEM_GAP
+            position += FIELD_GAP
+
+        for word, posting in postings.items():
+            docs = self._postings.get(word)
+            if docs is None:
+                docs = self._postings[word] = {}
+                bisect.insort(self._vocabulary, word)
+            docs[doc] = posting
+        self._doc_terms[doc] = list(postings)
+        self._doc_length[doc] = length
+        self._total_length += length
+
+    def remove(self, doc: int) -> None:
+        terms = self._doc_terms.pop(doc, None)
+        if terms is None:
+            return
+        self._cache.clear()
+        for word in terms:
+            docs = self._postings[word]
+            del docs[doc]
+            if not docs:
+                del self._postings[word]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, word)]
+        self._total_length -= self._doc_length.pop(doc)
+
+    def _expand(self, prefix: str) -> List[str]:
+        """Indexed words starting with the prefix (or with its stem)"""
+        words: List[str] = []
+        for start in {prefix, stem(prefix)}:
+            i = bisect.bisect_left(self._vocabulary, start)
+            while i < len(self._vocabulary) and self._vocabulary[i].startswith(start):
+                words.append(self._vocabulary[i])
+                i += 1
+                if len(words) >= MAX_PREFIX_TERMS:
+                    break
+        return list(dict.fromkeys(words))
+
+    def _term_hits(self, word: str) -> SearchHits:
+        """BM25 scores of one word for every doc containing it (cached)"""
+        hits = self._cache.get(word)
+        if hits is None:
+            hits = SearchHits(self._bm25(word, self._postings[word]))
+            self._remember(word, hits)
+        return hits
+
+    def _bm25(self, word: str, docs: Iterable[int]) -> Dict[int, float]:
+        """BM25 scores of one word for the given docs containing it"""
+        hits = self._cache.get(word)
+        if hits is not None:
+            return {doc: hits.scores[doc] for doc in docs if doc in hits.scores}
+        postings = self._postings[word]
+        df = len(postings)
+        idf = math.log(1 + (len(self._doc_length) - df + 0.5) / (df + 0.5))
+        lengths = self._doc_length
+        avgdl = self._total_length / len(lengths) or 1.0
+        base, per_length = K1 * (1 - B), K1 * B / avgdl
+        return {
+            doc: idf * tf * (K1 + 1) / (tf + base + per_length * lengths[doc])
+            for doc in docs if doc in postings
+            for tf in (postings[doc].tf,)
+        }
+
+    def _remember(self, key: Any, hits: SearchHits) -> None:
+        if len(self._cache) >= MAX_CACHED_HITS:
+            del self._cache[next(iter(self._cache))]
+        self._cache[key] = hits
+
+    def _phrase_docs(self, words: List[str]) -> set:
+        postings = [self._postings.get(word) for word in words]
+        if not all(postings):
+            return set()
+        docs = set.intersection(*(set(p) for p in postings))
+        matched = set()
+        for doc in docs:
+            starts = set(postings[0][doc].positions)
+            for offset, posting in enumerate(postings[1:], 1):
+                starts &= {position - offset for position in posting[doc].positions}
+                if not starts:
+                    break
+            if starts:
+                matched.add(doc)
+        return matched
+
+    def search(self, query: str) -> Optional[SearchHits]:
+        """
+        Docs matching every clause of the query, with their BM25 scores
+        (retrying with the last word as a prefix if none do).
+
+        Returns None when the query has nothing searchable in it.
+        """
+        clauses = parse_query(query)
+        if not clauses:
+            return None
+        hits = self._search(clauses)
+        if not hits:
+            as_prefix = parse_query(query, prefix_last=True)
+            if as_prefix != clauses:
+                hits = self._search(as_prefix)
+        return hits
+
+    def _search(self, clauses: List[Tuple[str, Any]]) -> SearchHits:
+        """Docs matching every clause, with their BM25 scores"""
+        if len(clauses) == 1 and clauses[0][0] == "term":
+            word = clauses[0][1]
+            return self._term_hits(word) if word in self._postings else SearchHits({})
+        key = tuple((kind, value if isinstance(value, str) else tuple(value)) for kind, value in clauses)
+        hits = self._cache.get(key)
+        if hits is not None:
+            return hits
+
+        # Docs matching each clause (a prefix matches any of its expansions)
+        expansions: Dict[str, List[str]] = {}
+        matches: List[Any] = []
+        for kind, value in clauses:
+            if kind == "term":
+                docs = self._postings.get(value, {}).keys()
+            elif kind == "prefix":
+                words = expansions[value] = self._expand(value)
+                docs = set().union(*(self._postings[word] for word in words))
+            else:
+                docs = self._phrase_docs(value)
+            if not docs:
+                return SearchHits({})
+            matches.append(docs)
+        matches.sort(key=len)
+        docs = set(matches[0]).intersection(*matches[1:])
+
+        # Only the docs matching everything get scored
+        scores = dict.fromkeys(docs, 0.0)
+        for kind, value in clauses:
+            if kind == "prefix":
+                # A prefix scores as its best expansion in the doc
+                partial: Dict[int, float] = {}
+                for word in expansions[value]:
+                    for doc, score in self._bm25(word, docs).items():
+                        if score > partial.get(doc, 0.0):
+                            partial[doc] = score
+                partials = [partial]
+            else:
+                partials = [self._bm25(word, docs) for word in ([value] if kind == "term" else value)]
+            for partial in partials:
+                for doc, score in partial.items():
+                    scores[doc] += score
+        hits = SearchHits(scores)
+        self._remember(key, hits)
+        return hits
+
+    def stats(self) -> Dict[str, Any]:
+        return {"documents": len(self), "terms": len(self._vocabulary)}
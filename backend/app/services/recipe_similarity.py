@@ -0,0 +1,158 @@
+"""
+Recipe Similarity
+
+Nearest-neighbour search over recipe nutrition, used to suggest
+alternatives from the local catalog.
+
+Each recipe is a row of a contiguous NumPy matrix (row = catalog doc id)
+holding calories, protein, carbs, fat, fiber and cost per serving. For
+search the columns are standardized (z-scores over the live recipes, a
+missing value counting as average) and then weighted, so each feature
+counts by its weight rather than its units.
+
+A query is one brute-force pass in C: squared distances to every row via a
+float32 vector-matrix product (features x recipes, so the product runs
+along recipes) and precomputed norms, rows outside the allowed bitmap
+pushed out of reach, and the k nearest picked with a partial sort. At 100k
+recipes that is well under a millisecond, with no tree to rebalance when
+recipes change; edits only mark the standardized matrix for rebuilding.
+"""
+
+import warnings
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Feature weights (applied to standardized values)
+FEATURE_WEIGHTS = {
+    "calories": 2.0,
+    "protein": 1.0,
+    "carbs": 1.0,
+    "fat": 1.0,
+    "fiber": 0.5,
+    "cost": 0.5,
+}
+
+_INITIAL_ROWS = 64
+
+# Added to the distance of rows that aren't allowed (finite, as 0 * inf is nan)
+_EXCLUDED = np.float32(1e30)
+
+
+# Recipe attribute each feature is read from
+FEATURE_FIELDS = {
+    "calories": "nutrition.calories",
+    "protein": "nutrition.protein",
+    "carbs": "nutrition.carbs",
+    "fat": "nutrition.fat",
+    "fiber": "nutrition.fiber",
+    "cost": "cost_per_serving",
+}
+
+
+def _features(recipe: Any) -> List[float]:
+    features = []
+    for name in FEATURE_WEIGHTS:
+        value = recipe
+        for attribute in FEATURE_FIELDS[name].split("."):
+            value = getattr(value, attribute)
+        features.append(np.nan if value is None else float(value))
+    return features
+
+
+def bitmap_to_mask(bitmap: int, size: int) -> np.ndarray:
+    """Boolean array of length size with True where the bitmap has a bit set"""
+    data = np.frombuffer(bitmap.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(data, bitorder="little")[:size].view(bool)
+
+
+def mask_to_bitmap(mask: np.ndarray) -> int:
+    """Bitmap with a bit set for every True in a boolean array"""
+    return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+
+class NutritionVectors:
+    """Nutrition feature rows by catalog doc id, with k-nearest search"""
+
+    def __init__(self):
+        self._raw = np.full((_INITIAL_ROWS, len(FEATURE_WEIGHTS)), np.nan)
+        self._present = np.zeros(_INITIAL_ROWS, dtype=bool)
+        self._rows = 0  # one past the highest doc id stored
+        self._weights = np.sqrt(np.array(list(FEATURE_WEIGHTS.values())))
+        # Standardized, weighted features (features x docs) and squared norms per doc (None = stale)
+        self._scaled: Optional[np.ndarray] = None
+        self._norms: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return int(self._present.sum())
+
+    def add(self, doc: int, recipe: Any) -> None:
+        """Store a recipe's features under doc (replacing what doc had)"""
+        if doc >= len(self._raw):
+            grow = max(len(self._raw), doc + 1 - len(self._raw))
+            self._raw = np.vstack([self._raw, np.full((grow, self._raw.shape[1]), np.nan)])
+            self._present = np.concatenate([self._present, np.zeros(grow, dtype=bool)])
+        self._raw[doc] = _features(recipe)
+        self._present[doc] = True
+        self._rows = max(self._rows, doc + 1)
+        self._scaled = None
+
+    def load(self, features: np.ndarray) -> None:
+        """Replace every row with a (docs x features) matrix, NaN where missing"""
+        rows = len(features)
+        self._raw = np.array(features, dtype=float).reshape(rows, len(FEATURE_WEIGHTS))
+        self._present = np.ones(rows, dtype=bool)
+        self._rows = rows
+        self._scaled = None
+
+    def remove(self, doc: int) -> None:
+        if doc < self._rows and self._present[doc]:
+            self._present[doc] = False
+            self._raw[doc] = np.nan
+            self._scaled = None
+
+    def _standardize(self) -> None:
+        raw = self._raw[:self._rows]
+        live = raw[self._present[:self._rows]]
+        if len(live) == 0:
+            mean = np.zeros(raw.shape[1])
+            std = np.ones(raw.shape[1])
+        else:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)  # all-missing columns
+                mean = np.nanmean(live, axis=0)
+                std = np.nanstd(live, axis=0)
+            mean = np.nan_to_num(mean)
+            std = np.where(np.isfinite(std) & (std > 0), std, 1.0)
+        scaled = np.nan_to_num((raw - mean) * (self._weights / std))  # missing -> average (0)
+        self._scaled = np.ascontiguousarray(scaled.T, dtype=np.float32)
+        self._norms = np.einsum("ij,ij->j", self._scaled, self._scaled)
+
+    def nearest(self, doc: int, allowed: int, k: int) -> List[int]:
+        """
+        Up to k docs from the allowed bitmap nearest to doc, closest first
+        (ties in doc order). doc itself is only returned if allowed.
+        """
+        if k <= 0 or not allowed or doc >= self._rows or not self._present[doc]:
+            return []
+        if self._scaled is None:
+            self._standardize()
+        rows = self._rows
+        mask = bitmap_to_mask(allowed, rows) & self._present[:rows]
+
+        query = self._scaled[:, doc]
+        # |x - q|^2 = |x|^2 - 2 x.q + |q|^2 (the last term is the same for all rows)
+        distances = self._norms - 2.0 * (query @ self._scaled)
+        distances += ~mask * _EXCLUDED
+
+        if np.count_nonzero(mask) > k:
+            # Everything within the k-th distance (more than k only on ties)
+            kth = np.partition(distances, k - 1)[k - 1]
+            top = np.flatnonzero(distances <= kth)
+        else:
+            top = np.flatnonzero(mask)
+        top = top[np.lexsort((top, distances[top]))]
+        return top[:k].tolist()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"vectors": len(self), "features": list(FEATURE_WEIGHTS)}
@@ -0,0 +1,266 @@
+"""
+Recipe Catalog Snapshot
+
+Compiles the recipe catalog into a versioned, columnar binary file that
+workers memory-map at startup instead of building every recipe object.
+
+Numeric fields are stored as NumPy arrays, one per field ("prep_time",
+"nutrition.calories", ...; missing values are NaN or -1). Strings are
+interned in one table and stored as int32 ids, and list fields (tags,
+instructions, ingredients) as offsets into flattened value arrays. The file
+is opened with mmap, so loading costs a header parse: the pages are read on
+demand and shared between every worker mapping the same file. RecipeCatalog
+indexes the columns directly and materializes a full recipe only when a row
+is returned.
+
+Layout: magic, uint32 version, uint32 manifest length, JSON manifest (row
+count, and dtype/offset/length per column), then the columns, 8-byte
+aligned. Files of another version are rejected; rebuild after changing the
+recipe source or this format:
+
+    python -m app.services.recipe_snapshot recipes.snapshot
+    python -m app.services.recipe_snapshot recipes.snapshot --json recipes.json
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"SNKRCP01"
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct("<II")
+
+# Recipe fields by storage; dotted names are nested (recipe.nutrition.calories)
+STRING_FIELDS = ("id", "title", "description", "cuisine", "meal_type", "region", "image_url")
+NUMBER_FIELDS = {
+    "prep_time": "<i4",
+    "cook_time": "<i4",
+    "servings": "<i4",
+    "cost_per_serving": "<f8",
+    "rating": "<f8",
+    "review_count": "<i4",
+    "nutrition.calories": "<i4",
+    "nutrition.protein": "<f8",
+    "nutrition.carbs": "<f8",
+    "nutrition.fat": "<f8",
+    "nutrition.fiber": "<f8",
+}
+LIST_FIELDS = ("tags", "instructions", "health_benefits", "suitable_for", "not_suitable_for")
+INGREDIENT_FIELDS = {"name": "<i4", "amount": "<f8", "unit": "<i4", "calories": "<f8", "optional": "|u1"}
+# Optional fields (stored as NaN / -1 when missing)
+OPTIONAL_FIELDS = {"image_url", "cost_per_serving", "nutrition.fiber", "ingredients.calories"}
+
+
+def _get(obj: Any, path: str) -> Any:
+    for name in path.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def write_snapshot(recipes: Iterable[Any], path: str) -> int:
+    """Write recipes (RecipeResponse-like objects) to a snapshot; returns the row count"""
+    recipes = list(recipes)
+    strings: Dict[str, int] = {}
+
+    def intern(value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    columns: Dict[str, np.ndarray] = {}
+    for field in STRING_FIELDS:
+        columns[field] = np.array([intern(_get(r, field)) for r in recipes], dtype="<i4")
+    for field, dtype in NUMBER_FIELDS.items():
+        values = [_get(r, field) for r in recipes]
+        missing = np.nan if dtype == "<f8" else -1
+        columns[field] = np.array([missing if v is None else v for v in values], dtype=dtype)
+    for field in LIST_FIELDS:
+        items = [_get(r, field) for r in recipes]
+        columns[f"{field}.offsets"] = np.cumsum([0] + [len(values) for values in items], dtype="<i8")
+        columns[f"{field}.values"] = np.array([intern(v) for values in items for v in values], dtype="<i4")
+    ingredients = [r.ingredients for r in recipes]
+    columns["ingredients.offsets"] = np.cumsum([0] + [len(values) for values in ingredients], dtype="<i8")
+    for field, dtype in INGREDIENT_FIELDS.items():
+        values = [getattr(i, field) for items in ingredients for i in items]
+        if dtype == "<i4":
+            values = [intern(v) for v in values]
+        elif dtype == "<f8":
+            values = [np.nan if v is None else v for v in values]
+        columns[f"ingredients.{field}"] = np.array(values, dtype=dtype)
+
+    encoded = [value.encode() for value in strings]
+    columns["strings.offsets"] = np.cumsum([0] + [len(b) for b in encoded], dtype="<i8")
+    columns["strings.data"] = np.frombuffer(b"".join(encoded), dtype="|u1")
+
+    # Offsets are relative to the data section, which starts after the (padded) manifest
+    manifest: Dict[str, Any] = {"rows": len(recipes), "columns": {}}
+    offset = 0
+    for name, array in columns.items():
+        manifest["columns"][name] = [array.dtype.str, offset, len(array)]
+        offset += -(-array.nbytes // 8) * 8
+    manifest_bytes = json.dumps(manifest).encode()
+    data_start = -(-(len(SNAPSHOT_MAGIC) + _HEADER.size + len(manifest_bytes)) // 8) * 8
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(_HEADER.pack(SNAPSHOT_VERSION, len(manifest_bytes)))
+        f.write(manifest_bytes)
+        f.write(b"\0" * (data_start - f.tell()))
+        for array in columns.values():
+            f.write(array.tobytes())
+            f.write(b"\0" * (-array.nbytes % 8))
+    os.replace(tmp_path, path)
+    return len(recipes)
+
+
+class RecipeSnapshot:
+    """Read-only, memory-mapped view of a snapshot written by write_snapshot()"""
+
+    def __init__(self, path: str, model: Any):
+        """
+        Args:
+            path: Snapshot file
+            model: Pydantic model rows are materialized as (RecipeResponse)
+        """
+        self.path = path
+        self.model = model
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a recipe snapshot")
+        version, manifest_length = _HEADER.unpack_from(self._map, len(SNAPSHOT_MAGIC))
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"{path} is snapshot version {version}, expected {SNAPSHOT_VERSION}")
+        start = len(SNAPSHOT_MAGIC) + _HEADER.size
+        manifest = json.loads(self._map[start:start + manifest_length])
+        data_start = -(-(start + manifest_length) // 8) * 8
+
+        self.rows: int = manifest["rows"]
+        self._columns = {
+            name: np.frombuffer(self._map, dtype=dtype, count=length, offset=data_start + offset)
+            for name, (dtype, offset, length) in manifest["columns"].items()
+        }
+        self._string_offsets = self._columns["strings.offsets"]
+        self._strings_start = data_start + manifest["columns"]["strings.data"][1]
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def column(self, name: str) -> np.ndarray:
+        """A column as a read-only array over the mapped file"""
+        return self._columns[name]
+
+    def string(self, string_id: int) -> Optional[str]:
+        if string_id < 0:
+            return None
+        start = self._strings_start + int(self._string_offsets[string_id])
+        end = self._strings_start + int(self._string_offsets[string_id + 1])
+        return self._map[start:end].decode()
+
+    def strings(self, field: str) -> List[Optional[str]]:
+        """A string field for every row"""
+        return [self.string(string_id) for string_id in self._columns[field].tolist()]
+
+    def number(self, field: str, row: int) -> Optional[float]:
+        value = self._columns[field][row].item()
+        if field in OPTIONAL_FIELDS and (value != value or value == -1):  # NaN or -1
+            return None
+        return value
+
+    def values(self, field: str, row: int) -> List[str]:
+        """
+        A list field of one row; also takes a string field (as a list) and
+        ingredients.name / ingredients.unit.
+        """
+        if field in STRING_FIELDS:
+            value = self.string(int(self._columns[field][row]))
+            return [] if value is None else [value]
+        if field.startswith("ingredients."):
+            offsets, ids = self._columns["ingredients.offsets"], self._columns[field]
+        else:
+            offsets, ids = self._columns[f"{field}.offsets"], self._columns[f"{field}.values"]
+        return [self.string(string_id) for string_id in ids[offsets[row]:offsets[row + 1]].tolist()]
+
+    def value_masks(self, field: str) -> Iterator[Tuple[str, np.ndarray]]:
+        """(value, rows having it) for each distinct value of a string or list field"""
+        if field in STRING_FIELDS:
+            ids, rows = self._columns[field], np.arange(self.rows)
+        else:
+            offsets = self._columns[f"{field}.offsets"]
+            ids = self._columns[f"{field}.values"]
+            rows = np.repeat(np.arange(self.rows), np.diff(offsets))
+        for string_id in np.unique(ids).tolist():
+            if string_id >= 0:
+                mask = np.zeros(self.rows, dtype=bool)
+                mask[rows[ids == string_id]] = True
+                yield self.string(string_id), mask
+
+    def row(self, row: int) -> Dict[str, Any]:
+        """One row as plain data, in the shape of the model"""
+        data: Dict[str, Any] = {field: self.string(int(self._columns[field][row])) for field in STRING_FIELDS}
+        nutrition: Dict[str, Any] = {}
+        for field in NUMBER_FIELDS:
+            if field.startswith("nutrition."):
+                nutrition[field.split(".", 1)[1]] = self.number(field, row)
+            else:
+                data[field] = self.number(field, row)
+        data["nutrition"] = nutrition
+        for field in LIST_FIELDS:
+            data[field] = self.values(field, row)
+
+        offsets = self._columns["ingredients.offsets"]
+        ingredients = []
+        for i in range(int(offsets[row]), int(offsets[row + 1])):
+            ingredient = {}
+            for field, dtype in INGREDIENT_FIELDS.items():
+                value = self._columns[f"ingredients.{field}"][i].item()
+                if dtype == "<i4":
+                    value = self.string(value)
+                elif dtype == "|u1":
+                    value = bool(value)
+                elif value != value:
+                    value = None
+                ingredient[field] = value
+            ingredients.append(ingredient)
+        data["ingredients"] = ingredients
+        return data
+
+    def recipe(self, row: int) -> Any:
+        """One row materialized as the model"""
+        return self.model.model_validate(self.row(row))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "version": SNAPSHOT_VERSION, "rows": self.rows, "bytes": len(self._map)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compile the recipe catalog into a snapshot")
+    parser.add_argument("output", help="Snapshot file to write (RECIPE_SNAPSHOT_PATH)")
+    parser.add_argument("--json", help="JSON list of recipes to compile (default: the built-in sample recipes)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    from app.api.routes.recipes import SAMPLE_RECIPES, RecipeResponse
+
+    if args.json:
+        with open(args.json) as f:
+            recipes = [RecipeResponse.model_validate(item) for item in json.load(f)]
+    else:
+        recipes = SAMPLE_RECIPES
+    rows = write_snapshot(recipes, args.output)
+    logger.info(f"Wrote {rows} recipes to {args.output} ({os.path.getsize(args.output):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
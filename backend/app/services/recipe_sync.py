@@ -0,0 +1,96 @@
+"""
+Recipe Catalog Sync
+
+Keeps a worker's in-memory RecipeCatalog (bitmaps, sorted indexes, text
+index, nutrition vectors) in step with the recipe repository by following
+its change feed. Each change is applied as one add or remove on the catalog,
+so edits never trigger a reload.
+
+Writes made by this worker are applied right away (the route calls
+catch_up() after writing); writes made by other workers are picked up by a
+background task polling every RECIPE_SYNC_INTERVAL_SECONDS, one indexed
+query when nothing changed.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.db.recipes import RecipeRepository
+
+logger = logging.getLogger(__name__)
+
+# Changes read per round trip
+BATCH_SIZE = 500
+
+
+class RecipeCatalogSync:
+    """Applies repository changes to a RecipeCatalog"""
+
+    def __init__(self, repository: RecipeRepository, catalog: Any, model: Any):
+        """
+        Args:
+            repository: Source of changes
+            catalog: RecipeCatalog to update
+            model: Pydantic model stored recipes are validated as (RecipeResponse)
+        """
+        self._repository = repository
+        self._catalog = catalog
+        self._model = model
+        self._seq = 0  # last change applied
+        self._applied = 0
+        self._poller: Optional[asyncio.Task] = None
+
+    def _apply(self, change: dict) -> None:
+        if change["deleted"] or change["status"] != "published":
+            self._catalog.remove(change["id"])
+        else:
+            self._catalog.add(self._model.model_validate(change["recipe"]))
+
+    async def catch_up(self) -> int:
+        """Apply every change not applied yet; returns how many were applied"""
+        applied = 0
+        while True:
+            changes = await self._repository.changes(after=self._seq, limit=BATCH_SIZE)
+            for change in changes:
+                # A concurrent catch_up may have applied it while we were reading
+                if change["seq"] > self._seq:
+                    self._apply(change)
+                    self._seq = change["seq"]
+                    applied += 1
+            if len(changes) < BATCH_SIZE:
+                break
+        self._applied += applied
+        return applied
+
+    async def _poll(self) -> None:
+        """Pick up changes written by other workers"""
+        while True:
+            await asyncio.sleep(settings.RECIPE_SYNC_INTERVAL_SECONDS)
+            try:
+                await self.catch_up()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Recipe catalog sync error: {e}")
+
+    async def start(self) -> None:
+        """Apply stored changes, then start polling (called from the app lifespan)"""
+        applied = await self.catch_up()
+        logger.info(f"Applied {applied} stored recipe changes to the catalog")
+        if self._poller is None:
+            self._poller = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        """Stop polling"""
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"seq": self._seq, "applied": self._applied, "polling": self._poller is not None}
@@ -5,14 +5,20 @@ This service handles all interactions with the Spoonacular API,
 converting their response format to our internal recipe models.
 """
 
+import json
 import logging
-from typing import List, Optional, Dict, Any, TYPE_CHECKING
+from typing import Awaitable, Callable, List, Optional, Dict, Any, Tuple, TYPE_CHECKING
 import httpx
 from fastapi import HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 from app.core.config import settings
-from app.core.cache import cached, TTL_1_HOUR, TTL_24_HOURS
+from app.core.cache import cached, cache_get_many, cache_set_many, generate_cache_key, TTL_1_HOUR, TTL_24_HOURS
+from app.core.offload import payload_offloader
+from app.core.resilience import UpstreamUnavailableError, get_upstream
+from app.services.spoonacular_quota import spoonacular_quota
+from app.utils.client import http_clients
+from app.utils.json_stream import map_json_array
 
 if TYPE_CHECKING:
     from app.api.routes.recipes import RecipeResponse, NutritionInfo, Ingredient
@@ -58,7 +64,199 @@ class RecipeResponse(BaseModel):
     rating: float = 0
     review_count: int = 0
 
-SPOONACULAR_BASE_URL = "https://api.spoonacular.com"
+
+class RecipeSearchPage(BaseModel):
+    """One complexSearch response with Spoonacular's paging fields"""
+    results: List[RecipeResponse]
+    fetched: int = 0  # results upstream returned, including any that failed to map
+    total_results: Optional[int] = None
+
+
+# Per-recipe cache entries, shared by get_recipe_by_id and get_recipes_bulk
+RECIPE_CACHE_PREFIX = "spoonacular:recipe"
+
+# Upstream calls made at most to fill one page when results are filtered locally
+MAX_SEARCH_BLOCKS_PER_PAGE = 3
+
+# dishTypes that decide a recipe's meal type (checked in this order)
+MEAL_TYPES_BY_DISH_TYPE = (
+    ("breakfast", {"breakfast", "morning meal"}),
+    ("dinner", {"dinner", "main course"}),
+    ("snack", {"snack"}),
+)
+
+
+def index_nutrients(nutrients: Optional[List[Dict[str, Any]]]) -> Dict[str, float]:
+    """Nutrient amounts by name in one pass (the first entry for a name wins)"""
+    return {nutrient["name"]: nutrient["amount"] for nutrient in reversed(nutrients or ())}
+
+
+def _ingredient_calories(ingredient: Dict[str, Any]) -> Optional[float]:
+    # Only one nutrient is needed here, so a scan beats indexing the list
+    for nutrient in (ingredient.get("nutrition") or {}).get("nutrients") or ():
+        if nutrient["name"] == "Calories":
+            return nutrient["amount"]
+    return None
+
+
+def recipe_fields(recipe: Dict[str, Any]) -> Dict[str, Any]:
+    """RecipeResponse fields (as plain data) for a Spoonacular recipe"""
+    nutrients = index_nutrients((recipe.get("nutrition") or {}).get("nutrients"))
+    fiber = nutrients.get("Fiber")
+
+    ingredients = [
+        {
+            "name": ing.get("nameClean") or ing.get("name") or "",
+            "amount": ing.get("amount") or 0,
+            "unit": ing.get("unit") or "",
+            "calories": _ingredient_calories(ing),
+        }
+        for ing in recipe.get("extendedIngredients") or ()
+    ]
+
+    instructions = []
+    analyzed_instructions = recipe.get("analyzedInstructions")
+    if analyzed_instructions:
+        instructions = [step.get("step", "") for step in analyzed_instructions[0].get("steps", [])]
+
+    diets = list(recipe.get("diets") or ())
+    dish_types = list(recipe.get("dishTypes") or ())
+    dish_types_lower = {d.lower() for d in dish_types}
+    meal_type = next(
+        (meal for meal, names in MEAL_TYPES_BY_DISH_TYPE if dish_types_lower & names),
+        "lunch",
+    )
+
+    summary = recipe.get("summary")
+    price = recipe.get("pricePerServing")
+    score = recipe.get("spoonacularScore")
+
+    return {
+        "id": str(recipe.get("id", "")),
+        "title": recipe.get("title") or "",
+        "description": summary.replace("<b>", "").replace("</b>", "")[:200] if summary else "",
+        "cuisine": (recipe.get("cuisines") or [None])[0] or "International",
+        "meal_type": meal_type,
+        "prep_time": recipe.get("preparationMinutes") or recipe.get("readyInMinutes") or 0,
+        "cook_time": recipe.get("cookingMinutes") or 0,
+        "servings": recipe.get("servings") or 2,
+        "nutrition": {
+            "calories": int(nutrients.get("Calories") or 0),
+            "protein": round(nutrients.get("Protein") or 0, 1),
+            "carbs": round(nutrients.get("Carbohydrates") or 0, 1),
+            "fat": round(nutrients.get("Fat") or 0, 1),
+            "fiber": round(fiber, 1) if fiber else None,
+        },
+        "ingredients": ingredients,
+        "instructions": instructions,
+        "tags": diets + dish_types,
+        "region": "Global",  # Spoonacular doesn't provide region directly
+        "cost_per_serving": price / 100 if price else None,
+        "health_benefits": [],  # Spoonacular doesn't provide this directly
+        "suitable_for": diets,
+        "not_suitable_for": [],  # Would need to check for allergens
+        "image_url": recipe.get("image"),
+        "rating": score / 100 if score else 0,
+        "review_count": recipe.get("aggregateLikes") or 0,
+    }
+
+
+def map_recipe(recipe: Dict[str, Any]) -> RecipeResponse:
+    """Map a Spoonacular recipe to RecipeResponse"""
+    return RecipeResponse.model_validate(recipe_fields(recipe))
+
+
+recipe_list = TypeAdapter(List[RecipeResponse])
+
+
+def map_recipes(items: List[Dict[str, Any]]) -> List[RecipeResponse]:
+    """
+    Map a page of Spoonacular recipes, skipping (and logging) malformed ones.
+
+    The page is validated in one call: pydantic builds every nested model in
+    its core, which is faster than constructing them one by one (even with
+    model_construct, which runs in Python).
+    """
+    fields = []
+    for item in items:
+        try:
+            fields.append(recipe_fields(item))
+        except Exception as e:
+            logger.warning(f"Failed to map recipe {item.get('id')}: {e}")
+    try:
+        return recipe_list.validate_python(fields)
+    except ValidationError:
+        pass
+
+    recipes = []
+    for item in fields:
+        try:
+            recipes.append(RecipeResponse.model_validate(item))
+        except ValidationError as e:
+            logger.warning(f"Failed to map recipe {item['id']}: {e}")
+    return recipes
+
+
+search_page = TypeAdapter(RecipeSearchPage)
+
+
+def decode_recipe_page(content: bytes) -> List[RecipeResponse]:
+    """Decode and map a complexSearch response (runs on the offload pool when large)"""
+    return map_recipes(json.loads(content).get("results", []))
+
+
+def decode_search_page(content: bytes) -> RecipeSearchPage:
+    """decode_recipe_page, keeping the paging fields"""
+    payload = json.loads(content)
+    results = payload.get("results", [])
+    return RecipeSearchPage(
+        results=map_recipes(results),
+        fetched=len(results),
+        total_results=payload.get("totalResults"),
+    )
+
+
+def decode_recipes(content: bytes) -> List[RecipeResponse]:
+    """Decode and map an informationBulk response (runs on the offload pool when large)"""
+    return map_recipes(json.loads(content))
+
+
+def _map_recipe_or_skip(recipe: Dict[str, Any]) -> Optional[RecipeResponse]:
+    try:
+        return map_recipe(recipe)
+    except Exception as e:
+        logger.warning(f"Failed to map recipe {recipe.get('id')}: {e}")
+        return None
+
+
+def stream_recipes(key: Optional[str]) -> Callable[[httpx.Response], Awaitable[Any]]:
+    """
+    Response consumer mapping each recipe of a streamed body as it arrives
+    (JSON_STREAMING), so the whole page is never held as dicts.
+
+    Args:
+        key: Top-level member holding the recipes (None: the body is the list)
+    """
+    async def consume(response: httpx.Response):
+        return await map_json_array(response.aiter_bytes(), key, _map_recipe_or_skip)
+    return consume
+
+
+async def stream_search_page(response: httpx.Response) -> RecipeSearchPage:
+    """stream_recipes for a complexSearch response, keeping the paging fields"""
+    fetched = 0
+
+    def map_item(recipe: Dict[str, Any]) -> Optional[RecipeResponse]:
+        nonlocal fetched
+        fetched += 1
+        return _map_recipe_or_skip(recipe)
+
+    results, fields = await map_json_array(response.aiter_bytes(), "results", map_item)
+    return RecipeSearchPage(
+        results=results,
+        fetched=fetched,
+        total_results=fields.get("totalResults"),
+    )
 
 
 class SpoonacularService:
@@ -82,39 +280,71 @@ class SpoonacularService:
             params.update(additional_params)
         return params
     
-    async def _make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Make a request to Spoonacular API"""
+    async def _make_request(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        raw: bool = False,
+        consume: Optional[Callable[[httpx.Response], Awaitable[Any]]] = None,
+    ) -> Any:
+        """
+        Make a request to Spoonacular API.
+
+        Returns the decoded JSON body, the raw body (raw=True), or whatever
+        consume returns: it gets the response with the body still streaming.
+        """
         if not self.api_key:
             raise HTTPException(
                 status_code=503,
                 detail="Spoonacular API key not configured"
             )
         
-        url = f"{SPOONACULAR_BASE_URL}{endpoint}"
+        # Shrink or skip the call depending on how much of today's quota is left
+        params = spoonacular_quota.shape(endpoint, params or {})
+
+        url = f"{settings.SPOONACULAR_BASE_URL}{endpoint}"
         request_params = self._get_params(params)
         
+        client = http_clients.get("spoonacular")
+        upstream = get_upstream("spoonacular", settings.SPOONACULAR_HTTP_TIMEOUT)
+
+        async def attempt(timeout: float) -> httpx.Response:
+            if consume is None:
+                return await client.get(url, params=request_params, headers=self._get_headers(), timeout=timeout)
+            request = client.build_request(
+                "GET", url, params=request_params, headers=self._get_headers(), timeout=timeout
+            )
+            response = await client.send(request, stream=True)
+            if response.status_code >= 400:
+                # Error bodies are small; reading one releases the connection
+                await response.aread()
+            return response
+
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url, params=request_params, headers=self._get_headers())
-                
-                if response.status_code == 401:
-                    raise HTTPException(
-                        status_code=401,
-                        detail="Invalid Spoonacular API key"
-                    )
-                elif response.status_code == 402:
-                    raise HTTPException(
-                        status_code=402,
-                        detail="Spoonacular API quota exceeded. Please check your plan."
-                    )
-                elif response.status_code == 429:
-                    raise HTTPException(
-                        status_code=429,
-                        detail="Spoonacular API rate limit exceeded. Please try again later."
-                    )
-                
-                response.raise_for_status()
-                return response.json()
+            response = await upstream.call(attempt)
+            await spoonacular_quota.record(endpoint, params, response.headers)
+            
+            if response.status_code == 401:
+                raise HTTPException(
+                    status_code=401,
+                    detail="Invalid Spoonacular API key"
+                )
+            elif response.status_code == 402:
+                spoonacular_quota.mark_exhausted()
+                raise UpstreamUnavailableError("Spoonacular", "daily quota exhausted")
+            elif response.status_code == 429:
+                raise HTTPException(
+                    status_code=429,
+                    detail="Spoonacular API rate limit exceeded. Please try again later."
+                )
+            
+            response.raise_for_status()
+            if consume is not None:
+                try:
+                    return await consume(response)
+                finally:
+                    await response.aclose()
+            return response.content if raw else response.json()
         except httpx.HTTPError as e:
             logger.error(f"Spoonacular API request failed: {e}")
             raise HTTPException(
@@ -122,86 +352,6 @@ class SpoonacularService:
                 detail=f"Failed to connect to Spoonacular API: {str(e)}"
             )
     
-    def _map_spoonacular_recipe(self, recipe: Dict[str, Any]) -> RecipeResponse:
-        """Map Spoonacular recipe format to our RecipeResponse model"""
-        # Extract nutrition information
-        nutrition_data = recipe.get("nutrition", {}) or {}
-        nutrients = nutrition_data.get("nutrients", [])
-        
-        # Find specific nutrients
-        calories = next((n["amount"] for n in nutrients if n["name"] == "Calories"), 0)
-        protein = next((n["amount"] for n in nutrients if n["name"] == "Protein"), 0)
-        carbs = next((n["amount"] for n in nutrients if n["name"] == "Carbohydrates"), 0)
-        fat = next((n["amount"] for n in nutrients if n["name"] == "Fat"), 0)
-        fiber = next((n["amount"] for n in nutrients if n["name"] == "Fiber"), None)
-        
-        # Map ingredients
-        ingredients_list = recipe.get("extendedIngredients", [])
-        ingredients = [
-            Ingredient(
-                name=ing.get("nameClean", ing.get("name", "")),
-                amount=ing.get("amount", 0),
-                unit=ing.get("unit", ""),
-                calories=next(
-                    (n["amount"] for n in ing.get("nutrition", {}).get("nutrients", []) if n["name"] == "Calories"),
-                    None
-                ),
-            )
-            for ing in ingredients_list
-        ]
-        
-        # Extract instructions
-        analyzed_instructions = recipe.get("analyzedInstructions", [])
-        instructions = []
-        if analyzed_instructions:
-            steps = analyzed_instructions[0].get("steps", [])
-            instructions = [step.get("step", "") for step in steps]
-        
-        # Extract diet tags
-        diets = recipe.get("diets", [])
-        dish_types = recipe.get("dishTypes", [])
-        tags = diets + dish_types
-        
-        # Determine meal type from dish types
-        meal_type = "lunch"  # default
-        dish_types_lower = [d.lower() for d in dish_types]
-        if any(mt in dish_types_lower for mt in ["breakfast", "morning meal"]):
-            meal_type = "breakfast"
-        elif any(mt in dish_types_lower for mt in ["dinner", "main course"]):
-            meal_type = "dinner"
-        elif any(mt in dish_types_lower for mt in ["snack"]):
-            meal_type = "snack"
-        
-        return RecipeResponse(
-            id=str(recipe.get("id", "")),
-            title=recipe.get("title", ""),
-            description=recipe.get("summary", "").replace("<b>", "").replace("</b>", "")[:200] if recipe.get("summary") else "",
-            cuisine=recipe.get("cuisines", [None])[0] or "International",
-            meal_type=meal_type,
-            prep_time=recipe.get("preparationMinutes", 0) or recipe.get("readyInMinutes", 0),
-            cook_time=recipe.get("cookingMinutes", 0),
-            servings=recipe.get("servings", 2),
-            nutrition=NutritionInfo(
-                calories=int(calories),
-                protein=round(protein, 1),
-                carbs=round(carbs, 1),
-                fat=round(fat, 1),
-                fiber=round(fiber, 1) if fiber else None,
-            ),
-            ingredients=ingredients,
-            instructions=instructions,
-            tags=tags,
-            region="Global",  # Spoonacular doesn't provide region directly
-            cost_per_serving=recipe.get("pricePerServing", 0) / 100 if recipe.get("pricePerServing") else None,
-            health_benefits=[],  # Spoonacular doesn't provide this directly
-            suitable_for=diets,
-            not_suitable_for=[],  # Would need to check for allergens
-            image_url=recipe.get("image"),
-            rating=recipe.get("spoonacularScore", 0) / 100 if recipe.get("spoonacularScore") else 0,
-            review_count=recipe.get("aggregateLikes", 0),
-        )
-    
-    @cached(ttl=TTL_1_HOUR, prefix="spoonacular:search")
     async def search_recipes(
         self,
         query: Optional[str] = None,
@@ -214,6 +364,31 @@ class SpoonacularService:
         limit: int = 20,
     ) -> List[RecipeResponse]:
         """Search for recipes using Spoonacular API (cached for 1 hour)"""
+        page = await self.search_recipe_page(
+            query=query,
+            cuisine=cuisine,
+            diet=diet,
+            exclude_ingredients=exclude_ingredients,
+            max_calories=max_calories,
+            max_prep_time=max_prep_time,
+            offset=offset,
+            limit=limit,
+        )
+        return page.results
+
+    @cached(ttl=TTL_1_HOUR, prefix="spoonacular:search", model=RecipeSearchPage)
+    async def search_recipe_page(
+        self,
+        query: Optional[str] = None,
+        cuisine: Optional[str] = None,
+        diet: Optional[str] = None,
+        exclude_ingredients: Optional[str] = None,
+        max_calories: Optional[int] = None,
+        max_prep_time: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> RecipeSearchPage:
+        """search_recipes with Spoonacular's totalResults (cached for 1 hour)"""
         params = {
             "number": min(limit, 100),  # Spoonacular max is 100
             "offset": offset,
@@ -236,25 +411,60 @@ class SpoonacularService:
             params["maxReadyTime"] = max_prep_time
         
         try:
-            data = await self._make_request("/recipes/complexSearch", params)
-            results = data.get("results", [])
-            
-            recipes = []
-            for recipe in results:
-                try:
-                    recipes.append(self._map_spoonacular_recipe(recipe))
-                except Exception as e:
-                    logger.warning(f"Failed to map recipe {recipe.get('id')}: {e}")
-                    continue
-            
-            return recipes
+            if settings.JSON_STREAMING:
+                return await self._make_request("/recipes/complexSearch", params, consume=stream_search_page)
+            content = await self._make_request("/recipes/complexSearch", params, raw=True)
+            return await payload_offloader.map(content, decode_search_page, search_page)
         except HTTPException:
             raise
         except Exception as e:
             logger.error(f"Error searching recipes: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to search recipes: {str(e)}")
     
-    @cached(ttl=TTL_24_HOURS, prefix="spoonacular:recipe")
+    async def search_recipes_from(
+        self,
+        position: int,
+        limit: int,
+        keep: Optional[Callable[[RecipeResponse], bool]] = None,
+        **filters: Any,
+    ) -> Tuple[List[RecipeResponse], Optional[int]]:
+        """
+        A page of search results starting at upstream result `position`.
+
+        Each upstream call asks for one page worth of results through the
+        cached search_recipe_page, so an unfiltered listing costs one call
+        of `limit` results per page, and revisiting a page costs nothing.
+        Calls the quota shaped down to fewer results just move the position
+        less; the end comes from Spoonacular's totalResults.
+
+        Args:
+            position: Index of the first upstream result to consider
+            limit: Page size
+            keep: Local filter for fields Spoonacular can't filter on; up to
+                MAX_SEARCH_BLOCKS_PER_PAGE calls are made to fill the page
+            filters: search_recipes arguments (query, cuisine, ...)
+
+        Returns:
+            (recipes, position to continue from, or None after the last result)
+        """
+        page: List[RecipeResponse] = []
+        for _ in range(MAX_SEARCH_BLOCKS_PER_PAGE):
+            block = await self.search_recipe_page(offset=position, limit=limit, **filters)
+            for index, recipe in enumerate(block.results):
+                if keep is None or keep(recipe):
+                    page.append(recipe)
+                    if len(page) == limit and index + 1 < len(block.results):
+                        # Results that failed to map aren't counted here, so a
+                        # page may repeat a few of them rather than skip any
+                        return page, position + index + 1
+            position += block.fetched
+            if block.fetched == 0 or (block.total_results is not None and position >= block.total_results):
+                return page, None
+            if len(page) == limit:
+                break
+        return page, position
+
+    @cached(ttl=TTL_24_HOURS, prefix=RECIPE_CACHE_PREFIX, model=RecipeResponse)
     async def get_recipe_by_id(self, recipe_id: int) -> RecipeResponse:
         """Get a specific recipe by ID from Spoonacular (cached for 24 hours)"""
         params = {
@@ -263,48 +473,79 @@ class SpoonacularService:
         
         try:
             recipe = await self._make_request(f"/recipes/{recipe_id}/information", params)
-            return self._map_spoonacular_recipe(recipe)
+            return map_recipe(recipe)
         except HTTPException:
             raise
         except Exception as e:
             logger.error(f"Error fetching recipe {recipe_id}: {e}")
             raise HTTPException(status_code=404, detail=f"Recipe {recipe_id} not found")
     
-    @cached(ttl=TTL_24_HOURS, prefix="spoonacular:alternatives")
+    async def get_recipes_bulk(self, recipe_ids: List[int]) -> List[RecipeResponse]:
+        """
+        Get several recipes, fetching only cache misses in one
+        /recipes/informationBulk call (1 point + 0.5 per extra recipe, versus
+        1 point per /information call).
+
+        Results are written back to the per-recipe cache used by
+        get_recipe_by_id. Unknown ids are skipped; order follows recipe_ids.
+        """
+        recipe_ids = list(dict.fromkeys(recipe_ids))
+        if not recipe_ids:
+            return []
+
+        keys = [generate_cache_key(RECIPE_CACHE_PREFIX, rid) for rid in recipe_ids]
+        recipes: Dict[int, RecipeResponse] = {}
+        for rid, value in zip(recipe_ids, await cache_get_many(keys)):
+            if value is not None:
+                recipes[rid] = RecipeResponse.model_validate(value)
+
+        missing = [rid for rid in recipe_ids if rid not in recipes]
+        if missing:
+            params = {
+                "ids": ",".join(str(rid) for rid in missing),
+                "includeNutrition": True,
+            }
+            try:
+                if settings.JSON_STREAMING:
+                    fetched_recipes, _ = await self._make_request(
+                        "/recipes/informationBulk", params, consume=stream_recipes(None)
+                    )
+                else:
+                    content = await self._make_request("/recipes/informationBulk", params, raw=True)
+                    fetched_recipes = await payload_offloader.map(content, decode_recipes, recipe_list)
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.error(f"Error fetching recipes {missing}: {e}")
+                raise HTTPException(status_code=500, detail=f"Failed to fetch recipes: {str(e)}")
+
+            fetched: Dict[str, RecipeResponse] = {}
+            for recipe in fetched_recipes:
+                recipes[int(recipe.id)] = recipe
+                fetched[generate_cache_key(RECIPE_CACHE_PREFIX, int(recipe.id))] = recipe
+
+            await cache_set_many(fetched, TTL_24_HOURS)
+
+        return [recipes[rid] for rid in recipe_ids if rid in recipes]
+
+    @cached(ttl=TTL_24_HOURS, prefix="spoonacular:alternatives", model=RecipeResponse)
     async def get_recipe_alternatives(
         self,
         recipe_id: int,
         limit: int = 3,
     ) -> List[RecipeResponse]:
-        """Get alternative recipes similar to the given recipe (optimized to avoid N+1 query)"""
+        """Get alternative recipes similar to the given recipe"""
         try:
-            # Use Spoonacular's similar recipes endpoint directly (avoids fetching original recipe)
-            # This endpoint returns recipes similar to the given recipe ID
+            # The similar endpoint only returns ids and titles; details for
+            # all of them come from the cache or a single bulk call
             params = {
                 "number": limit,
             }
 
             data = await self._make_request(f"/recipes/{recipe_id}/similar", params)
-
-            # The similar endpoint returns a simpler format, so we need to fetch full details
-            # But we do it in parallel for all results, not sequentially
             similar_ids = [r.get("id") for r in data if r.get("id")]
 
-            if not similar_ids:
-                return []
-
-            # Fetch all recipes in parallel (much faster than N sequential calls)
-            import asyncio
-            tasks = [self.get_recipe_by_id(rid) for rid in similar_ids[:limit]]
-            alternatives = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # Filter out any exceptions and return valid recipes
-            valid_alternatives = [
-                alt for alt in alternatives
-                if not isinstance(alt, Exception)
-            ]
-
-            return valid_alternatives[:limit]
+            return await self.get_recipes_bulk(similar_ids[:limit])
         except HTTPException:
             raise
         except Exception as e:
@@ -314,6 +555,30 @@ class SpoonacularService:
                 detail=f"Failed to fetch recipe alternatives: {str(e)}"
             )
 
+    @cached(ttl=TTL_1_HOUR, prefix="spoonacular:featured", model=RecipeResponse)
+    async def get_featured_recipes(self, limit: int = 6) -> List[RecipeResponse]:
+        """
+        Get popular recipes (cached for 1 hour).
+
+        Searches for ids only (no recipe information flags) and loads the
+        details through get_recipes_bulk, so popular recipes already in the
+        per-recipe cache cost nothing.
+        """
+        params = {
+            "number": min(limit, 100),
+            "sort": "popularity",
+        }
+
+        try:
+            data = await self._make_request("/recipes/complexSearch", params)
+            ids = [r.get("id") for r in data.get("results", []) if r.get("id")]
+            return await self.get_recipes_bulk(ids)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error fetching featured recipes: {e}")
+            raise HTTPException(status_code=500, detail=f"Failed to fetch featured recipes: {str(e)}")
+
 
 # Singleton instance
 spoonacular_service = SpoonacularService()
@@ -0,0 +1,224 @@
+"""
+Spoonacular Quota Manager
+
+Spoonacular bills each call in points and resets the daily allowance at
+midnight UTC. Every response reports the points it cost and the running
+total in headers (X-API-Quota-Request, X-API-Quota-Used, X-API-Quota-Left).
+This module keeps today's total in Redis (so all workers share it) with an
+in-memory fallback, estimates a call's cost up front from Spoonacular's
+published pricing, and shapes requests as the budget runs down:
+
+- normal   (> 50% left): requests go out unchanged
+- reduced  (20-50% left): fewer results per search, no fillIngredients
+- minimal  (5-20% left): 5 results per search, no addRecipeNutrition;
+  unauthenticated requests are served from cache/sample data only
+- reserve  (< 5% left, or after a 402): every request is served from
+  cache/sample data until the quota resets
+
+Shaped responses are cached for SPOONACULAR_SHAPED_CACHE_TTL only, so the
+full results come back soon after the quota resets.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Mapping, Optional
+
+from app.core.cache import cap_cache_ttl
+from app.core.config import settings
+from app.core.redis import RedisClient
+from app.core.request_context import is_authenticated_request
+from app.core.resilience import UpstreamUnavailableError
+
+logger = logging.getLogger(__name__)
+
+QUOTA_KEY_PREFIX = "spoonacular:quota:"
+QUOTA_KEY_TTL = 2 * 24 * 3600
+
+# Fraction of the daily allowance left at which each tier starts
+REDUCED_AT = 0.5
+MINIMAL_AT = 0.2
+RESERVE_AT = 0.05
+
+# Results per search allowed in each degraded tier
+TIER_MAX_RESULTS = {"reduced": 10, "minimal": 5}
+
+# Keep the larger of the stored and reported totals. Responses from
+# concurrent calls can arrive out of order, and the total only goes up
+# within a day.
+SET_MAX_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local value = tonumber(ARGV[1])
+if ARGV[2] == '1' then
+    value = current + value
+end
+if value > current then
+    redis.call('SET', KEYS[1], value, 'EX', ARGV[3])
+    return tostring(value)
+end
+return tostring(current)
+"""
+
+
+def estimate_cost(endpoint: str, params: Mapping[str, Any]) -> float:
+    """Estimate the points a call will cost (Spoonacular's pricing table)"""
+    number = int(params.get("number", 10))
+
+    if endpoint == "/recipes/complexSearch":
+        cost = 1 + 0.01 * number
+        for flag in ("addRecipeInformation", "addRecipeNutrition", "fillIngredients"):
+            if params.get(flag):
+                cost += 0.025 * number
+        return cost
+
+    if endpoint == "/recipes/informationBulk":
+        ids = [i for i in str(params.get("ids", "")).split(",") if i]
+        return 1 + 0.5 * max(0, len(ids) - 1)
+
+    if endpoint.endswith("/similar"):
+        return 1 + 0.01 * number
+
+    if endpoint.endswith("/information") and params.get("includeNutrition"):
+        return 1.025
+
+    return 1.0
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class SpoonacularQuota:
+    """Daily point budget shared by every worker using the same API key"""
+
+    def __init__(self, daily_points: float):
+        self.daily_points = daily_points
+        self._day = self._today()
+        self._used = 0.0
+        self._exhausted = False
+        self._shaped = 0
+        self._refused = 0
+        self._set_max = None
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    def _roll_over(self) -> None:
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._used = 0.0
+            self._exhausted = False
+
+    @property
+    def remaining(self) -> float:
+        self._roll_over()
+        if self._exhausted:
+            return 0.0
+        return max(0.0, self.daily_points - self._used)
+
+    def tier(self) -> str:
+        """Current budget tier: normal, reduced, minimal or reserve"""
+        left = self.remaining / self.daily_points if self.daily_points > 0 else 0.0
+        if left <= RESERVE_AT:
+            return "reserve"
+        if left <= MINIMAL_AT:
+            return "minimal"
+        if left <= REDUCED_AT:
+            return "reduced"
+        return "normal"
+
+    def shape(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Adjust request parameters to the remaining budget.
+
+        Raises:
+            UpstreamUnavailableError: the call should be served from cache or
+                sample data instead (routes fall back on this error)
+        """
+        tier = self.tier()
+        if tier == "normal":
+            return params
+
+        if tier == "reserve" or (tier == "minimal" and not is_authenticated_request()):
+            self._refused += 1
+            raise UpstreamUnavailableError("Spoonacular", f"daily quota low ({tier})")
+
+        shaped = dict(params)
+        if "number" in shaped:
+            shaped["number"] = min(int(shaped["number"]), TIER_MAX_RESULTS[tier])
+        shaped.pop("fillIngredients", None)
+        if tier == "minimal":
+            shaped.pop("addRecipeNutrition", None)
+
+        if shaped != params:
+            self._shaped += 1
+            cap_cache_ttl(settings.SPOONACULAR_SHAPED_CACHE_TTL)
+        return shaped
+
+    async def _store(self, value: float, increment: bool) -> Optional[float]:
+        """Merge a usage figure into the shared total; returns the new total"""
+        redis_client = await RedisClient.get_client()
+        if not redis_client:
+            return None
+
+        try:
+            if self._set_max is None:
+                self._set_max = redis_client.register_script(SET_MAX_SCRIPT)
+            result = await self._set_max(
+                keys=[f"{QUOTA_KEY_PREFIX}{self._day}"],
+                args=[value, "1" if increment else "0", QUOTA_KEY_TTL],
+                client=redis_client,
+            )
+            return float(result)
+        except Exception as e:
+            logger.error(f"Redis error updating Spoonacular quota: {e}")
+            return None
+
+    async def record(self, endpoint: str, params: Mapping[str, Any], headers: Mapping[str, str]) -> None:
+        """Account for a completed call using the quota headers if present"""
+        self._roll_over()
+
+        used = _header_float(headers, "X-API-Quota-Used")
+        if used is not None:
+            shared = await self._store(used, increment=False)
+            self._used = max(self._used, used if shared is None else shared)
+        else:
+            cost = _header_float(headers, "X-API-Quota-Request")
+            if cost is None:
+                cost = estimate_cost(endpoint, params)
+            shared = await self._store(cost, increment=True)
+            self._used = self._used + cost if shared is None else max(self._used, shared)
+
+        left = _header_float(headers, "X-API-Quota-Left")
+        if left is not None and left <= 0:
+            self.mark_exhausted()
+
+    def mark_exhausted(self) -> None:
+        """Stop calling Spoonacular until the quota resets (after a 402)"""
+        self._roll_over()
+        if not self._exhausted:
+            logger.warning("Spoonacular daily quota exhausted; serving cached/sample data until reset")
+        self._exhausted = True
+
+    def stats(self) -> Dict[str, Any]:
+        """Quota snapshot for the health endpoint"""
+        return {
+            "day": self._day,
+            "daily_points": self.daily_points,
+            "used": round(self._used, 2),
+            "remaining": round(self.remaining, 2),
+            "tier": self.tier(),
+            "shaped_requests": self._shaped,
+            "refused_requests": self._refused,
+        }
+
+
+# Singleton instance
+spoonacular_quota = SpoonacularQuota(daily_points=settings.SPOONACULAR_DAILY_POINTS)
@@ -5,21 +5,31 @@ This service handles all interactions with the USDA FoodData Central API,
 providing nutrition data for foods to support meal logging and tracking.
 """
 
+import asyncio
+import json
 import logging
-from typing import List, Optional, Dict, Any
+from typing import Awaitable, Callable, List, Optional, Dict, Any
 import time
 import httpx
 from fastapi import HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict  # pydantic needs this version before Python 3.12
 
 from app.core.config import settings
 from app.core.redis import RedisClient, in_memory_limiter
-from app.core.cache import cached, TTL_1_HOUR, TTL_7_DAYS
+from app.core.cache import cached, cache_get_many, cache_set_many, generate_cache_key, TTL_1_HOUR, TTL_7_DAYS
+from app.core.offload import payload_offloader
+from app.core.resilience import get_upstream
+from app.utils.client import http_clients
+from app.utils.json_stream import map_json_array
 
 logger = logging.getLogger(__name__)
 
-USDA_BASE_URL = "https://api.nal.usda.gov/fdc/v1"
 USDA_RATE_LIMIT_PER_HOUR = 1000  # USDA default rate limit
+USDA_MAX_IDS_PER_CALL = 20  # /foods accepts at most 20 FDC IDs
+
+# Per-food cache entries, shared by get_food_by_id and get_foods_by_ids
+FOOD_CACHE_PREFIX = "usda:food"
 
 
 class FoodItem(BaseModel):
@@ -29,6 +39,7 @@ class FoodItem(BaseModel):
     brand_owner: Optional[str] = None
     data_type: Optional[str] = None
     description: Optional[str] = None
+    gtin_upc: Optional[str] = None  # Barcode (branded foods)
 
 
 class FoodNutrition(BaseModel):
@@ -47,6 +58,211 @@ class FoodNutrition(BaseModel):
     brand_owner: Optional[str] = None
     data_type: Optional[str] = None
     description: Optional[str] = None
+    gtin_upc: Optional[str] = None  # Barcode (branded foods)
+
+
+# FDC nutrient IDs
+NUTRIENT_ENERGY_KCAL = 1008
+NUTRIENT_PROTEIN = 1003
+NUTRIENT_CARBS = 1005
+NUTRIENT_FAT = 1004
+NUTRIENT_FIBER = 1079
+NUTRIENT_SUGARS = 2000
+NUTRIENT_SODIUM = 1093
+
+
+def index_nutrients(nutrients: Optional[List[Dict[str, Any]]]) -> Dict[int, float]:
+    """Nutrient amounts by FDC nutrient ID in one pass (the first entry for an ID wins)"""
+    return {nutrient.get("nutrientId"): nutrient.get("amount") for nutrient in reversed(nutrients or ())}
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value else None
+
+
+def food_nutrition_fields(food_data: Dict[str, Any]) -> Dict[str, Any]:
+    """FoodNutrition fields (as plain data) for a USDA food"""
+    nutrients = index_nutrients(food_data.get("foodNutrients"))
+
+    serving_size = None
+    serving_unit = None
+    food_portions = food_data.get("foodPortions")
+    if food_portions:
+        portion = food_portions[0]
+        serving_size = portion.get("amount")
+        serving_unit = (portion.get("measureUnit") or {}).get("name")
+
+    return {
+        "fdc_id": food_data.get("fdcId", 0),
+        "name": food_data.get("description") or "Unknown Food",
+        "calories": round(nutrients.get(NUTRIENT_ENERGY_KCAL) or 0.0, 2),
+        "protein": round(nutrients.get(NUTRIENT_PROTEIN) or 0.0, 2),
+        "carbs": round(nutrients.get(NUTRIENT_CARBS) or 0.0, 2),
+        "fat": round(nutrients.get(NUTRIENT_FAT) or 0.0, 2),
+        "fiber": _round(nutrients.get(NUTRIENT_FIBER)),
+        "sugar": _round(nutrients.get(NUTRIENT_SUGARS)),
+        "sodium": _round(nutrients.get(NUTRIENT_SODIUM)),
+        "serving_size": serving_size,
+        "serving_unit": serving_unit,
+        "brand_owner": food_data.get("brandOwner"),
+        "data_type": food_data.get("dataType"),
+        "description": food_data.get("description"),
+        "gtin_upc": food_data.get("gtinUpc"),
+    }
+
+
+def map_food_nutrition(food_data: Dict[str, Any]) -> FoodNutrition:
+    """Map a USDA food to FoodNutrition"""
+    return FoodNutrition.model_validate(food_nutrition_fields(food_data))
+
+
+# Whole pages are validated in one call, which beats building models one by one
+food_list = TypeAdapter(List[FoodNutrition])
+
+
+class SearchHits(TypedDict):
+    """A mapped /foods/search page (search_foods adds current_page)"""
+    foods: List[FoodItem]
+    total_hits: int
+    total_pages: int
+
+
+search_hits = TypeAdapter(SearchHits)
+
+
+def map_foods(foods_data: List[Dict[str, Any]]) -> List[FoodNutrition]:
+    """Map a /foods response"""
+    return food_list.validate_python([food_nutrition_fields(food) for food in foods_data])
+
+
+def search_item_fields(item: Dict[str, Any]) -> Dict[str, Any]:
+    """FoodItem fields (as plain data) for a USDA search hit"""
+    return {
+        "fdc_id": item.get("fdcId", 0),
+        "name": item.get("description") or "Unknown Food",
+        "brand_owner": item.get("brandOwner"),
+        "data_type": item.get("dataType"),
+        "description": item.get("additionalDescriptions") or item.get("description"),
+        "gtin_upc": item.get("gtinUpc"),
+    }
+
+
+def map_search_item(item: Dict[str, Any]) -> FoodItem:
+    """Map a USDA search hit to FoodItem"""
+    return FoodItem.model_validate(search_item_fields(item))
+
+
+def map_search_hits(data: Dict[str, Any]) -> SearchHits:
+    """Map a /foods/search response"""
+    return search_hits.validate_python({
+        "foods": [search_item_fields(item) for item in data.get("foods") or ()],
+        "total_hits": data.get("totalHits", 0),
+        "total_pages": data.get("totalPages", 0),
+    })
+
+
+def decode_foods(content: bytes) -> List[FoodNutrition]:
+    """Decode and map a /foods response (runs on the offload pool when large)"""
+    foods_data = json.loads(content) if content else []
+    return map_foods(foods_data if isinstance(foods_data, list) else [])
+
+
+def decode_search_hits(content: bytes) -> SearchHits:
+    """Decode and map a /foods/search response (runs on the offload pool when large)"""
+    return map_search_hits(json.loads(content) if content else {})
+
+
+def stream_array(
+    key: Optional[str],
+    map_item: Callable[[Dict[str, Any]], Any],
+) -> Callable[[httpx.Response], Awaitable[Any]]:
+    """
+    Response consumer mapping each element of a streamed body as it arrives
+    (JSON_STREAMING), so the whole page is never held as dicts.
+
+    Args:
+        key: Top-level member holding the list (None: the body is the list)
+        map_item: Maps one element
+    """
+    async def consume(response: httpx.Response):
+        return await map_json_array(response.aiter_bytes(), key, map_item)
+    return consume
+
+
+class FoodLoader:
+    """
+    Coalesces concurrent single-food lookups into /foods batch calls.
+
+    load() calls made within `window_ms` of each other are merged into one
+    batch (dispatched early once it reaches `max_batch` ids), and each caller
+    gets its own food back. Concurrent loads of the same id share one slot.
+    """
+
+    def __init__(
+        self,
+        fetch_batch: Callable[[List[int]], Awaitable[List[FoodNutrition]]],
+        window_ms: float,
+        max_batch: int = USDA_MAX_IDS_PER_CALL,
+    ):
+        self._fetch_batch = fetch_batch
+        self._window = window_ms / 1000
+        self._max_batch = max_batch
+        self._queue: List[int] = []
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.loads = 0
+
+    async def load(self, fdc_id: int) -> FoodNutrition:
+        """Get one food, batched with other lookups in the current window"""
+        self.loads += 1
+        future = self._pending.get(fdc_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[fdc_id] = future
+            self._queue.append(fdc_id)
+
+            if len(self._queue) >= self._max_batch:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = loop.call_later(self._window, self._dispatch)
+
+        # Shield so one caller's cancellation doesn't fail the others
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._queue:
+            batch = self._queue[:self._max_batch]
+            del self._queue[:self._max_batch]
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, fdc_ids: List[int]) -> None:
+        self.batches += 1
+        futures = {fdc_id: self._pending.pop(fdc_id) for fdc_id in fdc_ids}
+        try:
+            foods = {food.fdc_id: food for food in await self._fetch_batch(fdc_ids)}
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for fdc_id, future in futures.items():
+            if future.done():
+                continue
+            food = foods.get(fdc_id)
+            if food is None:
+                future.set_exception(HTTPException(status_code=404, detail=f"Food with FDC ID {fdc_id} not found"))
+            else:
+                future.set_result(food)
 
 
 class USDAFoodService:
@@ -56,6 +272,12 @@ class USDAFoodService:
         self.api_key = settings.USDA_API_KEY
         if not self.api_key:
             logger.warning("USDA API key not configured. Food nutrition lookup will not be available.")
+        self.food_loader = FoodLoader(self._fetch_foods_batch, window_ms=settings.USDA_BATCH_WINDOW_MS)
+
+    @property
+    def available(self) -> bool:
+        """Whether the live API can be called (an API key is configured)"""
+        return bool(self.api_key)
 
     async def _check_rate_limit(self) -> None:
         """
@@ -115,9 +337,16 @@ class USDAFoodService:
         endpoint: str,
         params: Optional[Dict[str, Any]] = None,
         method: str = "GET",
-        json_data: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
-        """Make a request to USDA FoodData Central API"""
+        json_data: Optional[Dict[str, Any]] = None,
+        raw: bool = False,
+        consume: Optional[Callable[[httpx.Response], Awaitable[Any]]] = None,
+    ) -> Any:
+        """
+        Make a request to USDA FoodData Central API.
+
+        Returns the decoded JSON body, the raw body (raw=True), or whatever
+        consume returns: it gets the response with the body still streaming.
+        """
         if not self.api_key:
             raise HTTPException(
                 status_code=503,
@@ -127,44 +356,68 @@ class USDAFoodService:
         # Check rate limit
         await self._check_rate_limit()
         
-        url = f"{USDA_BASE_URL}{endpoint}"
+        url = f"{settings.USDA_BASE_URL}{endpoint}"
         request_params = self._get_params(params)
         
+        client = http_clients.get("usda")
+        upstream = get_upstream("usda", settings.USDA_HTTP_TIMEOUT)
+
+        async def attempt(timeout: float) -> httpx.Response:
+            if consume is not None:
+                request = client.build_request(
+                    method, url, params=request_params, json=json_data, timeout=timeout
+                )
+                response = await client.send(request, stream=True)
+                if response.status_code >= 400:
+                    # Error bodies are small; reading one releases the connection
+                    await response.aread()
+                return response
+            if method == "POST":
+                return await client.post(
+                    url,
+                    params=request_params,
+                    json=json_data,
+                    headers={"Content-Type": "application/json"},
+                    timeout=timeout,
+                )
+            return await client.get(url, params=request_params, timeout=timeout)
+
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                if method == "POST":
-                    response = await client.post(
-                        url,
-                        params=request_params,
-                        json=json_data,
-                        headers={"Content-Type": "application/json"}
-                    )
-                else:
-                    response = await client.get(url, params=request_params)
-                
-                if response.status_code == 401:
-                    raise HTTPException(
-                        status_code=401,
-                        detail="Invalid USDA API key"
-                    )
-                elif response.status_code == 403:
-                    raise HTTPException(
-                        status_code=403,
-                        detail="USDA API access forbidden. Check your API key."
-                    )
-                elif response.status_code == 429:
-                    raise HTTPException(
-                        status_code=429,
-                        detail="USDA API rate limit exceeded. Limit: 1,000 requests/hour"
-                    )
-                
-                response.raise_for_status()
-                
-                # Handle empty responses
-                if response.status_code == 200 and not response.text:
-                    return {}
-                
-                return response.json()
+            # FDC's POST endpoints (/foods/search, /foods) are reads, so every
+            # call is safe to retry
+            response = await upstream.call(attempt, idempotent=True)
+            
+            if response.status_code == 401:
+                raise HTTPException(
+                    status_code=401,
+                    detail="Invalid USDA API key"
+                )
+            elif response.status_code == 403:
+                raise HTTPException(
+                    status_code=403,
+                    detail="USDA API access forbidden. Check your API key."
+                )
+            elif response.status_code == 429:
+                raise HTTPException(
+                    status_code=429,
+                    detail="USDA API rate limit exceeded. Limit: 1,000 requests/hour"
+                )
+            
+            response.raise_for_status()
+            
+            if consume is not None:
+                try:
+                    return await consume(response)
+                finally:
+                    await response.aclose()
+            if raw:
+                return response.content
+
+            # Handle empty responses
+            if response.status_code == 200 and not response.text:
+                return {}
+            
+            return response.json()
         except httpx.HTTPError as e:
             logger.error(f"USDA API request failed: {e}")
             raise HTTPException(
@@ -172,66 +425,6 @@ class USDAFoodService:
                 detail=f"Failed to connect to USDA API: {str(e)}"
             )
     
-    def _extract_nutrient(self, nutrients: List[Dict], nutrient_id: int, default: float = 0.0) -> float:
-        """Extract a specific nutrient value from nutrients list"""
-        for nutrient in nutrients:
-            if nutrient.get("nutrientId") == nutrient_id:
-                return nutrient.get("amount", default)
-        return default
-    
-    def _map_usda_food_to_nutrition(self, food_data: Dict[str, Any]) -> FoodNutrition:
-        """Map USDA food data to our FoodNutrition model"""
-        fdc_id = food_data.get("fdcId", 0)
-        name = food_data.get("description", "Unknown Food")
-        
-        # Extract nutrients (nutrient IDs from USDA standard)
-        # Common nutrient IDs: 1008 = Energy (kcal), 1003 = Protein, 1005 = Carbs, 1004 = Fat
-        nutrients = food_data.get("foodNutrients", [])
-        
-        calories = self._extract_nutrient(nutrients, 1008)  # Energy (kcal)
-        protein = self._extract_nutrient(nutrients, 1003)  # Protein
-        carbs = self._extract_nutrient(nutrients, 1005)    # Carbohydrates
-        fat = self._extract_nutrient(nutrients, 1004)      # Fat
-        fiber = self._extract_nutrient(nutrients, 1079, None)  # Fiber (optional)
-        sugar = self._extract_nutrient(nutrients, 2000, None)  # Sugars (optional)
-        sodium = self._extract_nutrient(nutrients, 1093, None)  # Sodium (optional)
-        
-        # Extract serving information if available
-        serving_size = None
-        serving_unit = None
-        food_portion = food_data.get("foodPortions")
-        if food_portion and len(food_portion) > 0:
-            portion = food_portion[0]
-            serving_size = portion.get("amount")
-            serving_unit = portion.get("measureUnit", {}).get("name")
-        
-        return FoodNutrition(
-            fdc_id=fdc_id,
-            name=name,
-            calories=round(calories, 2),
-            protein=round(protein, 2),
-            carbs=round(carbs, 2),
-            fat=round(fat, 2),
-            fiber=round(fiber, 2) if fiber else None,
-            sugar=round(sugar, 2) if sugar else None,
-            sodium=round(sodium, 2) if sodium else None,
-            serving_size=serving_size,
-            serving_unit=serving_unit,
-            brand_owner=food_data.get("brandOwner"),
-            data_type=food_data.get("dataType"),
-            description=food_data.get("description"),
-        )
-    
-    def _map_usda_search_result(self, food_item: Dict[str, Any]) -> FoodItem:
-        """Map USDA search result to FoodItem model"""
-        return FoodItem(
-            fdc_id=food_item.get("fdcId", 0),
-            name=food_item.get("description", "Unknown Food"),
-            brand_owner=food_item.get("brandOwner"),
-            data_type=food_item.get("dataType"),
-            description=food_item.get("additionalDescriptions") or food_item.get("description"),
-        )
-    
     @cached(ttl=TTL_1_HOUR, prefix="usda:search")
     async def search_foods(
         self,
@@ -276,59 +469,108 @@ class USDAFoodService:
             json_data["brandOwner"] = brand_owner
         
         try:
-            data = await self._make_request("/foods/search", params=params, method="POST", json_data=json_data)
-            
-            foods = [self._map_usda_search_result(item) for item in data.get("foods", [])]
-            
-            return {
-                "foods": foods,
-                "total_hits": data.get("totalHits", 0),
-                "current_page": page_number,
-                "total_pages": data.get("totalPages", 0),
-            }
+            if settings.JSON_STREAMING:
+                foods, fields = await self._make_request(
+                    "/foods/search", params=params, method="POST", json_data=json_data,
+                    consume=stream_array("foods", map_search_item),
+                )
+                hits = {
+                    "foods": foods,
+                    "total_hits": fields.get("totalHits", 0),
+                    "total_pages": fields.get("totalPages", 0),
+                }
+            else:
+                content = await self._make_request(
+                    "/foods/search", params=params, method="POST", json_data=json_data, raw=True
+                )
+                hits = await payload_offloader.map(content, decode_search_hits, search_hits)
+            return {**hits, "current_page": page_number}
         except HTTPException:
             raise
         except Exception as e:
             logger.error(f"Error searching foods: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to search foods: {str(e)}")
     
-    @cached(ttl=TTL_7_DAYS, prefix="usda:food")
+    @cached(ttl=TTL_7_DAYS, prefix=FOOD_CACHE_PREFIX, model=FoodNutrition)
     async def get_food_by_id(self, fdc_id: int) -> FoodNutrition:
-        """Get detailed nutrition information for a food by FDC ID (cached for 7 days)"""
+        """
+        Get detailed nutrition information for a food by FDC ID (cached for 7 days).
+
+        Cache misses go through the FoodLoader, so concurrent lookups share
+        /foods batch calls instead of one /food/{id} call each.
+        """
         try:
-            food_data = await self._make_request(f"/food/{fdc_id}")
-            
-            if not food_data or not food_data.get("fdcId"):
-                raise HTTPException(status_code=404, detail=f"Food with FDC ID {fdc_id} not found")
-            
-            return self._map_usda_food_to_nutrition(food_data)
+            return await self.food_loader.load(fdc_id)
         except HTTPException:
             raise
         except Exception as e:
             logger.error(f"Error fetching food {fdc_id}: {e}")
             raise HTTPException(status_code=404, detail=f"Food {fdc_id} not found")
+
+    async def _fetch_foods_batch(self, fdc_ids: List[int]) -> List[FoodNutrition]:
+        """Fetch up to 20 foods in one /foods call (unknown IDs are omitted)"""
+        json_data = {"fdcIds": fdc_ids}
+        if settings.JSON_STREAMING:
+            foods, _ = await self._make_request(
+                "/foods", method="POST", json_data=json_data, consume=stream_array(None, map_food_nutrition)
+            )
+            return foods
+        content = await self._make_request("/foods", method="POST", json_data=json_data, raw=True)
+        return await payload_offloader.map(content, decode_foods, food_list)
     
     async def get_foods_by_ids(self, fdc_ids: List[int]) -> List[FoodNutrition]:
-        """Get detailed nutrition information for multiple foods by FDC IDs"""
+        """
+        Get detailed nutrition information for multiple foods by FDC IDs.
+
+        Duplicate IDs are fetched once and cached foods are read with a single
+        multi-get. The rest are split into 20-ID /foods calls made
+        concurrently (at most USDA_BATCH_CONCURRENCY at a time) and written
+        back to the per-food cache. Unknown IDs are omitted; order follows
+        fdc_ids.
+        """
+        fdc_ids = list(dict.fromkeys(fdc_ids))
         if not fdc_ids:
             return []
         
-        if len(fdc_ids) > 20:
-            raise HTTPException(status_code=400, detail="Maximum 20 food IDs per request")
+        if len(fdc_ids) > settings.USDA_MAX_BATCH_IDS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Maximum {settings.USDA_MAX_BATCH_IDS} food IDs per request"
+            )
         
-        try:
-            json_data = {"fdcIds": fdc_ids}
-            foods_data = await self._make_request("/foods", method="POST", json_data=json_data)
-            
-            if not isinstance(foods_data, list):
-                foods_data = []
-            
-            return [self._map_usda_food_to_nutrition(food) for food in foods_data]
-        except HTTPException:
-            raise
-        except Exception as e:
-            logger.error(f"Error fetching foods: {e}")
-            raise HTTPException(status_code=500, detail=f"Failed to fetch foods: {str(e)}")
+        keys = [generate_cache_key(FOOD_CACHE_PREFIX, fdc_id) for fdc_id in fdc_ids]
+        foods: Dict[int, FoodNutrition] = {}
+        for fdc_id, value in zip(fdc_ids, await cache_get_many(keys)):
+            if value is not None:
+                foods[fdc_id] = FoodNutrition.model_validate(value)
+
+        missing = [fdc_id for fdc_id in fdc_ids if fdc_id not in foods]
+        if missing:
+            semaphore = asyncio.Semaphore(settings.USDA_BATCH_CONCURRENCY)
+
+            async def fetch_chunk(chunk: List[int]) -> List[FoodNutrition]:
+                async with semaphore:
+                    return await self._fetch_foods_batch(chunk)
+
+            try:
+                chunks = await asyncio.gather(*(
+                    fetch_chunk(missing[i:i + USDA_MAX_IDS_PER_CALL])
+                    for i in range(0, len(missing), USDA_MAX_IDS_PER_CALL)
+                ))
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.error(f"Error fetching foods: {e}")
+                raise HTTPException(status_code=500, detail=f"Failed to fetch foods: {str(e)}")
+
+            fetched = {food.fdc_id: food for chunk in chunks for food in chunk}
+            foods.update(fetched)
+            await cache_set_many(
+                {generate_cache_key(FOOD_CACHE_PREFIX, fdc_id): food for fdc_id, food in fetched.items()},
+                TTL_7_DAYS,
+            )
+
+        return [foods[fdc_id] for fdc_id in fdc_ids if fdc_id in foods]
 
 
 # Singleton instance
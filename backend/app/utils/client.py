@@ -1,11 +1,165 @@
-from typing import Any, Dict
+"""
+Shared HTTP Clients
+
+One long-lived httpx.AsyncClient per upstream (Spoonacular, USDA, and a
+default client for other third-party calls), so connections, TLS sessions
+and DNS lookups are reused across requests instead of being set up per call.
+Pool limits, keep-alive expiry, timeouts and HTTP/2 are configured per
+upstream in Settings.
+
+Clients are opened in the app lifespan (or lazily on first use) and closed on
+shutdown. Each request is traced to record how long it waited for a pooled
+connection and whether it reused one.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional
 
 import httpx
 
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+UPSTREAMS = ("spoonacular", "usda", "default")
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class PoolMetrics:
+    """Connection pool counters for one upstream"""
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.pool_wait_ms_total = 0.0
+        self.pool_wait_ms_max = 0.0
+
+    def record_wait(self, wait_ms: float) -> None:
+        self.pool_wait_ms_total += wait_ms
+        self.pool_wait_ms_max = max(self.pool_wait_ms_max, wait_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        connections = self.new_connections + self.reused_connections
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused_connections,
+            "reuse_ratio": round(self.reused_connections / connections, 3) if connections else None,
+            "pool_wait_ms_avg": round(self.pool_wait_ms_total / connections, 3) if connections else None,
+            "pool_wait_ms_max": round(self.pool_wait_ms_max, 3),
+        }
+
+
+class _RequestTrace:
+    """
+    httpcore trace hook for a single request.
+
+    The first connection event marks the end of the pool wait: either a new
+    TCP connect starts, or request headers go out on a reused connection.
+    """
+
+    def __init__(self, metrics: PoolMetrics):
+        self._metrics = metrics
+        self._started = time.perf_counter()
+        self._assigned = False
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        if self._assigned:
+            return
+
+        if event_name == "connection.connect_tcp.started":
+            self._metrics.new_connections += 1
+        elif event_name.endswith("send_request_headers.started"):
+            self._metrics.reused_connections += 1
+        else:
+            return
+
+        self._assigned = True
+        self._metrics.record_wait((time.perf_counter() - self._started) * 1000)
+
+
+class HTTPClientRegistry:
+    """Long-lived, per-upstream pooled HTTP clients"""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._transports: Dict[str, httpx.AsyncBaseTransport] = {}
+        self.metrics: Dict[str, PoolMetrics] = {name: PoolMetrics() for name in UPSTREAMS}
+
+    def _create(self, name: str) -> httpx.AsyncClient:
+        prefix = name.upper()
+        http2 = getattr(settings, f"{prefix}_HTTP2")
+        if http2 and not _http2_available():
+            logger.warning(f"{prefix}_HTTP2 is enabled but h2 is not installed; using HTTP/1.1")
+            http2 = False
+
+        metrics = self.metrics[name]
+
+        async def trace_request(request: httpx.Request) -> None:
+            metrics.requests += 1
+            request.extensions["trace"] = _RequestTrace(metrics)
+
+        return httpx.AsyncClient(
+            timeout=getattr(settings, f"{prefix}_HTTP_TIMEOUT"),
+            limits=httpx.Limits(
+                max_connections=getattr(settings, f"{prefix}_HTTP_MAX_CONNECTIONS"),
+                max_keepalive_connections=getattr(settings, f"{prefix}_HTTP_MAX_KEEPALIVE"),
+                keepalive_expiry=getattr(settings, f"{prefix}_HTTP_KEEPALIVE_EXPIRY"),
+            ),
+            http2=http2,
+            transport=self._transports.get(name),
+            event_hooks={"request": [trace_request]},
+        )
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Get the pooled client for an upstream, creating it on first use"""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._create(name)
+            self._clients[name] = client
+        return client
+
+    def set_transport(self, name: str, transport: Optional[httpx.AsyncBaseTransport]) -> None:
+        """
+        Route an upstream through a custom transport (e.g. an in-process ASGI
+        stand-in). Takes effect for clients created afterwards.
+        """
+        if transport is None:
+            self._transports.pop(name, None)
+        else:
+            self._transports[name] = transport
+
+    def open(self) -> None:
+        """Create every upstream client (called from the app lifespan)"""
+        for name in UPSTREAMS:
+            self.get(name)
+
+    async def aclose(self) -> None:
+        """Close every client and its pooled connections"""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Pool metrics per upstream for the health endpoint"""
+        return {name: metrics.snapshot() for name, metrics in self.metrics.items()}
+
+
+# Singleton instance
+http_clients = HTTPClientRegistry()
+
 
 async def fetch_json(url: str, params: Dict[str, Any] | None = None) -> Dict[str, Any]:
     """Generic async helper to fetch JSON payloads from third-party APIs."""
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
+    response = await http_clients.get("default").get(url, params=params)
+    response.raise_for_status()
+    return response.json()
@@ -0,0 +1,207 @@
+"""
+Streaming JSON array decoding
+
+Upstream list responses ({"results": [...], "totalResults": N} from
+Spoonacular, {"foods": [...], "totalHits": N} from USDA) can be several MB.
+response.json() builds the whole dict tree before anything is mapped, so
+every concurrent request holds a tree ~10x the size of the body.
+
+JSONArrayStream is fed the body chunk by chunk and hands back each element
+of one array as soon as it is complete. Elements are decoded one at a time
+with the stdlib decoder (json.JSONDecoder.raw_decode), so the scanner stays
+in C; only the few top-level tokens are handled here. Memory in use is
+about one chunk plus one element, whatever the page size.
+
+The other top-level members (totals, offsets) are collected into a dict.
+"""
+
+import codecs
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+# Consumed text is dropped from the buffer once this much has built up
+_COMPACT_AFTER = 64 * 1024
+
+
+class JSONStreamError(ValueError):
+    """The body isn't JSON of the expected shape"""
+
+
+class JSONArrayStream:
+    """
+    Incremental decoder for the elements of one array in a JSON document.
+
+    Args:
+        key: Top-level member holding the array, or None if the document
+            itself is the array
+    """
+
+    def __init__(self, key: Optional[str] = None):
+        self.key = key
+        self.fields: Dict[str, Any] = {}
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._member: Optional[str] = None
+        # Between a value and the "," or closing bracket after it
+        self._after_value = False
+        self._final = False
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Add the next part of the body; returns the elements it completed"""
+        self._buffer += self._text.decode(chunk)
+        return self._parse()
+
+    def close(self) -> List[Any]:
+        """
+        Signal the end of the body; returns any remaining elements.
+
+        An empty body counts as an empty array (USDA answers /foods with no
+        body when none of the IDs exist).
+        """
+        self._buffer += self._text.decode(b"", final=True)
+        self._final = True
+        if self._state == "start" and not self._buffer.strip():
+            self._state = "done"
+        items = self._parse()
+        if self._state != "done":
+            raise JSONStreamError("Truncated JSON document")
+        return items
+
+    def _skip_whitespace(self) -> bool:
+        """Advance past whitespace; False if the buffer ran out"""
+        buffer, pos = self._buffer, self._pos
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return pos < len(buffer)
+
+    def _decode_value(self) -> Tuple[bool, Any]:
+        """Decode the value at the cursor; (False, None) if it isn't complete yet"""
+        try:
+            value, end = _decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError as e:
+            if self._final:
+                raise JSONStreamError(str(e)) from e
+            return False, None
+        # A number at the very end may continue in the next chunk
+        if end == len(self._buffer) and not self._final:
+            return False, None
+        self._pos = end
+        return True, value
+
+    def _expect(self, char: str) -> None:
+        if self._buffer[self._pos] != char:
+            raise JSONStreamError(f"Expected {char!r} at offset {self._pos}, got {self._buffer[self._pos]!r}")
+        self._pos += 1
+
+    def _separator(self, char: str, closer: str) -> bool:
+        """Consume a "," between values; True if char was one"""
+        if char == ",":
+            if not self._after_value:
+                raise JSONStreamError(f"Unexpected ',' at offset {self._pos}")
+            self._pos += 1
+            self._after_value = False
+            return True
+        if self._after_value and char != closer:
+            raise JSONStreamError(f"Expected ',' or {closer!r} at offset {self._pos}, got {char!r}")
+        return False
+
+    def _parse(self) -> List[Any]:
+        items: List[Any] = []
+        while self._state != "done" and self._skip_whitespace():
+            char = self._buffer[self._pos]
+
+            if self._state == "start":
+                self._expect("[" if self.key is None else "{")
+                self._state = "items" if self.key is None else "member"
+
+            elif self._state == "member":
+                if self._separator(char, "}"):
+                    continue
+                if char == "}":
+                    self._pos += 1
+                    self._state = "done"
+                    continue
+                start = self._pos
+                complete, name = self._decode_value()
+                if not complete:
+                    break
+                if not self._skip_whitespace():
+                    self._pos = start
+                    break
+                self._expect(":")
+                if name == self.key:
+                    if not self._skip_whitespace():
+                        self._pos = start
+                        break
+                    self._expect("[")
+                    self._state = "items"
+                    self._after_value = False
+                else:
+                    self._member = name
+                    self._state = "value"
+
+            elif self._state == "value":
+                complete, value = self._decode_value()
+                if not complete:
+                    break
+                self.fields[self._member] = value
+                self._state = "member"
+                self._after_value = True
+
+            elif self._state == "items":
+                if self._separator(char, "]"):
+                    continue
+                if char == "]":
+                    self._pos += 1
+                    self._state = "done" if self.key is None else "member"
+                    self._after_value = True
+                    continue
+                complete, value = self._decode_value()
+                if not complete:
+                    break
+                items.append(value)
+                self._after_value = True
+
+        if self._pos >= _COMPACT_AFTER:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        return items
+
+
+async def map_json_array(
+    chunks: AsyncIterator[bytes],
+    key: Optional[str],
+    map_item: Callable[[Any], Optional[T]],
+) -> Tuple[List[T], Dict[str, Any]]:
+    """
+    Decode a streamed JSON body, mapping each array element as it completes.
+
+    Args:
+        chunks: The body (e.g. response.aiter_bytes())
+        key: Top-level member holding the array (None: the body is the array)
+        map_item: Maps one decoded element; returning None skips it
+
+    Returns:
+        (mapped elements, other top-level members)
+    """
+    stream = JSONArrayStream(key)
+    mapped: List[T] = []
+
+    def add(items: List[Any]) -> None:
+        for item in items:
+            result = map_item(item)
+            if result is not None:
+                mapped.append(result)
+
+    async for chunk in chunks:
+        add(stream.feed(chunk))
+    add(stream.close())
+    return mapped, stream.fields
@@ -0,0 +1,14 @@
+"""
+SnackTrack benchmarks.
+
+Run modules from the repository root, e.g. `python -m benchmarks.rate_limit_keyspace`.
+Importing the package puts the backend on sys.path so `app` resolves.
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+BACKEND_APP = ROOT / "backend"
+if str(BACKEND_APP) not in sys.path:
+    sys.path.insert(0, str(BACKEND_APP))
@@ -0,0 +1,179 @@
+"""
+Micro-benchmark harness (pytest-benchmark style, no extra dependency).
+
+Benchmarks are tests taking the `bench` fixture:
+
+    def test_generate_cache_key(bench):
+        bench(generate_cache_key, "spoonacular:search", "pasta")
+
+Each one is timed (best and median time per call over several rounds, with
+the garbage collector off, like timeit) and measured under tracemalloc (peak
+and retained bytes of one call). Results are compared with the stored
+baseline in benchmarks/baseline.json; the best time is what gets compared,
+as it is the least disturbed by other load on the machine.
+
+Usage (from the repository root):
+    python -m pytest benchmarks -q                 # report changes vs the baseline
+    python -m pytest benchmarks --bench-fail 25    # fail benchmarks >25% worse
+    python -m pytest benchmarks --bench-save       # record a new baseline
+
+Timings only compare within one quiet machine (shared hosts can swing them
+by 30%+ between runs), so pick --bench-fail to match; allocations are
+deterministic and compare anywhere.
+"""
+
+import gc
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import pytest
+
+# Keep runs from writing database files into the working tree
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("FOOD_DATABASE_URL", "sqlite:///:memory:")
+
+from benchmarks import BACKEND_APP  # noqa: E402,F401  (puts the backend on sys.path)
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+# Each timing round runs the function for at least this long
+MIN_ROUND_SECONDS = 0.01
+ROUNDS = 15
+# Allocation changes smaller than this are noise (interned strings, free lists)
+ALLOC_SLACK_BYTES = 256
+
+_results: Dict[str, Dict[str, Any]] = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("bench", "micro-benchmarks")
+    group.addoption("--bench-save", action="store_true", help="Write the results to the baseline file")
+    group.addoption("--bench-fail", type=float, default=None, metavar="PCT",
+                    help="Fail benchmarks whose best time or peak allocation grew more than PCT%%")
+    group.addoption("--bench-baseline", type=Path, default=BASELINE_PATH, help="Baseline file")
+
+
+def _load_baseline(path: Path) -> Dict[str, Dict[str, Any]]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text()).get("benchmarks", {})
+
+
+class Bench:
+    """Times and measures allocations of one function (the `bench` fixture)"""
+
+    def __init__(self, name: str, baseline: Optional[Dict[str, Any]], fail_pct: Optional[float]):
+        self.name = name
+        self.baseline = baseline
+        self.fail_pct = fail_pct
+        self.result: Optional[Dict[str, Any]] = None
+
+    @staticmethod
+    def _time(fn: Callable[[], Any], number: int) -> float:
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            for _ in range(number):
+                fn()
+            return time.perf_counter() - started
+        finally:
+            gc.enable()
+
+    @staticmethod
+    def _allocations(fn: Callable[[], Any]) -> tuple[int, int]:
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            result = fn()
+            current, peak = tracemalloc.get_traced_memory()
+            del result
+            return peak - before, current - before
+        finally:
+            tracemalloc.stop()
+
+    def __call__(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Benchmark fn(*args, **kwargs); returns its result for assertions"""
+        call = lambda: fn(*args, **kwargs)  # noqa: E731
+        result = call()  # warm up (and check it works)
+
+        number = 1
+        while (elapsed := self._time(call, number)) < MIN_ROUND_SECONDS:
+            number *= 2 if elapsed > MIN_ROUND_SECONDS / 4 else 10
+        per_call = [self._time(call, number) / number for _ in range(ROUNDS)]
+        peak, retained = self._allocations(call)
+
+        self.result = {
+            "ns_min": round(min(per_call) * 1e9, 1),
+            "ns_median": round(statistics.median(per_call) * 1e9, 1),
+            "alloc_peak_bytes": peak,
+            "alloc_retained_bytes": retained,
+        }
+        _results[self.name] = self.result
+        self._check()
+        return result
+
+    def _check(self) -> None:
+        if self.fail_pct is None or not self.baseline:
+            return
+        limit = 1 + self.fail_pct / 100
+        problems = []
+        if self.result["ns_min"] > self.baseline["ns_min"] * limit:
+            problems.append(f"time {self.baseline['ns_min']:.0f} -> {self.result['ns_min']:.0f} ns")
+        allowed = self.baseline["alloc_peak_bytes"] * limit + ALLOC_SLACK_BYTES
+        if self.result["alloc_peak_bytes"] > allowed:
+            problems.append(
+                f"peak allocation {self.baseline['alloc_peak_bytes']} -> {self.result['alloc_peak_bytes']} bytes"
+            )
+        if problems:
+            pytest.fail(f"{self.name} regressed more than {self.fail_pct:g}%: {'; '.join(problems)}")
+
+
+@pytest.fixture
+def bench(request) -> Bench:
+    config = request.config
+    baseline = _load_baseline(config.getoption("--bench-baseline"))
+    return Bench(request.node.name, baseline.get(request.node.name), config.getoption("--bench-fail"))
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if not _results:
+        return
+    path = config.getoption("--bench-baseline")
+    baseline = _load_baseline(path)
+
+    def change(new: float, old: Optional[float]) -> str:
+        if not old:
+            return "     new"
+        return f"{(new - old) / old * 100:+7.1f}%"
+
+    write = terminalreporter.write_line
+    terminalreporter.section("micro-benchmarks")
+    write(f"{'benchmark':<40} {'best':>12} {'vs base':>8} {'median':>12} {'peak alloc':>12} {'vs base':>8}")
+    for name, result in sorted(_results.items()):
+        old = baseline.get(name, {})
+        write(
+            f"{name:<40} {result['ns_min'] / 1000:>9.2f} us {change(result['ns_min'], old.get('ns_min'))} "
+            f"{result['ns_median'] / 1000:>9.2f} us "
+            f"{result['alloc_peak_bytes']:>10} B {change(result['alloc_peak_bytes'], old.get('alloc_peak_bytes'))}"
+        )
+
+    if config.getoption("--bench-save"):
+        merged = {**baseline, **_results}
+        path.write_text(json.dumps({
+            "machine": {
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "processor": platform.processor() or platform.machine(),
+            },
+            "benchmarks": dict(sorted(merged.items())),
+        }, indent=2) + "\n")
+        write(f"Baseline written to {path}")
@@ -0,0 +1,104 @@
+"""
+Food autocomplete latency and memory benchmark.
+
+Builds the autocomplete index from a local FoodData Central database (see
+app.db.fdc_import) or, without one, from synthetic food names, then times
+keystroke-style queries (prefixes and misspellings) and prints p50/p99
+latency and the index's memory report.
+
+Usage (from the repository root):
+    python -m benchmarks.food_autocomplete --foods 300000
+    python -m benchmarks.food_autocomplete --database sqlite:///./fdc.db
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from benchmarks import BACKEND_APP  # noqa: F401  (puts the backend on sys.path)
+from app.db.engine import create_engine
+from app.db.foods import FoodRepository
+from app.services.food_autocomplete import AutocompleteIndex
+
+WORDS = (
+    "apple banana broccoli chicken breast thigh roasted grilled raw cooked boiled "
+    "oatmeal yogurt greek plain vanilla strawberry blueberry almond peanut butter "
+    "whole wheat bread brown rice white salmon tuna canned spinach kale avocado "
+    "cheddar cheese mozzarella milk skim chocolate cereal granola bar orange juice "
+    "tomato sauce pasta spaghetti beef ground lean turkey egg scrambled potato sweet"
+).split()
+
+QUERIES = [
+    "b", "br", "bro", "broc", "brocoli", "chik", "chiken breast", "greek yog",
+    "yougurt", "peanut buter", "oatmel", "sweet pot", "salmon raw", "avocdo",
+    "whole wheat br", "strawbery", "mozarella", "cheddar", "spagheti", "turky",
+]
+
+
+SYLLABLES = "ba ko ri ta mel zu na po lin dar sy ve qu fen ox tri ham gol".split()
+
+
+def synthetic_foods(count: int, seed: int = 7):
+    """Common food words plus made-up brand words, shaped like FDC names"""
+    rng = random.Random(seed)
+    brands = list({
+        "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+        for _ in range(max(1000, count // 20))
+    })
+    for i in range(count):
+        words = rng.sample(WORDS, rng.randint(2, 5))
+        if i % 4:
+            words.insert(0, rng.choice(brands))
+        yield i + 1, " ".join(words).title(), "Branded" if i % 4 else "SR Legacy"
+
+
+async def database_foods(url: str):
+    engine = create_engine(url)
+    rows = await FoodRepository(engine).all_names()
+    await engine.close()
+    return [(r["fdc_id"], r["name"], r["data_type"]) for r in rows]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", help="Local FDC database URL (default: synthetic names)")
+    parser.add_argument("--foods", type=int, default=300_000, help="Synthetic foods to index")
+    parser.add_argument("--rounds", type=int, default=50, help="Passes over the query list")
+    args = parser.parse_args()
+
+    foods = asyncio.run(database_foods(args.database)) if args.database else list(synthetic_foods(args.foods))
+
+    index = AutocompleteIndex()
+    started = time.perf_counter()
+    index.add_many(foods)
+    build_seconds = time.perf_counter() - started
+
+    samples = []
+    for _ in range(args.rounds):
+        for query in QUERIES:
+            started = time.perf_counter()
+            index.suggest(query, 10)
+            samples.append((time.perf_counter() - started) * 1000)
+
+    print(f"{len(index)} foods, {index.word_count} distinct words, built in {build_seconds:.1f}s")
+    print(
+        f"{len(samples)} queries: p50 {percentile(samples, 0.5):.2f} ms, "
+        f"p99 {percentile(samples, 0.99):.2f} ms, mean {statistics.mean(samples):.2f} ms"
+    )
+    for part, size in index.memory_report().items():
+        print(f"{part:>8}: {size / 1024 / 1024:8.1f} MiB")
+
+    for query in ("brocoli", "chiken breast", "greek yog"):
+        top = ", ".join(s["name"] for s in index.suggest(query, 3))
+        print(f"{query!r:>16} -> {top}")
+
+
+if __name__ == "__main__":
+    main()
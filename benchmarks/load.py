@@ -0,0 +1,310 @@
+"""
+End-to-end load benchmark for the FastAPI app.
+
+Drives app.main.app in-process (ASGI transport, lifespan included) with
+concurrent virtual users at a target request rate over a weighted mix of
+routes: recipe list and search, recipe detail, meal log, log-batch, daily
+log, leaderboard and food search. Spoonacular and USDA are the
+benchmarks/upstreams stand-ins; Redis is fakeredis when installed (the
+in-memory fallback otherwise, or a real server with --redis local).
+
+Each virtual user is authenticated and sends on a fixed schedule (open
+loop). Latency is measured from when a request was scheduled, not when it
+was sent, so a stalled server shows up as latency instead of as fewer
+requests. Reports p50/p95/p99 per route, throughput, error rates and
+event-loop lag, and writes the results as JSON for comparing runs.
+
+Usage (from the repository root):
+    python -m benchmarks.load --rps 200 --users 50 --duration 30
+    python -m benchmarks.load --upstream-latency lognormal --upstream-ms 80 --upstream-p99-ms 600
+    python -m benchmarks.load --compare benchmarks/results/load-20260101-120000.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Keep runs from writing database files into the working tree
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("FOOD_DATABASE_URL", "sqlite:///:memory:")
+
+import httpx
+
+from benchmarks import BACKEND_APP, ROOT  # noqa: F401  (puts the backend on sys.path)
+from benchmarks.upstreams import UpstreamBehavior, install_in_process, uninstall_in_process
+from app.core.config import settings
+from app.core.redis import RedisClient
+from app.core.security import create_access_token
+from app.main import app
+from app.services.spoonacular import spoonacular_service
+from app.services.spoonacular_quota import spoonacular_quota
+from app.services.usda import usda_service
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+SEARCH_TERMS = [
+    "pasta", "chicken", "salad", "soup", "curry", "tacos", "rice", "salmon", "tofu", "oats",
+    "lentil", "burger", "pizza", "noodles", "chili", "omelette", "quinoa", "smoothie", "stew", "wrap",
+]
+FOOD_TERMS = [
+    "banana", "apple", "yogurt", "cheddar", "almonds", "bread", "milk", "egg", "spinach", "beef",
+    "peanut butter", "broccoli", "avocado", "cereal", "orange juice", "potato", "turkey", "tuna",
+]
+# Recipe and food IDs requested, drawn from ranges large enough to miss the cache sometimes
+RECIPE_IDS = (100000, 102000)
+FDC_IDS = (170000, 175000)
+
+# Every rate limit is raised this high unless --rate-limits is given
+UNLIMITED = 10**9
+
+
+@dataclass
+class Route:
+    name: str
+    weight: int
+    build: Callable[[random.Random], Tuple[str, str, Optional[Any]]]
+
+
+def _meal(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "name": "Load test meal",
+        "calories": 450,
+        "protein": 25.0,
+        "carbs": 50.0,
+        "fat": 15.0,
+        "meal_type": rng.choice(["breakfast", "lunch", "dinner", "snack"]),
+        "fdc_id": rng.randint(*FDC_IDS),
+    }
+
+
+ROUTES = [
+    Route("recipes.list", 15, lambda rng: ("GET", "/api/v1/recipes/?limit=20", None)),
+    Route("recipes.search", 15, lambda rng: (
+        "GET", f"/api/v1/recipes/?search={rng.choice(SEARCH_TERMS)}&limit=10", None)),
+    Route("recipes.detail", 15, lambda rng: ("GET", f"/api/v1/recipes/{rng.randint(*RECIPE_IDS)}", None)),
+    Route("meals.log", 10, lambda rng: ("POST", "/api/v1/meals/log", _meal(rng))),
+    Route("meals.log_batch", 5, lambda rng: ("POST", "/api/v1/meals/log-batch", [_meal(rng) for _ in range(5)])),
+    Route("meals.daily", 15, lambda rng: ("GET", f"/api/v1/meals/daily/{date.today().isoformat()}", None)),
+    Route("leaderboard", 10, lambda rng: ("GET", "/api/v1/leaderboard/?period=week", None)),
+    Route("foods.search", 15, lambda rng: (
+        "GET", f"/api/v1/foods/search?query={rng.choice(FOOD_TERMS)}&page_size=25", None)),
+]
+
+
+@dataclass
+class RouteStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    statuses: Dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+
+    def record(self, latency_ms: float, status: str, error: bool) -> None:
+        self.latencies_ms.append(latency_ms)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if error:
+            self.errors += 1
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of unsorted samples (0 for none)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies_ms: List[float], errors: int, duration: float) -> Dict[str, Any]:
+    count = len(latencies_ms)
+    return {
+        "requests": count,
+        "throughput_rps": round(count / duration, 1) if duration else 0.0,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+        "max_ms": round(max(latencies_ms, default=0.0), 2),
+    }
+
+
+def use_redis(mode: str) -> str:
+    """Point RedisClient at the chosen stand-in; returns what was used"""
+    if mode == "fake":
+        try:
+            from fakeredis import FakeAsyncRedis
+        except ImportError:
+            print("fakeredis is not installed (pip install fakeredis); using the in-memory fallback")
+            mode = "memory"
+        else:
+            RedisClient._instance = FakeAsyncRedis(decode_responses=True)
+            RedisClient._is_connected = True
+    if mode == "memory":
+        RedisClient._retry_at = float("inf")
+    return mode
+
+
+def configure(args: argparse.Namespace) -> Dict[str, UpstreamBehavior]:
+    """Install the stand-ins and settings for a run"""
+    behaviors = {
+        name: UpstreamBehavior(
+            latency=args.upstream_latency,
+            latency_ms=args.upstream_ms,
+            latency_p99_ms=args.upstream_p99_ms,
+            error_rate=args.upstream_error_rate,
+            seed=args.seed + i,
+        )
+        for i, name in enumerate(("spoonacular", "usda"))
+    }
+    install_in_process(**behaviors)
+    spoonacular_service.api_key = "load-test"
+    usda_service.api_key = "load-test"
+    # The stand-ins don't bill, so keep the service out of its degraded tiers
+    spoonacular_quota.daily_points = float(UNLIMITED)
+    if not args.rate_limits:
+        for name in (
+            "RATE_LIMIT_AUTH_PER_MIN", "RATE_LIMIT_UNAUTH_PER_MIN", "RATE_LIMIT_THIRD_PARTY_AUTH_PER_MIN",
+            "RATE_LIMIT_THIRD_PARTY_UNAUTH_PER_MIN", "RATE_LIMIT_SENSITIVE_PER_MIN",
+        ):
+            setattr(settings, name, UNLIMITED)
+    return behaviors
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    routes = [route for route in ROUTES if not args.routes or route.name in args.routes]
+    weights = [route.weight for route in routes]
+    stats = {route.name: RouteStats() for route in routes}
+    lags: List[float] = []
+    interval = 1 / args.rps
+    total = int(args.duration * args.rps)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://snacktrack.test") as client:
+            done = asyncio.Event()
+
+            async def ticker() -> None:
+                while not done.is_set():
+                    started = time.perf_counter()
+                    await asyncio.sleep(0.005)
+                    lags.append((time.perf_counter() - started) * 1000 - 5)
+
+            async def user(index: int, started: float) -> None:
+                user_rng = random.Random(rng.random())
+                headers = {"Authorization": f"Bearer {create_access_token(f'load-user-{index}')}"}
+                # Users take turns, so together they send args.rps requests per second
+                for slot in range(index, total, args.users):
+                    scheduled = started + slot * interval
+                    delay = scheduled - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    route = user_rng.choices(routes, weights)[0]
+                    method, path, body = route.build(user_rng)
+                    try:
+                        response = await client.request(method, path, json=body, headers=headers)
+                        status, error = str(response.status_code), response.status_code >= 400
+                    except Exception as e:
+                        status, error = type(e).__name__, True
+                    stats[route.name].record((time.perf_counter() - scheduled) * 1000, status, error)
+
+            tick = asyncio.create_task(ticker())
+            # Let startup work settle outside the measurement
+            await client.get("/health")
+            started = time.perf_counter()
+            await asyncio.gather(*(user(i, started) for i in range(args.users)))
+            elapsed = time.perf_counter() - started
+            done.set()
+            await tick
+
+    all_latencies = [ms for route in stats.values() for ms in route.latencies_ms]
+    all_errors = sum(route.errors for route in stats.values())
+    return {
+        "duration_s": round(elapsed, 2),
+        "overall": summarize(all_latencies, all_errors, elapsed),
+        "routes": {
+            name: {**summarize(route.latencies_ms, route.errors, elapsed), "statuses": route.statuses}
+            for name, route in stats.items()
+        },
+        "loop_lag_ms": {
+            "p50": round(percentile(lags, 50), 2),
+            "p99": round(percentile(lags, 99), 2),
+            "max": round(max(lags, default=0.0), 2),
+        },
+    }
+
+
+def print_report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    def delta(section: Dict[str, Any], previous: Optional[Dict[str, Any]], key: str) -> str:
+        if not previous or not previous.get(key):
+            return ""
+        change = (section[key] - previous[key]) / previous[key] * 100
+        return f" ({change:+.0f}%)"
+
+    print(f"{'route':>16} {'reqs':>6} {'rps':>7} {'err%':>6} {'p50 ms':>14} {'p95 ms':>14} {'p99 ms':>14}")
+    rows = list(results["routes"].items()) + [("overall", results["overall"])]
+    for name, section in rows:
+        previous = None
+        if baseline:
+            previous = baseline["overall"] if name == "overall" else baseline["routes"].get(name)
+        print(
+            f"{name:>16} {section['requests']:>6} {section['throughput_rps']:>7.1f} "
+            f"{section['error_rate'] * 100:>6.2f} "
+            + " ".join(f"{section[k]:>8.1f}{delta(section, previous, k):<6}" for k in ("p50_ms", "p95_ms", "p99_ms"))
+        )
+    lag = results["loop_lag_ms"]
+    print(f"\nEvent-loop lag: p50 {lag['p50']:.1f} ms, p99 {lag['p99']:.1f} ms, max {lag['max']:.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rps", type=float, default=100.0, help="Target requests per second")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of load")
+    parser.add_argument("--routes", nargs="*", choices=[route.name for route in ROUTES], help="Only these routes")
+    parser.add_argument("--redis", choices=("fake", "memory", "local"), default="fake",
+                        help="fakeredis, the in-memory fallback, or REDIS_HOST")
+    parser.add_argument("--rate-limits", action="store_true", help="Keep the configured rate limits")
+    parser.add_argument("--upstream-latency", choices=("fixed", "uniform", "lognormal"), default="lognormal")
+    parser.add_argument("--upstream-ms", type=float, default=40.0, help="Upstream latency (median for lognormal)")
+    parser.add_argument("--upstream-p99-ms", type=float, default=250.0)
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/load-<time>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier results file to compare against")
+    parser.add_argument("--log-level", default="WARNING", help="App log level (per-request INFO logs skew results)")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(args.log_level)
+    logging.getLogger("httpx").setLevel(args.log_level)
+    redis_mode = use_redis(args.redis)
+    behaviors = configure(args)
+    try:
+        results = asyncio.run(run_load(args))
+    finally:
+        uninstall_in_process()
+
+    results = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {**{k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()}, "redis": redis_mode},
+        **results,
+        "upstreams": {name: behavior.stats() for name, behavior in behaviors.items()},
+    }
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(results, baseline)
+
+    output = args.output or RESULTS_DIR / f"load-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
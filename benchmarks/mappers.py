@@ -0,0 +1,191 @@
+"""
+Upstream payload mapping micro-benchmark.
+
+Maps synthetic Spoonacular search pages (100 recipes with full nutrition and
+ingredients) and USDA /foods batches with the current mappers, and with the
+previous approach kept here as a baseline: one linear scan of the nutrient
+list per nutrient, and a pydantic constructor call per model.
+
+Usage (from the repository root):
+    python -m benchmarks.mappers --rounds 200
+"""
+
+import argparse
+import gc
+import random
+import time
+
+from benchmarks import BACKEND_APP  # noqa: F401  (puts the backend on sys.path)
+from app.services.spoonacular import Ingredient, NutritionInfo, RecipeResponse, map_recipes
+from app.services.usda import FoodNutrition, map_foods
+
+SPOONACULAR_NUTRIENTS = [
+    "Calories", "Fat", "Saturated Fat", "Carbohydrates", "Net Carbohydrates", "Sugar", "Cholesterol",
+    "Sodium", "Protein", "Vitamin K", "Vitamin A", "Vitamin C", "Manganese", "Folate", "Potassium",
+    "Fiber", "Iron", "Magnesium", "Vitamin B6", "Phosphorus", "Copper", "Vitamin B1", "Calcium",
+    "Vitamin E", "Zinc", "Vitamin B2", "Vitamin B3", "Vitamin B5", "Selenium", "Alcohol",
+]
+# Typical FDC nutrient count for a Foundation/SR Legacy food; targets sit late in the list
+USDA_NUTRIENT_IDS = list(range(1050, 1110)) + [1003, 1004, 1005, 1008, 1079, 2000, 1093]
+
+
+def spoonacular_page(rng: random.Random, size: int = 100) -> list[dict]:
+    def nutrients():
+        names = SPOONACULAR_NUTRIENTS[:]
+        rng.shuffle(names)
+        return [{"name": n, "amount": rng.uniform(0, 500), "unit": "g"} for n in names]
+
+    return [
+        {
+            "id": i,
+            "title": f"Recipe {i}",
+            "summary": "A <b>tasty</b> dish " * 20,
+            "cuisines": ["Italian"],
+            "dishTypes": ["lunch", "main course"],
+            "diets": ["vegetarian"],
+            "readyInMinutes": 30,
+            "servings": 4,
+            "pricePerServing": 250.0,
+            "spoonacularScore": 88.0,
+            "aggregateLikes": 12,
+            "nutrition": {"nutrients": nutrients()},
+            "extendedIngredients": [
+                {"name": f"ingredient {j}", "nameClean": f"ingredient {j}", "amount": 2, "unit": "g",
+                 "nutrition": {"nutrients": nutrients()}}
+                for j in range(12)
+            ],
+            "analyzedInstructions": [{"steps": [{"step": f"Step {k}"} for k in range(8)]}],
+        }
+        for i in range(size)
+    ]
+
+
+def usda_batch(rng: random.Random, size: int = 20) -> list[dict]:
+    return [
+        {
+            "fdcId": 100000 + i,
+            "description": f"Food {i}",
+            "dataType": "SR Legacy",
+            "foodNutrients": [{"nutrientId": n, "amount": rng.uniform(0, 100)} for n in USDA_NUTRIENT_IDS],
+            "foodPortions": [{"amount": 1.0, "measureUnit": {"name": "cup"}}],
+        }
+        for i in range(size)
+    ]
+
+
+# --- Baseline: the mappers before nutrient indexing and page validation ---
+
+def baseline_recipe(recipe: dict) -> RecipeResponse:
+    nutrients = recipe.get("nutrition", {}).get("nutrients", [])
+    calories = next((n["amount"] for n in nutrients if n["name"] == "Calories"), 0)
+    protein = next((n["amount"] for n in nutrients if n["name"] == "Protein"), 0)
+    carbs = next((n["amount"] for n in nutrients if n["name"] == "Carbohydrates"), 0)
+    fat = next((n["amount"] for n in nutrients if n["name"] == "Fat"), 0)
+    fiber = next((n["amount"] for n in nutrients if n["name"] == "Fiber"), None)
+    ingredients = [
+        Ingredient(
+            name=ing.get("nameClean", ing.get("name", "")),
+            amount=ing.get("amount", 0),
+            unit=ing.get("unit", ""),
+            calories=next(
+                (n["amount"] for n in ing.get("nutrition", {}).get("nutrients", []) if n["name"] == "Calories"),
+                None,
+            ),
+        )
+        for ing in recipe.get("extendedIngredients", [])
+    ]
+    steps = recipe["analyzedInstructions"][0].get("steps", [])
+    dish_types_lower = [d.lower() for d in recipe.get("dishTypes", [])]
+    meal_type = "dinner" if any(mt in dish_types_lower for mt in ["dinner", "main course"]) else "lunch"
+    return RecipeResponse(
+        id=str(recipe["id"]),
+        title=recipe["title"],
+        description=recipe["summary"].replace("<b>", "").replace("</b>", "")[:200],
+        cuisine=recipe["cuisines"][0],
+        meal_type=meal_type,
+        prep_time=recipe["readyInMinutes"],
+        cook_time=0,
+        servings=recipe["servings"],
+        nutrition=NutritionInfo(
+            calories=int(calories), protein=round(protein, 1), carbs=round(carbs, 1),
+            fat=round(fat, 1), fiber=round(fiber, 1) if fiber else None,
+        ),
+        ingredients=ingredients,
+        instructions=[s.get("step", "") for s in steps],
+        tags=recipe["diets"] + recipe["dishTypes"],
+        region="Global",
+        cost_per_serving=recipe["pricePerServing"] / 100,
+        suitable_for=recipe["diets"],
+        image_url=recipe.get("image"),
+        rating=recipe["spoonacularScore"] / 100,
+        review_count=recipe["aggregateLikes"],
+    )
+
+
+def _extract(nutrients: list[dict], nutrient_id: int, default=0.0):
+    for nutrient in nutrients:
+        if nutrient.get("nutrientId") == nutrient_id:
+            return nutrient.get("amount", default)
+    return default
+
+
+def baseline_food(food: dict) -> FoodNutrition:
+    nutrients = food.get("foodNutrients", [])
+    fiber, sugar, sodium = (_extract(nutrients, n, None) for n in (1079, 2000, 1093))
+    portion = food["foodPortions"][0]
+    return FoodNutrition(
+        fdc_id=food["fdcId"],
+        name=food["description"],
+        calories=round(_extract(nutrients, 1008), 2),
+        protein=round(_extract(nutrients, 1003), 2),
+        carbs=round(_extract(nutrients, 1005), 2),
+        fat=round(_extract(nutrients, 1004), 2),
+        fiber=round(fiber, 2) if fiber else None,
+        sugar=round(sugar, 2) if sugar else None,
+        sodium=round(sodium, 2) if sodium else None,
+        serving_size=portion.get("amount"),
+        serving_unit=portion.get("measureUnit", {}).get("name"),
+        data_type=food.get("dataType"),
+        description=food.get("description"),
+    )
+
+
+def timed(label: str, fn, payload, rounds: int, items: int) -> float:
+    fn(payload)  # warm up
+    # Like timeit: keep collector pauses out of the comparison
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            fn(payload)
+        elapsed = time.perf_counter() - started
+    finally:
+        gc.enable()
+    per_second = rounds * items / elapsed
+    print(f"{label:>28}: {elapsed / rounds * 1000:7.2f} ms/page, {per_second:10,.0f} items/s")
+    return per_second
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200, help="Pages mapped per measurement")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    page = spoonacular_page(rng)
+    batch = usda_batch(rng)
+
+    print("Spoonacular complexSearch page (100 recipes x 12 ingredients)")
+    before = timed("baseline", lambda p: [baseline_recipe(r) for r in p], page, args.rounds, len(page))
+    after = timed("map_recipes", map_recipes, page, args.rounds, len(page))
+    print(f"{'speedup':>28}: {after / before:.1f}x")
+
+    print("USDA /foods batch (20 foods x 67 nutrients)")
+    before = timed("baseline", lambda b: [baseline_food(f) for f in b], batch, args.rounds * 5, len(batch))
+    after = timed("map_foods", map_foods, batch, args.rounds * 5, len(batch))
+    print(f"{'speedup':>28}: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
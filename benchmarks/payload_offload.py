@@ -0,0 +1,99 @@
+"""
+Payload offload benchmark: picks PAYLOAD_OFFLOAD_MIN_BYTES.
+
+For Spoonacular complexSearch pages of growing size it measures:
+- inline: decode + map on the event loop (what every other request waits for)
+- loop cost of "process" mode: validating the worker's compact JSON, the
+  only part left on the event loop
+- worst event-loop lag while 8 pages are mapped concurrently in each mode
+
+The suggested threshold is the smallest payload where mapping inline costs
+the loop more than offloading it to a process would.
+
+Usage (from the repository root):
+    python -m benchmarks.payload_offload
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks import BACKEND_APP  # noqa: F401  (puts the backend on sys.path)
+from benchmarks.mappers import spoonacular_page
+from app.core.offload import PayloadOffloader, _map_to_json
+from app.services.spoonacular import decode_recipe_page, recipe_list
+
+PAGE_SIZES = (1, 5, 10, 25, 50, 100)
+
+
+def best_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return min(samples)
+
+
+async def worst_lag_ms(offloader: PayloadOffloader, content: bytes, pages: int) -> float:
+    """Map pages concurrently while a ticker measures how late the loop wakes it"""
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append((time.perf_counter() - started) * 1000 - 1)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    await asyncio.gather(*(offloader.map(content, decode_recipe_page, recipe_list) for _ in range(pages)))
+    done.set()
+    await tick
+    return max(lags)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Timing repetitions per size")
+    parser.add_argument("--workers", type=int, default=2, help="Offload pool size")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    payloads = {n: json.dumps({"results": spoonacular_page(rng, n)}).encode() for n in PAGE_SIZES}
+
+    print(f"{'recipes':>8} {'bytes':>10} {'inline ms':>10} {'process loop ms':>16}")
+    suggested = None
+    for n, content in payloads.items():
+        inline = best_ms(lambda: decode_recipe_page(content), args.repeat)
+        packed = _map_to_json(decode_recipe_page, content)
+        on_loop = best_ms(lambda: recipe_list.validate_json(packed), args.repeat)
+        print(f"{n:>8} {len(content):>10,} {inline:>10.2f} {on_loop:>16.2f}")
+        # Offloading also costs a pool round trip (~1 ms), so require a clear win
+        if suggested is None and inline > on_loop + 1.0:
+            suggested = len(content)
+
+    content = payloads[max(PAGE_SIZES)]
+    print(f"\nWorst event-loop lag mapping 8 x {max(PAGE_SIZES)}-recipe pages concurrently:")
+    for mode in ("off", "thread", "process"):
+        offloader = PayloadOffloader(mode, min_bytes=0, max_workers=args.workers)
+        offloader.start()
+        try:
+            # Warm the pool up (process workers import the app on first use)
+            asyncio.run(offloader.map(content, decode_recipe_page, recipe_list))
+            lag = asyncio.run(worst_lag_ms(offloader, content, 8))
+        finally:
+            offloader.shutdown()
+        print(f"{mode:>8}: {lag:7.1f} ms")
+
+    if suggested:
+        print(f"\nSuggested PAYLOAD_OFFLOAD_MIN_BYTES={suggested}")
+    else:
+        print("\nInline mapping was cheapest at every size measured; keep PAYLOAD_OFFLOAD=off")
+
+
+if __name__ == "__main__":
+    main()
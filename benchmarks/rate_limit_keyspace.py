@@ -0,0 +1,97 @@
+"""
+Rate-limit keyspace memory benchmark.
+
+Writes one window of counters for N identities with each key layout
+(flat and sharded) and reports Redis memory per 100k identities.
+
+Needs a disposable Redis; every key written is deleted afterwards.
+
+Usage (from the repository root):
+    python -m benchmarks.rate_limit_keyspace --identities 100000 --db 15
+"""
+
+import argparse
+import time
+
+import redis
+
+from benchmarks import BACKEND_APP  # noqa: F401  (puts the backend on sys.path)
+from app.core.config import settings
+from app.middleware.rate_limit import RATE_LIMIT_WINDOW_TTL, build_rate_limit_key
+
+BATCH_SIZE = 1000
+
+
+def used_memory(client: redis.Redis) -> int:
+    return int(client.info("memory")["used_memory"])
+
+
+def populate(client: redis.Redis, layout: str, identities: int, window: int) -> set[str]:
+    """Increment one counter per identity, the way the middleware would."""
+    settings.RATE_LIMIT_KEY_LAYOUT = layout
+    keys: set[str] = set()
+    pipe = client.pipeline(transaction=False)
+
+    for i in range(identities):
+        key, field = build_rate_limit_key(f"user:user_{1700000000 + i}", window)
+        if field is None:
+            pipe.incr(key)
+            pipe.expire(key, RATE_LIMIT_WINDOW_TTL)
+        else:
+            pipe.hincrby(key, field, 1)
+            if key not in keys:
+                pipe.expire(key, RATE_LIMIT_WINDOW_TTL)
+        keys.add(key)
+
+        if (i + 1) % BATCH_SIZE == 0:
+            pipe.execute()
+    pipe.execute()
+
+    return keys
+
+
+def measure(client: redis.Redis, layout: str, identities: int) -> dict:
+    window = int(time.time()) // 60
+    before = used_memory(client)
+    keys = populate(client, layout, identities, window)
+    after = used_memory(client)
+
+    for i in range(0, len(keys), BATCH_SIZE):
+        client.delete(*list(keys)[i:i + BATCH_SIZE])
+
+    used = after - before
+    return {
+        "layout": layout,
+        "keys": len(keys),
+        "bytes": used,
+        "bytes_per_100k": used * 100_000 // identities,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=settings.REDIS_HOST)
+    parser.add_argument("--port", type=int, default=settings.REDIS_PORT)
+    parser.add_argument("--db", type=int, default=15)
+    parser.add_argument("--identities", type=int, default=100_000)
+    parser.add_argument("--shards", type=int, default=settings.RATE_LIMIT_KEY_SHARDS)
+    args = parser.parse_args()
+
+    client = redis.Redis(host=args.host, port=args.port, db=args.db, password=settings.REDIS_PASSWORD)
+    settings.RATE_LIMIT_KEY_SHARDS = args.shards
+
+    listpack = client.config_get("hash-max-*-entries")
+    print(f"Redis {client.info('server')['redis_version']}, {listpack}")
+    print(f"{args.identities} identities, {args.shards} shards\n")
+
+    for layout in ("flat", "sharded"):
+        result = measure(client, layout, args.identities)
+        print(
+            f"{result['layout']:>8}: {result['keys']:>7} keys, "
+            f"{result['bytes'] / 1024 / 1024:8.2f} MiB, "
+            f"{result['bytes_per_100k'] / 1024 / 1024:8.2f} MiB per 100k identities"
+        )
+
+
+if __name__ == "__main__":
+    main()
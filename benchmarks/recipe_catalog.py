@@ -0,0 +1,202 @@
+"""
+Recipe catalog filtering benchmark.
+
+Builds a synthetic catalog and times typical fallback queries two ways: the
+linear scan list_recipes used to do over SAMPLE_RECIPES, and RecipeCatalog
+(bitmap intersections plus bounded reads). Both must return the same page.
+Then times free-text search: the old substring scan against BM25 search,
+cold (first query after an edit) and warm (scores cached), and nutrition
+similarity: alternatives for a recipe, against a scan for the closest
+calories. Finally compares building the catalog from objects with loading
+it from a snapshot file.
+
+Usage (from the repository root):
+    python -m benchmarks.recipe_catalog --recipes 50000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks import BACKEND_APP  # noqa: F401  (puts the backend on sys.path)
+from app.api.routes.recipes import NutritionInfo, RecipeResponse
+from app.services.recipe_catalog import RecipeCatalog
+from app.services.recipe_snapshot import RecipeSnapshot, write_snapshot
+
+CUISINES = ["Italian", "Mexican", "Thai", "Indian", "Japanese", "Greek", "American", "French", "Korean", "Ethiopian"]
+MEAL_TYPES = ["breakfast", "lunch", "dinner", "snack"]
+TAGS = ["quick", "vegetarian", "vegan", "high-protein", "low-carb", "gluten-free", "spicy", "budget", "kid-friendly",
+        "one-pot", "meal-prep", "comfort", "seafood", "grilled", "baked", "no-cook"]
+WORDS = ["chicken", "tomato", "basil", "garlic", "lemon", "roasted", "spicy", "creamy", "noodles", "rice", "salmon",
+         "tofu", "chickpea", "curry", "soup", "salad", "pasta", "beans", "mushroom", "ginger", "honey", "grilled"]
+CONDITIONS = ["Diabetes", "Heart Health", "Weight Loss", "Hypertension", "Pregnancy"]
+ALLERGENS = ["Nut Allergy", "Dairy Allergy", "Gluten Sensitivity", "Shellfish Allergy"]
+
+QUERIES = {
+    "cuisine + meal_type": dict(cuisine="thai", meal_type="dinner"),
+    "tags + max_calories": dict(tags=["vegan", "low-carb"], max_calories=450),
+    "condition, no allergen": dict(suitable_for=["Diabetes"], exclude_not_suitable_for=["Nut Allergy"]),
+    "narrow calorie band": dict(min_calories=500, max_calories=505),
+    "everything": dict(cuisine="italian", meal_type="lunch", tags=["quick"], max_calories=700, max_prep_time=30),
+    "rare combination": dict(cuisine="ethiopian", meal_type="breakfast", tags=["seafood"], suitable_for=["Pregnancy"]),
+}
+
+SEARCHES = ["chicken", "garlic", "spicy noodles", "roasted tomato soup"]
+
+
+def synthetic_recipes(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(count):
+        yield RecipeResponse.model_construct(
+            id=f"recipe_{i}",
+            title=" ".join(rng.sample(WORDS, 3)).title(),
+            description=" ".join(rng.sample(WORDS, 8)),
+            cuisine=rng.choice(CUISINES),
+            meal_type=rng.choice(MEAL_TYPES),
+            prep_time=rng.randint(5, 120),
+            cook_time=0,
+            servings=2,
+            nutrition=NutritionInfo.model_construct(
+                calories=rng.randint(100, 1200), protein=round(rng.uniform(2, 60), 1),
+                carbs=round(rng.uniform(5, 120), 1), fat=round(rng.uniform(2, 50), 1),
+                fiber=round(rng.uniform(0, 15), 1),
+            ),
+            ingredients=[],
+            instructions=[],
+            tags=rng.sample(TAGS, rng.randint(1, 4)),
+            region="Global",
+            cost_per_serving=round(rng.uniform(0.5, 12), 2),
+            suitable_for=rng.sample(CONDITIONS, rng.randint(0, 2)),
+            not_suitable_for=rng.sample(ALLERGENS, rng.randint(0, 2)),
+            rating=round(rng.uniform(3, 5), 1),
+        )
+
+
+def linear_scan(recipes, cuisine=None, meal_type=None, tags=None, suitable_for=None, exclude_not_suitable_for=None,
+                min_calories=None, max_calories=None, max_prep_time=None, limit=20):
+    """The pre-catalog filter loop, generalised to the same filters"""
+    cuisine = cuisine.lower() if cuisine else None
+    meal_type = meal_type.lower() if meal_type else None
+    tag_set = {t.lower() for t in tags} if tags else None
+    results = []
+    for recipe in recipes:
+        if cuisine and recipe.cuisine.lower() != cuisine:
+            continue
+        if meal_type and recipe.meal_type.lower() != meal_type:
+            continue
+        if min_calories and recipe.nutrition.calories < min_calories:
+            continue
+        if max_calories and recipe.nutrition.calories > max_calories:
+            continue
+        if max_prep_time and recipe.prep_time > max_prep_time:
+            continue
+        if tag_set and not any(t.lower() in tag_set for t in recipe.tags):
+            continue
+        if suitable_for and not all(s in recipe.suitable_for for s in suitable_for):
+            continue
+        if exclude_not_suitable_for and any(a in recipe.not_suitable_for for a in exclude_not_suitable_for):
+            continue
+        results.append(recipe)
+    return results[:limit]
+
+
+def best_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return min(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipes", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    recipes = list(synthetic_recipes(args.recipes))
+    catalog = RecipeCatalog()
+    started = time.perf_counter()
+    catalog.add_many(recipes)
+    print(f"Indexed {len(catalog):,} recipes in {(time.perf_counter() - started) * 1000:.0f} ms\n")
+
+    print(f"{'query':>24} {'matches':>8} {'scan ms':>9} {'catalog ms':>11} {'speedup':>8}")
+    for name, filters in QUERIES.items():
+        expected = linear_scan(recipes, **filters)
+        assert catalog.query(**filters) == expected, name
+        matches = len(catalog.query(**filters, limit=len(recipes)))
+        scan = best_ms(lambda: linear_scan(recipes, **filters), args.repeat)
+        indexed = best_ms(lambda: catalog.query(**filters), args.repeat)
+        print(f"{name:>24} {matches:>8,} {scan:>9.2f} {indexed:>11.3f} {scan / indexed:>7.0f}x")
+
+    print(f"\n{'search':>24} {'matches':>8} {'scan ms':>9} {'cold ms':>9} {'warm ms':>9} {'speedup':>8}")
+    for query in SEARCHES:
+        def substring_scan():
+            return [r for r in recipes if query in r.title.lower() or query in r.description.lower()][:20]
+
+        def cold_search():
+            catalog.add(recipes[0])  # any edit drops the cached scores
+            started = time.perf_counter()
+            catalog.query(search=query)
+            return time.perf_counter() - started
+
+        matches = len(catalog.query(search=query, limit=len(recipes)))
+        scan = best_ms(substring_scan, args.repeat)
+        cold = min(cold_search() for _ in range(args.repeat)) * 1000
+        warm = best_ms(lambda: catalog.query(search=query), args.repeat)
+        print(f"{query:>24} {matches:>8,} {scan:>9.2f} {cold:>9.2f} {warm:>9.3f} {scan / warm:>7.0f}x")
+
+    print(f"\n{'alternatives':>24} {'matches':>8} {'scan ms':>9} {'catalog ms':>11} {'speedup':>8}")
+    for name, filters in {
+        "same meal type": {},
+        "no nuts or dairy": dict(exclude_not_suitable_for=["Nut Allergy", "Dairy Allergy"]),
+    }.items():
+        recipe = recipes[len(recipes) // 2]
+
+        def calorie_scan():
+            allowed = [
+                r for r in recipes
+                if r.meal_type == recipe.meal_type and r.id != recipe.id
+                and not set(filters.get("exclude_not_suitable_for", ())) & set(r.not_suitable_for)
+            ]
+            return sorted(allowed, key=lambda r: abs(r.nutrition.calories - recipe.nutrition.calories))[:3]
+
+        def alternatives():
+            return catalog.query(meal_type=recipe.meal_type, similar_to=recipe.id, limit=3, **filters)
+
+        matches = len(catalog.query(meal_type=recipe.meal_type, limit=len(recipes), **filters)) - 1
+        scan = best_ms(calorie_scan, args.repeat)
+        indexed = best_ms(alternatives, args.repeat)
+        print(f"{name:>24} {matches:>8,} {scan:>9.2f} {indexed:>11.3f} {scan / indexed:>7.0f}x")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "recipes.snapshot")
+        started = time.perf_counter()
+        write_snapshot(recipes, path)
+        written = (time.perf_counter() - started) * 1000
+        loaded = RecipeCatalog()
+        started = time.perf_counter()
+        loaded.load_snapshot(RecipeSnapshot(path, RecipeResponse))
+        load = (time.perf_counter() - started) * 1000
+        for filters in QUERIES.values():
+            assert loaded.query(**filters) == catalog.query(**filters)
+        started = time.perf_counter()
+        loaded.query(search=SEARCHES[0])
+        scan_search = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        loaded.fill_text_index()
+        fill = (time.perf_counter() - started) * 1000
+        print(f"\nSnapshot of {os.path.getsize(path):,} bytes: written in {written:.0f} ms, loaded in {load:.0f} ms, "
+              f"first search (title scan) {scan_search:.0f} ms, text index filled in {fill:.0f} ms")
+
+    started = time.perf_counter()
+    for i in range(1000):
+        catalog.add(recipes[i].model_copy(update={"cuisine": "Korean"}))
+    print(f"\n1,000 incremental updates: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Micro-benchmarks for the request hot paths (see conftest.py for usage).
+
+Inputs are fixed: recorded upstream payloads from benchmarks/upstreams and
+the sample data shipped with the app.
+"""
+
+from datetime import date
+
+import pytest
+
+from benchmarks.upstreams import load_fixture
+from app.api.routes import recipes  # noqa: F401  (loads the sample recipes into the catalog)
+from app.core.cache import InMemoryCache, generate_cache_key
+from app.core.redis import InMemoryRateLimiter
+from app.core.security import create_access_token, decode_token
+from app.middleware.rate_limit import get_rate_limit_for_path
+from app.schemas.recommendations import RecommendationRequest
+from app.services.recipe_catalog import recipe_catalog
+from app.services.recommendations import RecommendationEngine
+from app.services.spoonacular import map_recipe
+from app.services.usda import map_food_nutrition
+
+PATHS = [
+    "/api/v1/auth/login",
+    "/api/v1/recipes/",
+    "/api/v1/recipes/716429",
+    "/api/v1/foods/search",
+    "/api/v1/meals/log",
+    "/api/v1/leaderboard/",
+]
+
+
+@pytest.fixture(scope="module")
+def filled_cache() -> InMemoryCache:
+    cache = InMemoryCache(max_size=1000)
+    for i in range(1000):
+        cache.set(f"spoonacular:recipe:{i}", {"id": i, "title": f"Recipe {i}"}, 3600)
+    return cache
+
+
+def test_generate_cache_key(bench):
+    key = bench(generate_cache_key, "spoonacular:search", "pasta", cuisine="italian", limit=20, offset=40)
+    assert key.startswith("spoonacular:search")
+
+
+def test_in_memory_cache_get(bench, filled_cache):
+    assert bench(filled_cache.get, "spoonacular:recipe:500")["id"] == 500
+
+
+def test_in_memory_cache_set(bench, filled_cache):
+    bench(filled_cache.set, "spoonacular:recipe:500", {"id": 500, "title": "Recipe 500"}, 3600)
+
+
+def test_rate_limiter_check_and_increment(bench):
+    limiter = InMemoryRateLimiter()
+    allowed, _ = bench(limiter.check_and_increment, "user:user_demo", 10**9)
+    assert allowed
+
+
+def test_get_rate_limit_for_path(bench):
+    def limits():
+        return [get_rate_limit_for_path(path, authenticated) for path in PATHS for authenticated in (False, True)]
+
+    assert len(bench(limits)) == 2 * len(PATHS)
+
+
+def test_decode_token(bench):
+    token = create_access_token("user_demo")
+    assert bench(decode_token, token).sub == "user_demo"
+
+
+def test_map_spoonacular_recipe(bench):
+    recipe = load_fixture("spoonacular_recipe.json")
+    assert bench(map_recipe, recipe).nutrition.calories == 584
+
+
+def test_map_usda_food(bench):
+    food = load_fixture("usda_food.json")
+    assert bench(map_food_nutrition, food).calories == 89.0
+
+
+def test_filter_sample_recipes(bench):
+    def chicken(recipe):
+        return "chicken" in recipe.title.lower() or "chicken" in recipe.description.lower()
+
+    results = bench(recipe_catalog.query, max_calories=700, max_prep_time=45, where=chicken)
+    assert all(chicken(r) for r in results)
+
+
+def test_search_sample_recipes(bench):
+    results = bench(recipe_catalog.query, search="high protein chick*", max_calories=700)
+    assert [r.title for r in results] == ["Chicken Tikka Masala", "Thai Green Curry"]
+
+
+def test_sample_recipe_alternatives(bench):
+    recipe = next(r for r in recipe_catalog.all() if r.meal_type == "dinner")
+    results = bench(recipe_catalog.query, meal_type="dinner", similar_to=recipe.id, limit=3)
+    assert results and recipe not in results
+
+
+def test_filter_sample_recipes_unfiltered(bench):
+    assert bench(recipe_catalog.query)
+
+
+def test_generate_plan(bench):
+    engine = RecommendationEngine()
+    request = RecommendationRequest(profile_id="demo-user", target_date=date(2026, 1, 5), meals_per_day=3)
+    assert len(bench(engine.generate_plan, request).plan) == 3
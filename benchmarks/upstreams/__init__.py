@@ -0,0 +1,73 @@
+"""
+Local stand-ins for the Spoonacular and USDA FoodData Central APIs.
+
+Load tests and resilience tests can't spend real quota, so these ASGI apps
+replay recorded payloads (fixtures/) with configurable latency, injected
+503/429 failures and a daily quota (402 from Spoonacular, 429 from USDA).
+
+In-process, route the services' pooled clients to them:
+
+    from benchmarks.upstreams import UpstreamBehavior, install_in_process
+    install_in_process(spoonacular=UpstreamBehavior(latency="lognormal", latency_ms=80, latency_p99_ms=600))
+
+Or run one as a server and point SPOONACULAR_BASE_URL / USDA_BASE_URL at it:
+
+    python -m benchmarks.upstreams spoonacular --port 8081 --latency lognormal --latency-ms 80
+"""
+
+from typing import Dict, Optional
+
+import httpx
+from starlette.applications import Starlette
+
+from benchmarks import BACKEND_APP  # noqa: F401  (puts the backend on sys.path)
+from benchmarks.upstreams import spoonacular as _spoonacular, usda as _usda
+from benchmarks.upstreams.behavior import UpstreamBehavior, load_fixture
+from app.core.config import settings
+from app.utils.client import http_clients
+
+__all__ = [
+    "UpstreamBehavior",
+    "install_in_process",
+    "load_fixture",
+    "uninstall_in_process",
+]
+
+# Base URLs replaced by install_in_process, restored by uninstall_in_process
+_saved_urls: Dict[str, str] = {}
+
+
+def install_in_process(
+    spoonacular: Optional[UpstreamBehavior] = None,
+    usda: Optional[UpstreamBehavior] = None,
+) -> Dict[str, Starlette]:
+    """
+    Serve the given upstreams from in-process stand-ins.
+
+    Points the base URL settings at them and routes their pooled clients
+    through an ASGI transport. The transport only applies to clients created
+    afterwards, so close open ones first (await http_clients.aclose()).
+
+    Returns:
+        The installed apps by upstream name
+    """
+    apps = {}
+    if spoonacular is not None:
+        apps["spoonacular"] = _spoonacular.create_app(spoonacular)
+    if usda is not None:
+        apps["usda"] = _usda.create_app(usda)
+    for name, app in apps.items():
+        setting = f"{name.upper()}_BASE_URL"
+        _saved_urls.setdefault(setting, getattr(settings, setting))
+        setattr(settings, setting, f"http://{name}.test")
+        http_clients.set_transport(name, httpx.ASGITransport(app=app))
+    return apps
+
+
+def uninstall_in_process() -> None:
+    """Undo install_in_process (close the clients afterwards as well)"""
+    for setting, url in _saved_urls.items():
+        setattr(settings, setting, url)
+    _saved_urls.clear()
+    for name in ("spoonacular", "usda"):
+        http_clients.set_transport(name, None)
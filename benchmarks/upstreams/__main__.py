@@ -0,0 +1,50 @@
+"""
+Run a stand-in upstream as a local server.
+
+Usage (from the repository root):
+    python -m benchmarks.upstreams spoonacular --port 8081 --latency lognormal --latency-ms 80 --latency-p99-ms 600
+    python -m benchmarks.upstreams usda --port 8082 --error-rate 0.02
+
+Then point the API at it, e.g. SPOONACULAR_BASE_URL=http://127.0.0.1:8081
+(any API key is accepted). GET /_stats reports requests, injected faults
+and quota use.
+"""
+
+import argparse
+
+import uvicorn
+
+from benchmarks.upstreams import spoonacular, usda
+from benchmarks.upstreams.behavior import LATENCY_DISTRIBUTIONS, UpstreamBehavior
+
+APPS = {"spoonacular": spoonacular.create_app, "usda": usda.create_app}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("service", choices=sorted(APPS))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed latency, uniform low bound or lognormal median")
+    parser.add_argument("--latency-p99-ms", type=float, default=0.0, help="Uniform high bound or lognormal p99")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--daily-points", type=float, default=None, help="Quota (Spoonacular points, USDA requests)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    behavior = UpstreamBehavior(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        latency_p99_ms=args.latency_p99_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        daily_points=args.daily_points,
+        seed=args.seed,
+    )
+    uvicorn.run(APPS[args.service](behavior), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Configurable upstream behavior shared by the stand-in servers: latency
+distribution, injected failures and a daily quota.
+"""
+
+import asyncio
+import json
+import math
+import random
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+# z-score of the 99th percentile of a standard normal distribution
+_Z_P99 = 2.326
+
+
+def load_fixture(name: str) -> Dict[str, Any]:
+    """A recorded upstream payload from fixtures/"""
+    with open(FIXTURES / name, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@dataclass
+class UpstreamBehavior:
+    """
+    How a stand-in upstream responds.
+
+    Latency (milliseconds) is drawn per request:
+    - "fixed": always latency_ms
+    - "uniform": between latency_ms and latency_p99_ms
+    - "lognormal": median latency_ms, 99th percentile latency_p99_ms (the
+      long tail real upstreams have)
+
+    error_rate and rate_limit_rate are the fractions of requests answered
+    with a 503 or a 429. With daily_points set, each request is charged its
+    cost in points and refused once the allowance is spent.
+    """
+
+    latency: str = "fixed"
+    latency_ms: float = 0.0
+    latency_p99_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    daily_points: Optional[float] = None
+    seed: Optional[int] = None
+    used: float = field(default=0.0, init=False)
+    requests: int = field(default=0, init=False)
+    faults: int = field(default=0, init=False)
+
+    def __post_init__(self):
+        if self.latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution {self.latency!r}")
+        self._rng = random.Random(self.seed)
+        # One behavior may serve apps on several threads (e.g. TestClient)
+        self._lock = threading.Lock()
+
+    def sample_latency(self) -> float:
+        """Seconds to wait before answering the next request"""
+        if self.latency == "uniform":
+            ms = self._rng.uniform(self.latency_ms, max(self.latency_ms, self.latency_p99_ms))
+        elif self.latency == "lognormal" and self.latency_ms > 0:
+            p99 = max(self.latency_p99_ms, self.latency_ms)
+            sigma = math.log(p99 / self.latency_ms) / _Z_P99
+            ms = self._rng.lognormvariate(math.log(self.latency_ms), sigma)
+        else:
+            ms = self.latency_ms
+        return ms / 1000
+
+    async def delay(self) -> None:
+        seconds = self.sample_latency()
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+    def fault(self) -> Optional[int]:
+        """Status code of an injected failure for this request, if any"""
+        with self._lock:
+            self.requests += 1
+            roll = self._rng.random()
+            if roll < self.error_rate:
+                status = 503
+            elif roll < self.error_rate + self.rate_limit_rate:
+                status = 429
+            else:
+                return None
+            self.faults += 1
+            return status
+
+    def charge(self, points: float) -> bool:
+        """Spend points from the daily allowance; False once it's exhausted"""
+        with self._lock:
+            if self.daily_points is not None and self.used + points > self.daily_points:
+                return False
+            self.used += points
+            return True
+
+    @property
+    def left(self) -> Optional[float]:
+        if self.daily_points is None:
+            return None
+        return max(0.0, self.daily_points - self.used)
+
+    def reset(self) -> None:
+        """Start a new day: clear the quota and counters"""
+        with self._lock:
+            self.used = 0.0
+            self.requests = 0
+            self.faults = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "faults": self.faults,
+            "points_used": round(self.used, 3),
+            "points_left": self.left,
+        }
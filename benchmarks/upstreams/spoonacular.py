@@ -0,0 +1,140 @@
+"""
+Spoonacular stand-in.
+
+Serves the endpoints SpoonacularService calls, replaying the recorded
+recipe in fixtures/spoonacular_recipe.json under a different id and title
+for each result. Every call is billed with Spoonacular's pricing table and
+reported in X-API-Quota-* headers; once UpstreamBehavior.daily_points is
+spent, calls get a 402 like the real API.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from benchmarks import BACKEND_APP  # noqa: F401  (puts the backend on sys.path)
+from benchmarks.upstreams.behavior import UpstreamBehavior, load_fixture
+from app.services.spoonacular_quota import estimate_cost
+
+# complexSearch reports this many matches for any query
+TOTAL_RESULTS = 5000
+MAX_NUMBER = 100
+
+
+def _params(request: Request) -> Dict[str, Any]:
+    """Query parameters with "true"/"false" read as booleans (for pricing)"""
+    params: Dict[str, Any] = {}
+    for name, value in request.query_params.items():
+        params[name] = {"true": True, "false": False}.get(value.lower(), value)
+    return params
+
+
+def _number(params: Dict[str, Any], default: int = 10) -> int:
+    try:
+        return max(1, min(int(params.get("number", default)), MAX_NUMBER))
+    except ValueError:
+        return default
+
+
+def _failure(status: int, message: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    return JSONResponse({"status": "failure", "code": status, "message": message}, status, headers=headers)
+
+
+def create_app(behavior: Optional[UpstreamBehavior] = None) -> Starlette:
+    """Build the stand-in; behavior defaults to instant, fault-free responses"""
+    behavior = behavior or UpstreamBehavior()
+    fixture = load_fixture("spoonacular_recipe.json")
+
+    def recipe(recipe_id: int, nutrition: bool = True, ingredients: bool = True) -> Dict[str, Any]:
+        data = dict(fixture, id=recipe_id, title=f"{fixture['title']} #{recipe_id}")
+        if not nutrition:
+            data.pop("nutrition", None)
+        if not ingredients:
+            data.pop("extendedIngredients", None)
+        return data
+
+    async def serve(request: Request, build: Callable[[Dict[str, Any]], Any]) -> JSONResponse:
+        await behavior.delay()
+        params = _params(request)
+        if not params.get("apiKey"):
+            return _failure(401, "You are not authorized. Please read https://spoonacular.com/food-api/docs#Authentication")
+
+        fault = behavior.fault()
+        if fault == 429:
+            return _failure(429, "You are sending too many requests. Slow down.")
+        if fault is not None:
+            return _failure(fault, "Service temporarily unavailable")
+
+        cost = estimate_cost(request.url.path, params)
+        if not behavior.charge(cost):
+            headers = {
+                "X-API-Quota-Request": "0",
+                "X-API-Quota-Used": f"{behavior.used:g}",
+                "X-API-Quota-Left": "0",
+            }
+            return _failure(402, "Your daily points limit has been reached.", headers)
+
+        headers = {"X-API-Quota-Request": f"{cost:g}", "X-API-Quota-Used": f"{behavior.used:g}"}
+        if behavior.left is not None:
+            headers["X-API-Quota-Left"] = f"{behavior.left:g}"
+        return JSONResponse(build(params), headers=headers)
+
+    async def complex_search(request: Request) -> JSONResponse:
+        def build(params: Dict[str, Any]) -> Dict[str, Any]:
+            number = _number(params)
+            offset = int(params.get("offset", 0))
+            first = 100000 + offset
+            count = max(0, min(number, TOTAL_RESULTS - offset))
+            if params.get("addRecipeInformation") or params.get("addRecipeNutrition"):
+                results = [
+                    recipe(first + i, bool(params.get("addRecipeNutrition")), bool(params.get("fillIngredients")))
+                    for i in range(count)
+                ]
+            else:
+                results = [
+                    {"id": first + i, "title": f"{fixture['title']} #{first + i}", "image": fixture["image"],
+                     "imageType": "jpg"}
+                    for i in range(count)
+                ]
+            return {"results": results, "offset": offset, "number": number, "totalResults": TOTAL_RESULTS}
+
+        return await serve(request, build)
+
+    async def information(request: Request) -> JSONResponse:
+        recipe_id = request.path_params["recipe_id"]
+        return await serve(request, lambda params: recipe(recipe_id, bool(params.get("includeNutrition"))))
+
+    async def information_bulk(request: Request) -> JSONResponse:
+        def build(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+            ids = [int(i) for i in str(params.get("ids", "")).split(",") if i.strip()]
+            return [recipe(i, bool(params.get("includeNutrition"))) for i in ids]
+
+        return await serve(request, build)
+
+    async def similar(request: Request) -> JSONResponse:
+        recipe_id = request.path_params["recipe_id"]
+
+        def build(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+            return [
+                {"id": recipe_id + i, "title": f"{fixture['title']} #{recipe_id + i}",
+                 "readyInMinutes": fixture["readyInMinutes"], "servings": fixture["servings"]}
+                for i in range(1, _number(params, 1) + 1)
+            ]
+
+        return await serve(request, build)
+
+    async def stats(request: Request) -> JSONResponse:
+        return JSONResponse(behavior.stats())
+
+    app = Starlette(routes=[
+        Route("/recipes/complexSearch", complex_search),
+        Route("/recipes/informationBulk", information_bulk),
+        Route("/recipes/{recipe_id:int}/information", information),
+        Route("/recipes/{recipe_id:int}/similar", similar),
+        Route("/_stats", stats),
+    ])
+    app.state.behavior = behavior
+    return app
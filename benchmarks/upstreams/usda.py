@@ -0,0 +1,130 @@
+"""
+USDA FoodData Central stand-in.
+
+Serves the endpoints USDAFoodService calls. Food details replay
+fixtures/usda_food.json and search hits replay
+fixtures/usda_search_food.json, each under the requested (or a generated)
+FDC ID. FDC sits behind api.data.gov, which counts requests per key and
+reports them in X-RateLimit-* headers; once UpstreamBehavior.daily_points
+requests have been made, calls get a 429.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from benchmarks.upstreams.behavior import UpstreamBehavior, load_fixture
+
+# /foods/search reports this many hits for any query
+TOTAL_HITS = 1000
+MAX_PAGE_SIZE = 200
+# FDC IDs at or above this don't exist (left out of /foods, 404 from /food)
+MISSING_FDC_ID = 90_000_000
+
+
+def _error(status: int, code: str, message: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    return JSONResponse({"error": {"code": code, "message": message}}, status, headers=headers)
+
+
+async def _body(request: Request) -> Dict[str, Any]:
+    content = await request.body()
+    if not content:
+        return {}
+    try:
+        body = json.loads(content)
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+def create_app(behavior: Optional[UpstreamBehavior] = None) -> Starlette:
+    """Build the stand-in; behavior defaults to instant, fault-free responses"""
+    behavior = behavior or UpstreamBehavior()
+    food_fixture = load_fixture("usda_food.json")
+    hit_fixture = load_fixture("usda_search_food.json")
+    base_gtin = int(hit_fixture["gtinUpc"])
+
+    def food(fdc_id: int) -> Dict[str, Any]:
+        return dict(food_fixture, fdcId=fdc_id, description=f"{food_fixture['description']} #{fdc_id}")
+
+    def hit(fdc_id: int, query: str) -> Dict[str, Any]:
+        return dict(
+            hit_fixture,
+            fdcId=fdc_id,
+            description=f"{query.upper()} {hit_fixture['description']} #{fdc_id}",
+            gtinUpc=f"{base_gtin + fdc_id:012d}",
+        )
+
+    async def serve(request: Request, build: Callable[[Dict[str, Any]], Any]) -> Response:
+        await behavior.delay()
+        if not request.query_params.get("api_key"):
+            return _error(403, "API_KEY_MISSING", "No api_key was supplied. Get one at https://api.data.gov:443")
+
+        fault = behavior.fault()
+        if fault == 429:
+            return _error(429, "OVER_RATE_LIMIT", "You have exceeded your rate limit. Try again later.")
+        if fault is not None:
+            return _error(fault, "SERVICE_UNAVAILABLE", "Service temporarily unavailable")
+
+        headers = {}
+        allowed = behavior.charge(1)
+        if behavior.daily_points is not None:
+            headers = {
+                "X-RateLimit-Limit": f"{behavior.daily_points:g}",
+                "X-RateLimit-Remaining": f"{behavior.left:g}",
+            }
+        if not allowed:
+            return _error(429, "OVER_RATE_LIMIT", "You have exceeded your rate limit. Try again later.", headers)
+
+        params = dict(request.query_params)
+        params.update(await _body(request))
+        data = build(params)
+        if data is None:
+            return _error(404, "NOT_FOUND", "Food not found", headers)
+        return JSONResponse(data, headers=headers)
+
+    async def search(request: Request) -> Response:
+        def build(params: Dict[str, Any]) -> Dict[str, Any]:
+            page_size = max(1, min(int(params.get("pageSize", 50)), MAX_PAGE_SIZE))
+            page_number = max(1, int(params.get("pageNumber", 1)))
+            first = (page_number - 1) * page_size
+            count = max(0, min(page_size, TOTAL_HITS - first))
+            query = str(params.get("query", ""))
+            return {
+                "totalHits": TOTAL_HITS,
+                "currentPage": page_number,
+                "totalPages": -(-TOTAL_HITS // page_size),
+                "foodSearchCriteria": {"query": query, "pageSize": page_size, "pageNumber": page_number},
+                "foods": [hit(2_000_000 + first + i, query) for i in range(count)],
+            }
+
+        return await serve(request, build)
+
+    async def food_detail(request: Request) -> Response:
+        fdc_id = request.path_params["fdc_id"]
+        return await serve(request, lambda params: food(fdc_id) if fdc_id < MISSING_FDC_ID else None)
+
+    async def foods(request: Request) -> Response:
+        def build(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+            ids = params.get("fdcIds") or []
+            if isinstance(ids, str):
+                ids = ids.split(",")
+            return [food(int(i)) for i in ids if int(i) < MISSING_FDC_ID]
+
+        return await serve(request, build)
+
+    async def stats(request: Request) -> JSONResponse:
+        return JSONResponse(behavior.stats())
+
+    app = Starlette(routes=[
+        Route("/foods/search", search, methods=["GET", "POST"]),
+        Route("/food/{fdc_id:int}", food_detail),
+        Route("/foods", foods, methods=["GET", "POST"]),
+        Route("/_stats", stats),
+    ])
+    app.state.behavior = behavior
+    return app
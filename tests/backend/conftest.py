@@ -1,3 +1,4 @@
+import os
 import sys
 from pathlib import Path
 
@@ -5,3 +6,38 @@ ROOT = Path(__file__).resolve().parents[2]
 BACKEND_APP = ROOT / "backend"
 if str(BACKEND_APP) not in sys.path:
     sys.path.insert(0, str(BACKEND_APP))
+
+# Keep test runs from writing a database file into the working tree
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("FOOD_DATABASE_URL", "sqlite:///:memory:")
+
+
+def make_recipe(recipe_id: str, **fields):
+    """
+    A RecipeResponse for tests; keyword arguments override its fields.
+    calories, protein, carbs, fat and fiber go into the nutrition and
+    ingredients takes ingredient names.
+    """
+    from app.api.routes.recipes import Ingredient, NutritionInfo, RecipeResponse
+
+    nutrition = {"calories": 500, "protein": 10, "carbs": 20, "fat": 5}
+    for field in ("calories", "protein", "carbs", "fat", "fiber"):
+        if field in fields:
+            nutrition[field] = fields.pop(field)
+    ingredients = [Ingredient(name=name, amount=1, unit="g") for name in fields.pop("ingredients", ())]
+    return RecipeResponse(**{
+        "id": recipe_id,
+        "title": f"Recipe {recipe_id}",
+        "description": "",
+        "cuisine": "Italian",
+        "meal_type": "dinner",
+        "prep_time": 30,
+        "cook_time": 0,
+        "servings": 2,
+        "nutrition": NutritionInfo(**nutrition),
+        "ingredients": ingredients,
+        "instructions": [],
+        "tags": [],
+        "region": "Global",
+        **fields,
+    })
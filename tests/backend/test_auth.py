@@ -0,0 +1,75 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def relaxed_auth_rate_limit(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "RATE_LIMIT_SENSITIVE_PER_MIN", 1000)
+
+
+def test_register_login_refresh_and_me(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"email": "New.User@Example.com", "password": "password123", "name": "New User"},
+    )
+    assert response.status_code == 200
+    user = response.json()["user"]
+    assert user["email"] == "new.user@example.com"
+
+    duplicate = client.post(
+        "/api/v1/auth/register",
+        json={"email": "new.user@example.com", "password": "password123", "name": "New User"},
+    )
+    assert duplicate.status_code == 400
+
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "NEW.USER@example.com", "password": "password123"},
+    )
+    assert response.status_code == 200
+    tokens = response.json()["tokens"]
+
+    me = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert me.json()["id"] == user["id"]
+
+    refreshed = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert refreshed.status_code == 200
+
+
+def test_demo_user_is_seeded() -> None:
+    client = TestClient(app)
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "demo@example.com", "password": "password123"},
+    )
+    assert response.status_code == 200
+    assert response.json()["user"]["id"] == "user_demo"
+
+
+def test_refresh_rotation_reuse_and_logout() -> None:
+    client = TestClient(app)
+    tokens = client.post(
+        "/api/v1/auth/login",
+        json={"email": "demo@example.com", "password": "password123"},
+    ).json()["tokens"]
+
+    rotated = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert rotated.status_code == 200
+    new_tokens = rotated.json()
+
+    # Replaying the old refresh token revokes the whole session
+    replay = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert replay.status_code == 401
+    after_replay = client.post("/api/v1/auth/refresh", json={"refresh_token": new_tokens["refresh_token"]})
+    assert after_replay.status_code == 401
+
+    headers = {"Authorization": f"Bearer {new_tokens['access_token']}"}
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+    assert client.post("/api/v1/auth/logout", headers=headers).status_code == 200
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
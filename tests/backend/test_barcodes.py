@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.cache import in_memory_cache
+from app.core.redis import RedisClient
+from app.db.engine import SQLiteEngine
+from app.db.foods import FoodRepository
+from app.main import app
+from app.services.barcodes import BarcodeIndex, FoodBarcodes, normalize_barcode
+from app.services.usda import usda_service
+from app.utils.client import http_clients
+
+
+def test_normalize_barcode() -> None:
+    # UPC-A and its EAN-13 form are the same product
+    assert normalize_barcode("012345678905") == normalize_barcode("0012345678905") == 12345678905
+    assert normalize_barcode("0 12345-67890 5") == 12345678905
+    assert normalize_barcode("12ab") is None
+    assert normalize_barcode("123") is None
+    assert normalize_barcode("000000000") is None
+
+
+def test_index_lookup_and_snapshot(tmp_path) -> None:
+    index = BarcodeIndex.build([("012345678905", 10), ("818290014115", 20), ("12345678905", 11), ("bad", 30)])
+    assert len(index) == 2
+    # Newest FDC entry for a barcode wins
+    assert index.lookup("0012345678905") == 11
+    assert index.lookup("818290014115") == 20
+    assert index.lookup("99999999") is None
+
+    index.add("99999999", 40)
+    assert index.lookup("99999999") == 40
+
+    path = str(tmp_path / "barcodes.bin")
+    index.save(path, source_count=3)
+    loaded, source_count = BarcodeIndex.load(path)
+    assert source_count == 3
+    assert [loaded.lookup(c) for c in ("12345678905", "818290014115", "99999999")] == [11, 20, 40]
+
+
+def test_snapshot_is_rebuilt_when_import_changes(tmp_path) -> None:
+    path = str(tmp_path / "barcodes.bin")
+    BarcodeIndex.build([("818290014115", 1)]).save(path, source_count=99)
+
+    async def run():
+        engine = SQLiteEngine(str(tmp_path / "fdc.db"))
+        repository = FoodRepository(engine)
+        await repository.initialize()
+        await engine.execute(
+            "INSERT INTO foods (fdc_id, name, data_type, gtin_upc) VALUES (2, 'Yogurt', 'Branded', '818290014115')"
+        )
+        barcodes = FoodBarcodes(repository, path)
+        await barcodes.ensure_loaded()
+        await engine.close()
+        return barcodes
+
+    barcodes = asyncio.run(run())
+    assert barcodes.lookup("818290014115") == 2
+    assert BarcodeIndex.load(path)[1] == 1
+
+
+@pytest.fixture
+def usda_upstream(monkeypatch):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        if request.url.path.endswith("/foods/search"):
+            assert json.loads(request.content)["query"] == "0818290014115"
+            return httpx.Response(200, json={"foods": [
+                {"fdcId": 2000002, "description": "GREEK YOGURT", "dataType": "Branded", "gtinUpc": "818290014115"},
+            ]})
+        if request.url.path.endswith("/foods"):
+            return httpx.Response(200, json=[
+                {"fdcId": 2000002, "description": "GREEK YOGURT", "gtinUpc": "818290014115",
+                 "foodNutrients": [{"nutrientId": 1008, "amount": 59}]},
+            ])
+        return httpx.Response(404)
+
+    monkeypatch.setattr(usda_service, "api_key", "test-key")
+    monkeypatch.setattr(RedisClient, "_retry_at", float("inf"))
+    in_memory_cache.clear()
+    http_clients.set_transport("usda", httpx.MockTransport(handler))
+    asyncio.run(http_clients.aclose())
+    yield requests
+    http_clients.set_transport("usda", None)
+    asyncio.run(http_clients.aclose())
+    in_memory_cache.clear()
+
+
+def test_barcode_endpoint_searches_once_then_uses_index(usda_upstream) -> None:
+    client = TestClient(app)
+
+    response = client.get("/api/v1/foods/barcode/0818290014115")
+    assert response.status_code == 200
+    assert response.json()["fdc_id"] == 2000002
+    assert response.json()["gtin_upc"] == "818290014115"
+    assert sum(path.endswith("/foods/search") for path in usda_upstream) == 1
+
+    usda_upstream.clear()
+    assert client.get("/api/v1/foods/barcode/818290014115").json()["calories"] == 59
+    assert usda_upstream == []
+
+    assert client.get("/api/v1/foods/barcode/not-a-code").status_code == 400
+
+
+def test_cached_search_results_are_indexed(usda_upstream) -> None:
+    client = TestClient(app)
+
+    # The second search is a cache hit holding plain dicts
+    for _ in range(2):
+        response = client.get("/api/v1/foods/search", params={"query": "0818290014115"})
+        assert response.status_code == 200
+        assert response.json()["foods"][0]["fdc_id"] == 2000002
+    assert sum(path.endswith("/foods/search") for path in usda_upstream) == 1
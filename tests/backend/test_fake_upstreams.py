@@ -0,0 +1,84 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.cache import in_memory_cache
+from app.core.redis import RedisClient
+from app.core.resilience import UpstreamUnavailableError
+from app.services.spoonacular import spoonacular_service
+from app.services.spoonacular_quota import SpoonacularQuota
+from app.services.usda import usda_service
+from app.utils.client import http_clients
+from benchmarks.upstreams import UpstreamBehavior, install_in_process, uninstall_in_process
+
+
+@pytest.fixture
+def fake_upstreams(monkeypatch):
+    monkeypatch.setattr(spoonacular_service, "api_key", "test-key")
+    monkeypatch.setattr(usda_service, "api_key", "test-key")
+    monkeypatch.setattr(RedisClient, "_retry_at", float("inf"))
+    in_memory_cache.clear()
+
+    def install(**behaviors):
+        asyncio.run(http_clients.aclose())
+        return install_in_process(**behaviors)
+
+    yield install
+    uninstall_in_process()
+    asyncio.run(http_clients.aclose())
+    in_memory_cache.clear()
+
+
+def test_services_map_replayed_payloads(fake_upstreams) -> None:
+    apps = fake_upstreams(spoonacular=UpstreamBehavior(), usda=UpstreamBehavior())
+
+    async def run():
+        recipes = await spoonacular_service.search_recipes(query="pasta", limit=3)
+        hits = await usda_service.search_foods("yogurt", page_size=5)
+        food = await usda_service.get_food_by_id(173944)
+        return recipes, hits, food
+
+    recipes, hits, food = asyncio.run(run())
+
+    assert [r.id for r in recipes] == ["100000", "100001", "100002"]
+    assert recipes[0].nutrition.calories == 584
+    assert len(recipes[0].ingredients) == 8
+    assert len(hits["foods"]) == 5 and hits["total_hits"] == 1000
+    assert hits["foods"][0].gtin_upc
+    assert (food.fdc_id, food.calories) == (173944, 89.0)
+    assert apps["spoonacular"].state.behavior.used > 0
+
+
+def test_latency_distributions() -> None:
+    fixed = UpstreamBehavior(latency_ms=20)
+    assert fixed.sample_latency() == 0.02
+
+    tail = UpstreamBehavior(latency="lognormal", latency_ms=50, latency_p99_ms=500, seed=1)
+    samples = sorted(tail.sample_latency() * 1000 for _ in range(20000))
+    assert samples[len(samples) // 2] == pytest.approx(50, rel=0.1)
+    assert samples[int(len(samples) * 0.99)] == pytest.approx(500, rel=0.2)
+
+
+def test_quota_exhaustion_and_injected_failures(fake_upstreams, monkeypatch) -> None:
+    quota = SpoonacularQuota(daily_points=1000)
+    monkeypatch.setattr("app.services.spoonacular.spoonacular_quota", quota)
+    apps = fake_upstreams(spoonacular=UpstreamBehavior(daily_points=3))
+
+    async def search(**params):
+        client = http_clients.get("spoonacular")
+        return await client.get("http://spoonacular.test/recipes/complexSearch", params={"apiKey": "k", **params})
+
+    first = asyncio.run(search(number=10))
+    assert first.status_code == 200
+    assert first.headers["X-API-Quota-Request"] == "1.1"
+    assert float(first.headers["X-API-Quota-Left"]) == pytest.approx(1.9)
+
+    # The service records the 402 and stops calling until the quota resets
+    with pytest.raises(UpstreamUnavailableError):
+        asyncio.run(spoonacular_service._make_request("/recipes/complexSearch", {"number": 100}))
+    assert quota.tier() == "reserve"
+
+    apps["spoonacular"].state.behavior.rate_limit_rate = 1.0
+    limited = asyncio.run(search(number=1))
+    assert limited.status_code == 429
@@ -0,0 +1,112 @@
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.core.cache import in_memory_cache
+from app.core.redis import RedisClient
+from app.main import app
+from app.services.food_autocomplete import MAX_BOOSTED_FOODS, AutocompleteIndex, edit_distance, food_autocomplete
+from app.services.usda import usda_service
+from app.utils.client import http_clients
+
+FOODS = [
+    (1, "Broccoli, raw", "SR Legacy"),
+    (2, "Broccoli, frozen, chopped", "SR Legacy"),
+    (3, "BROCCOLI CHEDDAR SOUP", "Branded"),
+    (4, "Chicken, breast, roasted", "SR Legacy"),
+    (5, "CHICKEN BREAST STRIPS", "Branded"),
+    (6, "Yogurt, Greek, plain, nonfat", "SR Legacy"),
+    (7, "Brown rice, cooked", "Foundation"),
+]
+
+
+def build_index() -> AutocompleteIndex:
+    index = AutocompleteIndex()
+    index.add_many(FOODS)
+    return index
+
+
+def ids(suggestions) -> list[int]:
+    return [s["fdc_id"] for s in suggestions]
+
+
+def test_edit_distance_counts_transpositions() -> None:
+    assert edit_distance("chiken", "chicken", 1) == 1
+    assert edit_distance("yougurt", "yogurt", 1) == 1
+    assert edit_distance("brwon", "brown", 1) == 1
+    assert edit_distance("banana", "cheddar", 2) == 3
+
+
+def test_prefix_and_typo_matches() -> None:
+    index = build_index()
+
+    assert set(ids(index.suggest("broc"))) == {1, 2, 3}
+    # Generic foods with short names rank first
+    assert ids(index.suggest("broc"))[0] == 1
+    assert ids(index.suggest("br", 10))[-1] == 3
+
+    assert set(ids(index.suggest("brocoli"))) == {1, 2, 3}
+    assert ids(index.suggest("chiken breast")) == [4, 5]
+    assert ids(index.suggest("greek yog")) == [6]
+    assert index.suggest("pizza") == []
+    assert index.suggest("  ") == []
+
+
+def test_lookups_raise_ranking_and_live_adds_are_searchable() -> None:
+    index = build_index()
+    assert ids(index.suggest("chicken")) == [4, 5]
+
+    for _ in range(10):
+        index.record_use(5)
+    assert ids(index.suggest("chicken", 1)) == [5]
+
+    # Folding boosts into the posting order keeps the same ranking
+    index._rerank()
+    assert ids(index.suggest("chicken", 1)) == [5]
+
+    index.add(8, "Chicken nuggets, frozen", "Branded")
+    assert 8 in ids(index.suggest("nugget"))
+    assert ids(index.suggest("chicken", 10))[0] == 5
+
+
+def test_boosted_foods_are_reranked_in_bulk() -> None:
+    index = AutocompleteIndex()
+    index.add_many((i, f"Food {i}", "Branded") for i in range(1, MAX_BOOSTED_FOODS + 3))
+    for fdc_id in range(1, MAX_BOOSTED_FOODS + 2):
+        index.record_use(fdc_id)
+    assert not index._boosted
+
+    index.record_use(MAX_BOOSTED_FOODS + 2)
+    index.record_use(MAX_BOOSTED_FOODS + 2)
+    assert ids(index.suggest("food", 1)) == [MAX_BOOSTED_FOODS + 2]
+
+
+def test_search_results_are_indexed_cold_and_cached(monkeypatch) -> None:
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        return httpx.Response(200, json={"foods": [
+            {"fdcId": 3000003, "description": "KOHLRABI CHIPS", "dataType": "Branded"},
+        ]})
+
+    monkeypatch.setattr(usda_service, "api_key", "test-key")
+    monkeypatch.setattr(RedisClient, "_retry_at", float("inf"))
+    in_memory_cache.clear()
+    http_clients.set_transport("usda", httpx.MockTransport(handler))
+    asyncio.run(http_clients.aclose())
+    try:
+        client = TestClient(app)
+        # The second search is a cache hit holding plain dicts
+        for _ in range(2):
+            response = client.get("/api/v1/foods/search", params={"query": "kohlrabi chips"})
+            assert response.status_code == 200
+            assert response.json()["foods"][0]["fdc_id"] == 3000003
+    finally:
+        http_clients.set_transport("usda", None)
+        asyncio.run(http_clients.aclose())
+        in_memory_cache.clear()
+
+    assert len(requests) == 1
+    assert [s["fdc_id"] for s in food_autocomplete.suggest("kohlrabi", 5)] == [3000003]
@@ -0,0 +1,39 @@
+import asyncio
+
+import httpcore
+import httpx
+
+from app.utils.client import HTTPClientRegistry
+
+RESPONSE = b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 2\r\n\r\n{}"
+
+
+def _mock_network_transport(responses: int) -> httpx.AsyncHTTPTransport:
+    """A real pooled transport whose connections read canned responses instead of a socket"""
+    transport = httpx.AsyncHTTPTransport()
+    transport._pool = httpcore.AsyncConnectionPool(network_backend=httpcore.AsyncMockBackend([RESPONSE] * responses))
+    return transport
+
+
+def test_pool_metrics_count_new_and_reused_connections() -> None:
+    registry = HTTPClientRegistry()
+    registry.set_transport("default", _mock_network_transport(responses=2))
+
+    async def run():
+        client = registry.get("default")
+        try:
+            for _ in range(2):
+                response = await client.get("http://upstream.test/foods")
+                assert response.json() == {}
+        finally:
+            await registry.aclose()
+
+    asyncio.run(run())
+    stats = registry.stats()["default"]
+    # The first request opens a connection, the second reuses it from the pool
+    assert stats["requests"] == 2
+    assert stats["new_connections"] == 1
+    assert stats["reused_connections"] == 1
+    assert stats["reuse_ratio"] == 0.5
+    assert stats["pool_wait_ms_avg"] is not None and stats["pool_wait_ms_max"] >= 0
+    assert registry.stats()["usda"]["requests"] == 0
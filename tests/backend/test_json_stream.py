@@ -0,0 +1,77 @@
+import asyncio
+import json
+import tracemalloc
+
+import pytest
+
+from app.utils.json_stream import JSONArrayStream, JSONStreamError, map_json_array
+
+CHUNK = 16 * 1024
+
+
+def _page(size: int) -> bytes:
+    return json.dumps({
+        "offset": 0,
+        "results": [
+            {"id": i, "title": f"Recipe é {i} ]}}", "nutrients": [{"name": "Calories", "amount": 1.5e2}] * 30}
+            for i in range(size)
+        ],
+        "totalResults": 12345,
+    }, ensure_ascii=False).encode()
+
+
+def _chunks(body: bytes, size: int):
+    async def gen():
+        for i in range(0, len(body), size):
+            yield body[i:i + size]
+    return gen()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_elements_and_fields_survive_any_chunking(chunk_size) -> None:
+    body = _page(5)
+    items, fields = asyncio.run(map_json_array(_chunks(body, chunk_size), "results", lambda r: r["id"]))
+
+    assert items == [0, 1, 2, 3, 4]
+    assert fields == {"offset": 0, "totalResults": 12345}
+
+
+def test_top_level_arrays_and_malformed_bodies() -> None:
+    stream = JSONArrayStream()
+    assert stream.feed(b'[{"a": 1}, 2') + stream.feed(b"34, []]") + stream.close() == [{"a": 1}, 234, []]
+
+    empty = JSONArrayStream()
+    assert empty.close() == []
+
+    for body in (b'{"results": [1, 2', b'{"results": 5}', b"[1 2]", b"[1,,2]"):
+        stream = JSONArrayStream("results" if body.startswith(b"{") else None)
+        with pytest.raises(JSONStreamError):
+            stream.feed(body)
+            stream.close()
+
+
+def _peak_bytes(decode) -> int:
+    tracemalloc.start()
+    try:
+        decode()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_peak_memory_does_not_grow_with_page_size() -> None:
+    small, large = _page(200), _page(800)
+
+    def streamed(body: bytes):
+        def decode():
+            stream = JSONArrayStream("results")
+            for i in range(0, len(body), CHUNK):
+                stream.feed(body[i:i + CHUNK])
+            stream.close()
+        return decode
+
+    # Whole-body decoding grows with the page...
+    assert _peak_bytes(lambda: json.loads(large)) > 3 * _peak_bytes(lambda: json.loads(small))
+    # ...streaming stays around the buffer (one chunk plus one element) whatever the size
+    assert _peak_bytes(streamed(large)) < 1.2 * _peak_bytes(streamed(small))
+    assert _peak_bytes(streamed(large)) < _peak_bytes(lambda: json.loads(small))
@@ -0,0 +1,27 @@
+import argparse
+import asyncio
+
+from app.core.config import settings
+from app.core.redis import RedisClient
+from benchmarks.load import percentile, run_load
+
+
+def test_percentile_nearest_rank() -> None:
+    samples = list(range(1, 101))
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 99) == 99
+    assert percentile([], 95) == 0.0
+
+
+def test_short_run_reports_every_route(monkeypatch) -> None:
+    monkeypatch.setattr(RedisClient, "_retry_at", float("inf"))
+    monkeypatch.setattr(settings, "RATE_LIMIT_AUTH_PER_MIN", 10**6)
+    args = argparse.Namespace(rps=40.0, users=4, duration=0.5, routes=["meals.daily", "leaderboard"], seed=1)
+
+    results = asyncio.run(run_load(args))
+
+    assert set(results["routes"]) == {"meals.daily", "leaderboard"}
+    assert results["overall"]["requests"] == 20
+    assert results["overall"]["error_rate"] == 0.0
+    assert results["overall"]["p50_ms"] <= results["overall"]["p99_ms"]
+    assert results["loop_lag_ms"]["max"] >= 0
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from app.db.engine import SQLiteEngine
+from app.db import fdc_import
+from app.db.fdc_import import import_fdc
+from app.db.foods import FoodRepository
+from app.services.local_foods import LocalFoodService
+from app.services.usda import USDAFoodService
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+@pytest.fixture
+def service(tmp_path):
+    repository = FoodRepository(SQLiteEngine(str(tmp_path / "fdc.db")))
+    imported = asyncio.run(import_fdc(
+        [os.path.join(FIXTURES, "fdc_csv"), os.path.join(FIXTURES, "fdc_foundation.json")],
+        repository,
+    ))
+    assert imported == 6  # lab sub-sample rows are skipped
+
+    fallback = USDAFoodService()
+    fallback.api_key = None
+    return LocalFoodService(repository, fallback)
+
+
+def test_import_flattens_nutrients(service) -> None:
+    banana = asyncio.run(service.get_food_by_id(173944))
+    assert (banana.calories, banana.carbs, banana.sugar) == (89, 22.8, 12.2)
+    assert banana.data_type == "SR Legacy"
+
+    yogurt = asyncio.run(service.get_food_by_id(1999631))
+    assert yogurt.brand_owner == "Chobani, LLC"
+    assert (yogurt.serving_size, yogurt.serving_unit, yogurt.sugar) == (170, "g", 3.2)
+
+    # Foundation foods only report Atwater energy
+    broccoli = asyncio.run(service.get_food_by_id(747447))
+    assert broccoli.calories == 39
+
+
+def test_search_ranks_and_filters(service) -> None:
+    result = asyncio.run(service.search_foods("banan"))
+    assert {food.fdc_id for food in result["foods"]} == {173944, 2000001}
+    assert result["total_hits"] == 2
+
+    branded = asyncio.run(service.search_foods("banana", data_type=["Branded"]))
+    assert [food.name for food in branded["foods"]] == ["BANANA CHIPS"]
+
+    by_brand = asyncio.run(service.search_foods("yogurt", brand_owner="chobani, llc"))
+    assert by_brand["total_hits"] == 1
+
+
+def test_missing_foods_without_fallback(service) -> None:
+    foods = asyncio.run(service.get_foods_by_ids([171705, 1, 171705, 2344719]))
+    assert [food.fdc_id for food in foods] == [171705, 2344719]
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(service.get_food_by_id(1))
+    assert exc.value.status_code == 404
+
+
+def test_json_import_streams_in_chunks_and_batches(tmp_path, monkeypatch) -> None:
+    foods = [
+        {
+            "fdcId": 900000 + i,
+            "description": f"Test food {i}",
+            "dataType": "Branded",
+            "brandOwner": "Testco" if i % 2 else None,
+            "foodNutrients": [
+                {"nutrient": {"id": 1008}, "amount": i},
+                {"nutrient": {"id": 1003}, "amount": 1.5},
+                {"nutrient": {"id": 9999}, "amount": 7},
+            ],
+        }
+        for i in range(25)
+    ]
+    path = tmp_path / "branded.json"
+    path.write_text(json.dumps({"BrandedFoods": foods}, indent=2))
+    # Many reads per food, several batches per file
+    monkeypatch.setattr(fdc_import, "JSON_READ_BYTES", 64)
+    monkeypatch.setattr(fdc_import, "STAGE_BATCH", 4)
+
+    repository = FoodRepository(SQLiteEngine(str(tmp_path / "fdc.db")))
+    assert asyncio.run(import_fdc([str(path)], repository)) == 25
+
+    service = LocalFoodService(repository, USDAFoodService())
+    food = asyncio.run(service.get_food_by_id(900013))
+    assert (food.name, food.calories, food.protein, food.brand_owner) == ("Test food 13", 13, 1.5, "Testco")
+    assert asyncio.run(service.get_food_by_id(900024)).brand_owner is None
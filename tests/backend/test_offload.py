@@ -0,0 +1,48 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.offload import PayloadOffloader
+from app.services.spoonacular import decode_recipe_page, recipe_list
+
+
+def _page(size: int) -> bytes:
+    return json.dumps({"results": [
+        {
+            "id": i,
+            "title": f"Recipe {i}",
+            "nutrition": {"nutrients": [{"name": "Calories", "amount": 120.5 * i}]},
+            "extendedIngredients": [{"name": "oats", "amount": 1, "unit": "cup"}],
+        }
+        for i in range(size)
+    ]}).encode()
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_large_payloads_are_offloaded(mode) -> None:
+    small, large = _page(2), _page(50)
+    offloader = PayloadOffloader(mode, min_bytes=len(small) + 1, max_workers=1)
+
+    async def run():
+        return (
+            await offloader.map(small, decode_recipe_page, recipe_list),
+            await offloader.map(large, decode_recipe_page, recipe_list),
+        )
+
+    try:
+        inline, offloaded = asyncio.run(run())
+    finally:
+        offloader.shutdown()
+
+    assert offloaded == decode_recipe_page(large)
+    assert offloaded[7].nutrition.calories == 843
+    assert len(inline) == 2
+    assert (offloader.stats()["inline"], offloader.stats()["offloaded"]) == (1, 1)
+
+
+def test_unknown_mode_maps_inline() -> None:
+    offloader = PayloadOffloader("fork", min_bytes=0, max_workers=1)
+    recipes = asyncio.run(offloader.map(_page(3), decode_recipe_page, recipe_list))
+    assert [r.id for r in recipes] == ["0", "1", "2"]
+    assert offloader.stats()["offloaded"] == 0
@@ -0,0 +1,242 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, Response
+from fastapi.testclient import TestClient
+
+from app.api.routes import admin as admin_routes
+from app.api.routes.admin import _page
+from app.api.routes.recipes import SAMPLE_RECIPES, RecipeResponse
+from app.core.cache import in_memory_cache
+from app.core.config import settings
+from app.core.cursors import CURSOR_HEADER, decode_cursor, encode_cursor
+from app.core.redis import RedisClient
+from app.db.engine import SQLiteEngine
+from app.db.recipes import RecipeRepository
+from app.main import app
+from app.services.recipe_catalog import RecipeCatalog
+from app.services.spoonacular import spoonacular_service
+from app.services.spoonacular_quota import estimate_cost, spoonacular_quota
+from app.utils.client import http_clients
+from benchmarks.upstreams import UpstreamBehavior, install_in_process, uninstall_in_process
+from benchmarks.upstreams import spoonacular as fake_spoonacular
+from conftest import make_recipe
+
+
+def _pasta(i: int) -> RecipeResponse:
+    return make_recipe(
+        f"r{i:03d}",
+        title=f"{['Tomato', 'Garlic', 'Lemon'][i % 3]} Pasta {i}",
+        description="pasta " * (i % 4 + 1),
+        cuisine=["Italian", "Thai"][i % 2],
+        prep_time=i % 7 * 10,
+        calories=300 + i % 5 * 50,
+        carbs=40,
+        fat=10,
+        cost_per_serving=None if i % 9 == 0 else i % 4 + 0.5,
+        rating=i % 3 + 2,
+    )
+
+
+def _walk(catalog: RecipeCatalog, limit: int, **filters) -> list:
+    """Every page via page_key/after"""
+    pages, after = [], None
+    while True:
+        page = catalog.query(**filters, after=after, limit=limit + 1)
+        pages.extend(page[:limit])
+        if len(page) <= limit:
+            return pages
+        after = catalog.page_key(page[limit - 1], order_by=filters.get("order_by"), search=filters.get("search"))
+
+
+def test_cursor_round_trip_and_filter_check() -> None:
+    cursor = encode_cursor([4.5, "recipe_3", 2], {"cuisine": "thai"})
+    assert decode_cursor(cursor, {"cuisine": "thai"}) == [4.5, "recipe_3", 2]
+
+    with pytest.raises(HTTPException) as other_filters:
+        decode_cursor(cursor, {"cuisine": "greek"})
+    assert other_filters.value.status_code == 400
+    with pytest.raises(HTTPException):
+        decode_cursor("not-a-cursor", {"cuisine": "thai"})
+
+
+def test_catalog_pages_resume_in_every_order() -> None:
+    catalog = RecipeCatalog()
+    catalog.add_many(_pasta(i) for i in range(60))
+    catalog.remove("r010")
+
+    for filters in (
+        {},
+        dict(cuisine="thai"),
+        dict(order_by="cost"),
+        dict(order_by="rating", descending=True),
+        dict(order_by="calories", descending=True, max_prep_time=30),
+        dict(search="pasta"),
+        dict(search="tomato pasta"),
+        dict(search="pasta", order_by="prep_time", descending=True),
+    ):
+        expected = catalog.query(**filters, limit=100)
+        assert _walk(catalog, 7, **filters) == expected, filters
+
+
+def test_catalog_pages_dont_shift_under_writes() -> None:
+    catalog = RecipeCatalog()
+    catalog.add_many(_pasta(i) for i in range(20))
+    first = catalog.query(order_by="calories", limit=5)
+    after = catalog.page_key(first[-1], order_by="calories")
+
+    # Recipes already seen disappear, the next page still starts right after the last one
+    for recipe in first:
+        catalog.remove(recipe.id)
+    assert catalog.query(order_by="calories", after=after, limit=5) == catalog.query(order_by="calories", limit=5)
+
+
+def test_list_recipes_route_pages_by_cursor() -> None:
+    client = TestClient(app)
+    seen, cursor = [], None
+    while True:
+        response = client.get("/api/v1/recipes/", params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        seen += [r["id"] for r in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert seen == [r["id"] for r in client.get("/api/v1/recipes/", params={"limit": 100}).json()]
+    assert len(seen) >= len(SAMPLE_RECIPES)
+
+    cursor = client.get("/api/v1/recipes/", params={"limit": 1}).headers["X-Next-Cursor"]
+    assert client.get("/api/v1/recipes/", params={"cursor": cursor, "cuisine": "thai"}).status_code == 400
+
+
+def test_admin_pages_sort_ids_before_seeking() -> None:
+    items = [SimpleNamespace(id=f"user_{i}") for i in (10, 2, 1, 11, 3)]
+    first, second = Response(), Response()
+    page = _page(first, items, {}, None, 0, 2)
+    rest = _page(second, items, {}, first.headers[CURSOR_HEADER], 0, 10)
+    assert [u.id for u in page + rest] == ["user_1", "user_10", "user_11", "user_2", "user_3"]
+    assert CURSOR_HEADER not in second.headers
+
+
+def test_admin_listings_page_by_cursor() -> None:
+    client = TestClient(app)
+    first = client.get("/api/v1/admin/users", params={"limit": 2})
+    second = client.get("/api/v1/admin/users", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+    assert [u["id"] for u in first.json() + second.json()] == ["user_1", "user_2", "user_3", "user_4"]
+
+    payload = SAMPLE_RECIPES[0].model_dump(exclude={"id", "rating", "review_count", "image_url"})
+    created = []
+    for i in range(5):
+        response = client.post("/api/v1/recipes/", json={**payload, "title": f"Admin Bowl {i}", "cuisine": "Adminland"})
+        created.append(response.json()["id"])
+    try:
+        client.put(f"/api/v1/admin/recipes/{created[1]}/status", params={"status": "draft"})
+
+        # Stored recipes are listed with their status, drafts included
+        listed = client.get("/api/v1/admin/recipes", params={"cuisine": "adminland", "limit": 100}).json()
+        assert sorted(created) == [r["id"] for r in listed]
+        assert {r["id"]: r["status"] for r in listed}[created[1]] == "draft"
+
+        params = {"status": "published", "cuisine": "Adminland", "limit": 3}
+        published = client.get("/api/v1/admin/recipes", params=params)
+        rest = client.get("/api/v1/admin/recipes", params={**params, "cursor": published.headers["X-Next-Cursor"]})
+    finally:
+        # The app's catalog is shared with other tests
+        for recipe_id in created:
+            client.delete(f"/api/v1/recipes/{recipe_id}")
+    assert [r["id"] for r in published.json() + rest.json()] == sorted(set(created) - {created[1]})
+    assert "X-Next-Cursor" not in rest.headers
+
+
+def test_admin_lists_built_in_recipes_on_a_fresh_install(monkeypatch) -> None:
+    repository = RecipeRepository(SQLiteEngine(":memory:"))
+    catalog = RecipeCatalog()
+    catalog.add_many(SAMPLE_RECIPES)
+    monkeypatch.setattr(admin_routes, "recipe_repository", repository)
+    monkeypatch.setattr(admin_routes, "recipe_catalog", catalog)
+    client = TestClient(app)
+
+    def walk(**params):
+        listed, cursor = [], None
+        while True:
+            page = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/api/v1/admin/recipes", params={**params, **page})
+            listed += [(r["id"], r["status"]) for r in response.json()]
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                return listed
+
+    assert walk() == sorted((r.id, "published") for r in SAMPLE_RECIPES)
+
+    # An archived built-in recipe leaves the catalog and is listed from the repository
+    archived = SAMPLE_RECIPES[1]
+    asyncio.run(repository.save(archived.model_dump(), status="archived"))
+    catalog.remove(archived.id)
+    statuses = dict(walk())
+    assert statuses[archived.id] == "archived" and len(statuses) == len(SAMPLE_RECIPES)
+    assert [recipe_id for recipe_id, _ in walk(status="archived")] == [archived.id]
+    assert archived.id not in dict(walk(status="published"))
+
+
+@pytest.fixture
+def spoonacular_upstream(monkeypatch):
+    monkeypatch.setattr(spoonacular_service, "api_key", "test-key")
+    monkeypatch.setattr(RedisClient, "_retry_at", float("inf"))
+    monkeypatch.setattr(spoonacular_quota, "_used", 0.0)
+    monkeypatch.setattr(spoonacular_quota, "daily_points", 1e6)
+    monkeypatch.setattr(settings, "RATE_LIMIT_UNAUTH_PER_MIN", 10**6)
+    monkeypatch.setattr(settings, "RATE_LIMIT_THIRD_PARTY_UNAUTH_PER_MIN", 10**6)
+    in_memory_cache.clear()
+    asyncio.run(http_clients.aclose())
+    apps = install_in_process(spoonacular=UpstreamBehavior())
+    yield apps["spoonacular"].state.behavior
+    uninstall_in_process()
+    asyncio.run(http_clients.aclose())
+    in_memory_cache.clear()
+
+
+def _walk_route(client: TestClient, pages: int, **params) -> tuple:
+    """Ids of up to `pages` pages of /recipes/ and the last cursor"""
+    ids, cursor = [], None
+    for _ in range(pages):
+        response = client.get("/api/v1/recipes/", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        ids += [r["id"] for r in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    return ids, cursor
+
+
+def test_spoonacular_pages_cost_one_call_of_page_size(spoonacular_upstream) -> None:
+    client = TestClient(app)
+    ids, _ = _walk_route(client, 4, search="pasta", limit=20)
+    assert ids == [str(100000 + i) for i in range(80)]
+    # One upstream call of 20 results per page, none when the pages are read again
+    assert spoonacular_upstream.requests == 4
+    assert spoonacular_upstream.used == pytest.approx(4 * estimate_cost(
+        "/recipes/complexSearch",
+        {"number": 20, "addRecipeInformation": True, "addRecipeNutrition": True, "fillIngredients": True},
+    ))
+    assert _walk_route(client, 4, search="pasta", limit=20)[0] == ids
+    assert spoonacular_upstream.requests == 4
+
+
+def test_spoonacular_pages_end_at_total_results(spoonacular_upstream, monkeypatch) -> None:
+    monkeypatch.setattr(fake_spoonacular, "TOTAL_RESULTS", 45)
+    ids, cursor = _walk_route(TestClient(app), 10, search="pasta", limit=20)
+    assert ids == [str(100000 + i) for i in range(45)]
+    assert cursor is None
+    assert spoonacular_upstream.requests == 3
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_quota_shaped_pages_still_reach_the_end(spoonacular_upstream, monkeypatch, streaming) -> None:
+    monkeypatch.setattr(settings, "JSON_STREAMING", streaming)
+    monkeypatch.setattr(fake_spoonacular, "TOTAL_RESULTS", 45)
+    # Reduced tier: 10 results per call instead of 20
+    monkeypatch.setattr(spoonacular_quota, "_used", spoonacular_quota.daily_points * 0.6)
+    ids, cursor = _walk_route(TestClient(app), 10, search="pasta", limit=20)
+    assert ids == [str(100000 + i) for i in range(45)]
+    assert cursor is None
+    assert spoonacular_upstream.requests == 5
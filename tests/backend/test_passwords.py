@@ -0,0 +1,37 @@
+import asyncio
+
+from app.core.config import settings
+from app.core.passwords import PasswordHasher, PasswordHasherBusy
+from app.core.security import get_hash_rounds, hash_password
+
+
+def test_verify_and_update_rehashes_when_cost_changes(monkeypatch) -> None:
+    hasher = PasswordHasher(max_workers=1, max_queue=0)
+    old_hash = hash_password("password123", rounds=4)
+
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+    is_valid, new_hash = asyncio.run(hasher.verify_and_update("password123", old_hash))
+    assert is_valid
+    assert get_hash_rounds(new_hash) == 5
+
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    assert asyncio.run(hasher.verify_and_update("password123", old_hash)) == (True, None)
+    assert asyncio.run(hasher.verify_and_update("wrong", old_hash)) == (False, None)
+    hasher.shutdown()
+
+
+def test_saturated_pool_fails_fast(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    hasher = PasswordHasher(max_workers=1, max_queue=1)
+
+    async def burst():
+        return await asyncio.gather(
+            *(hasher.hash("password123") for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(burst())
+    assert sum(isinstance(r, PasswordHasherBusy) for r in results) == 1
+    assert hasher.stats()["rejected"] == 1
+    assert hasher.stats()["queue_depth"] == 0
+    hasher.shutdown()
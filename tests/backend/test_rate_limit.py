@@ -0,0 +1,45 @@
+from app.core.config import settings
+from app.core.redis import in_memory_limiter
+from app.middleware.rate_limit import RateLimitMiddleware, build_rate_limit_key
+
+
+def test_flat_layout_keeps_one_key_per_identity(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "RATE_LIMIT_KEY_LAYOUT", "flat")
+    assert build_rate_limit_key("user:user_demo", 123) == ("rl:user:user_demo:123", None)
+
+
+def test_sharded_layout_uses_stable_hash_tagged_shards(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "RATE_LIMIT_KEY_LAYOUT", "sharded")
+    monkeypatch.setattr(settings, "RATE_LIMIT_KEY_SHARDS", 16)
+
+    key, field = build_rate_limit_key("ip:10.0.0.1", 123)
+    assert field == "ip:10.0.0.1"
+    assert key == build_rate_limit_key("ip:10.0.0.1", 123)[0]
+    shard = key.split("{")[1].split("}")[0]
+    assert 0 <= int(shard) < 16
+    assert key.endswith(":123")
+
+    shards = {build_rate_limit_key(f"user:{i}", 123)[0] for i in range(1000)}
+    assert len(shards) == 16
+
+
+def test_sharded_layout_falls_back_to_per_identity_counters(monkeypatch) -> None:
+    import asyncio
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_KEY_LAYOUT", "sharded")
+    monkeypatch.setattr(settings, "RATE_LIMIT_KEY_SHARDS", 1)
+
+    async def no_redis():
+        return None
+
+    monkeypatch.setattr("app.middleware.rate_limit.RedisClient.get_client", no_redis)
+    in_memory_limiter._storage.clear()
+
+    middleware = RateLimitMiddleware(app=None)
+    key_a, field_a = build_rate_limit_key("ip:a", 1)
+    key_b, field_b = build_rate_limit_key("ip:b", 1)
+    assert key_a == key_b
+
+    assert asyncio.run(middleware._check_rate_limit(key_a, 1, field_a)) == (True, 1)
+    assert asyncio.run(middleware._check_rate_limit(key_b, 1, field_b)) == (True, 1)
+    assert asyncio.run(middleware._check_rate_limit(key_a, 1, field_a)) == (False, 2)
@@ -0,0 +1,105 @@
+from fastapi.testclient import TestClient
+
+from app.api.routes.recipes import SAMPLE_RECIPES
+from app.main import app
+from app.services import recipe_catalog as catalog_module
+from app.services.recipe_catalog import RecipeCatalog, bitmap_from_docs, iter_docs
+from conftest import make_recipe
+
+
+def test_bitmap_helpers_round_trip() -> None:
+    docs = [0, 7, 8, 63, 64, 1000]
+    assert list(iter_docs(bitmap_from_docs(docs))) == docs
+    assert list(iter_docs(0)) == []
+
+
+def test_filters_intersect_and_match_a_linear_scan() -> None:
+    recipes = [
+        make_recipe(str(i), calories=100 + i * 10, cuisine=("Italian", "Thai", "Mexican")[i % 3],
+                    tags=["quick"] if i % 2 else ["slow"], prep_time=10 + i % 50,
+                    suitable_for=["Diabetes"] if i % 4 == 0 else [],
+                    not_suitable_for=["Nut Allergy"] if i % 5 == 0 else [],
+                    cost_per_serving=(i % 7) + 0.5, rating=(i % 10) / 2)
+        for i in range(300)
+    ]
+    catalog = RecipeCatalog()
+    catalog.add_many(recipes)
+
+    results = catalog.query(
+        cuisine="thai", tags=["Quick"], suitable_for=["diabetes"], exclude_not_suitable_for=["nut allergy"],
+        min_calories=500, max_calories=2500, max_prep_time=40, limit=1000,
+    )
+    expected = [
+        r for r in recipes
+        if r.cuisine == "Thai" and "quick" in r.tags and "Diabetes" in r.suitable_for
+        and "Nut Allergy" not in r.not_suitable_for and 500 <= r.nutrition.calories <= 2500 and r.prep_time <= 40
+    ]
+    assert results == expected
+
+    page = catalog.query(cuisine="italian", offset=5, limit=3)
+    assert page == [r for r in recipes if r.cuisine == "Italian"][5:8]
+
+    top = catalog.query(order_by="rating", descending=True, max_cost=2, limit=4)
+    assert top == sorted((r for r in recipes if r.cost_per_serving <= 2), key=lambda r: -r.rating)[:4]
+
+
+def test_small_catalogs_are_scanned_like_the_index(monkeypatch) -> None:
+    catalog = RecipeCatalog()
+    catalog.add_many([
+        make_recipe(str(i), calories=100 + i * 50, cuisine=("Italian", "Thai")[i % 2],
+                    tags=["quick"] if i % 3 else [], prep_time=10 + i, suitable_for=["Diabetes"] if i % 4 == 0 else [],
+                    not_suitable_for=["Nut Allergy"] if i % 5 == 0 else [], cost_per_serving=i % 6 or None)
+        for i in range(20)
+    ])
+    # Reuses a freed doc id, out of id order
+    catalog.remove("3")
+    catalog.add(make_recipe("new", calories=420, tags=["quick"]))
+    queries = [
+        {},
+        dict(offset=2, limit=5),
+        dict(cuisine="THAI", tags=["Quick"]),
+        dict(tags=[]),
+        dict(suitable_for=["diabetes"], exclude_not_suitable_for=["nut allergy"]),
+        dict(min_calories=300, max_calories=800, max_prep_time=25, max_cost=4),
+        dict(exclude_ids=["0", "new"], where=lambda r: r.prep_time % 2 == 0),
+        dict(after=catalog.page_key(catalog.get("new")), limit=4),
+    ]
+    scanned = [catalog.query(**filters) for filters in queries]
+    monkeypatch.setattr(catalog_module, "SCAN_MAX_RECIPES", 0)
+    assert scanned == [catalog.query(**filters) for filters in queries]
+    assert scanned[0][3].id == "new"
+
+
+def test_updates_and_removals_are_reflected() -> None:
+    catalog = RecipeCatalog()
+    catalog.add_many([
+        make_recipe("a", calories=300), make_recipe("b", calories=400, tags=["quick"]), make_recipe("c", calories=500),
+    ])
+
+    catalog.add(make_recipe("b", calories=900, cuisine="Thai"))
+    assert catalog.query(cuisine="italian") == [catalog.get("a"), catalog.get("c")]
+    assert catalog.query(tags=["quick"]) == []
+    assert [r.id for r in catalog.query(min_calories=800)] == ["b"]
+
+    assert catalog.remove("a")
+    assert not catalog.remove("a")
+    catalog.add(make_recipe("d", calories=350))
+    assert catalog.get("a") is None
+    assert {r.id for r in catalog.query(max_calories=400)} == {"d"}
+    assert len(catalog) == 3
+    assert "thai" in catalog.facet_values("cuisine")
+
+
+def test_fallback_routes_use_the_catalog() -> None:
+    client = TestClient(app)
+    recipe = SAMPLE_RECIPES[0]
+
+    assert client.get(f"/api/v1/recipes/{recipe.id}").json()["title"] == recipe.title
+    assert client.get("/api/v1/recipes/missing").status_code == 404
+
+    featured = client.get("/api/v1/recipes/featured", params={"limit": 3}).json()
+    assert [r["rating"] for r in featured] == sorted((r.rating for r in SAMPLE_RECIPES), reverse=True)[:3]
+
+    condition = SAMPLE_RECIPES[0].suitable_for[0]
+    by_condition = client.get("/api/v1/recipes/by-health-condition", params={"condition": condition}).json()
+    assert [r["id"] for r in by_condition] == [r.id for r in SAMPLE_RECIPES if condition in r.suitable_for][:10]
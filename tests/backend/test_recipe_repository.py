@@ -0,0 +1,165 @@
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.api.routes.recipes import SAMPLE_RECIPES, RecipeResponse
+from app.db.engine import SQLiteEngine
+from app.db.recipes import RecipeRepository, recipe_repository
+from app.main import app
+from app.models.recipe import RecipeFilter
+from app.services.recipe_catalog import RecipeCatalog, recipe_catalog
+from app.services.recipe_sync import RecipeCatalogSync
+from conftest import make_recipe
+
+
+def test_keyset_listing_uses_filter_columns_and_labels() -> None:
+    async def run():
+        repository = RecipeRepository(SQLiteEngine(":memory:"))
+        for i in range(7):
+            await repository.save(make_recipe(
+                f"r{i}",
+                cuisine="Thai" if i % 2 else "Greek",
+                tags=["Quick"] if i < 3 else ["Slow"],
+                not_suitable_for=["Nut Allergy"] if i == 1 else [],
+            ).model_dump())
+        await repository.delete("r6")
+        await repository.save(make_recipe("r5", cuisine="Thai").model_dump(), status="draft")
+
+        pages, after = [], None
+        while True:
+            page = await repository.list(after=after, limit=2)
+            if not page:
+                break
+            pages.append([row["id"] for row in page])
+            after = page[-1]["id"]
+
+        thai = await repository.list(RecipeFilter(cuisine="thai"))
+        quick_no_nuts = await repository.list(RecipeFilter(tags=["quick"], exclude_allergens=["nut allergy"]))
+        drafts = await repository.list(status="draft")
+        return pages, thai, quick_no_nuts, drafts
+
+    pages, thai, quick_no_nuts, drafts = asyncio.run(run())
+    assert pages == [["r0", "r1"], ["r2", "r3"], ["r4", "r5"]]
+    assert [row["id"] for row in thai] == ["r1", "r3", "r5"]
+    assert [row["id"] for row in quick_no_nuts] == ["r0", "r2"]
+    assert [(row["id"], row["recipe"]["cuisine"]) for row in drafts] == [("r5", "Thai")]
+
+
+def test_change_feed_has_one_entry_per_recipe_in_write_order() -> None:
+    async def run():
+        repository = RecipeRepository(SQLiteEngine(":memory:"))
+        assert await repository.create(make_recipe("a").model_dump()) == 1
+        assert await repository.create(make_recipe("a").model_dump()) is None
+        await repository.save(make_recipe("b").model_dump())
+        await repository.save(make_recipe("a", title="Renamed").model_dump())
+        await repository.delete("b")
+        return await repository.changes(after=0), await repository.changes(after=3)
+
+    everything, latest = asyncio.run(run())
+    assert [(c["id"], c["seq"], c["deleted"]) for c in everything] == [("a", 3, False), ("b", 4, True)]
+    assert everything[0]["recipe"]["title"] == "Renamed"
+    assert [c["id"] for c in latest] == ["b"]
+
+
+def test_sync_applies_changes_from_other_workers() -> None:
+    async def run():
+        repository = RecipeRepository(SQLiteEngine(":memory:"))
+        # Two workers sharing one database, each with its own catalog
+        catalogs = [RecipeCatalog(), RecipeCatalog()]
+        syncs = [RecipeCatalogSync(repository, catalog, RecipeResponse) for catalog in catalogs]
+        for catalog in catalogs:
+            catalog.add_many(SAMPLE_RECIPES)
+
+        await repository.save(make_recipe("new", title="Saffron Rice Bowl").model_dump())
+        await repository.save(SAMPLE_RECIPES[1].model_dump(), status="archived")
+        await repository.delete(SAMPLE_RECIPES[2].id)
+        applied = [await sync.catch_up() for sync in syncs]
+        assert await syncs[0].catch_up() == 0
+
+        await repository.save(SAMPLE_RECIPES[1].model_dump(), status="published")
+        await syncs[1].catch_up()
+        return applied
+
+    assert asyncio.run(run()) == [3, 3]
+
+
+def test_sync_keeps_catalog_indexes_current() -> None:
+    async def run():
+        repository = RecipeRepository(SQLiteEngine(":memory:"))
+        catalog = RecipeCatalog()
+        catalog.add_many(SAMPLE_RECIPES)
+        sync = RecipeCatalogSync(repository, catalog, RecipeResponse)
+
+        await repository.save(make_recipe("new", title="Saffron Rice Bowl").model_dump())
+        await repository.save(SAMPLE_RECIPES[1].model_dump(), status="archived")
+        await repository.delete(SAMPLE_RECIPES[2].id)
+        await sync.catch_up()
+        return catalog
+
+    catalog = asyncio.run(run())
+    assert [r.id for r in catalog.query(search="saffron")] == ["new"]
+    assert catalog.get(SAMPLE_RECIPES[1].id) is None
+    assert catalog.get(SAMPLE_RECIPES[2].id) is None
+    assert len(catalog) == len(SAMPLE_RECIPES) - 1
+
+
+def test_recipe_routes_persist_writes() -> None:
+    client = TestClient(app)
+    payload = SAMPLE_RECIPES[0].model_dump(exclude={"id", "rating", "review_count", "image_url"})
+    payload["title"] = "Persisted Lentil Stew"
+
+    created = client.post("/api/v1/recipes/", json=payload)
+    assert created.status_code == 200
+    recipe_id = created.json()["id"]
+    recreated_id = None
+    try:
+        assert client.get("/api/v1/recipes/", params={"search": "lentil stew"}).json()[0]["id"] == recipe_id
+
+        archived = client.put(f"/api/v1/admin/recipes/{recipe_id}/status", params={"status": "archived"})
+        assert archived.status_code == 200
+        assert client.get(f"/api/v1/recipes/{recipe_id}").status_code == 404
+
+        payload["title"] = "Persisted Lentil Soup"
+        assert client.put(f"/api/v1/recipes/{recipe_id}", json=payload).status_code == 200
+        assert client.put(f"/api/v1/admin/recipes/{recipe_id}/status", params={"status": "published"}).status_code == 200
+        assert client.get(f"/api/v1/recipes/{recipe_id}").json()["title"] == "Persisted Lentil Soup"
+
+        assert client.delete(f"/api/v1/recipes/{recipe_id}").status_code == 200
+        assert client.delete(f"/api/v1/recipes/{recipe_id}").status_code == 404
+        recreated_id = client.post("/api/v1/recipes/", json=payload).json()["id"]
+        assert recreated_id != recipe_id
+    finally:
+        # The app's catalog is shared with other tests
+        for leftover in (recipe_id, recreated_id):
+            if leftover is not None:
+                client.delete(f"/api/v1/recipes/{leftover}")
+
+
+def test_concurrent_creates_get_distinct_ids_in_one_insert_each(monkeypatch) -> None:
+    client = TestClient(app)
+    payload = SAMPLE_RECIPES[0].model_dump(exclude={"id", "rating", "review_count", "image_url"})
+    inserts = []
+    create = recipe_repository.create
+
+    async def counting_create(recipe: dict, status: str = "published"):
+        inserts.append(recipe["id"])
+        return await create(recipe, status)
+
+    monkeypatch.setattr(recipe_repository, "create", counting_create)
+
+    async def post_many():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            responses = await asyncio.gather(*(
+                http.post("/api/v1/recipes/", json={**payload, "title": f"Batch Stew {i}"}) for i in range(8)
+            ))
+        return [response.json()["id"] for response in responses]
+
+    ids = asyncio.run(post_many())
+    try:
+        assert len(set(ids)) == 8
+        assert sorted(inserts) == sorted(ids)
+        assert all(recipe_catalog.get(recipe_id) for recipe_id in ids)
+    finally:
+        for recipe_id in ids:
+            client.delete(f"/api/v1/recipes/{recipe_id}")
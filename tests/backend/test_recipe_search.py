@@ -0,0 +1,132 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.recipe_catalog import RecipeCatalog
+from app.services.recipe_search import RecipeTextIndex, parse_query, stem, tokenize
+from conftest import make_recipe
+
+
+def _catalog() -> RecipeCatalog:
+    catalog = RecipeCatalog()
+    catalog.add_many([
+        make_recipe("pasta", title="Tomato Basil Pasta", description="Fresh tomatoes and basil",
+                    ingredients=["spaghetti", "tomatoes", "olive oil"], tags=["Vegetarian", "Quick"]),
+        make_recipe("soup", title="Roasted Tomato Soup", description="Slow roasted, blended",
+                    ingredients=["tomato", "garlic", "cream"], tags=["Comfort Food"], meal_type="lunch"),
+        make_recipe("salad", title="Chickpea Salad", description="Tossed with olive oil and lemon",
+                    ingredients=["chickpeas", "cucumber", "oil olive"], tags=["Vegan"], calories=300),
+        make_recipe("curry", title="Chicken Curry", description="Mild curry with rice, no tomato",
+                    ingredients=["chicken", "rice"], tags=["High Protein"], cuisine="Indian", calories=700),
+    ])
+    return catalog
+
+
+def test_stemming_maps_inflections_together() -> None:
+    assert stem("tomatoes") == stem("tomato")
+    assert stem("roasted") == stem("roast")
+    assert stem("berries") == stem("berry")
+    assert stem("chopped") == stem("chop")
+    assert stem("sliced") == stem("slice")
+    assert stem("hummus") == "hummus"
+    assert tokenize("Crème Brûlée") == ["crem", "brule"]
+
+
+def test_parse_query_clauses() -> None:
+    assert parse_query('"olive oil" chick* sun-dried tomatoes') == [
+        ("phrase", ["oliv", "oil"]),
+        ("prefix", "chick"),
+        ("phrase", ["sun", "dry"]),
+        ("term", "tomato"),
+    ]
+    assert parse_query('  "" * ') == []
+    assert parse_query('tomato chick', prefix_last=True) == [("term", "tomato"), ("prefix", "chick")]
+    assert parse_query('chick "olive oil"', prefix_last=True) == [("term", "chick"), ("phrase", ["oliv", "oil"])]
+
+
+def test_ranking_prefers_title_and_requires_every_word() -> None:
+    catalog = _catalog()
+
+    ids = [r.id for r in catalog.query(search="tomatoes", limit=10)]
+    assert set(ids[:2]) == {"pasta", "soup"}
+    assert ids[-1] == "curry"  # only in its description
+
+    assert [r.id for r in catalog.query(search="roasting tomato")] == ["soup"]
+    assert catalog.query(search="tomato chickpea") == []
+    assert catalog.query(search="!!!") == []
+
+
+def test_phrase_and_prefix_queries() -> None:
+    catalog = _catalog()
+
+    # "oil olive" in the salad's ingredients must not match the phrase
+    assert {r.id for r in catalog.query(search='"olive oil"')} == {"pasta", "salad"}
+    assert [r.id for r in catalog.query(search='"oil olive"')] == ["salad"]
+    # Phrases don't run across fields or list items
+    assert catalog.query(search='"pasta fresh"') == []
+
+    assert {r.id for r in catalog.query(search="chick*")} == {"salad", "curry"}
+    assert [r.id for r in catalog.query(search="chick* lemon")] == ["salad"]
+
+
+def test_partial_last_word_matches_as_prefix() -> None:
+    catalog = _catalog()
+    assert {r.id for r in catalog.query(search="chick")} == {"salad", "curry"}
+    assert [r.id for r in catalog.query(search="tomato sou")] == ["soup"]
+    # Whole words that match are not widened
+    assert [r.id for r in catalog.query(search="chicken")] == ["curry"]
+    assert catalog.query(search="chickpea zzz") == []
+
+    # Search on the listing route used to be a substring match
+    found = TestClient(app).get("/api/v1/recipes/", params={"search": "chick"}).json()
+    assert "Chicken Tikka Masala" in [r["title"] for r in found]
+
+
+def test_search_combines_with_filters_and_ordering() -> None:
+    catalog = _catalog()
+
+    assert [r.id for r in catalog.query(search="tomato", meal_type="lunch")] == ["soup"]
+    assert [r.id for r in catalog.query(search="oil", max_calories=400)] == ["salad"]
+    by_calories = catalog.query(search="tomato", order_by="calories", descending=True, limit=10)
+    assert [r.id for r in by_calories] == ["curry", "pasta", "soup"]
+    assert [r.id for r in catalog.query(search="tomato", offset=2, limit=5)] == ["curry"]
+
+
+def test_index_follows_updates_and_removals() -> None:
+    catalog = _catalog()
+
+    catalog.add(make_recipe(
+        "curry", title="Chicken Korma", description="Mild and creamy", ingredients=["chicken", "yogurt"]
+    ))
+    assert {r.id for r in catalog.query(search="tomato", limit=10)} == {"pasta", "soup"}
+    assert [r.id for r in catalog.query(search="korma")] == ["curry"]
+
+    catalog.remove("salad")
+    assert [r.id for r in catalog.query(search="chick*")] == ["curry"]
+    assert catalog.query(search="lemon") == []
+
+    index = RecipeTextIndex()
+    index.add(0, make_recipe("x", title="Lemon Tart"))
+    index.remove(0)
+    assert index.stats() == {"documents": 0, "terms": 0}
+
+
+def test_admin_edits_show_up_in_search() -> None:
+    client = TestClient(app)
+    body = make_recipe(
+        "new", title="Saffron Risotto", description="Creamy rice", ingredients=["arborio rice", "saffron"]
+    ).model_dump(exclude={"id"})
+
+    created = client.post("/api/v1/recipes/", json=body).json()
+    try:
+        found = client.get("/api/v1/recipes/", params={"search": "saffron"}).json()
+        assert [r["id"] for r in found] == [created["id"]]
+
+        body["title"] = "Mushroom Risotto"
+        body["ingredients"] = [{"name": "mushrooms", "amount": 1, "unit": "g"}]
+        assert client.put(f"/api/v1/recipes/{created['id']}", json=body).status_code == 200
+        assert client.get("/api/v1/recipes/", params={"search": "saffron"}).json() == []
+        assert len(client.get("/api/v1/recipes/", params={"search": "mushroom"}).json()) == 1
+    finally:
+        assert client.delete(f"/api/v1/recipes/{created['id']}").status_code == 200
+    assert client.get("/api/v1/recipes/", params={"search": "mushroom"}).json() == []
+    assert client.delete(f"/api/v1/recipes/{created['id']}").status_code == 404
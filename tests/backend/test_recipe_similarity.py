@@ -0,0 +1,92 @@
+import random
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.api.routes.recipes import SAMPLE_RECIPES
+from app.main import app
+from app.services.recipe_catalog import RecipeCatalog, bitmap_from_docs
+from app.services.recipe_similarity import FEATURE_WEIGHTS, NutritionVectors, bitmap_to_mask
+from conftest import make_recipe
+
+
+def test_bitmap_to_mask() -> None:
+    assert bitmap_to_mask(bitmap_from_docs([0, 3, 9]), 12).tolist() == [
+        i in (0, 3, 9) for i in range(12)
+    ]
+
+
+def test_nearest_matches_brute_force() -> None:
+    rng = random.Random(3)
+    recipes = [
+        make_recipe(str(i), calories=rng.randint(100, 1200), protein=rng.uniform(0, 60), carbs=rng.uniform(0, 120),
+                    fat=rng.uniform(0, 50), fiber=rng.choice([None, rng.uniform(0, 15)]),
+                    cost_per_serving=rng.choice([None, rng.uniform(1, 9)]))
+        for i in range(500)
+    ]
+    vectors = NutritionVectors()
+    for doc, recipe in enumerate(recipes):
+        vectors.add(doc, recipe)
+    allowed = bitmap_from_docs(doc for doc in range(500) if doc % 3 and doc != 42)
+
+    raw = np.array([
+        [r.nutrition.calories, r.nutrition.protein, r.nutrition.carbs, r.nutrition.fat,
+         np.nan if r.nutrition.fiber is None else r.nutrition.fiber,
+         np.nan if r.cost_per_serving is None else r.cost_per_serving]
+        for r in recipes
+    ])
+    scaled = np.nan_to_num((raw - np.nanmean(raw, axis=0)) / np.nanstd(raw, axis=0))
+    scaled *= np.sqrt(list(FEATURE_WEIGHTS.values()))
+    distances = ((scaled - scaled[42]) ** 2).sum(axis=1)
+    expected = sorted((doc for doc in range(500) if doc % 3 and doc != 42), key=lambda doc: distances[doc])[:10]
+
+    assert vectors.nearest(42, allowed, 10) == expected
+    assert vectors.nearest(42, allowed, 10_000) == sorted(
+        (doc for doc in range(500) if doc % 3 and doc != 42), key=lambda doc: distances[doc]
+    )
+    assert vectors.nearest(42, 0, 10) == []
+
+
+def test_catalog_alternatives_respect_constraints_and_edits() -> None:
+    catalog = RecipeCatalog()
+    catalog.add_many([
+        make_recipe("base", calories=500),
+        make_recipe("close", calories=520),
+        make_recipe("closer-but-lunch", calories=500, meal_type="lunch"),
+        make_recipe("close-with-nuts", calories=505, not_suitable_for=["Nut Allergy"]),
+        make_recipe("far", calories=1100, protein=60, fat=45),
+        make_recipe("same-calories-more-protein", calories=500, protein=55),
+    ])
+
+    def alternatives(**filters):
+        return [r.id for r in catalog.query(meal_type="dinner", similar_to="base", limit=10, **filters)]
+
+    assert alternatives() == ["close-with-nuts", "close", "same-calories-more-protein", "far"]
+    assert alternatives(exclude_not_suitable_for=["nut allergy"]) == ["close", "same-calories-more-protein", "far"]
+    assert alternatives(max_calories=1000)[-1] == "same-calories-more-protein"
+
+    catalog.add(make_recipe("far", calories=500))
+    assert alternatives()[0] == "far"
+    catalog.remove("close-with-nuts")
+    assert "close-with-nuts" not in alternatives()
+    assert catalog.query(similar_to="missing") == []
+
+
+def test_alternatives_route_uses_nutrition_similarity() -> None:
+    client = TestClient(app)
+    recipe = next(r for r in SAMPLE_RECIPES if r.meal_type == "dinner")
+
+    response = client.get(f"/api/v1/recipes/{recipe.id}/alternatives", params={"limit": 10})
+    assert response.status_code == 200
+    ids = [r["id"] for r in response.json()]
+    assert recipe.id not in ids
+    assert ids and {r.meal_type for r in SAMPLE_RECIPES if r.id in ids} == {"dinner"}
+
+    allergen = next(a for r in SAMPLE_RECIPES if r.id in ids for a in r.not_suitable_for)
+    safe = client.get(
+        f"/api/v1/recipes/{recipe.id}/alternatives", params={"limit": 10, "exclude_allergens": allergen}
+    ).json()
+    assert {r["id"] for r in safe} == {
+        i for i in ids if allergen not in next(r for r in SAMPLE_RECIPES if r.id == i).not_suitable_for
+    }
+    assert client.get("/api/v1/recipes/missing/alternatives").status_code == 404
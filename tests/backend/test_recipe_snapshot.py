@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+from app.api.routes import recipes as recipe_routes
+from app.api.routes.recipes import SAMPLE_RECIPES, RecipeResponse, load_local_catalog
+from app.core.config import settings
+from app.services import recipe_catalog as catalog_module
+from app.services.recipe_catalog import RecipeCatalog
+from app.services.recipe_snapshot import SNAPSHOT_MAGIC, RecipeSnapshot, write_snapshot
+
+
+def _bare_recipe() -> RecipeResponse:
+    return SAMPLE_RECIPES[0].model_copy(update={
+        "id": "bare",
+        "cost_per_serving": None,
+        "image_url": None,
+        "tags": [],
+        "ingredients": [],
+        "nutrition": SAMPLE_RECIPES[0].nutrition.model_copy(update={"fiber": None}),
+    })
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = str(tmp_path / "recipes.snapshot")
+    write_snapshot([*SAMPLE_RECIPES, _bare_recipe()], path)
+    return path
+
+
+def test_rows_round_trip(snapshot_path) -> None:
+    snapshot = RecipeSnapshot(snapshot_path, RecipeResponse)
+
+    assert len(snapshot) == len(SAMPLE_RECIPES) + 1
+    assert [snapshot.recipe(row) for row in range(len(snapshot))] == [*SAMPLE_RECIPES, _bare_recipe()]
+    assert snapshot.strings("id")[-1] == "bare"
+    assert snapshot.values("ingredients.name", 0) == [i.name for i in SAMPLE_RECIPES[0].ingredients]
+    assert snapshot.number("nutrition.fiber", len(SAMPLE_RECIPES)) is None
+
+
+def test_rejects_other_files_and_versions(tmp_path, snapshot_path) -> None:
+    other = tmp_path / "other"
+    other.write_bytes(b"not a snapshot at all")
+    with pytest.raises(ValueError, match="not a recipe snapshot"):
+        RecipeSnapshot(str(other), RecipeResponse)
+
+    data = bytearray(open(snapshot_path, "rb").read())
+    data[len(SNAPSHOT_MAGIC)] += 1
+    other.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="version 2"):
+        RecipeSnapshot(str(other), RecipeResponse)
+
+
+def test_snapshot_catalog_answers_like_the_object_catalog(snapshot_path) -> None:
+    recipes = [*SAMPLE_RECIPES, _bare_recipe()]
+    from_objects = RecipeCatalog()
+    from_objects.add_many(recipes)
+    from_snapshot = RecipeCatalog()
+    from_snapshot.load_snapshot(RecipeSnapshot(snapshot_path, RecipeResponse))
+
+    # Nothing is materialized until rows are read
+    assert from_snapshot._recipes == [None] * len(recipes)
+    assert from_snapshot.query(meal_type="lunch", limit=1) == from_objects.query(meal_type="lunch", limit=1)
+    assert sum(recipe is not None for recipe in from_snapshot._recipes) == 1
+    assert from_snapshot.fill_text_index()
+
+    dinner = next(r for r in recipes if r.meal_type == "dinner")
+    for filters in (
+        dict(cuisine=recipes[0].cuisine.upper()),
+        dict(tags=["high protein", "quick"], max_calories=600),
+        dict(suitable_for=[recipes[0].suitable_for[0]], exclude_not_suitable_for=["Lactose Intolerance"]),
+        dict(max_cost=4, order_by="cost", descending=True),
+        dict(min_calories=400, order_by="rating"),
+        dict(search="chick* high protein"),
+        dict(search='"green curry"'),
+        dict(meal_type="dinner", similar_to=dinner.id),
+    ):
+        assert from_snapshot.query(limit=50, **filters) == from_objects.query(limit=50, **filters), filters
+    assert from_snapshot.facet_values("tags") == from_objects.facet_values("tags")
+    assert from_snapshot.get("bare") == _bare_recipe()
+
+
+def test_edits_after_loading_a_snapshot(snapshot_path) -> None:
+    catalog = RecipeCatalog()
+    catalog.load_snapshot(RecipeSnapshot(snapshot_path, RecipeResponse))
+    first = SAMPLE_RECIPES[0]
+
+    catalog.add(first.model_copy(update={"title": "Saffron Rice Bowl", "nutrition": first.nutrition.model_copy(
+        update={"calories": 9999})}))
+    assert catalog.remove("bare")
+    asyncio.run(catalog.fill_text_index_gradually())
+    assert [r.id for r in catalog.query(search="saffron")] == [first.id]
+    assert catalog.query(search=f'"{first.title}"') == []
+    assert [r.id for r in catalog.query(min_calories=5000)] == [first.id]
+    assert catalog.get("bare") is None
+    assert len(catalog) == len(SAMPLE_RECIPES)
+
+
+def test_searches_scan_titles_until_the_text_index_is_filled(monkeypatch, snapshot_path) -> None:
+    catalog = RecipeCatalog()
+    catalog.load_snapshot(RecipeSnapshot(snapshot_path, RecipeResponse))
+    curry = next(r for r in SAMPLE_RECIPES if "curry" in r.title.lower())
+    titled = [r.id for r in [*SAMPLE_RECIPES, _bare_recipe()] if "curry" in r.title.lower()]
+
+    # Title matches in catalog order, without indexing anything
+    assert [r.id for r in catalog.query(search="Curries", limit=50)] == titled
+    assert catalog.stats()["search"] == {"documents": 0, "terms": 0, "backlog": len(SAMPLE_RECIPES) + 1}
+    first = catalog.query(search="curry", limit=1)[0]
+    page_key = catalog.page_key(first, search="curry")
+    assert [r.id for r in catalog.query(search="curry", after=page_key, limit=50)] == titled[1:]
+
+    monkeypatch.setattr(catalog_module, "TEXT_INDEX_CHUNK", 2)
+
+    async def fill_while_searching():
+        filling = asyncio.create_task(catalog.fill_text_index_gradually())
+        await asyncio.sleep(0)
+        # Part of the rows are indexed; searches still scan titles
+        assert 0 < catalog.stats()["search"]["documents"] < len(SAMPLE_RECIPES)
+        assert [r.id for r in catalog.query(search="curry", limit=50)] == titled
+        await filling
+
+    asyncio.run(fill_while_searching())
+    assert catalog.stats()["search"]["backlog"] == 0
+    # Indexed: ingredients and descriptions match too, ranked by relevance
+    assert curry.id in [r.id for r in catalog.query(search="curry", limit=50)]
+    assert catalog._scan_titles is None
+
+
+def test_startup_loads_the_configured_snapshot(monkeypatch, snapshot_path) -> None:
+    monkeypatch.setattr(settings, "RECIPE_SNAPSHOT_PATH", snapshot_path)
+    catalog = RecipeCatalog()
+    monkeypatch.setattr(recipe_routes, "recipe_catalog", catalog)
+
+    load_local_catalog()
+    assert catalog.stats()["snapshot"]["rows"] == len(SAMPLE_RECIPES) + 1
+    assert catalog.get("bare") == _bare_recipe()
+
+
+def test_startup_ignores_a_bad_snapshot(monkeypatch, tmp_path) -> None:
+    path = tmp_path / "broken.snapshot"
+    path.write_bytes(b"garbage")
+    monkeypatch.setattr(settings, "RECIPE_SNAPSHOT_PATH", str(path))
+    catalog = RecipeCatalog()
+    monkeypatch.setattr(recipe_routes, "recipe_catalog", catalog)
+
+    load_local_catalog()
+    assert len(catalog) == len(SAMPLE_RECIPES)
+    assert catalog.stats()["snapshot"] is None
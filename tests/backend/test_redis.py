@@ -0,0 +1,38 @@
+import asyncio
+
+from app.core import redis as redis_module
+from app.core.redis import RedisClient
+
+
+class _SlowRedis:
+    created = []
+
+    def __init__(self, **kwargs):
+        self.closed = False
+        _SlowRedis.created.append(self)
+
+    async def ping(self):
+        await asyncio.sleep(0.01)
+        return True
+
+    async def close(self):
+        self.closed = True
+
+
+def test_concurrent_first_callers_share_one_client(monkeypatch) -> None:
+    monkeypatch.setattr(redis_module.redis, "Redis", _SlowRedis)
+    monkeypatch.setattr(_SlowRedis, "created", [])
+    monkeypatch.setattr(RedisClient, "_instance", None)
+    monkeypatch.setattr(RedisClient, "_is_connected", False)
+    monkeypatch.setattr(RedisClient, "_retry_at", 0.0)
+
+    async def run():
+        clients = await asyncio.gather(*(RedisClient.get_client() for _ in range(5)))
+        await RedisClient.close()
+        return clients
+
+    clients = asyncio.run(run())
+    # One client is created and pinged; the callers that waited get it too
+    assert len(_SlowRedis.created) == 1
+    assert all(client is _SlowRedis.created[0] for client in clients)
+    assert _SlowRedis.created[0].closed
@@ -0,0 +1,179 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.request_context import request_deadline, set_request_deadline
+from app.core.resilience import CircuitBreaker, ResilientUpstream, UpstreamUnavailableError
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "UPSTREAM_RETRY_BASE_DELAY", 0.001)
+    monkeypatch.setattr(settings, "UPSTREAM_RETRY_MAX_DELAY", 0.002)
+
+
+def test_circuit_breaker_opens_and_half_opens(monkeypatch) -> None:
+    clock = [0.0]
+    monkeypatch.setattr("app.core.resilience.time.monotonic", lambda: clock[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock[0] = 11
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial request
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_retries_transient_failures() -> None:
+    upstream = ResilientUpstream("test", timeout=1.0)
+    calls = []
+
+    async def attempt(timeout: float) -> httpx.Response:
+        calls.append(timeout)
+        if len(calls) < 3:
+            raise httpx.ConnectError("refused")
+        return httpx.Response(200)
+
+    response = asyncio.run(upstream.call(attempt))
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_counts_failed_calls_not_attempts() -> None:
+    upstream = ResilientUpstream("test", timeout=1.0)
+    upstream.breaker.failure_threshold = 2
+    calls = []
+
+    async def attempt(timeout: float) -> httpx.Response:
+        calls.append(timeout)
+        return httpx.Response(503)
+
+    with pytest.raises(UpstreamUnavailableError):
+        asyncio.run(upstream.call(attempt))
+    # Every attempt of the call ran and the call counted once
+    assert len(calls) == 1 + settings.UPSTREAM_RETRY_ATTEMPTS
+    assert upstream.breaker.failures == 1
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+    with pytest.raises(UpstreamUnavailableError):
+        asyncio.run(upstream.call(attempt))
+    assert upstream.breaker.state == CircuitBreaker.OPEN
+
+
+def test_non_idempotent_calls_are_not_retried() -> None:
+    upstream = ResilientUpstream("test", timeout=1.0)
+    calls = []
+
+    async def attempt(timeout: float) -> httpx.Response:
+        calls.append(timeout)
+        return httpx.Response(502)
+
+    with pytest.raises(UpstreamUnavailableError):
+        asyncio.run(upstream.call(attempt, idempotent=False))
+    assert len(calls) == 1
+
+
+def test_client_errors_are_not_failures() -> None:
+    upstream = ResilientUpstream("test", timeout=1.0)
+
+    async def attempt(timeout: float) -> httpx.Response:
+        return httpx.Response(404)
+
+    assert asyncio.run(upstream.call(attempt)).status_code == 404
+    assert upstream.breaker.failures == 0
+
+
+def test_timeout_is_capped_by_request_deadline() -> None:
+    upstream = ResilientUpstream("test", timeout=5.0)
+    seen = []
+
+    async def attempt(timeout: float) -> httpx.Response:
+        seen.append(timeout)
+        return httpx.Response(200)
+
+    async def run() -> None:
+        token = set_request_deadline(0.5)
+        try:
+            await upstream.call(attempt)
+        finally:
+            request_deadline.reset(token)
+
+    asyncio.run(run())
+    assert 0 < seen[0] <= 0.5
+
+
+def test_hedged_request_wins_over_slow_primary(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "UPSTREAM_HEDGING", True)
+    monkeypatch.setattr(settings, "UPSTREAM_HEDGE_MIN_SAMPLES", 5)
+    upstream = ResilientUpstream("test", timeout=5.0)
+    for _ in range(10):
+        upstream.latency.record(0.01)
+    calls = []
+
+    async def attempt(timeout: float) -> httpx.Response:
+        calls.append(timeout)
+        if len(calls) == 1:
+            await asyncio.sleep(2)
+        return httpx.Response(200)
+
+    response = asyncio.run(asyncio.wait_for(upstream.call(attempt), timeout=1))
+    assert response.status_code == 200
+    assert upstream.hedges == 1
+
+
+def _half_open_upstream() -> ResilientUpstream:
+    """An upstream whose open circuit lets a trial call through right away"""
+    upstream = ResilientUpstream("test", timeout=1.0)
+    for _ in range(upstream.breaker.failure_threshold):
+        upstream.breaker.record_failure()
+    upstream.breaker.reset_seconds = 0
+    return upstream
+
+
+def test_probe_with_spent_deadline_frees_the_trial_slot() -> None:
+    upstream = _half_open_upstream()
+
+    async def attempt(timeout: float) -> httpx.Response:
+        return httpx.Response(200)
+
+    async def run() -> None:
+        token = set_request_deadline(0.0)
+        try:
+            await upstream.call(attempt)
+        finally:
+            request_deadline.reset(token)
+
+    with pytest.raises(UpstreamUnavailableError):
+        asyncio.run(run())
+    assert upstream.breaker.state == CircuitBreaker.HALF_OPEN
+
+    # The next request gets to probe, and closes the circuit
+    assert asyncio.run(upstream.call(attempt)).status_code == 200
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_probe_frees_the_trial_slot() -> None:
+    upstream = _half_open_upstream()
+
+    async def hang(timeout: float) -> httpx.Response:
+        await asyncio.sleep(10)
+        return httpx.Response(200)
+
+    async def ok(timeout: float) -> httpx.Response:
+        return httpx.Response(200)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(upstream.call(hang), timeout=0.05))
+    assert upstream.breaker.state == CircuitBreaker.HALF_OPEN
+
+    assert asyncio.run(upstream.call(ok)).status_code == 200
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
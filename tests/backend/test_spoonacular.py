@@ -0,0 +1,114 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.cache import cache_get, cache_set, generate_cache_key, in_memory_cache
+from app.core.config import settings
+from app.services.spoonacular import RECIPE_CACHE_PREFIX, map_recipe, spoonacular_service
+from app.utils.client import http_clients
+
+
+def _recipe(recipe_id: int) -> dict:
+    return {
+        "id": recipe_id,
+        "title": f"Recipe {recipe_id}",
+        "servings": 2,
+        "nutrition": {"nutrients": [{"name": "Calories", "amount": 400}]},
+    }
+
+
+@pytest.fixture
+def spoonacular_upstream(monkeypatch):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path == "/recipes/informationBulk":
+            ids = [int(i) for i in request.url.params["ids"].split(",")]
+            return httpx.Response(200, json=[_recipe(i) for i in ids])
+        if request.url.path.endswith("/similar"):
+            return httpx.Response(200, json=[{"id": 1}, {"id": 2}, {"id": 3}])
+        return httpx.Response(404)
+
+    monkeypatch.setattr(spoonacular_service, "api_key", "test-key")
+    in_memory_cache.clear()
+    http_clients.set_transport("spoonacular", httpx.MockTransport(handler))
+    asyncio.run(http_clients.aclose())
+    yield requests
+    http_clients.set_transport("spoonacular", None)
+    asyncio.run(http_clients.aclose())
+    in_memory_cache.clear()
+
+
+def test_bulk_lookup_fetches_only_cache_misses(spoonacular_upstream) -> None:
+    async def run():
+        cached = map_recipe(_recipe(1))
+        await cache_set(generate_cache_key(RECIPE_CACHE_PREFIX, 1), cached, 60)
+        recipes = await spoonacular_service.get_recipes_bulk([3, 1, 2, 3])
+        written_back = await cache_get(generate_cache_key(RECIPE_CACHE_PREFIX, 2))
+        return recipes, written_back
+
+    recipes, written_back = asyncio.run(run())
+
+    assert [r.id for r in recipes] == ["3", "1", "2"]
+    assert len(spoonacular_upstream) == 1
+    assert spoonacular_upstream[0].url.params["ids"] == "3,2"
+    assert written_back["title"] == "Recipe 2"
+
+
+def test_alternatives_use_one_bulk_call(spoonacular_upstream) -> None:
+    async def run():
+        first = await spoonacular_service.get_recipe_alternatives(99, 3)
+        # Second call is a cache hit, rebuilt into models
+        second = await spoonacular_service.get_recipe_alternatives(99, 3)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert [r.title for r in first] == ["Recipe 1", "Recipe 2", "Recipe 3"]
+    assert [r.id for r in second] == ["1", "2", "3"]
+    assert second[0].nutrition.calories == 400
+    assert [r.url.path for r in spoonacular_upstream] == ["/recipes/99/similar", "/recipes/informationBulk"]
+
+
+def test_streamed_bulk_lookup(spoonacular_upstream, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "JSON_STREAMING", True)
+
+    recipes = asyncio.run(spoonacular_service.get_recipes_bulk([2, 1]))
+
+    assert [(r.id, r.title, r.nutrition.calories) for r in recipes] == [("2", "Recipe 2", 400), ("1", "Recipe 1", 400)]
+
+
+def test_map_recipe_matches_validated_model() -> None:
+    payload = {
+        "id": 7,
+        "title": "Oat Bowl",
+        "summary": "A <b>quick</b> breakfast",
+        "cuisines": [],
+        "dishTypes": ["Morning Meal", "snack"],
+        "diets": ["vegetarian"],
+        "readyInMinutes": 10,
+        "pricePerServing": 150,
+        "nutrition": {"nutrients": [
+            {"name": "Calories", "amount": 351.6},
+            {"name": "Fat", "amount": 7.04},
+            {"name": "Protein", "amount": 12.31},
+            {"name": "Carbohydrates", "amount": 58.95},
+            {"name": "Calories", "amount": 1},
+        ]},
+        "extendedIngredients": [
+            {"name": "oats", "nameClean": None, "amount": 1, "unit": "cup",
+             "nutrition": {"nutrients": [{"name": "Fat", "amount": 5}, {"name": "Calories", "amount": 307}]}},
+        ],
+    }
+
+    recipe = map_recipe(payload)
+
+    assert recipe == recipe.model_validate(recipe.model_dump())
+    assert (recipe.meal_type, recipe.cuisine, recipe.prep_time) == ("breakfast", "International", 10)
+    assert recipe.nutrition.model_dump() == {"calories": 351, "protein": 12.3, "carbs": 59.0, "fat": 7.0, "fiber": None}
+    assert recipe.ingredients[0].model_dump() == {
+        "name": "oats", "amount": 1.0, "unit": "cup", "calories": 307, "optional": False,
+    }
+    assert recipe.description == "A quick breakfast"
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.cache import cached, in_memory_cache
+from app.core.config import settings
+from app.core.redis import RedisClient
+from app.core.request_context import request_user_id
+from app.core.resilience import UpstreamUnavailableError
+from app.services.spoonacular_quota import SpoonacularQuota, estimate_cost
+
+SEARCH_PARAMS = {
+    "number": 20,
+    "addRecipeInformation": True,
+    "addRecipeNutrition": True,
+    "fillIngredients": True,
+}
+
+
+def test_estimate_cost_counts_search_flags() -> None:
+    assert estimate_cost("/recipes/complexSearch", SEARCH_PARAMS) == pytest.approx(1 + 0.2 + 3 * 0.5)
+    assert estimate_cost("/recipes/complexSearch", {"number": 20}) == pytest.approx(1.2)
+    assert estimate_cost("/recipes/informationBulk", {"ids": "1,2,3"}) == pytest.approx(2.0)
+
+
+def test_headers_override_local_estimate() -> None:
+    quota = SpoonacularQuota(daily_points=150)
+    asyncio.run(quota.record("/recipes/complexSearch", SEARCH_PARAMS, {"X-API-Quota-Used": "100"}))
+    assert quota.remaining == pytest.approx(50)
+
+    # Out-of-order response reporting a lower total doesn't roll usage back
+    asyncio.run(quota.record("/recipes/1/information", {}, {"X-API-Quota-Used": "90"}))
+    assert quota.remaining == pytest.approx(50)
+
+    asyncio.run(quota.record("/recipes/1/information", {}, {}))
+    assert quota.remaining == pytest.approx(49)
+
+
+def test_shaping_follows_remaining_budget() -> None:
+    quota = SpoonacularQuota(daily_points=100)
+    assert quota.shape("/recipes/complexSearch", SEARCH_PARAMS) == SEARCH_PARAMS
+
+    quota._used = 60
+    reduced = quota.shape("/recipes/complexSearch", SEARCH_PARAMS)
+    assert reduced["number"] == 10
+    assert "fillIngredients" not in reduced
+    assert reduced["addRecipeNutrition"] is True
+
+    quota._used = 85
+    with pytest.raises(UpstreamUnavailableError):
+        quota.shape("/recipes/complexSearch", SEARCH_PARAMS)
+
+    token = request_user_id.set("user_demo")
+    try:
+        minimal = quota.shape("/recipes/complexSearch", SEARCH_PARAMS)
+    finally:
+        request_user_id.reset(token)
+    assert minimal["number"] == 5
+    assert "addRecipeNutrition" not in minimal
+
+
+def test_exhausted_quota_refuses_every_call() -> None:
+    quota = SpoonacularQuota(daily_points=150)
+    quota.mark_exhausted()
+    assert quota.tier() == "reserve"
+
+    token = request_user_id.set("user_demo")
+    try:
+        with pytest.raises(UpstreamUnavailableError):
+            quota.shape("/recipes/1/information", {})
+    finally:
+        request_user_id.reset(token)
+
+
+def test_shaped_responses_are_cached_briefly(monkeypatch) -> None:
+    monkeypatch.setattr(RedisClient, "_retry_at", float("inf"))
+    in_memory_cache.clear()
+    quota = SpoonacularQuota(daily_points=100)
+
+    @cached(ttl=3600, prefix="test:shaped:search")
+    async def search(query: str) -> dict:
+        return quota.shape("/recipes/complexSearch", SEARCH_PARAMS)
+
+    @cached(ttl=86400, prefix="test:shaped:page")
+    async def page(query: str) -> dict:
+        return await search(query)
+
+    def ttls() -> dict:
+        now = time.time()
+        return {key.split(":")[2]: expiry - now for key, (_, expiry) in in_memory_cache._cache.items()}
+
+    asyncio.run(page("full"))
+    assert all(ttl > settings.SPOONACULAR_SHAPED_CACHE_TTL for ttl in ttls().values())
+
+    in_memory_cache.clear()
+    quota._used = 60
+    asyncio.run(page("reduced"))
+    # The shaped search and the page built from it both expire early
+    assert sorted(ttls()) == ["page", "search"]
+    assert all(ttl <= settings.SPOONACULAR_SHAPED_CACHE_TTL for ttl in ttls().values())
+    in_memory_cache.clear()
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+
+import pytest
+
+from app.core.config import settings
+from app.core.redis import RedisClient
+from app.core.tokens import BloomFilter, RevocationFilter, TokenRegistry
+
+
+def test_bloom_filter_has_no_false_negatives() -> None:
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"jti-{i}")
+
+    assert all(f"jti-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_revocation_filter_keeps_previous_generation(monkeypatch) -> None:
+    clock = [0.0]
+    monkeypatch.setattr("app.core.tokens.time.monotonic", lambda: clock[0])
+    revoked = RevocationFilter(capacity=100, error_rate=0.001, rotate_seconds=60)
+
+    revoked.add("a")
+    clock[0] = 61
+    assert "a" in revoked
+    clock[0] = 122
+    assert "a" not in revoked
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    async def get_client():
+        return client
+
+    monkeypatch.setattr(RedisClient, "get_client", get_client)
+    return client
+
+
+def test_refresh_tokens_are_consumed_once_in_one_step(fake_redis) -> None:
+    registry = TokenRegistry()
+
+    async def run():
+        await registry.register_refresh_token("t1", "user_1", ttl=60)
+        # Concurrent refreshes with one token: exactly one wins, the rest count as reuse
+        first = await asyncio.gather(*(registry.consume_refresh_token("t1", "fam", ttl=60) for _ in range(5)))
+
+        await registry.register_refresh_token("t2", "user_1", ttl=60)
+        after_reuse = await registry.consume_refresh_token("t2", "fam", ttl=60)
+
+        await registry.register_refresh_token("t3", "user_2", ttl=60)
+        other_family = await registry.consume_refresh_token("t3", "fam2", ttl=60)
+        return first, after_reuse, other_family, await fake_redis.exists("auth:refresh:t2")
+
+    first, after_reuse, other_family, t2_left = asyncio.run(run())
+    assert sorted(first) == [False] * 4 + [True]
+    # The reused token's family is revoked without consuming its live tokens
+    assert after_reuse is False and t2_left == 1
+    assert other_family is True
+
+
+def test_consume_script_runs_on_the_current_client(monkeypatch) -> None:
+    fakeredis = pytest.importorskip("fakeredis")
+    registry = TokenRegistry()
+    clients = [fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer(), decode_responses=True) for _ in range(2)]
+    current = clients[0]
+
+    async def get_client():
+        return current
+
+    monkeypatch.setattr(RedisClient, "get_client", get_client)
+
+    async def consume(jti):
+        await registry.register_refresh_token(jti, "user_1", ttl=60)
+        return await registry.consume_refresh_token(jti, "fam", ttl=60), await current.exists(f"auth:refresh:{jti}")
+
+    first = asyncio.run(consume("t1"))
+    # After a reconnect the registered script must not keep using the old client
+    current = clients[1]
+    second = asyncio.run(consume("t2"))
+    assert first == second == (True, 0)
+
+
+def test_startup_warns_about_per_worker_fallback(monkeypatch, caplog) -> None:
+    async def no_redis():
+        return None
+
+    monkeypatch.setattr(RedisClient, "get_client", no_redis)
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+    registry = TokenRegistry()
+
+    async def run():
+        await registry.start()
+        await registry.stop()
+
+    with caplog.at_level(logging.WARNING, logger="app.core.tokens"):
+        asyncio.run(run())
+    assert "4 workers" in caplog.text
+
+    caplog.clear()
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 1)
+    with caplog.at_level(logging.WARNING, logger="app.core.tokens"):
+        asyncio.run(run())
+    assert "workers" not in caplog.text
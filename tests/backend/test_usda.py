@@ -0,0 +1,113 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.core.cache import in_memory_cache
+from app.core.config import settings
+from app.core.redis import RedisClient
+from app.services.usda import FoodLoader, map_food_nutrition, usda_service
+from app.utils.client import http_clients
+
+
+def _food(fdc_id: int) -> dict:
+    return {
+        "fdcId": fdc_id,
+        "description": f"Food {fdc_id}",
+        "foodNutrients": [{"nutrientId": 1008, "amount": 100}],
+    }
+
+
+@pytest.fixture
+def usda_upstream(monkeypatch):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path.endswith("/foods"):
+            ids = json.loads(request.content)["fdcIds"]
+            return httpx.Response(200, json=[_food(i) for i in ids if i < 900])
+        return httpx.Response(404)
+
+    monkeypatch.setattr(usda_service, "api_key", "test-key")
+    # Use the in-memory cache; connection attempts would stagger the lookups
+    monkeypatch.setattr(RedisClient, "_retry_at", float("inf"))
+    # Wide window so the batching assertions don't depend on timing
+    monkeypatch.setattr(usda_service, "food_loader", FoodLoader(usda_service._fetch_foods_batch, window_ms=50))
+    in_memory_cache.clear()
+    http_clients.set_transport("usda", httpx.MockTransport(handler))
+    asyncio.run(http_clients.aclose())
+    yield requests
+    http_clients.set_transport("usda", None)
+    asyncio.run(http_clients.aclose())
+    in_memory_cache.clear()
+
+
+def test_concurrent_lookups_are_batched(usda_upstream) -> None:
+    async def run():
+        ids = list(range(1, 26)) + [3]
+        return await asyncio.gather(*(usda_service.get_food_by_id(i) for i in ids))
+
+    foods = asyncio.run(run())
+
+    assert [f.fdc_id for f in foods] == list(range(1, 26)) + [3]
+    batches = [json.loads(r.content)["fdcIds"] for r in usda_upstream]
+    assert batches == [list(range(1, 21)), list(range(21, 26))]
+
+
+def test_missing_food_fails_only_its_caller(usda_upstream) -> None:
+    async def run():
+        return await asyncio.gather(
+            usda_service.get_food_by_id(7),
+            usda_service.get_food_by_id(999),
+            return_exceptions=True,
+        )
+
+    found, missing = asyncio.run(run())
+
+    assert found.name == "Food 7"
+    assert isinstance(missing, HTTPException) and missing.status_code == 404
+    assert len(usda_upstream) == 1
+
+
+def test_batch_lookup_uses_cache_and_chunks(usda_upstream) -> None:
+    async def run():
+        await usda_service.get_food_by_id(5)
+        usda_upstream.clear()
+        return await usda_service.get_foods_by_ids([5, 1, 5] + list(range(6, 46)) + [999])
+
+    foods = asyncio.run(run())
+
+    assert [f.fdc_id for f in foods] == [5, 1] + list(range(6, 46))
+    batches = sorted(json.loads(r.content)["fdcIds"] for r in usda_upstream)
+    assert batches == sorted([[1] + list(range(6, 25)), list(range(25, 45)), [45, 999]])
+    assert 5 not in sum(batches, [])
+
+
+def test_streamed_batch_lookup(usda_upstream, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "JSON_STREAMING", True)
+
+    foods = asyncio.run(usda_service.get_foods_by_ids([5, 999, 6]))
+
+    assert [(f.fdc_id, f.calories) for f in foods] == [(5, 100), (6, 100)]
+
+
+def test_map_food_nutrition_indexes_nutrients_once() -> None:
+    food = map_food_nutrition({
+        "fdcId": 171705,
+        "description": "Avocados, raw",
+        "dataType": "SR Legacy",
+        "foodNutrients": [
+            {"nutrientId": 1004, "amount": 14.66},
+            {"nutrientId": 1008, "amount": 160},
+            {"nutrientId": 1079, "amount": 6.7},
+            {"nutrientId": 1008, "amount": 670},
+        ],
+        "foodPortions": [{"amount": 1.0, "measureUnit": {"name": "cup"}}],
+    })
+
+    assert food == food.model_validate(food.model_dump())
+    assert (food.calories, food.fat, food.fiber, food.protein, food.sugar) == (160, 14.66, 6.7, 0.0, None)
+    assert (food.serving_size, food.serving_unit) == (1.0, "cup")